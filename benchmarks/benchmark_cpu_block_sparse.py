@@ -0,0 +1,89 @@
+import argparse
+import itertools
+
+import pandas as pd
+import torch
+
+from torchao.sparsity.prototype.superblock.blocksparse import (
+    blocksparse_int_addmm,
+    side_by_side_block_values,
+)
+from torchao.sparsity.utils import create_block_sparse_tensor
+from torchao.utils import benchmark_model
+
+
+def run_cpu_block_sparse_benchmark(m, k, n, block_size, sparsity_level, args):
+    mask = create_block_sparse_tensor(m, k, block_size, sparsity_level, torch.float32, device="cpu")
+    weight = torch.randint(-127, 127, (m, k), dtype=torch.int8) * mask.to(torch.int8)
+    weight_bsr = weight.to_sparse_bsr(block_size)
+    # laid out once, as BlockSparseLayoutType does on cpu
+    values = side_by_side_block_values(weight_bsr.values())
+    # activations are passed transposed, as in the BlockSparseLayoutType linear
+    x_t = torch.randint(-127, 127, (n, k), dtype=torch.int8).t()
+    w_scales = torch.rand(m, dtype=torch.bfloat16)
+    x_scales = torch.rand(n, dtype=torch.bfloat16)
+
+    def dense_fn():
+        y = torch._int_mm(weight, x_t).to(torch.float32) * w_scales.reshape(-1, 1)
+        return (y * x_scales).to(torch.bfloat16).t()
+
+    def sparse_fn():
+        return blocksparse_int_addmm(
+            weight_bsr.crow_indices(),
+            weight_bsr.col_indices(),
+            values,
+            x_t,
+            w_scales,
+            x_scales,
+        )
+
+    torch.testing.assert_close(dense_fn(), sparse_fn(), rtol=0, atol=0)
+
+    # warmup
+    benchmark_model(dense_fn, 2, device_type="cpu")
+    dense_time = benchmark_model(dense_fn, args.num_runs, device_type="cpu") * 1000
+    benchmark_model(sparse_fn, 2, device_type="cpu")
+    sparse_time = benchmark_model(sparse_fn, args.num_runs, device_type="cpu") * 1000
+
+    return {
+        "m": m,
+        "k": k,
+        "n": n,
+        "block_size": block_size,
+        "sparsity_level": sparsity_level,
+        "num_threads": torch.get_num_threads(),
+        "sparse_latency (ms)": sparse_time,
+        "dense_latency (ms)": dense_time,
+        "speedup (d/s)": dense_time / sparse_time,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPU block-sparse int8 linear microbenchmarks")
+    parser.add_argument("--m", type=int, default=4096, help="output features")
+    parser.add_argument("--k", type=int, default=4096, help="input features")
+    parser.add_argument("--n", type=int, nargs="+", default=[1, 32, 512], help="number of tokens")
+    parser.add_argument("--block-sizes", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--sparsity-levels", type=float, nargs="+", default=[0.5, 0.7, 0.8, 0.9, 0.95])
+    parser.add_argument("--num-threads", type=int, default=None)
+    parser.add_argument("--num-runs", type=int, default=20)
+    parser.add_argument("-save", action="store_true")
+    args = parser.parse_args()
+
+    if args.num_threads is not None:
+        torch.set_num_threads(args.num_threads)
+    print(f"Started benchmark: {args}")
+
+    results = (
+        run_cpu_block_sparse_benchmark(args.m, args.k, n, block_size, sparsity_level, args)
+        for n, block_size, sparsity_level in itertools.product(
+            args.n, args.block_sizes, args.sparsity_levels
+        )
+    )
+
+    df = pd.DataFrame.from_records(results)
+    if args.save:
+        save_file = f"cpu_block_sparse_{args.m}x{args.k}_{torch.get_num_threads()}threads.csv"
+        df.to_csv(save_file)
+        print(f"Finished benchmark: saved results to {save_file}")
+    print(df)
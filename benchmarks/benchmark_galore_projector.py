@@ -0,0 +1,115 @@
+"""Benchmarks the GaLore projection refresh: exact `torch.linalg.svd` against the randomized range finder, cold
+(a fresh random sketch each refresh) and warm-started from the previous projection, for time and projection quality.
+Quality is reported as the subspace overlap with the exact projection, ||P_exact @ P^T||_F^2 / rank, which is 1 when
+the two rank-`rank` subspaces coincide, and as the fraction of the gradient energy captured by the exact projection
+that the approximate one captures, ||G @ P^T||_F^2 / ||G @ P_exact^T||_F^2. The overlap is pessimistic when singular
+values around `rank` are close together, since any basis mixing them captures almost the same energy.
+
+Gradients are synthetic: a slowly rotating matrix with a power-law spectrum plus noise, sampled every `update_proj_gap`
+steps, so consecutive refreshes see related but different subspaces like they do during training.
+
+python benchmarks/benchmark_galore_projector.py --M 4096 --N 4096 --rank 128
+"""
+import argparse
+import time
+
+import torch
+
+from torchao.prototype.galore.utils import get_orthogonal_matrix, get_orthogonal_matrix_randomized
+
+
+def _make_gradients(M, N, num_refreshes, drift, noise, device, dtype):
+    n = min(M, N)
+    U = torch.linalg.qr(torch.randn(M, n, device=device)).Q
+    V = torch.linalg.qr(torch.randn(N, n, device=device)).Q
+    s = torch.arange(1, n + 1, device=device, dtype=torch.float) ** -1.0
+    grads = []
+    for _ in range(num_refreshes):
+        # small random rotation of the singular vectors between refreshes
+        U = torch.linalg.qr(U + drift * torch.randn_like(U) / n**0.5).Q
+        V = torch.linalg.qr(V + drift * torch.randn_like(V) / n**0.5).Q
+        G = (U * s) @ V.t() + noise / max(M, N) ** 0.5 * torch.randn(M, N, device=device)
+        grads.append(G.to(dtype))
+    return grads
+
+
+def _overlap(P, P_ref):
+    # both are (rank x N) with orthonormal rows
+    return (P_ref.float() @ P.float().t()).pow(2).sum().item() / P_ref.shape[0]
+
+
+def _captured_energy(G, P, P_ref):
+    G = G.float()
+    return (G @ P.float().t()).pow(2).sum().item() / (G @ P_ref.float().t()).pow(2).sum().item()
+
+
+def _time(fn):
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    out = fn()
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    return out, time.perf_counter() - start
+
+
+def run(args):
+    device = args.device
+    dtype = getattr(torch, args.dtype)
+    grads = _make_gradients(args.M, args.N, args.num_refreshes, args.drift, args.noise, device, dtype)
+    # GaLore "std" projection: right singular vectors when M >= N, as in GaLoreProjector
+    type = "right" if args.M >= args.N else "left"
+
+    def _as_rows(P):
+        return P if type == "right" else P.t()
+
+    def _as_cols(G):
+        return G if type == "right" else G.t()
+
+    methods = {"exact svd": None}
+    for power_iters in args.power_iters:
+        methods[f"randomized, cold, power_iters={power_iters}"] = (False, power_iters)
+        methods[f"randomized, warm, power_iters={power_iters}"] = (True, power_iters)
+
+    exact = []
+    results = {}
+    for name, config in methods.items():
+        times, overlaps, energies = [], [], []
+        P = None
+        for i, G in enumerate(grads):
+            if config is None:
+                P, t = _time(lambda: get_orthogonal_matrix(G, args.rank, type))
+                exact.append(P)
+            else:
+                warm, power_iters = config
+                init = P if warm else None
+                P, t = _time(
+                    lambda: get_orthogonal_matrix_randomized(
+                        G, args.rank, type, init=init, power_iters=power_iters, oversample=args.oversample
+                    )
+                )
+            overlaps.append(_overlap(_as_rows(P), _as_rows(exact[i])))
+            energies.append(_captured_energy(_as_cols(G), _as_rows(P), _as_rows(exact[i])))
+            times.append(t)
+        # the first refresh includes warmup and is always cold
+        results[name] = [sum(x[1:]) / (len(x) - 1) for x in (times, overlaps, energies)]
+
+    print(f"{args.M}x{args.N}, rank {args.rank}, dtype {args.dtype}, device {device}, {args.num_refreshes} refreshes")
+    print("method, time per refresh (ms), subspace overlap, captured energy")
+    for name, (t, overlap, energy) in results.items():
+        print(f"{name}, {t * 1e3:.2f}, {overlap:.4f}, {energy:.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument("--M", type=int, default=4096)
+    parser.add_argument("--N", type=int, default=4096)
+    parser.add_argument("--rank", type=int, default=128)
+    parser.add_argument("--oversample", type=int, default=8)
+    parser.add_argument("--power_iters", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--num_refreshes", type=int, default=5)
+    parser.add_argument("--drift", type=float, default=0.1, help="rotation of the gradient subspace between refreshes")
+    parser.add_argument("--noise", type=float, default=1e-3, help="approximate spectral norm of the added noise")
+    parser.add_argument("--dtype", type=str, default="float32")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    run(parser.parse_args())
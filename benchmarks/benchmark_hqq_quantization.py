@@ -0,0 +1,67 @@
+"""Benchmarks the time to quantize the linear weights of a llama model with HQQ, solving the weights one at a time
+(`quantize_`), and batching the HQQ problems of several modules (`quantize_(..., hqq_batch_size=n)`), in eager mode and
+with `torch.compile` (`hqq_compile=True`).
+Weights are randomly initialized, only the model shapes matter.
+
+python benchmarks/benchmark_hqq_quantization.py --model_name stories110M
+"""
+import argparse
+import copy
+import time
+
+import torch
+
+from torchao._models.llama.model import Transformer
+from torchao.quantization.quant_api import int4_weight_only, quantize_, uintx_weight_only
+
+
+def _hqq_config(device, group_size):
+    if device == "cuda":
+        return int4_weight_only(group_size=group_size, use_hqq=True)
+    # tinygemm packing needs cuda
+    return uintx_weight_only(torch.uint4, group_size=group_size, use_hqq=True)
+
+
+def _time(fn):
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    fn()
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+    return time.perf_counter() - start
+
+
+def run_benchmarks(model_name, device, precision, group_size, hqq_batch_size):
+    model = Transformer.from_name(model_name).to(device=device, dtype=precision)
+    num_linears = sum(isinstance(module, torch.nn.Linear) for module in model.modules())
+    print(f"model: {model_name}, device: {device}, dtype: {precision}, group size: {group_size}, linear weights: {num_linears}")
+
+    results = {}
+    results["quantize_, one weight at a time"] = _time(
+        lambda: quantize_(copy.deepcopy(model), _hqq_config(device, group_size))
+    )
+    results[f"quantize_, hqq_batch_size={hqq_batch_size}"] = _time(
+        lambda: quantize_(copy.deepcopy(model), _hqq_config(device, group_size), hqq_batch_size=hqq_batch_size)
+    )
+    # the first call compiles
+    quantize_(copy.deepcopy(model), _hqq_config(device, group_size), hqq_batch_size=hqq_batch_size, hqq_compile=True)
+    results[f"quantize_, hqq_batch_size={hqq_batch_size}, hqq_compile=True"] = _time(
+        lambda: quantize_(copy.deepcopy(model), _hqq_config(device, group_size), hqq_batch_size=hqq_batch_size, hqq_compile=True)
+    )
+
+    print("method, time (s)")
+    for name, seconds in results.items():
+        print(f"{name}, {seconds:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Whole model HQQ quantization time")
+    parser.add_argument("--model_name", type=str, default="stories110M", help="llama config name, e.g. stories110M or 7B")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--precision", type=lambda x: getattr(torch, x.split(".")[-1]), default=torch.bfloat16)
+    parser.add_argument("--group_size", type=int, default=64)
+    parser.add_argument("--hqq_batch_size", type=int, default=8, help="modules whose HQQ problems are solved together")
+    args = parser.parse_args()
+
+    run_benchmarks(args.model_name, args.device, args.precision, args.group_size, args.hqq_batch_size)
@@ -42,6 +42,9 @@ OPTIM_MAP = dict(
     AdamW8bitAo=low_bit_optim.AdamW8bit,
     AdamWFp8Ao=low_bit_optim.AdamWFp8,
     AdamW4bitAo=low_bit_optim.AdamW4bit,
+    AdamW8bitAoForeach=partial(low_bit_optim.AdamW8bit, foreach=True),
+    AdamWFp8AoForeach=partial(low_bit_optim.AdamWFp8, foreach=True),
+    AdamW4bitAoForeach=partial(low_bit_optim.AdamW4bit, foreach=True),
 )
 
 try:
@@ -0,0 +1,79 @@
+"""Benchmarks NF4 quantization (`to_nf4`) and dequantization (`get_original_weight`) throughput,
+comparing the bucketize based quantization and the pair lookup dequantization against the
+previous nearest-value search and stack based implementations.
+
+python benchmarks/benchmark_nf4.py --device cpu
+"""
+import argparse
+import time
+from unittest import mock
+
+import torch
+from torchao.dtypes.nf4tensor import NF4Tensor, to_nf4
+
+
+def benchmark_in_ms(device, f, *args, num_runs=10, **kwargs):
+    # warmup
+    f(*args, **kwargs)
+    if device == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(num_runs):
+        f(*args, **kwargs)
+    if device == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) / num_runs * 1000
+
+
+def to_nf4_nearest(tensor, block_size=64, scaler_block_size=256):
+    # quantization with the (numel, 16) distance search
+    with mock.patch.object(NF4Tensor, "quantize_tensor_nearest_bucketize", NF4Tensor.quantize_tensor_nearest):
+        return to_nf4(tensor, block_size, scaler_block_size)
+
+
+def get_original_weight_stack(nf4_tensor):
+    # dequantization decoding each half of the bytes separately then interleaving them with stack
+    first_elements = (nf4_tensor.quantized_data >> 4).to(torch.long)
+    second_elements = (nf4_tensor.quantized_data & 0b1111).to(torch.long)
+    dequantized_first = nf4_tensor.nf4[first_elements]
+    dequantized_second = nf4_tensor.nf4[second_elements]
+    scalers = nf4_tensor.dequantize_scalers(
+        nf4_tensor.quantized_scalers, nf4_tensor.quantization_factor, nf4_tensor.scaler_block_size
+    )
+    repeated = scalers.unsqueeze(-1).expand(scalers.size(0), nf4_tensor.block_size // 2).flatten()
+    scaled_first = (dequantized_first * repeated).unsqueeze(-1).transpose(0, 1)
+    scaled_second = (dequantized_second * repeated).unsqueeze(-1).transpose(0, 1)
+    return torch.stack([scaled_first, scaled_second], dim=-1).reshape(nf4_tensor.shape)
+
+
+def run_benchmarks(device, dtype, shapes, num_runs):
+    print(f"device: {device}, dtype: {dtype}")
+    print("shape, to_nf4 nearest (ms), to_nf4 bucketize (ms), speedup, dequant stack (ms), dequant fused (ms), speedup, bit-exact")
+    for shape in shapes:
+        weight = torch.randn(shape, device=device, dtype=dtype)
+        nearest_ms = benchmark_in_ms(device, to_nf4_nearest, weight, num_runs=num_runs)
+        bucketize_ms = benchmark_in_ms(device, to_nf4, weight, num_runs=num_runs)
+
+        nf4_weight = to_nf4(weight)
+        stack_ms = benchmark_in_ms(device, get_original_weight_stack, nf4_weight, num_runs=num_runs)
+        fused_ms = benchmark_in_ms(device, nf4_weight.get_original_weight, num_runs=num_runs)
+
+        exact = torch.equal(to_nf4_nearest(weight).quantized_data, nf4_weight.quantized_data) and torch.equal(
+            get_original_weight_stack(nf4_weight), nf4_weight.get_original_weight()
+        )
+        print(
+            f"{shape}, {nearest_ms:.2f}, {bucketize_ms:.2f}, {nearest_ms / bucketize_ms:.2f}x, "
+            f"{stack_ms:.2f}, {fused_ms:.2f}, {stack_ms / fused_ms:.2f}x, {exact}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NF4 quantization and dequantization benchmark")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu", choices=["cuda", "cpu"])
+    parser.add_argument("--dtype", type=lambda x: getattr(torch, x.split(".")[-1]), default=torch.bfloat16)
+    parser.add_argument("--num_runs", type=int, default=10)
+    args = parser.parse_args()
+
+    # llama2-7b / llama3-8b linear weight shapes
+    shapes = [(4096, 4096), (11008, 4096), (4096, 14336)]
+    run_benchmarks(args.device, args.dtype, shapes, args.num_runs)
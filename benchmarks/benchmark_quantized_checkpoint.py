@@ -0,0 +1,149 @@
+"""Benchmarks time to first token of the llama model when loading a high precision checkpoint and quantizing it
+at startup (`_load_model` + `quantize_`), streaming it into a meta model one module at a time
+(`quantize_from_checkpoint_`) and loading a checkpoint saved with `save_quantized_checkpoint`
+(`load_quantized_checkpoint`), each in a fresh process so the peak memory increase (anonymous RSS) is reported per path.
+Weights are randomly initialized, only the model shapes matter.
+
+python benchmarks/benchmark_quantized_checkpoint.py --model_name stories110M --quantization int8wo
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import torch
+
+from torchao._models.llama.generate import _load_model, _load_quantized_model, prefill
+from torchao._models.llama.model import Transformer
+from torchao.quantization.quant_api import (
+    int4_weight_only,
+    int8_dynamic_activation_int8_weight,
+    int8_weight_only,
+    quantize_,
+    quantize_from_checkpoint_,
+    save_quantized_checkpoint,
+    uintx_weight_only,
+)
+
+
+def _apply_quantization(model, quantization):
+    if quantization == "int8wo":
+        quantize_(model, int8_weight_only())
+    elif quantization == "int8dq":
+        quantize_(model, int8_dynamic_activation_int8_weight())
+    elif quantization.startswith("int4wo"):
+        quantize_(model, int4_weight_only(group_size=int(quantization.split("-")[1])))
+    elif quantization.startswith("uintx"):
+        _, nbits, group_size = quantization.split("-")
+        quantize_(model, uintx_weight_only(getattr(torch, f"uint{nbits}"), int(group_size)))
+    else:
+        raise ValueError(f"unsupported quantization {quantization}")
+
+
+def _first_token(model, device, prompt_length):
+    with torch.device(device):
+        model.setup_caches(max_batch_size=1, max_seq_length=prompt_length + 1)
+    prompt = torch.randint(0, model.config.vocab_size, (1, prompt_length), device=device)
+    input_pos = torch.arange(0, prompt_length, device=device)
+    with torch.no_grad():
+        token = prefill(model, prompt, input_pos)
+    return token.item()
+
+
+def _rss_gb(field):
+    # linux only
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1]) / 1e6
+
+
+class _PeakAnonymousRss:
+    # samples the anonymous resident memory, i.e. excluding the pages of the memory mapped checkpoints, which
+    # are file backed and can be dropped by the kernel at any time
+    def __enter__(self):
+        self.baseline = self.peak = _rss_gb("RssAnon")
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._sample)
+        self.thread.start()
+        return self
+
+    def _sample(self):
+        while not self.stop.wait(0.005):
+            self.peak = max(self.peak, _rss_gb("RssAnon"))
+
+    def __exit__(self, *args):
+        self.stop.set()
+        self.thread.join()
+        self.peak = max(self.peak, _rss_gb("RssAnon"))
+
+
+def _run(path_name, checkpoint_path, quantized_checkpoint_path, quantization, device, precision, prompt_length, num_workers):
+    with _PeakAnonymousRss() as rss:
+        load_s, ttft_s = _load_and_generate(
+            path_name, checkpoint_path, quantized_checkpoint_path, quantization, device, precision, prompt_length, num_workers
+        )
+    return load_s, ttft_s, rss.peak - rss.baseline
+
+
+def _load_and_generate(path_name, checkpoint_path, quantized_checkpoint_path, quantization, device, precision, prompt_length, num_workers):
+    start = time.perf_counter()
+    if path_name == "load then quantize":
+        model = _load_model(checkpoint_path, device, precision)
+        _apply_quantization(model, quantization)
+    elif path_name == "stream and quantize":
+        with torch.device("meta"):
+            model = Transformer.from_name(checkpoint_path.parent.name)
+        quantize_from_checkpoint_(
+            model, checkpoint_path, lambda module: _apply_quantization(module, quantization) or module,
+            lambda module, fqn: isinstance(module, torch.nn.Linear), device=device, dtype=precision, num_workers=num_workers,
+        )
+        model.eval()
+    else:
+        model = _load_quantized_model(checkpoint_path, quantized_checkpoint_path, device)
+    load_s = time.perf_counter() - start
+    _first_token(model, device, prompt_length)
+    ttft_s = time.perf_counter() - start
+    return load_s, ttft_s
+
+
+def run_benchmarks(model_name, quantization, device, precision, prompt_length, num_workers, checkpoint_precision):
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # `_load_model` picks the model config from the checkpoint directory name
+        checkpoint_path = Path(tmp_dir) / model_name / "model.pth"
+        checkpoint_path.parent.mkdir()
+        model = Transformer.from_name(model_name).to(checkpoint_precision)
+        torch.save(model.state_dict(), checkpoint_path)
+        model = model.to(precision)
+        quantized_checkpoint_path = Path(tmp_dir) / model_name / f"model-{quantization}.pt"
+        _apply_quantization(model.to(device), quantization)
+        save_quantized_checkpoint(model, quantized_checkpoint_path)
+        del model
+
+        print(f"model: {model_name}, quantization: {quantization}, device: {device}, dtype: {precision}, checkpoint dtype: {checkpoint_precision}")
+        print(f"checkpoint size: {os.path.getsize(checkpoint_path) / 1e9:.2f} GB, quantized checkpoint size: {os.path.getsize(quantized_checkpoint_path) / 1e9:.2f} GB")
+        print("path, load (s), time to first token (s), peak anonymous rss increase (GB)")
+        for path_name in ["load then quantize", "stream and quantize", "load quantized"]:
+            with ctx.Pool(1) as pool:
+                load_s, ttft_s, max_rss_gb = pool.apply(
+                    _run, (path_name, checkpoint_path, quantized_checkpoint_path, quantization, device, precision, prompt_length, num_workers)
+                )
+            print(f"{path_name}, {load_s:.2f}, {ttft_s:.2f}, {max_rss_gb:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time to first token with a pre-quantized checkpoint")
+    parser.add_argument("--model_name", type=str, default="stories110M", help="llama config name, e.g. stories110M or 7B")
+    parser.add_argument("--quantization", type=str, default="int8wo", help="int8wo, int8dq, int4wo-<groupsize> or uintx-<nbits>-<groupsize>")
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--precision", type=lambda x: getattr(torch, x.split(".")[-1]), default=torch.bfloat16)
+    parser.add_argument("--prompt_length", type=int, default=128)
+    parser.add_argument("--checkpoint_precision", type=lambda x: getattr(torch, x.split(".")[-1]), default=torch.bfloat16, help="dtype of the high precision checkpoint")
+    parser.add_argument("--num_workers", type=int, default=0, help="threads quantizing modules concurrently with quantize_from_checkpoint_")
+    args = parser.parse_args()
+
+    run_benchmarks(args.model_name, args.quantization, args.device, args.precision, args.prompt_length, args.num_workers, args.checkpoint_precision)
@@ -0,0 +1,127 @@
+"""
+Benchmarks whole-model mask computation time and peak memory of WandaSparsifier
+and WeightNormSparsifier on a stack of Llama-2-7B shaped linear layers,
+against the previous argsort-based Wanda mask update.
+"""
+import argparse
+import gc
+import time
+
+import torch
+from torch import nn
+from torch.profiler import profile, ProfilerActivity
+
+from torchao.sparsity import WandaSparsifier
+from torchao.sparsity.prototype import WeightNormSparsifier
+
+# (in_features, out_features) of q, k, v, o, gate, up, down
+LLAMA_7B_LINEAR_SHAPES = [
+    (4096, 4096),
+    (4096, 4096),
+    (4096, 4096),
+    (4096, 4096),
+    (4096, 11008),
+    (4096, 11008),
+    (11008, 4096),
+]
+
+
+class _ArgsortWandaSparsifier(WandaSparsifier):
+    """WandaSparsifier with the previous full argsort mask update, as a baseline"""
+
+    def update_mask(self, module, tensor_name, sparsity_level, **kwargs):
+        mask = getattr(module.parametrizations, tensor_name)[0].mask
+        tensor = getattr(module.parametrizations, tensor_name).original
+        pruning_metric = torch.abs(tensor) * module.activation_post_process.norm
+
+        block_size = pruning_metric.numel()
+        num_specified = int(block_size * sparsity_level)
+        if kwargs.get("semi_structured_block_size", None) is not None:
+            block_size = kwargs["semi_structured_block_size"]
+            num_specified = block_size // 2
+
+        pruning_inds = pruning_metric.view(-1, block_size).argsort(dim=1)[:, :num_specified]
+        mask.data.view(-1, block_size).scatter_(
+            1, pruning_inds, torch.zeros_like(pruning_inds, dtype=mask.dtype)
+        )
+
+
+def _peak_extra_memory_bytes(f):
+    """Peak memory allocated by `f()` on top of what is already allocated"""
+    if torch.cuda.is_available():
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+        start = torch.cuda.memory_allocated()
+        f()
+        torch.cuda.synchronize()
+        return torch.cuda.max_memory_allocated() - start
+
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        f()
+    events = sorted(prof.events(), key=lambda e: e.time_range.start)
+    cur, peak = 0, 0
+    for e in events:
+        cur += e.self_cpu_memory_usage
+        peak = max(peak, cur)
+    return peak
+
+
+def _make_model(num_layers, device):
+    return nn.Sequential(
+        *[
+            nn.Linear(in_features, out_features, bias=False, device=device)
+            for _ in range(num_layers)
+            for in_features, out_features in LLAMA_7B_LINEAR_SHAPES
+        ]
+    )
+
+
+def run(name, make_sparsifier, args):
+    model = _make_model(args.num_layers, args.device)
+    sparsifier = make_sparsifier()
+    sparsifier.prepare(model, config=None)
+    if isinstance(sparsifier, WandaSparsifier):
+        # collect activation norms, layers are not chained so feed each one
+        with torch.no_grad():
+            for linear in model:
+                linear(torch.randn(args.num_tokens, linear.in_features, device=args.device))
+
+    def step():
+        sparsifier.step()
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+
+    t0 = time.perf_counter()
+    step()
+    elapsed = time.perf_counter() - t0
+    peak = _peak_extra_memory_bytes(step)
+    num_params = sum(linear.weight.numel() for linear in model)
+    print(
+        f"{name:<32} {elapsed:>10.2f} s {peak / 1e9:>12.2f} GB  "
+        f"({peak / (num_params * 4):.1f}x the fp32 weights)"
+    )
+    sparsifier.squash_mask()
+    del model
+    gc.collect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sparsifier mask computation benchmarks")
+    parser.add_argument("--num-layers", type=int, default=1, help="number of 7B transformer blocks")
+    parser.add_argument("--num-tokens", type=int, default=128, help="calibration tokens for Wanda")
+    parser.add_argument("--sparsity-level", type=float, default=0.5)
+    parser.add_argument("--device", type=str, default="cuda" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+
+    print(f"Started benchmark: {args}")
+    print(f"{'sparsifier':<32} {'time':>12} {'peak extra memory':>15}")
+    configs = {
+        "wanda unstructured (argsort)": lambda: _ArgsortWandaSparsifier(args.sparsity_level),
+        "wanda unstructured": lambda: WandaSparsifier(args.sparsity_level),
+        "wanda 2:4 (argsort)": lambda: _ArgsortWandaSparsifier(semi_structured_block_size=4),
+        "wanda 2:4": lambda: WandaSparsifier(semi_structured_block_size=4),
+        "weight norm (1, 4) blocks": lambda: WeightNormSparsifier(args.sparsity_level),
+        "weight norm 2:4": lambda: WeightNormSparsifier(1.0, (1, 4), zeros_per_block=2),
+    }
+    for name, make_sparsifier in configs.items():
+        run(name, make_sparsifier, args)
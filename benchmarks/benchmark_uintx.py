@@ -1,10 +1,13 @@
+import argparse
+import time
 from math import log
 from copy import deepcopy
 
 import torch
 from torchao.utils import unwrap_tensor_subclass
-from torchao.prototype.uintx import uintx_affine_weight_only, pack, unpack, pack_cpu, unpack_cpu
-from torchao.quantization.quant_api import quantize_
+from torchao.dtypes.uintx.uintx import _BIT_WIDTH_TO_DTYPE
+from torchao.dtypes.uintx.bitpacking import pack, unpack, pack_cpu, unpack_cpu
+from torchao.quantization.quant_api import quantize_, uintx_weight_only
     
 class Linear16(torch.nn.Module):
     def __init__(self, scale):
@@ -88,7 +91,7 @@ def uintx_vs_fp16(nbits= [1,2,3,4,5,6,7], scales=[256, 512, 1024], repeats=30):
         times.append(fp16_time)
         for bit_size in nbits:
             m = deepcopy(fp16)
-            quantize_(m, uintx_affine_weight_only(bit_size)) 
+            quantize_(m, uintx_weight_only(_BIT_WIDTH_TO_DTYPE[bit_size])) 
             m = torch.compile(m, fullgraph=True)
             uintx_time = benchmark(m.forward, forward_args, repeats)
             times.append(uintx_time)
@@ -101,9 +104,50 @@ def uintx_vs_fp16(nbits= [1,2,3,4,5,6,7], scales=[256, 512, 1024], repeats=30):
         for i in range(2, len(result)):
             print(f"int{nbits[i-2]}: {result[1]/result[i]: .2f}x")
     
-        
-        
-if __name__ == "__main__":   
-    uintx_vs_fp16(nbits=[4,7])
+
+
+def benchmark_cpu(function, args, num_runs):
+    for _ in range(3):
+        function(*args)
+    start = time.perf_counter()
+    for _ in range(num_runs):
+        function(*args)
+    return (time.perf_counter() - start) / num_runs * 1e3
+
+
+def uintx_cpu_decode(nbits=[2, 4, 7], shapes=[(4096, 4096), (11008, 4096)], batch_sizes=[1, 4, 16, 32], group_size=64, dtype=torch.bfloat16, compile=False, repeats=10):
+    """Decode shaped (M=1..32) matmuls on cpu, comparing the float weight, the uintx weight through the tiled
+    unpack-and-matmul dispatch, and dequantizing the full uintx weight before the matmul"""
+    print("out_features, in_features, M, nbits, float (ms), uintx tiled (ms), uintx dequantize (ms)")
+    for out_features, in_features in shapes:
+        linear = torch.nn.Linear(in_features, out_features, bias=False, dtype=dtype)
+        for bit_size in nbits:
+            quantized = deepcopy(linear)
+            quantize_(quantized, uintx_weight_only(_BIT_WIDTH_TO_DTYPE[bit_size], group_size=group_size))
+            weight = quantized.weight
+            dequantize_linear = lambda x: torch.nn.functional.linear(x, weight.dequantize())
+            float_linear, tiled_linear = linear, quantized
+            if compile:
+                float_linear = torch.compile(linear, fullgraph=True)
+                tiled_linear = torch.compile(quantized, fullgraph=True)
+            for m in batch_sizes:
+                x = torch.randn(m, in_features, dtype=dtype)
+                with torch.no_grad():
+                    float_time = benchmark_cpu(float_linear, [x], repeats)
+                    tiled_time = benchmark_cpu(tiled_linear, [x], repeats)
+                    dequantize_time = benchmark_cpu(dequantize_linear, [x], repeats)
+                print(f"{out_features}, {in_features}, {m}, {bit_size}, {float_time:.2f}, {tiled_time:.2f}, {dequantize_time:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="uintx weight only linear benchmarks")
+    parser.add_argument("--cpu", action="store_true", help="decode shaped cpu matmuls instead of the cuda benchmark")
+    parser.add_argument("--compile", action="store_true", help="torch.compile the cpu linears")
+    args = parser.parse_args()
+
+    if args.cpu:
+        uintx_cpu_decode(compile=args.compile)
+    else:
+        uintx_vs_fp16(nbits=[4,7])
     
     
\ No newline at end of file
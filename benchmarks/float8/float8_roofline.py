@@ -12,7 +12,8 @@ layer to float8, by estimating the difference in e2e GPU kernel time between:
 
 The gemm times are estimated either from direct measurements via benchmarks,
 or with a roofline estimation based on TOPS and peak compute bandwidth of an 
-NVIDIA H100.
+NVIDIA H100 (or, with `--device_spec cpu`, on calibrated numbers of the current
+CPU host).
 
 The float8 overhead times are estimated by counting memory reads and writes
 based on the specified float8 scaling, and estimating that we can achieve
@@ -71,6 +72,7 @@ from torchao.float8 import (
     CastConfig,
 )
 from torchao.float8.config import recipe_name_to_linear_config, Float8LinearRecipeName
+from torchao.profiler import CPUDeviceSpec
 
 
 class LNLinearSigmoid(torch.nn.Module):
@@ -179,6 +181,7 @@ def run(
     shape_gen_name: str = "square",
     gemm_cache_filename: Optional[str] = None,
     n_limit: Optional[int] = None,
+    device_spec: str = "h100",
 ):
     """
     Args:
@@ -188,13 +191,34 @@ def run(
     * `shape_gen_name`: `llama`, `square`, or `sweep`
     * `gemm_cache_filename (optional)`: file to cache gemm benchmark results
     * `n_limit (optional)`: if specified, only runs `n_limit` iterations
+    * `device_spec`:
+      - `h100`: use the NVIDIA H100 peak numbers for the roofline estimates
+      - `cpu`: use the bandwidth and gemm throughput of this host, measured
+        with `torchao.profiler.calibrate_device` and cached on disk. There are
+        no float8 gemms on CPU, so the int8 gemm throughput stands in for them.
+        Requires `gemm_time_strategy=roofline`, and the e2e GPU measurements
+        are skipped.
     """
 
     print(f'gemm_time_strategy: {gemm_time_strategy}')
     print(f'shape_gen_name: {shape_gen_name}')
+    print(f'device_spec: {device_spec}')
 
     assert gemm_time_strategy in ("benchmarks", "roofline"), \
         "`gemm_time_strategy` must be 'benchmarks' or 'roofline'"
+    assert device_spec in ("h100", "cpu"), \
+        "`device_spec` must be 'h100' or 'cpu'"
+
+    run_e2e = device_spec == "h100"
+    if device_spec == "cpu":
+        assert gemm_time_strategy == "roofline", \
+            "`device_spec=cpu` requires `gemm_time_strategy=roofline`"
+        spec = CPUDeviceSpec()
+        if torch.float8_e4m3fn not in spec.flops_by_dtype:
+            spec.flops_by_dtype[torch.float8_e4m3fn] = spec.flops_by_dtype[torch.int8]
+        print(spec)
+    else:
+        spec = None
 
     M, K, N = sympy.symbols('M K N')
 
@@ -204,6 +228,7 @@ def run(
         scaling_type_input="dynamic",
         scaling_type_weight="dynamic",
         scaling_type_grad_output="dynamic",
+        device_spec=spec,
     )
     fp8_mem_time_sympy_dyn_nolimit = get_float8_mem_sympy(
         M, K, N,
@@ -211,6 +236,7 @@ def run(
         scaling_type_input="dynamic",
         scaling_type_weight="dynamic",
         scaling_type_grad_output="dynamic",
+        device_spec=spec,
     )
     fp8_mem_time_sympy_del_limit = get_float8_mem_sympy(
         M, K, N,
@@ -218,6 +244,7 @@ def run(
         scaling_type_input="delayed",
         scaling_type_weight="delayed",
         scaling_type_grad_output="delayed",
+        device_spec=spec,
     )
     fp8_mem_time_sympy_del_nolimit = get_float8_mem_sympy(
         M, K, N,
@@ -225,12 +252,13 @@ def run(
         scaling_type_input="delayed",
         scaling_type_weight="delayed",
         scaling_type_grad_output="delayed",
+        device_spec=spec,
     )
 
     if gemm_time_strategy == "roofline":
-        bf16_gemm_time_sympy = get_gemm_time_sympy(M, K, N, torch.bfloat16)
+        bf16_gemm_time_sympy = get_gemm_time_sympy(M, K, N, torch.bfloat16, spec)
         print('bf16_gemm_time_sympy', bf16_gemm_time_sympy)
-        fp8_gemm_time_sympy = get_gemm_time_sympy(M, K, N, torch.float8_e4m3fn)
+        fp8_gemm_time_sympy = get_gemm_time_sympy(M, K, N, torch.float8_e4m3fn, spec)
         print('fp8_gemm_time_sympy', fp8_gemm_time_sympy)
         print()
     else:
@@ -280,40 +308,48 @@ def run(
         fp8_mem_time_del_nolimit_s = \
             fp8_mem_time_sympy_del_nolimit.subs(M, M_val).subs(K, K_val).subs(N, N_val)
 
-        # create the model
-        m_orig = LNLinearSigmoid(K_val, N_val).cuda().bfloat16()
-        x = torch.randn(M_val, K_val, dtype=torch.bfloat16, device="cuda").requires_grad_()
-
-        # get the bf16 gpu kernel time
-        torch._dynamo.reset()
-        m_bf16 = torch.compile(copy.deepcopy(m_orig))
-        bf16_time_actual_s = get_gpu_kernel_time(m_bf16, x)
-
-        # get the float8 dynamic scaling gpu kernel time
-        torch._dynamo.reset()
-        m_fp8_dyn = convert_to_float8_training(copy.deepcopy(m_orig))
-        m_fp8_dyn = torch.compile(m_fp8_dyn)
-        fp8_dyn_time_actual_s = get_gpu_kernel_time(m_fp8_dyn, x)
-
-        # get the float8 delayed scaling gpu kernel time
-        torch._dynamo.reset()
-        config = Float8LinearConfig(
-            enable_amax_init=False,
-            enable_pre_and_post_forward=False,
-            cast_config_input=CastConfig(scaling_type=ScalingType.DELAYED),
-            cast_config_weight=CastConfig(scaling_type=ScalingType.DELAYED),
-            cast_config_grad_output=CastConfig(scaling_type=ScalingType.DELAYED),
-        )
-        m_fp8_del = convert_to_float8_training(copy.deepcopy(m_orig), config=config)
-        m_fp8_del = torch.compile(m_fp8_del)
-        fp8_del_time_actual_s = get_gpu_kernel_time(m_fp8_del, x)
-
-        # get the float8 dynamic axiswise scaling gpu kernel time
-        torch._dynamo.reset()
-        config = recipe_name_to_linear_config(Float8LinearRecipeName.ALL_AXISWISE)
-        m_fp8_dyn_axs = convert_to_float8_training(copy.deepcopy(m_orig), config=config)
-        m_fp8_dyn_axs = torch.compile(m_fp8_dyn_axs)
-        fp8_dyn_axs_time_actual_s = get_gpu_kernel_time(m_fp8_dyn_axs, x)
+        bf16_time_actual_s = fp8_dyn_time_actual_s = None
+        fp8_del_time_actual_s = fp8_dyn_axs_time_actual_s = None
+        fp8_dyn_sp = fp8_del_sp = fp8_dyn_axs_sp = None
+        if run_e2e:
+            # create the model
+            m_orig = LNLinearSigmoid(K_val, N_val).cuda().bfloat16()
+            x = torch.randn(M_val, K_val, dtype=torch.bfloat16, device="cuda").requires_grad_()
+
+            # get the bf16 gpu kernel time
+            torch._dynamo.reset()
+            m_bf16 = torch.compile(copy.deepcopy(m_orig))
+            bf16_time_actual_s = get_gpu_kernel_time(m_bf16, x)
+
+            # get the float8 dynamic scaling gpu kernel time
+            torch._dynamo.reset()
+            m_fp8_dyn = convert_to_float8_training(copy.deepcopy(m_orig))
+            m_fp8_dyn = torch.compile(m_fp8_dyn)
+            fp8_dyn_time_actual_s = get_gpu_kernel_time(m_fp8_dyn, x)
+
+            # get the float8 delayed scaling gpu kernel time
+            torch._dynamo.reset()
+            config = Float8LinearConfig(
+                enable_amax_init=False,
+                enable_pre_and_post_forward=False,
+                cast_config_input=CastConfig(scaling_type=ScalingType.DELAYED),
+                cast_config_weight=CastConfig(scaling_type=ScalingType.DELAYED),
+                cast_config_grad_output=CastConfig(scaling_type=ScalingType.DELAYED),
+            )
+            m_fp8_del = convert_to_float8_training(copy.deepcopy(m_orig), config=config)
+            m_fp8_del = torch.compile(m_fp8_del)
+            fp8_del_time_actual_s = get_gpu_kernel_time(m_fp8_del, x)
+
+            # get the float8 dynamic axiswise scaling gpu kernel time
+            torch._dynamo.reset()
+            config = recipe_name_to_linear_config(Float8LinearRecipeName.ALL_AXISWISE)
+            m_fp8_dyn_axs = convert_to_float8_training(copy.deepcopy(m_orig), config=config)
+            m_fp8_dyn_axs = torch.compile(m_fp8_dyn_axs)
+            fp8_dyn_axs_time_actual_s = get_gpu_kernel_time(m_fp8_dyn_axs, x)
+
+            fp8_dyn_sp = bf16_time_actual_s / fp8_dyn_time_actual_s
+            fp8_del_sp = bf16_time_actual_s / fp8_del_time_actual_s
+            fp8_dyn_axs_sp = bf16_time_actual_s / fp8_dyn_axs_time_actual_s
 
         # get the lw recipe scaling gpu kernel time
         # TODO(future PR): enable below once basic performance issues
@@ -337,9 +373,7 @@ def run(
             bf16_time_actual_s, fp8_dyn_time_actual_s, fp8_del_time_actual_s,
             fp8_dyn_axs_time_actual_s, 
             # fp8_lw_time_actual_s,
-            bf16_time_actual_s / fp8_dyn_time_actual_s,
-            bf16_time_actual_s / fp8_del_time_actual_s,
-            bf16_time_actual_s / fp8_dyn_axs_time_actual_s,
+            fp8_dyn_sp, fp8_del_sp, fp8_dyn_axs_sp,
             # bf16_time_actual_s / fp8_lw_time_actual_s,
         ])
 
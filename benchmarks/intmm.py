@@ -4,16 +4,11 @@ import itertools
 import math
 import sys
 import pathlib
+import time
 
 import torch
 from torchao.utils import TORCH_VERSION_AT_LEAST_2_4, TORCH_VERSION_AT_LEAST_2_2
 
-
-# Check if CUDA is available, if not, exit the script
-if not torch.cuda.is_available():
-    print("CUDA is not available. Exiting the script.")
-    sys.exit(0)
-
 import torch.nn.functional as F
 import torch.utils.benchmark as benchmark
 from torchao.kernel.intmm import int_matmul, int_scaled_matmul
@@ -26,6 +21,8 @@ device = "cuda"
 
 
 def benchmark_in_ms(warmup, iters, f, *args, **kwargs):
+    if device == "cpu":
+        return cpu_benchmark_in_ms(warmup, iters, f, *args, **kwargs)
     for _ in range(warmup):
         f(*args, **kwargs)
     torch.cuda.synchronize()
@@ -41,6 +38,15 @@ def benchmark_in_ms(warmup, iters, f, *args, **kwargs):
     return start_event.elapsed_time(end_event) / float(iters)
 
 
+def cpu_benchmark_in_ms(warmup, iters, f, *args, **kwargs):
+    for _ in range(warmup):
+        f(*args, **kwargs)
+    start = time.perf_counter()
+    for _ in range(iters):
+        f(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000 / float(iters)
+
+
 @torch.compile(mode="max-autotune")
 def compiled_mm(x, w):
     return torch.mm(x, w)
@@ -70,14 +76,25 @@ def run_int_scaled_mm_benchmark(x, w, b):
     return fp_time, int_scaled_mm_time
 
 
-def run_benchmarks(shapes):
+def run_int32_fallback_benchmark(x, w, b):
+    # the upcasting matmul safe_int_mm used on cpu before it dispatched to torch._int_mm
+    x_int = x.to(dtype=torch.int8)
+    w_int = w.to(dtype=torch.int8)
+    fallback_time = benchmark_in_ms(
+        2, 10, lambda x, w: torch.matmul(x.to(torch.int32), w.to(torch.int32)), x_int, w_int
+    )
+    int_mm_time = benchmark_in_ms(2, 10, int_matmul, x_int, w_int)
+    return fallback_time, int_mm_time
+
+
+def run_benchmarks(shapes, compare_fallback=False):
     print("fn,m,k,n,fp_time,int_mm_time,ratio")
     positives = []
     dtype = torch.bfloat16
-    device = "cuda"
-    for fn, (m, k, n) in itertools.product(
-        [run_int_mm_benchmark, run_int_scaled_mm_benchmark], shapes
-    ):
+    fns = [run_int_mm_benchmark, run_int_scaled_mm_benchmark]
+    if compare_fallback:
+        fns.append(run_int32_fallback_benchmark)
+    for fn, (m, k, n) in itertools.product(fns, shapes):
         x = torch.randn(m, k, dtype=dtype, device=device)
         w = torch.randn(n, k, dtype=dtype, device=device).t()
         b = torch.randn(m, n, dtype=dtype, device=device)
@@ -91,7 +108,17 @@ def run_benchmarks(shapes):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="integer matmul benchmarks")
     parser.add_argument("--file_path", type=str, required=True, help="Path to csv file with shapes")
+    parser.add_argument("--device", type=str, default="cuda", choices=["cuda", "cpu"], help="Device to benchmark on")
+    parser.add_argument(
+        "--compare_fallback",
+        action="store_true",
+        help="Also time the int32 upcasting matmul fallback (slow, int32_time is reported in the fp_time column)",
+    )
     args = parser.parse_args()
+    device = args.device
+    if device == "cuda" and not torch.cuda.is_available():
+        print("CUDA is not available. Exiting the script.")
+        sys.exit(0)
     # Access the file path provided as an argument
     file_path = args.file_path
     file_path = pathlib.Path(file_path)
@@ -102,4 +129,4 @@ if __name__ == "__main__":
     # Turn into list of int tuples
     shapes = list(map(lambda x: tuple(map(int, x)), shapes))
 
-    run_benchmarks(shapes)
+    run_benchmarks(shapes, args.compare_fallback)
@@ -109,3 +109,61 @@ def test_dora_layer(
     ref = dora_layer.forward(x)
     test = dora_layer.forward_fused(x)
     check(ref, test, dtype)
+
+
+@pytest.mark.parametrize("dtype", DTYPES, ids=_arg_to_id)
+def test_dora_layer_inference_cache(dtype):
+    from torchao.quantization.quant_api import int8_weight_only
+
+    bs, seqlen, in_features, out_features, lora_rank = 1, 512, 4096, 4096, 16
+    x = torch.randn(bs, seqlen, in_features, dtype=dtype).cuda()
+    base_layer = torch.nn.Linear(
+        in_features, out_features, dtype=dtype, bias=False
+    ).cuda()
+    dora_layer = DoRALinear(base_layer, lora_rank).cuda()
+    torch.nn.init.normal_(dora_layer.dora_layer.lora_B.weight, std=0.01)
+
+    ref = dora_layer.forward(x)
+    with torch.no_grad():
+        cached = dora_layer.forward(x)
+        torch.testing.assert_close(cached, ref.detach())
+
+        dora_layer.merge()
+        merged = dora_layer.forward(x)
+        check(ref, merged, dtype)
+
+        # updating the LoRA weights invalidates the merged weight
+        dora_layer.dora_layer.lora_B.weight.add_(0.01)
+        updated = dora_layer.forward(x)
+    dora_layer.unmerge()
+    updated_ref = dora_layer.forward(x)
+    check(updated_ref, updated, dtype)
+    assert not torch.allclose(merged, updated)
+
+    dora_layer.merge(int8_weight_only())
+    with torch.inference_mode():
+        quantized = dora_layer.forward(x)
+    check(updated_ref, quantized, dtype)
+
+
+@pytest.mark.parametrize("merged", [False, True], ids=_arg_to_id)
+def test_dora_layer_inference_cache_after_inference_mode(merged):
+    in_features, out_features, lora_rank = 64, 32, 4
+    base_layer = torch.nn.Linear(in_features, out_features, bias=False)
+    dora_layer = DoRALinear(base_layer, lora_rank)
+    torch.nn.init.normal_(dora_layer.dora_layer.lora_B.weight, std=0.01)
+    for p in dora_layer._dora_params():
+        p.requires_grad_(False)
+    if merged:
+        dora_layer.merge()
+
+    x = torch.randn(2, 8, in_features)
+    with torch.inference_mode():
+        ref = dora_layer.forward(x)
+
+    # the cache built under inference mode is reused by a grad enabled call
+    x.requires_grad_()
+    out = dora_layer.forward(x)
+    out.sum().backward()
+    torch.testing.assert_close(out.detach(), ref)
+    assert x.grad is not None
@@ -272,6 +272,39 @@ class TestNF4Linear(TestCase):
 
         torch.testing.assert_close(nf4_patched.quantized_data, nf4_base.quantized_data)
 
+    @parametrize("dtype", [torch.bfloat16, torch.float16, torch.float32])
+    def test_quantize_tensor_nearest_bucketize(self, dtype: torch.dtype):
+        nf4 = to_nf4(torch.randn(64, 64, dtype=dtype), 64, 64).nf4
+        midpoints = (nf4[1:] + nf4[:-1]) / 2
+        value = torch.cat([torch.rand(2**16, dtype=dtype) * 2 - 1, nf4, midpoints])
+        torch.testing.assert_close(
+            NF4Tensor.quantize_tensor_nearest_bucketize(value, nf4),
+            NF4Tensor.quantize_tensor_nearest(value, nf4),
+            atol=0,
+            rtol=0,
+        )
+
+    @parametrize("dtype", [torch.bfloat16, torch.float16, torch.float32])
+    def test_get_original_weight(self, dtype: torch.dtype):
+        nf4_tensor = to_nf4(torch.randn(128, 64, dtype=dtype), 64, 32)
+        # reference: decode each half of the bytes separately and scale them by the repeated scalers
+        scalers = nf4_tensor.dequantize_scalers(
+            nf4_tensor.quantized_scalers,
+            nf4_tensor.quantization_factor,
+            nf4_tensor.scaler_block_size,
+        ).repeat_interleave(nf4_tensor.block_size // 2)
+        first = (
+            nf4_tensor.nf4[(nf4_tensor.quantized_data >> 4).to(torch.long)] * scalers
+        )
+        second = (
+            nf4_tensor.nf4[(nf4_tensor.quantized_data & 0b1111).to(torch.long)]
+            * scalers
+        )
+        ref = torch.stack([first, second], dim=-1).reshape(nf4_tensor.shape)
+        torch.testing.assert_close(
+            nf4_tensor.get_original_weight(), ref, atol=0, rtol=0
+        )
+
     @unittest.skipIf(not torch.cuda.is_available(), "Need CUDA available")
     @parametrize("input_size", [(512 * 512,), (512, 512)])
     def test_empty_like(self, input_size: Union[Tuple[int], int]):
@@ -157,3 +157,33 @@ def test_uintx_model_size(dtype):
     uintx_weight_only(dtype)(l[0])
     quantized_size = get_model_size_in_bytes(l)
     assert bf16_size * _dtype_to_ratio[dtype] == quantized_size
+
+@pytest.mark.parametrize("dtype", dtypes)
+@pytest.mark.parametrize("group_size", group_sizes + [512])
+@pytest.mark.skipif(not TORCH_VERSION_AT_LEAST_2_3, reason="sub byte dtype requires torch 2.3+")
+def test_uintx_linear_cpu_tiled(dtype, group_size):
+    from torchao.dtypes.uintx.uintx import _linear_fp_act_uintx_weight_check
+    l = torch.nn.Linear(512, 96, bias=True, dtype=torch.bfloat16)
+    quantize_(l, uintx_weight_only(dtype, group_size=group_size))
+    x = torch.randn(2, 3, 512, dtype=torch.bfloat16)
+    assert _linear_fp_act_uintx_weight_check(x, l.weight, l.bias)
+    ref = torch.nn.functional.linear(x.float(), l.weight.dequantize().float(), l.bias.float()).to(torch.bfloat16)
+    torch.testing.assert_close(l(x), ref, atol=2e-2, rtol=2e-2)
+
+def test_uintx_linear_tile_size():
+    from torchao.dtypes.uintx.uintx import _uintx_linear_tile_size
+    assert _uintx_linear_tile_size(512, 64) == 64
+    assert _uintx_linear_tile_size(512, 32) == 64
+    assert _uintx_linear_tile_size(512, 128) == 64
+    # 8 tiles of in_features // 8 columns would drop the remainder
+    assert _uintx_linear_tile_size(36, 4) is None
+    assert _uintx_linear_tile_size(4, 4) is None
+
+@pytest.mark.skipif(not TORCH_VERSION_AT_LEAST_2_5, reason="torch.compile without unwrap_tensor_subclass requires torch 2.5+")
+def test_uintx_linear_cpu_tiled_compile():
+    l = torch.nn.Linear(512, 96, bias=False, dtype=torch.bfloat16)
+    quantize_(l, uintx_weight_only(torch.uint3, group_size=64))
+    x = torch.randn(4, 512, dtype=torch.bfloat16)
+    eager = l(x)
+    compiled = torch.compile(l, fullgraph=True)(x)
+    torch.testing.assert_close(compiled, eager, atol=2e-2, rtol=2e-2)
@@ -4,6 +4,7 @@
 # This source code is licensed under the BSD 3-Clause license found in the
 # LICENSE file in the root directory of this source tree.
 import copy
+import dataclasses
 import io
 import itertools
 import random
@@ -33,6 +34,7 @@ from torchao.float8.config import (
 )
 from torchao.float8.float8_linear import Float8Linear
 from torchao.float8.float8_linear_utils import (
+    clear_float8_weight_cache,
     convert_to_float8_training,
     linear_requires_sync,
     sync_float8_amax_and_scale_history,
@@ -510,6 +512,89 @@ class TestFloat8Linear:
         s = m.__repr__()
         assert "i:dyn_ten,w:del_ten,go:dyn_ten" in s
 
+    @pytest.mark.parametrize(
+        "scaling_type_weight", [ScalingType.DYNAMIC, ScalingType.STATIC]
+    )
+    @pytest.mark.parametrize("enable_fsdp_float8_all_gather", [False, True])
+    def test_weight_cast_cache(
+        self, scaling_type_weight: ScalingType, enable_fsdp_float8_all_gather: bool
+    ):
+        if enable_fsdp_float8_all_gather and scaling_type_weight is not ScalingType.DYNAMIC:
+            pytest.skip("covered by the dynamic weight wrapper")
+        static_scale = (
+            torch.tensor([1.0]) if scaling_type_weight is ScalingType.STATIC else None
+        )
+        config = Float8LinearConfig(
+            cast_config_weight=CastConfig(
+                scaling_type=scaling_type_weight, static_scale=static_scale
+            ),
+            enable_fsdp_float8_all_gather=enable_fsdp_float8_all_gather,
+            emulate=True,
+        )
+        cached_config = dataclasses.replace(config, cache_fp8_weight=True)
+        m_ref = nn.Linear(32, 16)
+        m = Float8Linear.from_float(copy.deepcopy(m_ref), config)
+        m_cached = Float8Linear.from_float(copy.deepcopy(m_ref), cached_config)
+        optim = torch.optim.SGD(m.parameters(), lr=0.1)
+        optim_cached = torch.optim.SGD(m_cached.parameters(), lr=0.1)
+
+        # the weight scale is only computed when the weight is cast
+        num_casts = 0
+        get_weight_scale = m_cached.get_weight_scale
+
+        def counting_get_weight_scale(weight):
+            nonlocal num_casts
+            num_casts += 1
+            return get_weight_scale(weight)
+
+        m_cached.get_weight_scale = counting_get_weight_scale
+
+        for step in range(2):
+            # gradient accumulation: the weight is cast once per optimizer step
+            for _ in range(3):
+                x = torch.randn(4, 32)
+                for mod in (m, m_cached):
+                    mod(x).sum().backward()
+            assert num_casts == step + 1
+            torch.testing.assert_close(m.weight.grad, m_cached.weight.grad)
+            # the optimizer step clears the cache
+            optim.step()
+            optim_cached.step()
+            assert not m_cached._fp8_weight_cache_valid
+            optim.zero_grad()
+            optim_cached.zero_grad()
+
+        # changes that do not bump the version need an explicit clear
+        with torch.no_grad():
+            m.weight.data = m.weight.data + 1.0
+            m_cached.weight.data = m_cached.weight.data + 1.0
+        clear_float8_weight_cache(m_cached)
+        x = torch.randn(4, 32)
+        torch.testing.assert_close(m(x), m_cached(x))
+        assert num_casts == 3
+
+        # loading a state dict clears the cache
+        state_dict = {k: v.clone() for k, v in m.state_dict().items()}
+        state_dict["weight"].fill_(0.5)
+        m.load_state_dict(state_dict)
+        m_cached.load_state_dict(state_dict)
+        assert not m_cached._fp8_weight_cache_valid
+        torch.testing.assert_close(m(x), m_cached(x))
+
+        # and so does an optimizer step on a copy of the layer
+        m_copy = copy.deepcopy(Float8Linear.from_float(copy.deepcopy(m_ref), cached_config))
+        m_copy(x).sum().backward()
+        assert m_copy._fp8_weight_cache_valid
+        torch.optim.SGD(m_copy.parameters(), lr=0.1).step()
+        assert not m_copy._fp8_weight_cache_valid
+
+    def test_weight_cast_cache_delayed_scaling_unsupported(self):
+        with pytest.raises(AssertionError, match="delayed weight scaling"):
+            Float8LinearConfig(
+                cast_config_weight=CastConfig(scaling_type=ScalingType.DELAYED),
+                cache_fp8_weight=True,
+            )
+
     @unittest.skipIf(not is_cuda_8_9, "CUDA 8.9 not available")
     def test_inference_mode(self):
         x = torch.randn(32, 32, device='cuda')
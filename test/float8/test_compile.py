@@ -367,6 +367,38 @@ def test_sync_amax_func_cuda_graph_success():
     assert "skipping cudagraphs due to mutaton on input" not in stderr[0]
 
 
+def test_weight_cast_cache():
+    torch._dynamo.reset()
+    torch.manual_seed(0)
+    m_ref = nn.Sequential(nn.Linear(32, 64), nn.ReLU(), nn.Linear(64, 16))
+    config = Float8LinearConfig(emulate=True)
+    m = convert_to_float8_training(copy.deepcopy(m_ref), config=config)
+    m_cached = convert_to_float8_training(
+        copy.deepcopy(m_ref),
+        config=Float8LinearConfig(emulate=True, cache_fp8_weight=True),
+    )
+    cnt = CompileCounterWithBackend("aot_eager")
+    m_cached_compiled = torch.compile(m_cached, backend=cnt, fullgraph=True)
+    optim = torch.optim.SGD(m.parameters(), lr=0.1)
+    # the cache is cleared by the optimizer step, which torch.compile can't see
+    optim_cached = torch.optim.SGD(m_cached.parameters(), lr=0.1)
+
+    for _ in range(3):
+        for _ in range(3):
+            x = torch.randn(8, 32)
+            m(x).sum().backward()
+            m_cached_compiled(x).sum().backward()
+        for mod, mod_cached in zip(m, m_cached):
+            if isinstance(mod, Float8Linear):
+                torch.testing.assert_close(mod.weight.grad, mod_cached.weight.grad)
+        optim.step()
+        optim_cached.step()
+        optim.zero_grad()
+        optim_cached.zero_grad()
+    # one graph each for allocating, refreshing and reusing the cache
+    assert cnt.frame_count == 3
+
+
 @unittest.skipIf(
         not is_cuda_8_9,
         "CUDA not available",
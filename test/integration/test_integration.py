@@ -77,6 +77,7 @@ from torchao.quantization.autoquant import (
 )
 from torch.ao.quantization.quantize_fx import convert_to_reference_fx, prepare_fx
 import os
+import tempfile
 from parameterized import parameterized
 import itertools
 import logging
@@ -549,6 +550,26 @@ class PythonQuantUtilOpUnitTest(unittest.TestCase):
         torch.testing.assert_close(y_ref, y_raw, atol=0, rtol=0)
         torch.testing.assert_close(y_ref, y_opt, atol=0, rtol=0)
 
+    @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_4, "cpu _int_mm requires 2.4+.")
+    def test__int_mm_cpu(self):
+        from torchao.kernel.intmm import int_scaled_matmul
+        shapes = (
+            (1, 32, 16),
+            (17, 33, 7),
+            (32, 1536, 4096),
+        )
+        for m, k, n in shapes:
+            x = torch.randint(-128, 127, (m, k), dtype=torch.int8)
+            # weights are stored as (n, k) and passed transposed
+            w = torch.randint(-128, 127, (n, k), dtype=torch.int8).t()
+            y_ref = torch.matmul(x.to(torch.int32), w.to(torch.int32))
+            y = safe_int_mm(x, w)
+            self.assertEqual(y.dtype, torch.int32)
+            torch.testing.assert_close(y_ref, y, atol=0, rtol=0)
+
+            scales = torch.randn(m, 1, dtype=torch.bfloat16)
+            torch.testing.assert_close(y_ref * scales, int_scaled_matmul(x, w, scales), atol=0, rtol=0)
+
     @unittest.skipIf(not torch.cuda.is_available(), "Need CUDA available")
     def test__int_mm_eager_and_torch_compile_numerics(self):
         def __int_mm_ref(x, w):
@@ -1391,6 +1412,107 @@ class TestAutoQuant(unittest.TestCase):
         assert not isinstance(model.lin1.weight.weight, AutoQuantizableLinearWeight)
         model(x_in)
 
+    def test_autoquant_bench_cpu(self):
+        from torchao.quantization.autoquant import do_autoquant_bench
+        a = torch.randn(32, 64)
+        b = torch.randn(64, 32)
+        hold_num_threads = torch.get_num_threads()
+        res = do_autoquant_bench(torch.mm, a, b, warmup=1, rep=5, num_threads=1)
+        self.assertTrue(0 < res < torch.inf)
+        self.assertEqual(torch.get_num_threads(), hold_num_threads)
+
+    def test_autoquant_tunes_unique_shapes_once(self):
+        from torchao.quantization.autoquant import AUTOQUANT_CACHE, AQFloatLinearWeight
+        benchmarked = []
+
+        class CountingAQFloatLinearWeight(AQFloatLinearWeight):
+            @classmethod
+            def _autoquant_test(cls, act_mat, weight, bias, best_time, mode=["relu", None]):
+                benchmarked.append((act_mat.shape, weight.shape))
+                return 1.0
+
+        old_cache = dict(AUTOQUANT_CACHE)
+        try:
+            model = torch.nn.Sequential(
+                *[torch.nn.Linear(64, 64) for _ in range(4)],
+                torch.nn.Linear(64, 32),
+            )
+            torchao.autoquant(model, qtensor_class_list=[CountingAQFloatLinearWeight], manual=True, set_inductor_config=False)
+            model(torch.randn(8, 64))
+            model(torch.randn(4, 64))
+            model.finalize_autoquant()
+            self.assertEqual(len(benchmarked), 4)
+            self.assertEqual(len(set(benchmarked)), 4)
+            self.assertFalse(isinstance(model[0].weight, AutoQuantizableLinearWeight))
+        finally:
+            AUTOQUANT_CACHE.clear()
+            AUTOQUANT_CACHE.update(old_cache)
+
+    def test_autoquant_cache_save_load(self):
+        from torchao.quantization.autoquant import (
+            AUTOQUANT_CACHE,
+            AQFloatLinearWeight,
+            check_cache,
+            load_autoquant_cache,
+            save_autoquant_cache,
+        )
+        shapes_and_dtype = (torch.Size([32, 128]), torch.Size([256, 128]), None, torch.bfloat16)
+        shapes_and_dtype2 = (torch.Size([1, 128]), torch.Size([256, 128]), torch.Size([256]), torch.float16)
+        old_cache = dict(AUTOQUANT_CACHE)
+        try:
+            AUTOQUANT_CACHE.clear()
+            AUTOQUANT_CACHE[(AQFloatLinearWeight,) + shapes_and_dtype] = 0.5
+            AUTOQUANT_CACHE[(AQInt8DynamicallyQuantizedLinearWeight,) + shapes_and_dtype] = torch.inf
+            # not benchmarked yet, should not be written
+            AUTOQUANT_CACHE[(AQInt8WeightOnlyQuantizedLinearWeight,) + shapes_and_dtype] = None
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                cache_path = os.path.join(tmp_dir, "autoquant_cache.json")
+                save_autoquant_cache(cache_path)
+
+                # a second process adds a new shape, the file should hold both
+                AUTOQUANT_CACHE.clear()
+                AUTOQUANT_CACHE[(AQFloatLinearWeight,) + shapes_and_dtype2] = 0.25
+                save_autoquant_cache(cache_path)
+
+                AUTOQUANT_CACHE.clear()
+                self.assertEqual(load_autoquant_cache(cache_path), 3)
+                self.assertEqual(check_cache(AQFloatLinearWeight, shapes_and_dtype), 0.5)
+                self.assertEqual(check_cache(AQFloatLinearWeight, shapes_and_dtype2), 0.25)
+                self.assertEqual(check_cache(AQInt8DynamicallyQuantizedLinearWeight, shapes_and_dtype), torch.inf)
+                self.assertIsNone(check_cache(AQInt8WeightOnlyQuantizedLinearWeight, shapes_and_dtype))
+
+                # entries measured on other hardware are kept in the file but not loaded
+                AUTOQUANT_CACHE.clear()
+                AUTOQUANT_CACHE[(AQFloatLinearWeight,) + shapes_and_dtype] = 0.75
+                save_autoquant_cache(cache_path, device="meta")
+                AUTOQUANT_CACHE.clear()
+                self.assertEqual(load_autoquant_cache(cache_path, device="meta"), 1)
+                self.assertEqual(check_cache(AQFloatLinearWeight, shapes_and_dtype), 0.75)
+                AUTOQUANT_CACHE.clear()
+                self.assertEqual(load_autoquant_cache(cache_path), 3)
+                self.assertEqual(check_cache(AQFloatLinearWeight, shapes_and_dtype), 0.5)
+
+                # entries recorded under a different inductor config are not reused
+                AUTOQUANT_CACHE.clear()
+                hold_tuning = torch._inductor.config.coordinate_descent_tuning
+                torch._inductor.config.coordinate_descent_tuning = not hold_tuning
+                try:
+                    self.assertEqual(load_autoquant_cache(cache_path), 0)
+                    # and saving under it keeps the entries of the other config
+                    AUTOQUANT_CACHE[(AQFloatLinearWeight,) + shapes_and_dtype] = 1.0
+                    save_autoquant_cache(cache_path)
+                    AUTOQUANT_CACHE.clear()
+                    self.assertEqual(load_autoquant_cache(cache_path), 1)
+                    self.assertEqual(check_cache(AQFloatLinearWeight, shapes_and_dtype), 1.0)
+                finally:
+                    torch._inductor.config.coordinate_descent_tuning = hold_tuning
+                AUTOQUANT_CACHE.clear()
+                self.assertEqual(load_autoquant_cache(cache_path), 3)
+                self.assertEqual(check_cache(AQFloatLinearWeight, shapes_and_dtype), 0.5)
+        finally:
+            AUTOQUANT_CACHE.clear()
+            AUTOQUANT_CACHE.update(old_cache)
+
 
 
 
@@ -0,0 +1,125 @@
+import json
+import os
+
+import pytest
+import torch
+
+from torchao.float8.roofline_utils import get_float8_mem_sympy, get_gemm_time_sympy
+from torchao.profiler.device_spec import (
+    CPUDeviceSpec,
+    calibrate_device,
+    measure_bandwidth,
+    measure_gemm_flops,
+)
+from torchao.profiler.performance_counter import PerformanceStats
+
+# Small problem sizes so calibration stays cheap in CI
+CALIBRATION_KWARGS = {"bandwidth_numel": 2**16, "gemm_size": 64, "min_run_time": 0.01}
+
+
+def test_measure_bandwidth():
+    bw = measure_bandwidth(numel=2**16, min_run_time=0.01)
+    assert bw["copy"] > 0 and bw["triad"] > 0
+
+
+@pytest.mark.parametrize("dtype", [torch.float32, torch.bfloat16, torch.int8])
+def test_measure_gemm_flops(dtype):
+    flops = measure_gemm_flops(dtype, size=64, min_run_time=0.01)
+    assert flops is None or flops > 0
+
+
+def test_calibrate_device_cache(tmp_path):
+    calibration = calibrate_device(
+        num_threads=1, dtypes=[torch.float32], cache_dir=str(tmp_path), **CALIBRATION_KWARGS
+    )
+    assert calibration["bandwidth"] == max(
+        calibration["bandwidth_copy"], calibration["bandwidth_triad"]
+    )
+    assert calibration["flops_by_dtype"][torch.float32] > 0
+
+    (cache_file,) = os.listdir(tmp_path)
+    assert cache_file.endswith("-cpu-1threads.json")
+
+    # Cached results are reused, not re-measured
+    path = tmp_path / cache_file
+    cached = json.loads(path.read_text())
+    cached["bandwidth_copy"] = 1.0
+    cached["bandwidth_triad"] = 2.0
+    cached["flops_by_dtype"]["float32"] = 3.0
+    path.write_text(json.dumps(cached))
+    calibration = calibrate_device(
+        num_threads=1, dtypes=[torch.float32], cache_dir=str(tmp_path), **CALIBRATION_KWARGS
+    )
+    assert calibration["bandwidth"] == 2.0
+    assert calibration["flops_by_dtype"] == {torch.float32: 3.0}
+
+    calibration = calibrate_device(
+        num_threads=1,
+        dtypes=[torch.float32],
+        cache_dir=str(tmp_path),
+        force=True,
+        **CALIBRATION_KWARGS,
+    )
+    assert calibration["flops_by_dtype"][torch.float32] != 3.0
+
+
+def test_cpu_device_spec(tmp_path):
+    # Warm the cache with cheap measurements so the spec does not recalibrate
+    calibrate_device(num_threads=1, cache_dir=str(tmp_path), **CALIBRATION_KWARGS)
+    (cache_file,) = os.listdir(tmp_path)
+    cached = json.loads((tmp_path / cache_file).read_text())
+
+    device_spec = CPUDeviceSpec(dtype=torch.float32, num_threads=1, cache_dir=str(tmp_path))
+    assert device_spec.bandwidth == max(cached["bandwidth_copy"], cached["bandwidth_triad"])
+    assert device_spec.flops_per_s == cached["flops_by_dtype"]["float32"]
+    assert device_spec.vram is not None
+    assert device_spec.roofline_balancepoint == device_spec.flops_per_s / device_spec.bandwidth
+
+    # dtype defaults to float32
+    default_spec = CPUDeviceSpec(num_threads=1, cache_dir=str(tmp_path))
+    assert default_spec.dtype == torch.float32
+    assert default_spec.flops_per_s == device_spec.flops_per_s
+
+    # Measured specs feed the utilization stats
+    stats = PerformanceStats(
+        label="test",
+        num_tokens=1,
+        latency=1.0,
+        total_flops=int(device_spec.flops_per_s),
+        total_io=int(device_spec.bandwidth),
+        flops_summary={},
+        io_summary={},
+        flop_counts={},
+        io_counts={},
+        device_bandwidth=device_spec.bandwidth,
+        device_flops_per_s=device_spec.flops_per_s,
+    )
+    assert stats.bandwidth_utilization == pytest.approx(1.0, rel=1e-6)
+    assert stats.flops_utilization == pytest.approx(1.0, rel=1e-6)
+
+
+def test_cpu_device_spec_no_calibration():
+    # Ok to instantiate without calibrating as long as fields are filled
+    device_spec = CPUDeviceSpec(
+        bandwidth=1e11, flops_per_s=1e12, dtype=torch.bfloat16, calibrate=False
+    )
+    assert device_spec.flops_by_dtype == {torch.bfloat16: 1e12}
+
+    with pytest.raises(AssertionError):
+        _ = CPUDeviceSpec(dtype=torch.bfloat16, calibrate=False)
+
+
+def test_roofline_with_device_spec():
+    device_spec = CPUDeviceSpec(
+        bandwidth=1e11, flops_per_s=1e12, dtype=torch.bfloat16, calibrate=False
+    )
+    M = K = N = 1024
+    assert get_gemm_time_sympy(M, K, N, torch.bfloat16, device_spec) == pytest.approx(
+        6 * M * K * N / 1e12
+    )
+    with pytest.raises(AssertionError):
+        get_gemm_time_sympy(M, K, N, torch.float8_e4m3fn, device_spec)
+
+    mem_time = get_float8_mem_sympy(M, K, N, device_spec=device_spec)
+    h100_mem_time = get_float8_mem_sympy(M, K, N)
+    assert mem_time > h100_mem_time
@@ -0,0 +1,79 @@
+import copy
+
+import pytest
+import torch
+
+from torchao.profiler.performance_counter import (
+    PerformanceCounterMode,
+    _get_stored_nbytes,
+    register_flop_formula,
+)
+from torchao.quantization.quant_api import (
+    int8_dynamic_activation_int8_weight,
+    int8_weight_only,
+    quantize_,
+    uintx_weight_only,
+)
+from torchao.utils import TORCH_VERSION_AT_LEAST_2_5
+
+if not TORCH_VERSION_AT_LEAST_2_5:
+    pytest.skip("Unsupported PyTorch version", allow_module_level=True)
+
+M, K, N = 4, 256, 128
+
+
+def _count(fn, *args):
+    with PerformanceCounterMode() as perf_counter:
+        out = fn(*args)
+    return perf_counter, out
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        int8_weight_only(),
+        int8_dynamic_activation_int8_weight(),
+        uintx_weight_only(torch.uint4, group_size=32),
+    ],
+    ids=["int8wo", "int8dq", "uint4wo"],
+)
+def test_quantized_linear(config):
+    model = torch.nn.Sequential(torch.nn.Linear(K, N, bias=False)).to(torch.bfloat16)
+    quantized_model = copy.deepcopy(model)
+    quantize_(quantized_model, config)
+    x = torch.randn(M, K, dtype=torch.bfloat16)
+
+    float_counter, _ = _count(model, x)
+    perf_counter, out = _count(quantized_model, x)
+
+    # the quantized linear does the same matmul, counted once
+    assert perf_counter.get_total_flops() == float_counter.get_total_flops() == 2 * M * N * K
+    # and is billed for the stored weight, not the dequantized one
+    weight = quantized_model[0].weight
+    expected_io = _get_stored_nbytes(x) + _get_stored_nbytes(weight) + _get_stored_nbytes(out)
+    assert perf_counter.get_total_io() == expected_io
+    assert _get_stored_nbytes(weight) < weight.numel() * weight.element_size()
+    assert perf_counter.get_summary_io_counts()["Sequential.0"] == expected_io
+
+
+def test_int_mm():
+    a = torch.randint(-128, 127, (32, 64), dtype=torch.int8)
+    b = torch.randint(-128, 127, (64, 16), dtype=torch.int8)
+    perf_counter, out = _count(torch._int_mm, a, b)
+    assert perf_counter.get_total_flops() == 2 * 32 * 64 * 16
+    assert perf_counter.get_total_io() == a.numel() + b.numel() + out.numel() * 4
+
+
+def test_register_flop_formula():
+    @torch.library.custom_op("perf_counter_test::scaled_mm", mutates_args=())
+    def scaled_mm(a: torch.Tensor, b: torch.Tensor, scale: float) -> torch.Tensor:
+        return a @ b * scale
+
+    @register_flop_formula("perf_counter_test::scaled_mm")
+    def scaled_mm_flop(a, b, scale, out_val=None):
+        return 2 * a.shape[0] * a.shape[1] * b.shape[1] + out_val.numel()
+
+    a, b = torch.randn(8, 16), torch.randn(16, 4)
+    perf_counter, out = _count(torch.ops.perf_counter_test.scaled_mm, a, b, 2.0)
+    assert perf_counter.get_total_flops() == 2 * 8 * 16 * 4 + 8 * 4
+    assert perf_counter.get_total_io() == (a.numel() + b.numel() + out.numel()) * 4
@@ -28,8 +28,10 @@ from torchao.prototype.mx_formats.custom_cast import (
     f6_e3m2_unpacked_to_f32,
     get_bits,
     pack_uint4,
+    pack_uint6,
     triton_f4_to_bf16,
     unpack_uint4,
+    unpack_uint6,
 )
 
 from torchao.prototype.mx_formats.fp_format_spec import (
@@ -318,6 +320,18 @@ def test_fp4_pack_unpack():
     assert torch.all(orig_vals_dq == orig_vals)
 
 
+def test_fp6_pack_unpack():
+    orig_vals = torch.Tensor(
+        [[0.0, 0.5, 4.0, -0.0, 7.5, -1.0, 0.125, 3.0], [-0.0, 1.0, -6.0, 3.0] * 2]
+    )
+    orig_vals_f6_unpacked = f32_to_f6_e2m3_unpacked(orig_vals)
+    orig_vals_f6_packed = pack_uint6(orig_vals_f6_unpacked)
+    assert orig_vals_f6_packed.numel() == (orig_vals.numel() * 3 / 4)
+    orig_vals_f6_packed_unpacked = unpack_uint6(orig_vals_f6_packed)
+    orig_vals_dq = f6_e2m3_unpacked_to_f32(orig_vals_f6_packed_unpacked)
+    assert torch.all(orig_vals_dq == orig_vals)
+
+
 @pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA not available")
 @pytest.mark.skipif(not has_triton(), reason="unsupported without triton")
 @pytest.mark.skipif(not TORCH_VERSION_AT_LEAST_2_4, reason="requires PyTorch >= 2.4")
@@ -10,7 +10,11 @@ import pytest
 
 import torch
 import torch.nn as nn
-from torchao.prototype.mx_formats.constants import SUPPORTED_ELEM_DTYPES
+from torchao.prototype.mx_formats.constants import (
+    DTYPE_FP6_E2M3,
+    DTYPE_FP6_E3M2,
+    SUPPORTED_ELEM_DTYPES,
+)
 
 from torchao.prototype.mx_formats.mx_linear import (
     MXInferenceLinear,
@@ -192,6 +196,36 @@ def test_inference_compile_simple(elem_dtype):
         assert sqnr >= 13.5
 
 
+@pytest.mark.parametrize("elem_dtype", SUPPORTED_ELEM_DTYPES)
+@pytest.mark.parametrize("pack_fp6", [False, True])
+@pytest.mark.parametrize("bias", [True, False])
+@pytest.mark.parametrize("input_shape", [(2, 64), (1, 3, 64)])
+# 48 output features are not a multiple of the block size, and fall back
+# to the full weight upcast
+@pytest.mark.parametrize("out_features", [96, 48])
+def test_inference_linear_tiled(elem_dtype, pack_fp6, bias, input_shape, out_features):
+    """
+    The tile-streamed forward matches the full weight upcast
+    """
+    if pack_fp6 and elem_dtype not in (DTYPE_FP6_E2M3, DTYPE_FP6_E3M2):
+        pytest.skip("unsupported configuration")
+    m = nn.Sequential(nn.Linear(64, out_features, bias=bias))
+    m_mx = copy.deepcopy(m)
+    m_mx_tiled = copy.deepcopy(m)
+    block_size = 32
+    swap_linear_with_mx_inference_linear(
+        m_mx, elem_dtype, block_size, pack_fp6=pack_fp6
+    )
+    swap_linear_with_mx_inference_linear(
+        m_mx_tiled, elem_dtype, block_size, pack_fp6=pack_fp6, tile_size=24
+    )
+
+    x = torch.randn(*input_shape)
+    y_mx = m_mx(x)
+    y_mx_tiled = m_mx_tiled(x)
+    torch.testing.assert_close(y_mx, y_mx_tiled, atol=1e-5, rtol=1e-5)
+
+
 def test_filter_fn():
     m1 = nn.Sequential(
         nn.Linear(32, 32),
@@ -196,6 +196,33 @@ def test_transpose(elem_dtype, fp4_triton):
     torch.testing.assert_close(tensor_mx_dq_t, tensor_mx_t_dq, atol=0, rtol=0)
 
 
+@pytest.mark.parametrize("elem_dtype", [DTYPE_FP6_E2M3, DTYPE_FP6_E3M2])
+def test_pack_fp6(elem_dtype):
+    """
+    Verify that packed fp6 matches unpacked fp6, including after a transpose
+    """
+    tensor_hp = torch.randn(64, 128, dtype=torch.bfloat16)
+    block_size = 32
+    tensor_mx = MXTensor.to_mx(tensor_hp, elem_dtype, block_size)
+    tensor_mx_packed = MXTensor.to_mx(
+        tensor_hp, elem_dtype, block_size, pack_fp6=True
+    )
+    assert tensor_mx_packed.shape == tensor_mx.shape
+    assert tensor_mx_packed._data.numel() == tensor_mx._data.numel() * 3 // 4
+    torch.testing.assert_close(
+        tensor_mx.to_dtype(tensor_hp.dtype),
+        tensor_mx_packed.to_dtype(tensor_hp.dtype),
+        atol=0,
+        rtol=0,
+    )
+    torch.testing.assert_close(
+        tensor_mx.t().to_dtype(tensor_hp.dtype),
+        tensor_mx_packed.t().to_dtype(tensor_hp.dtype),
+        atol=0,
+        rtol=0,
+    )
+
+
 @pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA not available")
 @pytest.mark.parametrize("elem_dtype", SUPPORTED_ELEM_DTYPES)
 def test_cast_autograd(elem_dtype):
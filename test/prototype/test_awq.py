@@ -126,4 +126,28 @@ def test_save_weights_only():
     
     assert awq_out is not None
     assert awq_save_load_out is not None
-    assert torch.allclose(awq_out, awq_save_load_out, atol = 1e-2)
\ No newline at end of file
+    assert torch.allclose(awq_out, awq_save_load_out, atol = 1e-2)
+
+
+@pytest.mark.skipif(not TORCH_VERSION_AT_LEAST_2_3, reason="requires torch 2.3+")
+def test_gram_scale_search():
+    l1,l2,l3 = 512,256,128
+    quant_dtype = torch.uint4
+    group_size = 128
+    n_calibration_examples = 10
+    sequence_length = 5
+
+    m = ToyLinearModel(l1,l2,l3).eval()
+    m_gram = deepcopy(m)
+    calibration_data = m.example_inputs(n_calibration_examples, sequence_length=sequence_length, dtype=torch.float32, device="cpu")
+
+    # validating on every calibration example scores the scale options on the same tokens as the Gram matrix
+    insert_awq_observer_(m, n_calibration_examples, sequence_length, quant_dtype=quant_dtype, group_size=group_size)
+    insert_awq_observer_(m_gram, n_calibration_examples, sequence_length, quant_dtype=quant_dtype, group_size=group_size, use_gram=True)
+    for example in calibration_data:
+        m(example)
+        m_gram(example)
+
+    for linear, linear_gram in [(m.linear1, m_gram.linear1), (m.linear2, m_gram.linear2)]:
+        assert linear_gram.act_obs.inputs == []
+        torch.testing.assert_close(linear_gram.act_obs.calculate_qparams(), linear.act_obs.calculate_qparams())
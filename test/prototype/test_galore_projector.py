@@ -0,0 +1,65 @@
+import torch
+from torch.testing._internal.common_utils import (
+    TestCase,
+    instantiate_parametrized_tests,
+    parametrize,
+    run_tests,
+)
+
+from torchao.prototype.galore.utils import (
+    get_orthogonal_matrix,
+    get_orthogonal_matrix_randomized,
+)
+
+
+def _low_rank_plus_noise(M, N, rank, dtype=torch.float32):
+    G = torch.randn(M, rank) @ torch.randn(rank, N) + 1e-3 * torch.randn(M, N)
+    return G.to(dtype)
+
+
+def _subspace_overlap(A, B):
+    # A, B have orthonormal columns
+    return (A.float().t() @ B.float()).pow(2).sum().item() / A.shape[1]
+
+
+class TestGaLoreRandomizedProjector(TestCase):
+    @parametrize("shape", [(256, 128), (128, 256)])
+    @parametrize("type", ["left", "right", "full"])
+    def test_matches_exact_svd(self, shape, type):
+        torch.manual_seed(0)
+        rank = 16
+        G = _low_rank_plus_noise(*shape, rank)
+        exact = get_orthogonal_matrix(G, rank, type)
+        approx = get_orthogonal_matrix_randomized(G, rank, type)
+        if type == "full":
+            self.assertGreater(_subspace_overlap(exact[0], approx[0]), 0.999)
+            self.assertGreater(_subspace_overlap(exact[1].t(), approx[1].t()), 0.999)
+        elif type == "left":
+            self.assertGreater(_subspace_overlap(exact, approx), 0.999)
+        else:
+            self.assertGreater(_subspace_overlap(exact.t(), approx.t()), 0.999)
+
+    def test_warm_start(self):
+        torch.manual_seed(0)
+        rank = 16
+        G = _low_rank_plus_noise(256, 128, rank)
+        exact = get_orthogonal_matrix(G, rank, "left")
+        # no power iterations: the result is only as good as the initial subspace
+        warm = get_orthogonal_matrix_randomized(
+            G, rank, "left", init=exact, power_iters=0, oversample=0
+        )
+        self.assertGreater(_subspace_overlap(exact, warm), 0.9999)
+
+    def test_dtype(self):
+        torch.manual_seed(0)
+        G = _low_rank_plus_noise(128, 64, 8, dtype=torch.bfloat16)
+        B = get_orthogonal_matrix_randomized(G, 8, "right")
+        self.assertEqual(B.dtype, torch.bfloat16)
+        self.assertEqual(B.shape, (8, 64))
+
+
+instantiate_parametrized_tests(TestGaLoreRandomizedProjector)
+
+
+if __name__ == "__main__":
+    run_tests()
@@ -120,6 +120,54 @@ class TestOptim(TestCase):
         for p1, p2 in zip(model.parameters(), model2.parameters()):
             torch.testing.assert_close(p2, p1)
 
+    @pytest.mark.skipif(not TORCH_VERSION_AT_LEAST_2_3, reason="requires PyTorch >= 2.3")
+    @parametrize("optim_name", ["Adam8bit", "AdamW8bit", "Adam4bit", "AdamW4bit", "AdamFp8", "AdamWFp8"])
+    @parametrize("device", _DEVICES)
+    def test_optim_foreach(self, optim_name, device):
+        if optim_name.endswith("Fp8") and device == "cuda":
+            if not TORCH_VERSION_AT_LEAST_2_4:
+                pytest.skip("FP8 CUDA requires PyTorch >= 2.4")
+            if torch.cuda.get_device_capability() < (8, 9):
+                pytest.skip("FP8 CUDA requires compute capability >= 8.9")
+
+        # mix of params with quantized states and small params with plain states
+        model1 = nn.Sequential(nn.Linear(32, 256), nn.ReLU(), nn.Linear(256, 256), nn.ReLU(), nn.Linear(256, 32))
+        model1.to(device)
+        model2 = copy.deepcopy(model1)
+
+        optim1 = getattr(low_bit_optim, optim_name)(model1.parameters())
+        optim2 = getattr(low_bit_optim, optim_name)(model2.parameters(), foreach=True)
+
+        for _ in range(2):
+            x = torch.randn(4, 32, device=device)
+
+            model1(x).sum().backward()
+            optim1.step()
+            optim1.zero_grad()
+
+            model2(x).sum().backward()
+            optim2.step()
+            optim2.zero_grad()
+
+        for p1, p2 in zip(model1.parameters(), model2.parameters()):
+            torch.testing.assert_close(p2, p1)
+
+        # optim states are the same subclasses, so checkpoints can be exchanged
+        model3 = copy.deepcopy(model1)
+        optim3 = getattr(low_bit_optim, optim_name)(model3.parameters(), foreach=True)
+        with tempfile.NamedTemporaryFile() as f:
+            torch.save(optim1.state_dict(), f.name)
+            optim3.load_state_dict(torch.load(f.name, map_location="cpu"))
+
+        x = torch.randn(4, 32, device=device)
+        model1(x).sum().backward()
+        optim1.step()
+        model3(x).sum().backward()
+        optim3.step()
+
+        for p1, p3 in zip(model1.parameters(), model3.parameters()):
+            torch.testing.assert_close(p3, p1)
+
     @pytest.mark.skipif(bnb is None, reason="bitsandbytes is not available")
     @pytest.mark.skipif(not torch.cuda.is_available(), reason="bitsandbytes 8-bit Adam only works for CUDA")
     @pytest.mark.skipif(not TORCH_VERSION_AT_LEAST_2_3, reason="requires PyTorch >= 2.3")
@@ -42,7 +42,15 @@ from torchao.quantization.quant_api import (
     int4_weight_only,
     int8_weight_only,
     int8_dynamic_activation_int8_weight,
+    uintx_weight_only,
+    _is_embedding,
+    _is_linear,
+    _get_linear_subclass_inserter,
+    save_quantized_checkpoint,
+    load_quantized_checkpoint,
+    quantize_from_checkpoint_,
 )
+from torchao.dtypes.nf4tensor import to_nf4
 from torchao.utils import (
     TORCH_VERSION_AT_LEAST_2_3,
     TORCH_VERSION_AT_LEAST_2_4,
@@ -235,6 +243,69 @@ class TestQuantFlow(TestCase):
         assert isinstance(m.linear2, Int8DynActInt4WeightLinear)
         m(*example_inputs)
 
+    @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_3, "skipping when torch verion is 2.3 or lower")
+    def test_quantize_hqq_batched(self):
+        from torchao.quantization.quant_primitives import (
+            choose_qparams_and_quantize_affine_hqq,
+            optimize_weights_proximal_batched,
+        )
+        from torchao.quantization.utils import compute_error
+        m = ToyLinearModel().eval().to(torch.bfloat16)
+        m_batched = copy.deepcopy(m)
+        example_inputs = m.example_inputs(dtype=torch.bfloat16)
+        quantize_(m_batched, uintx_weight_only(torch.uint4, group_size=32, use_hqq=True), hqq_batch_size=2)
+        for linear in [m_batched.linear1, m_batched.linear2]:
+            self.assertIsInstance(linear.weight, AffineQuantizedTensor)
+        ref_W_q, _, _, _ = choose_qparams_and_quantize_affine_hqq(
+            m.linear1.weight, nbits=4, group_size=32, compute_dtype=torch.bfloat16, optimize_weights=optimize_weights_proximal_batched
+        )
+        self.assertTrue(torch.equal(m_batched.linear1.weight.layout_tensor.int_data, ref_W_q))
+        quantize_(m, uintx_weight_only(torch.uint4, group_size=32, use_hqq=True))
+        ref = m(*example_inputs)
+        res = m_batched(*example_inputs)
+        self.assertGreater(compute_error(ref, res), 30)
+
+        # a weight shared by modules in different batches is solved once and stays shared
+        m_tied = ToyLinearModel(m=64, n=64, k=64).eval().to(torch.bfloat16)
+        m_tied.linear2.weight = m_tied.linear1.weight
+        quantize_(m_tied, uintx_weight_only(torch.uint4, group_size=32, use_hqq=True), hqq_batch_size=1)
+        self.assertIsInstance(m_tied.linear1.weight, AffineQuantizedTensor)
+        self.assertIs(m_tied.linear1.weight, m_tied.linear2.weight)
+
+        with self.assertRaisesRegex(ValueError, "hqq_batch_size"):
+            quantize_(ToyLinearModel().eval(), int8_weight_only(), hqq_batch_size=2)
+
+    @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_3, "skipping when torch verion is 2.3 or lower")
+    def test_8da4w_gptq_quantizer_block_sequential(self):
+        from torchao.quantization.GPTQ import (
+            Int8DynActInt4WeightGPTQQuantizer,
+            Int8DynActInt4WeightLinear,
+            Int8DynActInt4WeightQuantizer,
+        )
+        from torchao.quantization.utils import _MultiInput
+        from torchao._models.llama.model import ModelArgs
+
+        torch.manual_seed(0)
+        seq_length = 32
+        config = ModelArgs(block_size=64, vocab_size=512, n_layer=2, n_head=4, dim=128, intermediate_size=256)
+        model = Transformer(config).eval()
+        model.setup_caches(max_batch_size=1, max_seq_length=64)
+        tokens = [torch.randint(0, config.vocab_size, (1, seq_length)) for _ in range(8)]
+        input_pos = torch.arange(seq_length)
+        inputs = [_MultiInput(tokens), _MultiInput([input_pos] * len(tokens))]
+
+        def error(m):
+            with torch.no_grad():
+                return sum((m(t, input_pos) - model(t, input_pos)).pow(2).mean() for t in tokens)
+
+        rtn = Int8DynActInt4WeightQuantizer(groupsize=32).quantize(copy.deepcopy(model))
+        gptq = Int8DynActInt4WeightGPTQQuantizer(groupsize=32, block_sequential=True).quantize(
+            copy.deepcopy(model), inputs
+        )
+        assert isinstance(gptq.layers[0].attention.wqkv, Int8DynActInt4WeightLinear)
+        assert isinstance(gptq.output, Int8DynActInt4WeightLinear)
+        self.assertLess(error(gptq), error(rtn))
+
     # TODO: save model weights as artifacts and re-enable in CI
     # For now, to run this test, you will need to download the weights from HF
     # and run this script to convert them:
@@ -708,6 +779,97 @@ class TestQuantFlow(TestCase):
             assert param.is_cuda
         self.assertLess(memory_streaming, memory_baseline)
 
+    @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_3, "uintx dtypes require 2.3+")
+    def test_quantized_embedding(self):
+        for apply_quant in [uintx_weight_only(torch.uint2, 32), uintx_weight_only(torch.uint3, 32), uintx_weight_only(torch.uint4, 32), int8_weight_only()]:
+            m = torch.nn.Sequential(torch.nn.Embedding(128, 64)).eval()
+            quantize_(m, apply_quant, _is_embedding)
+            assert isinstance(m[0].weight, AffineQuantizedTensor)
+
+            indices = torch.randint(0, 128, (3, 5))
+            # only the looked up rows are dequantized
+            ref = torch.nn.functional.embedding(indices, m[0].weight.dequantize())
+            self.assertTrue(torch.equal(m(indices), ref))
+
+    @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_3, "uintx dtypes require 2.3+")
+    def test_quantized_tied_embedding(self):
+        m = torch.nn.Sequential(torch.nn.Embedding(128, 64), torch.nn.Linear(64, 128, bias=False)).eval()
+        m[1].weight = m[0].weight
+        indices = torch.randint(0, 128, (3, 5))
+
+        filter_fn = lambda mod, fqn: isinstance(mod, torch.nn.Linear) or _is_embedding(mod)
+        quantize_(m, uintx_weight_only(torch.uint4, 32), filter_fn)
+        assert isinstance(m[0].weight, AffineQuantizedTensor)
+        # the weight is quantized once and stays shared
+        assert m[1].weight is m[0].weight
+
+        weight = m[0].weight.dequantize()
+        ref = torch.nn.functional.linear(torch.nn.functional.embedding(indices, weight), weight)
+        # the linear accumulates over tiles of the packed weight on cpu
+        torch.testing.assert_close(m(indices), ref)
+
+    @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_5, "Test only enabled for 2.5+")
+    def test_quantized_checkpoint_save_load(self):
+        def make_model():
+            m = torch.nn.Sequential(torch.nn.Embedding(256, 256), torch.nn.Linear(256, 256, bias=False), torch.nn.Linear(256, 256, bias=False))
+            m[2].weight = m[0].weight
+            return m.eval().to(torch.bfloat16)
+
+        linear_or_embedding = lambda mod, fqn: _is_linear(mod) or _is_embedding(mod)
+        for apply_quant, filter_fn in [
+            (int8_weight_only(), linear_or_embedding),
+            (uintx_weight_only(torch.uint4, 32), linear_or_embedding),
+            (int8_dynamic_activation_int8_weight(), _is_linear),
+            (_get_linear_subclass_inserter(to_nf4), _is_linear),
+        ]:
+            m = make_model()
+            quantize_(m, apply_quant, filter_fn)
+            indices = torch.randint(0, 256, (3, 5))
+            ref = m(indices)
+            with tempfile.NamedTemporaryFile() as f:
+                save_quantized_checkpoint(m, f.name)
+                m_loaded = load_quantized_checkpoint(make_model, f.name)
+
+                for name, param in m.named_parameters(remove_duplicate=False):
+                    loaded_param = m_loaded.get_parameter(name)
+                    self.assertIs(type(loaded_param.data), type(param.data))
+                    self.assertFalse(loaded_param.is_meta)
+                # weights that were shared when saving stay shared
+                self.assertEqual(m_loaded[2].weight is m_loaded[0].weight, m[2].weight is m[0].weight)
+                self.assertTrue(torch.equal(m_loaded(indices), ref))
+
+    @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_3, "uintx dtypes require 2.3+")
+    def test_quantize_from_checkpoint(self):
+        def make_model():
+            m = torch.nn.Sequential(torch.nn.Embedding(256, 64), torch.nn.Linear(64, 64), torch.nn.LayerNorm(64), torch.nn.Linear(64, 256, bias=False))
+            m[3].weight = m[0].weight
+            return m.eval()
+
+        m = make_model()
+        state_dict = m.state_dict()
+        keys = list(state_dict)
+        shards = [{k: state_dict[k] for k in keys[:3]}, {k: state_dict[k] for k in keys[3:]}]
+        filter_fn = lambda mod, fqn: _is_linear(mod) or _is_embedding(mod)
+        indices = torch.randint(0, 256, (3, 5))
+        for apply_quant in [int8_weight_only(), uintx_weight_only(torch.uint4, 32)]:
+            m_ref = copy.deepcopy(m).to(torch.bfloat16)
+            quantize_(m_ref, apply_quant, filter_fn)
+            ref = m_ref(indices)
+            with tempfile.NamedTemporaryFile() as f:
+                torch.save(state_dict, f.name)
+                for checkpoint, num_workers in [(f.name, 0), (state_dict, 2), (reversed(shards), 1)]:
+                    with torch.device("meta"):
+                        m_streamed = make_model()
+                    quantize_from_checkpoint_(m_streamed, checkpoint, apply_quant, filter_fn, dtype=torch.bfloat16, num_workers=num_workers)
+                    assert isinstance(m_streamed[1].weight, AffineQuantizedTensor)
+                    assert m_streamed[3].weight is m_streamed[0].weight
+                    self.assertTrue(torch.equal(m_streamed(indices), ref))
+
+        with torch.device("meta"):
+            m_streamed = make_model()
+        with self.assertRaisesRegex(RuntimeError, "missing keys: \\['2.bias'\\]"):
+            quantize_from_checkpoint_(m_streamed, {k: v for k, v in state_dict.items() if k != "2.bias"}, int8_weight_only())
+
 class TestMultiTensorFlow(TestCase):
 
     @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_4, "Test only enabled for 2.4+")
@@ -14,6 +14,9 @@ from torchao.quantization.quant_primitives import (
     quantize_affine,
     dequantize_affine,
     choose_qparams_affine,
+    choose_qparams_and_quantize_affine_hqq,
+    choose_qparams_and_quantize_affine_hqq_batched,
+    optimize_weights_proximal_batched,
     MappingType,
     ZeroPointDomain,
 )
@@ -574,5 +577,35 @@ class TestQuantPrimitives(unittest.TestCase):
         torch.testing.assert_close(dequantized, fake_quantized)
         torch.testing.assert_close(expected_mask, mask)
 
+    def test_choose_qparams_and_quantize_affine_hqq_batched(self):
+        torch.manual_seed(0)
+        tensors = [torch.randn(256, 512), torch.randn(128, 256, dtype=torch.bfloat16), torch.randn(512, 128)]
+        for axis in [0, 1]:
+            batched = choose_qparams_and_quantize_affine_hqq_batched(tensors, nbits=4, group_size=64, axis=axis, compute_dtype=torch.float32)
+            for tensor, (W_q, scale, zero, shape) in zip(tensors, batched):
+                self.assertEqual(shape, tensor.shape)
+                self.assertEqual(W_q.device, tensor.device)
+                if axis == 1:
+                    # groups are optimized independently, so batching doesn't change the result (with axis=0 the
+                    # mean over a group is reduced in a different order, which can flip an early stop)
+                    ref_W_q, ref_scale, ref_zero, _ = choose_qparams_and_quantize_affine_hqq(
+                        tensor, nbits=4, group_size=64, axis=axis, compute_dtype=torch.float32,
+                        optimize_weights=optimize_weights_proximal_batched,
+                    )
+                    torch.testing.assert_close(W_q, ref_W_q, atol=0, rtol=0)
+                    torch.testing.assert_close(scale, ref_scale)
+                    torch.testing.assert_close(zero, ref_zero)
+
+                # per group early stopping is close to the legacy solver and better than no optimization
+                def error(W_q, scale, zero, shape):
+                    grouped_shape = (-1, 64) if axis == 1 else (64, -1)
+                    dequantized = ((W_q.reshape(grouped_shape).float() - 8) * scale + zero).reshape(shape)
+                    return (dequantized - tensor.float()).abs().mean()
+
+                legacy = choose_qparams_and_quantize_affine_hqq(tensor, nbits=4, group_size=64, axis=axis, compute_dtype=torch.float32)
+                rtn = choose_qparams_and_quantize_affine_hqq(tensor, nbits=4, group_size=64, axis=axis, compute_dtype=torch.float32, optimize=False)
+                self.assertLess(error(W_q, scale, zero, shape), error(*legacy) * 1.01)
+                self.assertLess(error(W_q, scale, zero, shape), error(*rtn))
+
 if __name__ == "__main__":
     unittest.main()
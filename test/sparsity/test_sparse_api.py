@@ -199,6 +199,121 @@ class TestQuantBlockSparseWeight(common_utils.TestCase):
 
         torch.testing.assert_close(reference, sparse_result, rtol=1e-1, atol=1e-1)
 
+    @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_5, "pytorch 2.5+ feature")
+    @common_utils.parametrize("blocksize", [16, 64])
+    @common_utils.parametrize("num_threads", [1, 4])
+    @common_utils.parametrize("side_by_side", [False, True])
+    def test_int_addmm_cpu(self, blocksize, num_threads, side_by_side):
+        from torchao.sparsity.prototype.superblock.blocksparse import (
+            blocksparse_int_addmm,
+            side_by_side_block_values,
+        )
+        from torchao.sparsity.utils import create_block_sparse_tensor
+
+        M, K, N = 256, 128, 17
+        mask = create_block_sparse_tensor(
+            M, K, blocksize, 0.5, torch.float32, device="cpu"
+        ).to(torch.int8)
+        # leave one block row empty
+        mask[:blocksize] = 0
+        weight = torch.randint(-127, 127, (M, K), dtype=torch.int8) * mask
+        A = torch.randint(-127, 127, (K, N), dtype=torch.int8)
+        w_scales = torch.rand(M, dtype=torch.bfloat16)
+        x_scales = torch.rand(N, dtype=torch.bfloat16)
+
+        weight_bsr = weight.to_sparse_bsr(blocksize)
+        values = weight_bsr.values()
+        if side_by_side:
+            values = side_by_side_block_values(values)
+        prev_num_threads = torch.get_num_threads()
+        torch.set_num_threads(num_threads)
+        try:
+            out = blocksparse_int_addmm(
+                weight_bsr.crow_indices(),
+                weight_bsr.col_indices(),
+                values,
+                A,
+                w_scales,
+                x_scales,
+            )
+            self.assertEqual(torch.get_num_threads(), num_threads)
+        finally:
+            torch.set_num_threads(prev_num_threads)
+
+        expected = torch._int_mm(weight, A).float() * w_scales.float().reshape(-1, 1)
+        expected = (expected * x_scales.float()).to(torch.bfloat16).t()
+        self.assertEqual(out.dtype, torch.bfloat16)
+        torch.testing.assert_close(out, expected, rtol=0, atol=0)
+
+    @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_5, "pytorch 2.5+ feature")
+    def test_int_addmm_cpu_fully_sparse(self):
+        from torchao.sparsity.prototype.superblock.blocksparse import (
+            blocksparse_int_addmm,
+        )
+        from torchao.sparsity.utils import create_block_sparse_tensor
+
+        M, K, N = 128, 64, 5
+        weight = create_block_sparse_tensor(
+            M, K, 32, 1.0, torch.float32, device="cpu"
+        ).to(torch.int8)
+        weight_bsr = weight.to_sparse_bsr(32)
+        self.assertEqual(weight_bsr.values().shape[0], 0)
+        out = blocksparse_int_addmm(
+            weight_bsr.crow_indices(),
+            weight_bsr.col_indices(),
+            weight_bsr.values(),
+            torch.randint(-127, 127, (K, N), dtype=torch.int8),
+            torch.rand(M, dtype=torch.bfloat16),
+            torch.rand(N, dtype=torch.bfloat16),
+        )
+        self.assertEqual(out.dtype, torch.bfloat16)
+        torch.testing.assert_close(out, torch.zeros(N, M, dtype=torch.bfloat16))
+
+    @unittest.skipIf(not TORCH_VERSION_AT_LEAST_2_5, "pytorch 2.5+ feature")
+    def test_sparse_cpu(self):
+        input = torch.rand((64, 128)).to(torch.bfloat16)
+        model = (
+            nn.Sequential(
+                nn.Linear(128, 256),
+                nn.Linear(256, 128),
+            )
+            .to(torch.bfloat16)
+            .eval()
+        )
+        from torchao.sparsity.prototype.superblock.blocksparse import (
+            blocksparse_int_addmm,
+        )
+        from torchao.sparsity.utils import create_block_sparse_tensor
+
+        M, N = model[0].weight.shape
+        model[0].weight.data = create_block_sparse_tensor(
+            M, N, 64, 0.5, torch.bfloat16, device="cpu"
+        ) * torch.rand(M, N, dtype=torch.bfloat16)
+        M, N = model[1].weight.shape
+        model[1].weight.data = create_block_sparse_tensor(
+            M, N, 64, 0.5, torch.bfloat16, device="cpu"
+        )
+
+        model_copy = copy.deepcopy(model)
+
+        quantize_(model_copy, int8_dynamic_activation_int8_weight())
+        reference = model_copy(input)
+
+        from torchao.dtypes.affine_quantized_tensor import BlockSparseLayoutType
+
+        quantize_(
+            model,
+            int8_dynamic_activation_int8_weight(
+                layout_type=BlockSparseLayoutType(blocksize=64)
+            ),
+        )
+        # the cpu kernel multiplies with the blocks laid out side by side
+        bsr_values = model[0].weight.original_weight_tensor.layout_tensor.bsr_values
+        self.assertTrue(bsr_values.transpose(0, 1).is_contiguous())
+        sparse_result = model(input)
+
+        torch.testing.assert_close(reference, sparse_result, rtol=1e-1, atol=1e-1)
+
 
 common_utils.instantiate_parametrized_tests(TestSemiStructuredSparse)
 common_utils.instantiate_parametrized_tests(TestQuantSemiSparse)
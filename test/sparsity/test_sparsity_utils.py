@@ -7,6 +7,7 @@ from torchao.sparsity.prototype.sparsifier.utils import (
     get_arg_info_from_tensor_fqn,
     module_to_fqn,
 )
+from torchao.sparsity.utils import prune_lowest_
 
 from torch.testing._internal.common_quantization import (
     ConvBnReLUModel,
@@ -147,5 +148,41 @@ class TestSparsityUtilFunctions(TestCase):
             self.assertEqual(arg_info["tensor_fqn"], "foo.bar.baz")
 
 
+class TestPruneLowest(TestCase):
+    def test_unstructured_matches_argsort(self):
+        """
+        Tests that the kthvalue threshold path zeroes the same entries as a full
+        argsort, across chunk boundaries
+        """
+        metric = torch.randn(1, 1000)
+        num_specified = 371
+        mask = prune_lowest_(torch.ones(1, 1000), metric, num_specified, chunk_size=64)
+
+        expected = torch.ones(1, 1000)
+        expected.scatter_(1, metric.argsort(dim=1)[:, :num_specified], 0)
+        self.assertEqual(mask, expected)
+
+    def test_unstructured_ties(self):
+        """
+        Tests that exactly num_specified entries are pruned when the threshold is tied,
+        the first tied entries being pruned first
+        """
+        metric = torch.tensor([[3.0, 1.0, 2.0, 2.0, 0.0, 2.0, 2.0, 5.0]])
+        mask = prune_lowest_(torch.ones(1, 8), metric, 4, chunk_size=3)
+        self.assertEqual(mask, torch.tensor([[1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 1.0, 1.0]]))
+
+    def test_semi_structured(self):
+        """
+        Tests the N:M path against a per-group argsort
+        """
+        metric = torch.randn(256, 4)
+        mask = prune_lowest_(torch.ones(256, 4), metric, 2, chunk_size=32)
+
+        expected = torch.ones(256, 4)
+        expected.scatter_(1, metric.argsort(dim=1)[:, :2], 0)
+        self.assertEqual(mask, expected)
+        self.assertEqual(mask.sum(dim=1), torch.full((256,), 2.0))
+
+
 if __name__ == "__main__":
     unittest.main()
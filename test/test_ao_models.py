@@ -24,3 +24,129 @@ def test_ao_llama_model_inference_mode(device, batch_size, is_training):
     for i in range(3):
         out = random_model(input_ids, input_pos)
         assert out is not None, "model failed to run"
+
+
+@pytest.mark.parametrize("device", _AVAILABLE_DEVICES)
+@pytest.mark.parametrize("kv_cache_quantization", [False, True])
+def test_ao_llama_model_generate_batched(device, kv_cache_quantization):
+    from torchao._models.llama.generate import generate, generate_batched
+
+    torch.manual_seed(0)
+    random_model = init_model(device=device, precision=torch.float32)
+    prompts = [torch.randint(0, 1024, (length,), dtype=torch.int, device=device) for length in [5, 9, 3]]
+    max_new_tokens = 8
+
+    # greedy decoding, each sequence on its own is the reference
+    expected = []
+    for prompt in prompts:
+        random_model.reset_caches()
+        seq = generate(random_model, prompt, max_new_tokens, interactive=False, top_k=1, kv_cache_quantization=kv_cache_quantization)
+        expected.append(seq[prompt.numel():].tolist())
+    # stop the first sequence early at its own eos
+    eos_id = expected[0][3]
+    expected = [tokens[:tokens.index(eos_id) + 1] if eos_id in tokens else tokens for tokens in expected]
+
+    # batch_size 2 < 3 prompts, the third prompt reuses the slot of the first finished sequence
+    random_model.reset_caches()
+    outputs, num_steps = generate_batched(
+        random_model, prompts, max_new_tokens, batch_size=2, eos_id=eos_id, top_k=1, kv_cache_quantization=kv_cache_quantization
+    )
+    assert [output.tolist() for output in outputs] == expected
+    assert num_steps < sum(len(tokens) for tokens in expected)
+
+
+@pytest.mark.parametrize("device", _AVAILABLE_DEVICES)
+@pytest.mark.parametrize("kv_cache_num_blocks", [None, 4])
+def test_ao_llama_model_generate_batched_paged_kv_cache(device, kv_cache_num_blocks):
+    from torchao._models.llama.generate import generate_batched
+
+    torch.manual_seed(0)
+    random_model = init_model(device=device, precision=torch.float32)
+    prompts = [torch.randint(0, 1024, (length,), dtype=torch.int, device=device) for length in [5, 9, 3, 12]]
+    max_new_tokens = 8
+
+    expected, _ = generate_batched(random_model, prompts, max_new_tokens, batch_size=4, top_k=1)
+    random_model.reset_caches()
+    # with 4 blocks of 8 tokens at most two sequences fit in the pool at once
+    outputs, _ = generate_batched(
+        random_model, prompts, max_new_tokens, batch_size=4, top_k=1, kv_cache_block_size=8, kv_cache_num_blocks=kv_cache_num_blocks
+    )
+    assert [output.tolist() for output in outputs] == [output.tolist() for output in expected]
+    allocator = random_model.kv_cache_allocator
+    assert len(allocator.free_blocks) == allocator.num_blocks
+
+
+@pytest.mark.parametrize("device", _AVAILABLE_DEVICES)
+def test_ao_llama_model_paged_kv_cache_bounded_reads(device):
+    from torchao._models.llama.model import PagedKVCache
+
+    torch.manual_seed(0)
+    random_model = init_model(device=device, precision=torch.float32)
+    seq_len = 64
+    input_ids = torch.randint(0, 1024, (2, 12)).to(device)
+
+    outs = []
+    for kv_cache_block_size in [None, 8]:
+        random_model.reset_caches()
+        with torch.device(device):
+            random_model.setup_caches(max_batch_size=2, max_seq_length=seq_len, kv_cache_block_size=kv_cache_block_size)
+        if kv_cache_block_size is not None:
+            for slot in range(2):
+                random_model.kv_cache_allocator.allocate(slot, 12)
+        out = [random_model(input_ids[:, :8], torch.arange(8, device=device))]
+        for i in range(8, 12):
+            out.append(random_model(input_ids[:, i:i + 1], torch.tensor([i], device=device)))
+        outs.append(torch.cat(out, dim=1))
+    torch.testing.assert_close(outs[1], outs[0])
+
+    # only the blocks covering the first kv_len positions are gathered
+    kv_cache = random_model.layers[0].attention.kv_cache
+    assert isinstance(kv_cache, PagedKVCache)
+    k_val = torch.randn(2, kv_cache.k_cache.shape[1], 1, kv_cache.k_cache.shape[-1], device=device)
+    k, v = kv_cache.update(torch.tensor([11], device=device), k_val, k_val, kv_len=12)
+    assert k.shape[2] == v.shape[2] == 16
+
+
+def test_ao_llama_model_paged_kv_cache_rejects_kv_cache_quantization():
+    random_model = init_model(precision=torch.float32)
+    with pytest.raises(ValueError, match="kv_cache_quantization is not supported with the paged kv cache"):
+        random_model.setup_caches(max_batch_size=2, max_seq_length=64, kv_cache_quantization=True, kv_cache_block_size=8)
+
+
+@pytest.mark.parametrize("device", _AVAILABLE_DEVICES)
+def test_ao_llama_model_kv_cache_quantized_attention(device):
+    torch.manual_seed(0)
+    random_model = init_model(device=device, precision=torch.float32)
+    seq_len = 16
+    input_ids = torch.randint(0, 1024, (2, seq_len)).to(device)
+
+    outs = []
+    for kv_cache_quantized_attention in [False, True]:
+        random_model.reset_caches()
+        with torch.device(device):
+            random_model.setup_caches(
+                max_batch_size=2, max_seq_length=seq_len, kv_cache_quantization=True, kv_cache_quantized_attention=kv_cache_quantized_attention
+            )
+        # prefill then decode one token at a time
+        out = [random_model(input_ids[:, :8], torch.arange(8, device=device))]
+        for i in range(8, seq_len):
+            out.append(random_model(input_ids[:, i:i + 1], torch.tensor([i], device=device)))
+        outs.append(torch.cat(out, dim=1))
+    # update() keeps the current tokens unquantized, the quantized attention path doesn't
+    torch.testing.assert_close(outs[1], outs[0], atol=5e-2, rtol=5e-2)
+
+
+def test_int8_kv_cache_attention_chunks():
+    from torchao._models.llama.model import int8_kv_cache_attention
+
+    torch.manual_seed(0)
+    q = torch.randn(2, 4, 3, 8)
+    k_int8, v_int8 = (torch.randint(-127, 128, (2, 2, 32, 8), dtype=torch.int8) for _ in range(2))
+    k_scale, v_scale = (torch.rand(2, 2, 32, 1) / 100 for _ in range(2))
+    # positions past 10 are masked out, so reading only the first 10 gives the same result
+    mask = torch.zeros(1, 1, 3, 32, dtype=torch.bool)
+    mask[..., :10] = True
+    expected = int8_kv_cache_attention(q, k_int8, k_scale, v_int8, v_scale, mask)
+    for kv_len, chunk_size in [(10, 4), (16, 16), (32, 5)]:
+        out = int8_kv_cache_attention(q, k_int8, k_scale, v_int8, v_scale, mask, kv_len, chunk_size)
+        torch.testing.assert_close(out, expected)
@@ -423,5 +423,49 @@ def test_marlin_24(batch_size, k_chunk, n_chunk, num_bits, group_size, mnk_facto
     )
 
 
+BLOCKSPARSE_INT_MM_OPCHECK_TEST_UTILS = [
+    "test_schema",
+    "test_autograd_registration",
+    "test_faketensor",
+    "test_aot_dispatch_dynamic",
+]
+
+
+@pytest.mark.skipif(
+    not torch._C._dispatch_has_kernel_for_dispatch_key("torchao::blocksparse_int_mm", "CPU"),
+    reason="torchao cpp extension not built",
+)
+@pytest.mark.parametrize("blocksize, sparsity", [(16, 0.5), (32, 0.9), (32, 1.0)])
+@pytest.mark.parametrize("num_threads", [1, 4])
+def test_blocksparse_int_mm(blocksize, sparsity, num_threads):
+    from torchao.sparsity.prototype.superblock.blocksparse import side_by_side_block_values
+    from torchao.sparsity.utils import create_block_sparse_tensor
+
+    M, K, N = 256, 128, 17
+    mask = create_block_sparse_tensor(M, K, blocksize, sparsity, torch.float32, device="cpu").to(torch.int8)
+    weight = torch.randint(-127, 127, (M, K), dtype=torch.int8) * mask
+    weight_bsr = weight.to_sparse_bsr(blocksize)
+    fn_inputs = (
+        weight_bsr.crow_indices().clone(),
+        weight_bsr.col_indices().clone(),
+        side_by_side_block_values(weight_bsr.values().clone()),
+        torch.randint(-127, 127, (N, K), dtype=torch.int8).t(),
+        M,
+    )
+    prev_num_threads = torch.get_num_threads()
+    torch.set_num_threads(num_threads)
+    try:
+        output = torchao.ops.blocksparse_int_mm(*fn_inputs)
+    finally:
+        torch.set_num_threads(prev_num_threads)
+    assert torch.equal(output, torch._int_mm(weight, fn_inputs[3].contiguous()))
+
+    opcheck(
+        torch.ops.torchao.blocksparse_int_mm,
+        fn_inputs,
+        test_utils=BLOCKSPARSE_INT_MM_OPCHECK_TEST_UTILS,
+    )
+
+
 if __name__ == "__main__":
     run_tests()
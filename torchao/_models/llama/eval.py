@@ -103,8 +103,10 @@ def run_evaluation(
             # avoid circular imports
             from torchao._models._eval import InputRecorder
             from torchao.quantization.GPTQ import Int4WeightOnlyGPTQQuantizer
-            groupsize=int(quantization.split("-")[-2])
+            groupsize=int(quantization.split("-")[1])
             assert groupsize in [32,64,128,256], f"int4wo groupsize needs to be one of [32,64,128,256] but got {groupsize}"
+            # int4wo-<groupsize>-gptq-block runs GPTQ one transformer block at a time, with only that block on the gpu
+            block_sequential = quantization.endswith("-block")
             assert precision==torch.bfloat16, f"{quantization} requires precision or bfloat16 but got {precision}"
             assert "cuda" in device, "int4 gptq quantization only works on cuda"
             inputs = InputRecorder(
@@ -119,7 +121,7 @@ def run_evaluation(
                 calibration_limit,
             ).get_inputs()
 
-            quantizer = Int4WeightOnlyGPTQQuantizer(groupsize=groupsize, device=device)
+            quantizer = Int4WeightOnlyGPTQQuantizer(groupsize=groupsize, device=device, block_sequential=block_sequential)
             model.setup_caches(max_batch_size=1, max_seq_length=calibration_seq_length)
             model = quantizer.quantize(model, inputs).to(device)
         else:
@@ -228,7 +230,7 @@ if __name__ == '__main__':
         type=str,
         help=(
             "Which quantization techniques to apply: int8dq, int8wo, fp6, int4wo-<groupsize>, "
-            "int4wo-<groupsize>-gptq, autoquant, autoquant-int4, int4wo-<groupsize>-hqq, "
+            "int4wo-<groupsize>-gptq, int4wo-<groupsize>-gptq-block, autoquant, autoquant-int4, int4wo-<groupsize>-hqq, "
             "uintx-<nbits>-<groupsize>, uintx-<nbits>-<groupsize>-hqq, sparse-marlin, "
             "autoround-<model_device>-<quant_lm_head>-<iters>-<groupsize>-<batch_size>-<seqlen>-<nsamples>-<grad_acc_steps>-<c>, "
             "float8wo, float8dq, float8saq"
@@ -7,7 +7,7 @@ import os
 import sys
 import time
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from datetime import datetime
 import torch
 import torchao
@@ -24,13 +24,20 @@ def device_sync(device):
     else:
         print(f"device={device} is not yet suppported")
 
+def peak_memory_gb(device):
+    if "cuda" in device:
+        return torch.cuda.max_memory_reserved() / 1e9
+    # peak resident set size of the process, in KiB on linux
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 / 1e9
+
 default_device = 'cuda' if torch.cuda.is_available() else 'cpu'
 
 # support running without installing as a package
 wd = Path(__file__).parent.parent.resolve()
 sys.path.append(str(wd))
 
-from torchao._models.llama.model import Transformer, prepare_inputs_for_model
+from torchao._models.llama.model import Transformer, kv_cache_read_len, prepare_inputs_for_model
 from torchao._models.llama.tokenizer import get_tokenizer
 
 def multinomial_sample_one_no_sync(probs_sort): # Does multinomial sampling without a cuda synchronization
@@ -52,23 +59,34 @@ def sample(logits, temperature: float = 1.0, top_k: Optional[int] = None):
     idx_next = multinomial_sample_one_no_sync(probs)
     return idx_next, probs
 
-def prefill(model: Transformer, x: torch.Tensor, input_pos: torch.Tensor, **sampling_kwargs) -> torch.Tensor:
+def sample_batched(logits, temperature: float = 1.0, top_k: Optional[int] = None):
+    # logits: [B, vocab_size], samples one next token per sequence
+    probs = logits_to_probs(logits, temperature, top_k)
+    idx_next = multinomial_sample_one_no_sync(probs)
+    return idx_next, probs
+
+def prefill(model: Transformer, x: torch.Tensor, input_pos: torch.Tensor, kv_len: Optional[int] = None, **sampling_kwargs) -> torch.Tensor:
     # input_pos: [B, S]
-    logits = model(x, input_pos)
+    logits = model(x, input_pos, kv_len=kv_len)
     return sample(logits, **sampling_kwargs)[0]
 
-def decode_one_token(model: Transformer, x: torch.Tensor, input_pos: torch.Tensor, **sampling_kwargs) -> Tuple[torch.Tensor, torch.Tensor]:
+def decode_one_token(model: Transformer, x: torch.Tensor, input_pos: torch.Tensor, kv_len: Optional[int] = None, **sampling_kwargs) -> Tuple[torch.Tensor, torch.Tensor]:
     # input_pos: [B, 1]
     assert input_pos.shape[-1] == 1
-    logits = model(x, input_pos)
+    logits = model(x, input_pos, kv_len=kv_len)
     return sample(logits, **sampling_kwargs)
 
+def _kv_len(model: Transformer, num_positions: int) -> Optional[int]:
+    # only models whose kv cache reads can be bounded take kv_len, so other models don't recompile on it
+    return kv_cache_read_len(num_positions, model.max_seq_length) if model.bounded_kv_cache_reads else None
+
 def decode_n_tokens(model: Transformer, cur_token: torch.Tensor, input_pos: torch.Tensor, num_new_tokens: int, callback=lambda _: _, **sampling_kwargs):
     new_tokens, new_probs = [], []
+    start_pos = int(input_pos.max())
     for i in range(num_new_tokens):
         with torch.backends.cuda.sdp_kernel(enable_flash=False, enable_mem_efficient=False, enable_math=True): # Actually better for Inductor to codegen attention here
             next_token, next_prob = decode_one_token(
-                model, cur_token, input_pos, **sampling_kwargs
+                model, cur_token, input_pos, _kv_len(model, start_pos + i + 1), **sampling_kwargs
             )
             next_token, next_prob = next_token.clone(), next_prob.clone()
             input_pos += 1
@@ -80,6 +98,19 @@ def decode_n_tokens(model: Transformer, cur_token: torch.Tensor, input_pos: torc
     return new_tokens, new_probs
 
 
+def prefill_batched(model: Transformer, x: torch.Tensor, input_pos: torch.Tensor, batch_idx: torch.Tensor, last_idx: torch.Tensor, kv_len: Optional[int] = None, **sampling_kwargs) -> torch.Tensor:
+    # x, input_pos: [B, S] right padded prompts, batch_idx: [B] kv cache rows, last_idx: [B] index of the last prompt token
+    logits = model(x, input_pos, batch_idx, kv_len=kv_len)
+    logits = logits[torch.arange(x.shape[0], device=x.device), last_idx]
+    return sample_batched(logits, **sampling_kwargs)[0]
+
+def decode_one_token_batched(model: Transformer, x: torch.Tensor, input_pos: torch.Tensor, kv_len: Optional[int] = None, **sampling_kwargs) -> Tuple[torch.Tensor, torch.Tensor]:
+    # x, input_pos: [B, 1], every sequence is at its own position
+    assert input_pos.shape[-1] == 1
+    logits = model(x, input_pos, kv_len=kv_len)
+    return sample_batched(logits[:, -1], **sampling_kwargs)
+
+
 def model_forward(model, x, input_pos):
     return model(x, input_pos)
 
@@ -94,6 +125,7 @@ def generate(
     kv_cache_quantization: bool = False,
     cache_size: Optional[int] = None,
     linear_causal_mask: bool=False,
+    kv_cache_quantized_attention: bool = False,
     **sampling_kwargs
 ) -> torch.Tensor:
     """
@@ -117,13 +149,13 @@ def generate(
         if cache_size is None:
             cache_size = max_seq_length
         assert cache_size >= max_seq_length, "need cache_size to be greater than max_new_tokens + size-of-prompt"
-        model.setup_caches(max_batch_size=1, max_seq_length=cache_size, kv_cache_quantization=kv_cache_quantization, linear_causal_mask=linear_causal_mask, prompt_length=T)
+        model.setup_caches(max_batch_size=1, max_seq_length=cache_size, kv_cache_quantization=kv_cache_quantization, linear_causal_mask=linear_causal_mask, prompt_length=T, kv_cache_quantized_attention=kv_cache_quantized_attention)
 
     # format model input
     x, input_pos = prepare_inputs_for_model(prompt, max_new_tokens)
 
     # execute prefill
-    next_token = prefill(model, x, input_pos, **sampling_kwargs).clone()
+    next_token = prefill(model, x, input_pos, _kv_len(model, T), **sampling_kwargs).clone()
     seq[T] = next_token
     # execute token generation
     input_pos = torch.tensor([T], device=device, dtype=torch.int)
@@ -133,6 +165,125 @@ def generate(
 
     return seq
 
+@torch.no_grad()
+def generate_batched(
+    model: Transformer,
+    prompts: List[torch.Tensor],
+    max_new_tokens: int,
+    *,
+    batch_size: int,
+    eos_id: Optional[int] = None,
+    kv_cache_quantization: bool = False,
+    cache_size: Optional[int] = None,
+    kv_cache_block_size: Optional[int] = None,
+    kv_cache_num_blocks: Optional[int] = None,
+    kv_cache_quantized_attention: bool = False,
+    **sampling_kwargs
+) -> Tuple[List[torch.Tensor], int]:
+    """
+    Continues every prompt in prompts with up to max_new_tokens tokens, decoding up to batch_size sequences at a time.
+
+    Each sequence has its own positions (and row of the kv cache), so prompts can have different lengths: they are
+    right padded for prefill and the padding is never attended to since it lies past the sequence's own position.
+    A sequence stops at its own eos_id (or after max_new_tokens) and its slot is reused for the next waiting prompt.
+    With kv_cache_block_size set the kv cache is paged: a sequence is only admitted once the pool has blocks for
+    its prompt and new tokens, and gives them back when it finishes.
+    Returns the generated tokens for each prompt and the number of batched decode steps.
+    """
+    device = prompts[0].device
+
+    # calculate how many tokens to generate based on max_new_tokens and model's upper bound (block_size)
+    max_seq_length = min(max(p.numel() for p in prompts) + max_new_tokens, model.config.block_size)
+
+    # setup model caches, one row per slot
+    with torch.device(device):
+        if cache_size is None:
+            cache_size = max_seq_length
+        assert cache_size >= max_seq_length, "need cache_size to be greater than max_new_tokens + size-of-prompt"
+        model.setup_caches(
+            max_batch_size=batch_size,
+            max_seq_length=cache_size,
+            kv_cache_quantization=kv_cache_quantization,
+            kv_cache_block_size=kv_cache_block_size,
+            kv_cache_num_blocks=kv_cache_num_blocks,
+            kv_cache_quantized_attention=kv_cache_quantized_attention,
+        )
+    allocator = model.kv_cache_allocator
+    if allocator is not None:
+        for slot in range(batch_size):
+            allocator.free(slot)
+
+    def num_new_tokens(request):
+        return min(max_new_tokens, max_seq_length - prompts[request].numel())
+
+    waiting = list(range(len(prompts)))
+    outputs = [[] for _ in prompts]
+    slot_request = [None] * batch_size
+    # the next input token and its position for every slot, free slots decode a dummy token at position 0
+    slot_token = [0] * batch_size
+    slot_pos = [0] * batch_size
+
+    def record(slots, tokens):
+        for slot, token in zip(slots, tokens):
+            request = slot_request[slot]
+            outputs[request].append(token)
+            if token == eos_id or len(outputs[request]) >= num_new_tokens(request):
+                slot_request[slot] = None
+                slot_token[slot], slot_pos[slot] = 0, 0
+                if allocator is not None:
+                    allocator.free(slot)
+            else:
+                slot_token[slot] = token
+                slot_pos[slot] += 1
+
+    num_steps = 0
+    while waiting or any(request is not None for request in slot_request):
+        free_slots = [slot for slot, request in enumerate(slot_request) if request is None]
+        slots, requests = [], []
+        for slot in free_slots[:len(waiting)]:
+            if allocator is not None:
+                num_tokens = prompts[waiting[0]].numel() + num_new_tokens(waiting[0])
+                if not allocator.can_allocate(num_tokens):
+                    break
+                allocator.allocate(slot, num_tokens)
+            slots.append(slot)
+            requests.append(waiting.pop(0))
+        if not slots and all(request is None for request in slot_request):
+            raise RuntimeError("the paged kv cache is too small to hold a single prompt and its new tokens")
+        if slots:
+            # prefill waiting prompts into the free slots
+            lengths = [prompts[request].numel() for request in requests]
+            x = torch.zeros(len(requests), max(lengths), dtype=prompts[0].dtype, device=device)
+            for i, request in enumerate(requests):
+                x[i, :lengths[i]] = prompts[request].view(-1)
+                slot_request[slots[i]] = request
+                slot_pos[slots[i]] = lengths[i] - 1
+            input_pos = torch.arange(max(lengths), dtype=torch.int, device=device).expand(len(requests), -1)
+            next_token = prefill_batched(
+                model,
+                x,
+                input_pos,
+                torch.tensor(slots, device=device),
+                torch.tensor(lengths, device=device) - 1,
+                _kv_len(model, max(lengths)),
+                **sampling_kwargs
+            )
+            record(slots, next_token.view(-1).tolist())
+            continue
+
+        active_slots = [slot for slot, request in enumerate(slot_request) if request is not None]
+        x = torch.tensor(slot_token, dtype=prompts[0].dtype, device=device).view(batch_size, 1)
+        input_pos = torch.tensor(slot_pos, dtype=torch.int, device=device).view(batch_size, 1)
+        with torch.backends.cuda.sdp_kernel(enable_flash=False, enable_mem_efficient=False, enable_math=True): # Actually better for Inductor to codegen attention here
+            next_token, _ = decode_one_token_batched(
+                model, x, input_pos, _kv_len(model, max(slot_pos) + 1), **sampling_kwargs
+            )
+        num_steps += 1
+        next_token = next_token.view(-1).tolist()
+        record(active_slots, [next_token[slot] for slot in active_slots])
+
+    return [torch.tensor(output, dtype=prompts[0].dtype, device=device) for output in outputs], num_steps
+
 def encode_tokens(tokenizer, string, bos=True, device=default_device):
     tokens = tokenizer.encode(string)
     if bos:
@@ -150,6 +301,12 @@ def _load_model(checkpoint_path, device, precision):
 
     return model.eval()
 
+def _load_quantized_model(checkpoint_path, quantized_checkpoint_path, device):
+    # the quantized weights are used straight from the mmapped checkpoint instead of loading and quantizing the model
+    from torchao.quantization.quant_api import load_quantized_checkpoint
+    model = load_quantized_checkpoint(lambda: Transformer.from_name(checkpoint_path.parent.name), quantized_checkpoint_path, device)
+    return model.eval()
+
 B_INST, E_INST = "[INST]", "[/INST]"
 
 def main(
@@ -174,6 +331,12 @@ def main(
     device=default_device,
     precision=torch.bfloat16,
     write_result: Optional[Path] = None,
+    batch_size: int = 1,
+    num_requests: Optional[int] = None,
+    kv_cache_block_size: Optional[int] = None,
+    kv_cache_num_blocks: Optional[int] = None,
+    kv_cache_quantized_attention: bool = False,
+    quantized_checkpoint_path: Optional[Path] = None,
 ) -> None:
     """Generates text samples based on a pre-trained Transformer model and tokenizer.
     """
@@ -189,7 +352,11 @@ def main(
 
     print("Loading model ...")
     t0 = time.time()
-    model = _load_model(checkpoint_path, device, precision)
+    if quantized_checkpoint_path is not None:
+        assert quantization is None, "quantized_checkpoint_path is already quantized, don't pass --quantization"
+        model = _load_quantized_model(checkpoint_path, quantized_checkpoint_path, device)
+    else:
+        model = _load_model(checkpoint_path, device, precision)
 
 
     device_sync(device=device) # MKG
@@ -314,21 +481,34 @@ def main(
     if save:
         output_dir = str(checkpoint_path.cwd())
         filename = str(checkpoint_path.name).split(".")[0]
-        torch.save(model.state_dict(), os.path.join(output_dir, filename + f"-{quantization}.pt"))
+        from torchao.quantization.quant_api import save_quantized_checkpoint
+        save_path = os.path.join(output_dir, filename + f"-{quantization}.pt")
+        save_quantized_checkpoint(model, save_path)
+        print(f"Saved quantized model to {save_path}, load it with --quantized_checkpoint_path {save_path}")
 
     if compile:
         print("Compiling Model")
-        global decode_one_token, prefill
+        global decode_one_token, prefill, decode_one_token_batched, prefill_batched
         decode_one_token = torch.compile(decode_one_token, mode="reduce-overhead", fullgraph=True)
+        decode_one_token_batched = torch.compile(decode_one_token_batched, mode="reduce-overhead", fullgraph=True)
 
         if compile_prefill:
             prefill = torch.compile(prefill, fullgraph=True, dynamic=True)
+            prefill_batched = torch.compile(prefill_batched, fullgraph=True, dynamic=True)
 
     if memory_profile:
         torch.cuda.memory._record_memory_history(True,trace_alloc_max_entries=250000, trace_alloc_record_context=True)
     aggregate_metrics = {
         'tokens_per_sec': [],
+        'steps_per_sec': [],
     }
+    # the paged kv cache is only used by batched generation
+    batched = batch_size > 1 or kv_cache_block_size is not None
+    if batched:
+        assert not interactive, "interactive mode is not supported with batched generation"
+        assert not linear_causal_mask, "linear_causal_mask is not supported with batched generation"
+        if num_requests is None:
+            num_requests = batch_size
     start = -1 if compile else 0
 
     for i in range(start, num_samples):
@@ -366,18 +546,35 @@ def main(
             torch.profiler._utils._init_for_cuda_graphs()
             prof = torch.profiler.profile()
         with prof:
-            y = generate(
-                model,
-                encoded,
-                max_new_tokens,
-                interactive=interactive,
-                callback=callback,
-                temperature=temperature,
-                top_k=top_k,
-                kv_cache_quantization=kv_cache_quantization,
-                cache_size=cache_size,
-                linear_causal_mask=linear_causal_mask,
-            )
+            if batched:
+                ys, num_steps = generate_batched(
+                    model,
+                    [encoded] * num_requests,
+                    max_new_tokens,
+                    batch_size=batch_size,
+                    eos_id=tokenizer.eos_id(),
+                    temperature=temperature,
+                    top_k=top_k,
+                    kv_cache_quantization=kv_cache_quantization,
+                    cache_size=cache_size,
+                    kv_cache_block_size=kv_cache_block_size,
+                    kv_cache_num_blocks=kv_cache_num_blocks,
+                    kv_cache_quantized_attention=kv_cache_quantized_attention,
+                )
+            else:
+                y = generate(
+                    model,
+                    encoded,
+                    max_new_tokens,
+                    interactive=interactive,
+                    callback=callback,
+                    temperature=temperature,
+                    top_k=top_k,
+                    kv_cache_quantization=kv_cache_quantization,
+                    cache_size=cache_size,
+                    linear_causal_mask=linear_causal_mask,
+                    kv_cache_quantized_attention=kv_cache_quantized_attention,
+                )
         if i == -1:
             print(f"Compilation time: {time.perf_counter() - t0:.2f} seconds")
             continue
@@ -386,6 +583,8 @@ def main(
         device_sync(device=device) # MKG
         t = time.perf_counter() - t0
 
+        if batched:
+            y = torch.cat((encoded, ys[0]))
         if not interactive:
                 tok_list = y.tolist()
                 # truncate text after end of string token
@@ -393,11 +592,18 @@ def main(
                 print(tokenizer.decode(tokens))
         else:
             print()
-        tokens_generated = y.size(0) - prompt_length
+        if batched:
+            # the weights are read once per decode step for the whole batch
+            tokens_generated = sum(y.size(0) for y in ys)
+            steps_sec = num_steps / t
+        else:
+            tokens_generated = y.size(0) - prompt_length
+            steps_sec = tokens_generated / t
         tokens_sec = tokens_generated / t
         aggregate_metrics['tokens_per_sec'].append(tokens_sec)
+        aggregate_metrics['steps_per_sec'].append(steps_sec)
         print(f"Time for inference {i + 1}: {t:.02f} sec total, {tokens_sec:.02f} tokens/sec")
-        print(f"Bandwidth achieved: {model_size * tokens_sec:.02f} GB/s")
+        print(f"Bandwidth achieved: {model_size * steps_sec:.02f} GB/s")
 
         if memory_profile and i==0:
             snapshot = torch.cuda.memory._snapshot()
@@ -413,18 +619,19 @@ def main(
     print("==========")
 
     tokpersec = torch.mean(torch.tensor(aggregate_metrics['tokens_per_sec'])).item()
-    bandwidth = model_size * tokpersec
-    mem = torch.cuda.max_memory_reserved() /1e9
+    bandwidth = model_size * torch.mean(torch.tensor(aggregate_metrics['steps_per_sec'])).item()
+    mem = peak_memory_gb(device)
     print(f"Average tokens/sec: {tokpersec:.2f}")
     print(f"Average Bandwidth: {bandwidth:.02f} GB/s")
     print(f"Peak Memory Usage: {mem:.02f} GB")
     print(f"Model Size: {model_size:.02f} GB")
     if write_result:
         result_txt = f"\n{datetime.today().strftime('%Y%m%d%H%M%S')}, tok/s={tokpersec:6.2f}, mem/s={bandwidth:7.2f} GB/s, peak_mem={mem:5.2f} GB, model_size={model_size:5.2f} GB "
-        result_txt += f"quant: {quantization}, mod: {checkpoint_path.parent.name}, kv_quant: {kv_cache_quantization}, compile: {compile}, compile_prefill: {compile_prefill}, dtype: {precision}, device: {device} "
+        result_txt += f"quant: {quantization}, mod: {checkpoint_path.parent.name}, kv_quant: {kv_cache_quantization}, compile: {compile}, compile_prefill: {compile_prefill}, dtype: {precision}, device: {device}, batch_size: {batch_size} "
         result_txt += f"repro: python generate.py "
         result_txt += f"--quantization {quantization} " if quantization else ""
         result_txt += f"--checkpoint_path {checkpoint_path} "
+        result_txt += f"--quantized_checkpoint_path {quantized_checkpoint_path} " if quantized_checkpoint_path else ""
         result_txt += f"--device {device} "
         result_txt += f"--precision {precision} "
         result_txt += f"--compile " if compile else ""
@@ -439,6 +646,11 @@ def main(
         result_txt += f"--cache_size {cache_size}" if cache_size else ""
         result_txt += f"--kv_cache_quantization " if kv_cache_quantization else ""
         result_txt += f"--linear_causal_mask " if linear_causal_mask else ""
+        result_txt += f"--batch_size {batch_size} " if batch_size > 1 else ""
+        result_txt += f"--num_requests {num_requests} " if batched else ""
+        result_txt += f"--kv_cache_block_size {kv_cache_block_size} " if kv_cache_block_size else ""
+        result_txt += f"--kv_cache_num_blocks {kv_cache_num_blocks} " if kv_cache_num_blocks else ""
+        result_txt += f"--kv_cache_quantized_attention " if kv_cache_quantized_attention else ""
 
         f=open(write_result, "a")
         f.write(result_txt)
@@ -465,10 +677,12 @@ if __name__ == '__main__':
     )
     parser.add_argument("--calibration_limit", type=int, default=10, help="Number of calibration examples")
     parser.add_argument("--calibration_seq_length", type=int, default=256, help="Sequence length for calibration")
-    parser.add_argument('--kv_cache_quantization', action='store_true', help='Whether to quantize the KV cache')
+    parser.add_argument('--kv_cache_quantization', action='store_true', help='Whether to quantize the KV cache (not supported with the paged kv cache, --kv_cache_block_size)')
     parser.add_argument('--cache_size', type=int, default=None, help='Force size of cache to be a certain number of tokens, if not set, will use max_new_tokens+prompt_size')
+    parser.add_argument('--kv_cache_quantized_attention', action='store_true', help='Whether attention should work on the quantized KV cache directly instead of dequantizing it (needs --kv_cache_quantization)')
     parser.add_argument('--linear_causal_mask', action='store_true', help='Whether to use the memory efficient, but slightly less fast, linear causal mask (important for long context lengths)')
     parser.add_argument('--save', action='store_true', help='Whether to save the quantized model.')
+    parser.add_argument('--quantized_checkpoint_path', type=Path, default=None, help='Quantized model saved with --save, loaded with mmap instead of quantizing the model at startup')
     parser.add_argument('--compile', action='store_true', help='Whether to compile the model.')
     parser.add_argument('--compile_prefill', action='store_true', help='Whether to compile the prefill (improves prefill perf, but higher compile times)')
     parser.add_argument('--profile', type=Path, default=None, help='Profile path.')
@@ -476,9 +690,15 @@ if __name__ == '__main__':
     parser.add_argument('--device', type=str, default=default_device, help='Device to use')
     parser.add_argument('--precision', type=lambda x: getattr(torch, x.split(".")[-1]), default=torch.bfloat16, help='dtype precision to use')
     parser.add_argument('--write_result', type=Path, default=None, help='Path where to write the result')
+    parser.add_argument('--batch_size', type=int, default=1, help='Number of sequences decoded together, each with its own positions and stopping at its own eos')
+    parser.add_argument('--kv_cache_block_size', type=int, default=None, help='Use a paged kv cache with blocks of this many tokens (uses batched generation, not supported with --kv_cache_quantization)')
+    parser.add_argument('--kv_cache_num_blocks', type=int, default=None, help='Number of blocks in the paged kv cache pool, defaults to enough for batch_size sequences of cache_size')
+    parser.add_argument('--num_requests', type=int, default=None, help='Number of prompts to generate for when batch_size > 1, finished sequences are replaced by waiting ones (defaults to batch_size)')
 
     args = parser.parse_args()
+    if args.kv_cache_block_size is not None and args.kv_cache_quantization:
+        parser.error("--kv_cache_quantization is not supported with the paged kv cache (--kv_cache_block_size)")
     main(
         args.prompt, args.interactive, args.num_samples, args.max_new_tokens, args.top_k,
-        args.temperature, args.checkpoint_path, args.quantization, args.calibration_limit, args.calibration_seq_length, args.kv_cache_quantization, args.cache_size, args.linear_causal_mask, args.save, args.compile, args.compile_prefill, args.profile, args.memory_profile, args.device, args.precision, args.write_result
+        args.temperature, args.checkpoint_path, args.quantization, args.calibration_limit, args.calibration_seq_length, args.kv_cache_quantization, args.cache_size, args.linear_causal_mask, args.save, args.compile, args.compile_prefill, args.profile, args.memory_profile, args.device, args.precision, args.write_result, args.batch_size, args.num_requests, args.kv_cache_block_size, args.kv_cache_num_blocks, args.kv_cache_quantized_attention, args.quantized_checkpoint_path
     )
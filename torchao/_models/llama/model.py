@@ -92,9 +92,15 @@ class KVCache(nn.Module):
         self.register_buffer('k_cache', torch.zeros(cache_shape, dtype=dtype))
         self.register_buffer('v_cache', torch.zeros(cache_shape, dtype=dtype))
 
-    def update(self, input_pos, k_val, v_val):
-        # input_pos: [S], k_val: [B, H, S, D]
-        assert input_pos.shape[0] == k_val.shape[2]
+    def update(self, input_pos, k_val, v_val, batch_idx=None):
+        # input_pos: [S] or [B, S], k_val: [B, H, S, D], batch_idx: [B]
+        assert input_pos.shape[-1] == k_val.shape[2]
+
+        if input_pos.dim() == 2:
+            # per-sequence positions, each sequence writes to its own positions of its row (batch_idx) of the cache
+            _update_kv_cache_rows(self.k_cache, batch_idx, input_pos, k_val)
+            _update_kv_cache_rows(self.v_cache, batch_idx, input_pos, v_val)
+            return _kv_cache_rows(self.k_cache, self.v_cache, batch_idx, k_val.shape[0])
 
         if use_index_put_for_kv_cache:
             k_out = torch.ops.aten.index_put_(self.k_cache, [None, None, input_pos], k_val)
@@ -108,11 +114,23 @@ class KVCache(nn.Module):
         return k_out, v_out
 
 
+def _update_kv_cache_rows(cache, batch_idx, input_pos, val):
+    # cache: [max_B, H, L, D], batch_idx: [B] or None for rows 0..B-1, input_pos: [B, S], val: [B, H, S, D]
+    if batch_idx is None:
+        batch_idx = torch.arange(val.shape[0], device=val.device)
+    cache[batch_idx.unsqueeze(-1), :, input_pos] = val.transpose(1, 2)
+
+def _kv_cache_rows(k_cache, v_cache, batch_idx, batch_size):
+    if batch_idx is None:
+        return k_cache[:batch_size], v_cache[:batch_size]
+    return k_cache[batch_idx], v_cache[batch_idx]
+
+
 from torchao.quantization.quant_primitives import quantize_affine, dequantize_affine
 from torchao.quantization.utils import quantize_activation_per_token_absmax
 
 class AffineQuantizedKVCache(nn.Module):
-    def __init__(self, max_batch_size, max_seq_length, n_heads, head_dim, scale_dtype=torch.bfloat16):
+    def __init__(self, max_batch_size, max_seq_length, n_heads, head_dim, scale_dtype=torch.bfloat16, quantized_attention=False):
         super().__init__()
         cache_shape = (max_batch_size, n_heads, max_seq_length, head_dim)
         scale_shape = (max_batch_size, n_heads, max_seq_length, 1)
@@ -120,8 +138,13 @@ class AffineQuantizedKVCache(nn.Module):
         self.register_buffer('v_cache', torch.zeros(cache_shape, dtype=torch.int8))
         self.register_buffer('k_cache_scale', torch.ones(scale_shape, dtype=scale_dtype))
         self.register_buffer('v_cache_scale', torch.ones(scale_shape, dtype=scale_dtype))
+        # whether Attention should use int8_kv_cache_attention on the int8 cache instead of update
+        self.quantized_attention = quantized_attention
     
-    def update(self, input_pos, k_val, v_val):
+    def update(self, input_pos, k_val, v_val, batch_idx=None):
+        if input_pos.dim() == 2:
+            return self._update_per_sequence(input_pos, k_val, v_val, batch_idx)
+
         # quantize current k_val and store it in the cache
         q_k_val, k_scale = quantize_activation_per_token_absmax(k_val)
         self.k_cache[:, :, input_pos] = q_k_val
@@ -137,12 +160,163 @@ class AffineQuantizedKVCache(nn.Module):
         
         return k_out, v_out
 
+    def update_quantized(self, input_pos, k_val, v_val, batch_idx=None):
+        """Same as update but returns the int8 k and v caches and their per token scales instead of
+        dequantizing the whole cache, to be consumed by int8_kv_cache_attention.
+        """
+        q_k_val, k_scale = quantize_activation_per_token_absmax(k_val)
+        q_v_val, v_scale = quantize_activation_per_token_absmax(v_val)
+        if input_pos.dim() == 2:
+            # input_pos: [B, S], each sequence uses its own positions and cache row
+            _update_kv_cache_rows(self.k_cache, batch_idx, input_pos, q_k_val)
+            _update_kv_cache_rows(self.k_cache_scale, batch_idx, input_pos, k_scale.unsqueeze(-1))
+            _update_kv_cache_rows(self.v_cache, batch_idx, input_pos, q_v_val)
+            _update_kv_cache_rows(self.v_cache_scale, batch_idx, input_pos, v_scale.unsqueeze(-1))
+            k_cache, v_cache = _kv_cache_rows(self.k_cache, self.v_cache, batch_idx, k_val.shape[0])
+            k_scale, v_scale = _kv_cache_rows(self.k_cache_scale, self.v_cache_scale, batch_idx, k_val.shape[0])
+            return k_cache, k_scale, v_cache, v_scale
+
+        self.k_cache[:, :, input_pos] = q_k_val
+        self.k_cache_scale[:, :, input_pos] = k_scale.unsqueeze(-1)
+        self.v_cache[:, :, input_pos] = q_v_val
+        self.v_cache_scale[:, :, input_pos] = v_scale.unsqueeze(-1)
+        return self.k_cache, self.k_cache_scale, self.v_cache, self.v_cache_scale
+
+    def _update_per_sequence(self, input_pos, k_val, v_val, batch_idx):
+        # input_pos: [B, S], same as the shared position update but each sequence uses its own positions and cache row
+        k_cache, k_scale, v_cache, v_scale = self.update_quantized(input_pos, k_val, v_val, batch_idx)
+        k_out = k_cache*k_scale
+        v_out = v_cache*v_scale
+        _update_kv_cache_rows(k_out, None, input_pos, k_val)
+        _update_kv_cache_rows(v_out, None, input_pos, v_val)
+        return k_out, v_out
+
     @classmethod
-    def from_float(cls, kv_cache):
+    def from_float(cls, kv_cache, quantized_attention=False):
         cache_shape = kv_cache.k_cache.shape
         max_batch_size, n_heads, max_seq_length, head_dim = cache_shape
         scale_dtype = kv_cache.k_cache.dtype
-        return cls(max_batch_size, max_seq_length, n_heads, head_dim, scale_dtype)
+        return cls(max_batch_size, max_seq_length, n_heads, head_dim, scale_dtype, quantized_attention)
+
+
+def int8_kv_cache_attention(q, k_int8, k_scale, v_int8, v_scale, mask, kv_len=None, chunk_size=2048):
+    """Attention over an int8 kv cache with per token scales that never dequantizes the whole cache at once.
+
+    The cache is read in chunks of chunk_size positions, each chunk of int8 keys and values is converted to the
+    dtype of q for the QK^T and PV matmuls, with the k scales applied to the scores and the v scales folded into
+    the attention probabilities instead of to the converted cache. So only one chunk is ever held in floating
+    point. Only the first kv_len positions (the whole cache if None) are read.
+
+    q: [B, H, S, D], k_int8, v_int8: [B, H_kv, L, D], k_scale, v_scale: [B, H_kv, L, 1], mask: broadcastable to [B, H, S, L]
+    """
+    bsz, n_head, seqlen, head_dim = q.shape
+    n_local_heads = k_int8.shape[1]
+    if kv_len is None:
+        kv_len = k_int8.shape[2]
+    # the query heads sharing a kv head attend to it together instead of repeating the cache
+    q = q.reshape(bsz, n_local_heads, n_head // n_local_heads * seqlen, head_dim) * head_dim ** -0.5
+
+    scores = []
+    for start in range(0, kv_len, chunk_size):
+        end = min(start + chunk_size, kv_len)
+        chunk_scores = torch.matmul(q, k_int8[:, :, start:end].to(q.dtype).transpose(-1, -2))
+        scores.append(chunk_scores * k_scale[:, :, start:end].transpose(-1, -2))
+    scores = torch.cat(scores, dim=-1).view(bsz, n_head, seqlen, kv_len)
+    scores = scores.masked_fill(~mask[..., :kv_len], float("-inf"))
+    probs = torch.softmax(scores.float(), dim=-1).to(q.dtype).view(bsz, n_local_heads, -1, kv_len)
+
+    y = None
+    for start in range(0, kv_len, chunk_size):
+        end = min(start + chunk_size, kv_len)
+        chunk_probs = probs[..., start:end] * v_scale[:, :, start:end].transpose(-1, -2)
+        chunk_y = torch.matmul(chunk_probs, v_int8[:, :, start:end].to(q.dtype))
+        y = chunk_y if y is None else y + chunk_y
+    return y.view(bsz, n_head, seqlen, head_dim)
+
+def kv_cache_read_len(num_positions, max_seq_length, min_len=2048):
+    """kv_len for a step attending to the first num_positions kv cache positions, rounded up to a power of two
+    (at least min_len, at most max_seq_length) so that compiled code only ever sees a handful of distinct lengths.
+    """
+    return min(max(min_len, 1 << (num_positions - 1).bit_length()), max_seq_length)
+
+class PagedKVCacheAllocator:
+    """Hands out the blocks of the paged kv cache pool to the sequences in each batch slot.
+
+    The block table is shared by the PagedKVCache of every layer, block_table[slot, i] is the pool block holding
+    positions [i * block_size, (i + 1) * block_size) of the sequence in that slot. Unallocated entries point to an
+    extra scratch block which only ever holds values that are masked out by the causal mask.
+    """
+    def __init__(self, max_batch_size, max_seq_length, block_size, num_blocks):
+        assert max_seq_length % block_size == 0, "max_seq_length needs to be a multiple of block_size"
+        self.block_size = block_size
+        self.num_blocks = num_blocks
+        self.scratch_block = num_blocks
+        self.block_table = torch.full((max_batch_size, max_seq_length // block_size), self.scratch_block, dtype=torch.long)
+        self.free_blocks = list(range(num_blocks - 1, -1, -1))
+        self.slot_blocks = [[] for _ in range(max_batch_size)]
+
+    def num_blocks_needed(self, num_tokens):
+        return -(-num_tokens // self.block_size)
+
+    def can_allocate(self, num_tokens, slot=None):
+        allocated = 0 if slot is None else len(self.slot_blocks[slot])
+        return self.num_blocks_needed(num_tokens) - allocated <= len(self.free_blocks)
+
+    def allocate(self, slot, num_tokens):
+        """Makes sure the sequence in slot has blocks for its first num_tokens positions."""
+        blocks = self.slot_blocks[slot]
+        num_new_blocks = self.num_blocks_needed(num_tokens) - len(blocks)
+        if num_new_blocks <= 0:
+            return
+        if not self.can_allocate(num_tokens, slot):
+            raise RuntimeError(f"paged kv cache is out of blocks, need {num_new_blocks} but only {len(self.free_blocks)} are free")
+        new_blocks = [self.free_blocks.pop() for _ in range(num_new_blocks)]
+        self.block_table[slot, len(blocks):len(blocks) + num_new_blocks] = torch.tensor(new_blocks, dtype=torch.long)
+        blocks.extend(new_blocks)
+
+    def free(self, slot):
+        self.free_blocks.extend(reversed(self.slot_blocks[slot]))
+        self.slot_blocks[slot] = []
+        self.block_table[slot] = self.scratch_block
+
+
+class PagedKVCache(nn.Module):
+    def __init__(self, allocator, n_heads, head_dim, dtype=torch.bfloat16):
+        super().__init__()
+        # one more block than the allocator hands out, the scratch block
+        cache_shape = (allocator.num_blocks + 1, n_heads, allocator.block_size, head_dim)
+        self.register_buffer('k_cache', torch.zeros(cache_shape, dtype=dtype))
+        self.register_buffer('v_cache', torch.zeros(cache_shape, dtype=dtype))
+        self.allocator = allocator
+
+    def update(self, input_pos, k_val, v_val, batch_idx=None, kv_len=None):
+        # input_pos: [S] or [B, S], k_val: [B, H, S, D], batch_idx: [B]
+        # only the blocks holding the first kv_len positions are read back, all of them if kv_len is None
+        assert input_pos.shape[-1] == k_val.shape[2]
+        if input_pos.dim() == 1:
+            input_pos = input_pos.expand(k_val.shape[0], -1)
+        if batch_idx is None:
+            block_table = self.allocator.block_table[:k_val.shape[0]]
+        else:
+            block_table = self.allocator.block_table[batch_idx]
+
+        # write each token to its offset in the block the block table maps its position to
+        blocks = torch.gather(block_table, 1, (input_pos // self.allocator.block_size).long())
+        offsets = input_pos % self.allocator.block_size
+        self.k_cache[blocks, :, offsets] = k_val.transpose(1, 2)
+        self.v_cache[blocks, :, offsets] = v_val.transpose(1, 2)
+
+        if kv_len is not None:
+            block_table = block_table[:, :self.allocator.num_blocks_needed(kv_len)]
+        return self._read(self.k_cache, block_table), self._read(self.v_cache, block_table)
+
+    @staticmethod
+    def _read(cache, block_table):
+        # gather the blocks of every sequence: [B, n_blocks, H, block_size, D] -> [B, H, n_blocks * block_size, D]
+        out = cache[block_table]
+        bsz, n_blocks, n_heads, block_size, head_dim = out.shape
+        return out.transpose(1, 2).reshape(bsz, n_heads, n_blocks * block_size, head_dim)
+
 
 class Transformer(nn.Module):
     def __init__(self, config: ModelArgs) -> None:
@@ -158,12 +332,29 @@ class Transformer(nn.Module):
         self.mask_cache: Optional[Tensor] = None
         self.max_batch_size = -1
         self.max_seq_length = -1
-
-    def setup_caches(self, max_batch_size, max_seq_length, training: bool=False, kv_cache_quantization=None, linear_causal_mask=False, prompt_length=None):
+        self.kv_cache_allocator: Optional[PagedKVCacheAllocator] = None
+        self.bounded_kv_cache_reads = False
+
+    def setup_caches(self, max_batch_size, max_seq_length, training: bool=False, kv_cache_quantization=None, linear_causal_mask=False, prompt_length=None, kv_cache_block_size=None, kv_cache_num_blocks=None, kv_cache_quantized_attention=False):
+        """Sets up the rope frequencies, causal mask and (for inference) the kv caches.
+
+        With kv_cache_block_size set, every layer uses a PagedKVCache: a pool of kv_cache_num_blocks blocks
+        of kv_cache_block_size tokens (by default enough for max_batch_size sequences of max_seq_length), blocks
+        are given to sequences with model.kv_cache_allocator.allocate(slot, num_tokens) and returned with free(slot).
+        Each step only gathers the blocks covering the positions attended to (see kv_len in forward). The paged
+        kv cache does not support kv_cache_quantization yet.
+        With kv_cache_quantization and kv_cache_quantized_attention, attention works on the int8 kv cache
+        directly (int8_kv_cache_attention) and only reads the positions attended to, instead of dequantizing
+        the whole cache every step.
+        """
         if self.max_seq_length >= max_seq_length and self.max_batch_size >= max_batch_size:
             return
         head_dim = self.config.dim // self.config.n_head
         max_seq_length = find_multiple(max_seq_length, 8)
+        if kv_cache_block_size is not None:
+            if kv_cache_quantization:
+                raise ValueError("kv_cache_quantization is not supported with the paged kv cache (kv_cache_block_size)")
+            max_seq_length = find_multiple(max_seq_length, kv_cache_block_size)
         self.max_seq_length = max_seq_length
         self.max_batch_size = max_batch_size
         dtype = self.output.weight.dtype
@@ -181,12 +372,23 @@ class Transformer(nn.Module):
             self.causal_mask = torch.zeros(1, 1, 1, self.max_seq_length, dtype=torch.bool)
             self.causal_mask[:,:,:,:prompt_length]=1
 
+        self.kv_cache_allocator = None
+        self.bounded_kv_cache_reads = not training and (
+            kv_cache_block_size is not None or bool(kv_cache_quantization and kv_cache_quantized_attention)
+        )
+        if not training and kv_cache_block_size is not None:
+            if kv_cache_num_blocks is None:
+                kv_cache_num_blocks = max_batch_size * max_seq_length // kv_cache_block_size
+            self.kv_cache_allocator = PagedKVCacheAllocator(max_batch_size, max_seq_length, kv_cache_block_size, kv_cache_num_blocks)
+
         if not training:
             for b in self.layers:
-                if kv_cache_quantization:
+                if self.kv_cache_allocator is not None:
+                    b.attention.kv_cache = PagedKVCache(self.kv_cache_allocator, self.config.n_local_heads, head_dim, dtype)
+                elif kv_cache_quantization:
                     with torch.device('meta'):
                         b.attention.kv_cache = KVCache(max_batch_size, max_seq_length, self.config.n_local_heads, head_dim, dtype)
-                    b.attention.kv_cache = AffineQuantizedKVCache.from_float(b.attention.kv_cache)
+                    b.attention.kv_cache = AffineQuantizedKVCache.from_float(b.attention.kv_cache, kv_cache_quantized_attention)
                 else:
                     b.attention.kv_cache = KVCache(max_batch_size, max_seq_length, self.config.n_local_heads, head_dim, dtype)
         self.freqs_cis = precompute_freqs_cis(
@@ -206,17 +408,29 @@ class Transformer(nn.Module):
         self.max_seq_length = -1
         self.freqs_cis: Optional[Tensor] = None
         self.mask_cache: Optional[Tensor] = None
+        self.kv_cache_allocator = None
+        self.bounded_kv_cache_reads = False
 
-    def forward(self, idx: Tensor, input_pos: Optional[Tensor] = None) -> Tensor:
+    def forward(self, idx: Tensor, input_pos: Optional[Tensor] = None, batch_idx: Optional[Tensor] = None, kv_len: Optional[int] = None) -> Tensor:
         """Forward pass of the model.
 
         Args:
             idx  (`torch.LongTensor` of shape `(batch_size, seq_length)`): 
                 Indices of input sequence tokens in the vocabulary.
-            input_pos (`torch.LongTensor` of shape `(batch_size, seq_length)`, *optional*):
+            input_pos (`torch.LongTensor` of shape `(seq_length)` or `(batch_size, seq_length)`, *optional*):
                 Indices of positions of each input sequence tokens in the position embeddings.
                 This argument is optional for training mode but required for
                 inference mode(when model.setup_caches(training=False) is used).
+                A 2d input_pos gives every sequence its own positions, e.g. for batched generation
+                of sequences with different lengths.
+            batch_idx (`torch.LongTensor` of shape `(batch_size)`, *optional*):
+                Rows of the kv cache used by each sequence when input_pos is 2d. Defaults to
+                rows 0..batch_size-1.
+            kv_len (`int`, *optional*):
+                Number of leading kv cache positions attended to, at least input_pos.max() + 1. The paged kv cache
+                only reads the blocks covering them and int8_kv_cache_attention only reads these positions. Defaults to input_pos.max() + 1 in eager mode (one host sync
+                per step) and to the whole cache under torch.compile, where callers should pass it rounded up to a
+                few distinct values (see kv_cache_read_len) to bound the reads without recompiling every step.
 
         Returns:
             Tensor: The output logits tensor.
@@ -227,7 +441,11 @@ class Transformer(nn.Module):
             mask = None
             freqs_cis = self.freqs_cis[:idx.shape[1]]
         else:
-            if not self.linear_causal_mask:
+            if input_pos.dim() == 2:
+                assert not self.linear_causal_mask, "per-sequence input_pos is not supported with linear_causal_mask"
+                # [B, 1, S, max_seq_length], positions past each sequence's own position are masked out
+                mask = self.causal_mask[input_pos].unsqueeze(1)
+            elif not self.linear_causal_mask:
                 mask = self.causal_mask[None, None, input_pos]
             elif len(input_pos)>1 and self.linear_causal_mask: # prefill for linear causal mask
                 mask = torch.tril(torch.ones(len(input_pos), self.max_seq_length, dtype=torch.bool, device=input_pos.device)).unsqueeze(0).unsqueeze(0)
@@ -235,11 +453,13 @@ class Transformer(nn.Module):
                 self.causal_mask[0,0,0,input_pos] = 1
                 mask = self.causal_mask
             freqs_cis = self.freqs_cis[input_pos]
+            if kv_len is None and self.bounded_kv_cache_reads and not torch.compiler.is_compiling():
+                kv_len = int(input_pos.max()) + 1
 
         x = self.tok_embeddings(idx)
 
         for i, layer in enumerate(self.layers):
-            x = layer(x, input_pos, freqs_cis, mask)
+            x = layer(x, input_pos, freqs_cis, mask, batch_idx, kv_len)
         x = self.norm(x)
         logits = self.output(x)
         return logits
@@ -257,8 +477,8 @@ class TransformerBlock(nn.Module):
         self.ffn_norm = RMSNorm(config.dim, config.norm_eps)
         self.attention_norm = RMSNorm(config.dim, config.norm_eps)
 
-    def forward(self, x: Tensor, input_pos: Optional[Tensor], freqs_cis: Tensor, mask: Optional[Tensor]) -> Tensor:
-        h = x + self.attention(self.attention_norm(x), freqs_cis, mask, input_pos)
+    def forward(self, x: Tensor, input_pos: Optional[Tensor], freqs_cis: Tensor, mask: Optional[Tensor], batch_idx: Optional[Tensor] = None, kv_len: Optional[int] = None) -> Tensor:
+        h = x + self.attention(self.attention_norm(x), freqs_cis, mask, input_pos, batch_idx, kv_len)
         out = h + self.feed_forward(self.ffn_norm(h))
         return out
 
@@ -287,7 +507,7 @@ class Attention(nn.Module):
             wv = state_dict.pop(prefix + "wv.weight")
             state_dict[prefix + "wqkv.weight"] = torch.cat([wq, wk, wv])
 
-    def forward(self, x: Tensor, freqs_cis: Tensor, mask: Optional[Tensor], input_pos: Optional[Tensor] = None) -> Tensor:
+    def forward(self, x: Tensor, freqs_cis: Tensor, mask: Optional[Tensor], input_pos: Optional[Tensor] = None, batch_idx: Optional[Tensor] = None, kv_len: Optional[int] = None) -> Tensor:
         bsz, seqlen, _ = x.shape
 
         kv_size = self.n_local_heads * self.head_dim
@@ -302,15 +522,26 @@ class Attention(nn.Module):
 
         q, k, v = map(lambda x: x.transpose(1, 2), (q, k, v))
 
-        if self.kv_cache is not None:
-            k, v = self.kv_cache.update(input_pos, k, v)
-
-        k = k.repeat_interleave(self.n_head // self.n_local_heads, dim=1)
-        v = v.repeat_interleave(self.n_head // self.n_local_heads, dim=1)
-        if mask is not None:
-            y = F.scaled_dot_product_attention(q, k, v, attn_mask=mask, dropout_p=0.0)
+        if getattr(self.kv_cache, "quantized_attention", False):
+            k_int8, k_scale, v_int8, v_scale = self.kv_cache.update_quantized(input_pos, k, v, batch_idx)
+            y = int8_kv_cache_attention(q, k_int8, k_scale, v_int8, v_scale, mask, kv_len)
         else:
-            y = F.scaled_dot_product_attention(q, k, v, dropout_p=0.0, is_causal=True)
+            if isinstance(self.kv_cache, PagedKVCache):
+                k, v = self.kv_cache.update(input_pos, k, v, batch_idx=batch_idx, kv_len=kv_len)
+                if mask is not None:
+                    mask = mask[..., :k.shape[2]]
+            elif self.kv_cache is not None:
+                if batch_idx is not None:
+                    k, v = self.kv_cache.update(input_pos, k, v, batch_idx=batch_idx)
+                else:
+                    k, v = self.kv_cache.update(input_pos, k, v)
+
+            k = k.repeat_interleave(self.n_head // self.n_local_heads, dim=1)
+            v = v.repeat_interleave(self.n_head // self.n_local_heads, dim=1)
+            if mask is not None:
+                y = F.scaled_dot_product_attention(q, k, v, attn_mask=mask, dropout_p=0.0)
+            else:
+                y = F.scaled_dot_product_attention(q, k, v, dropout_p=0.0, is_causal=True)
 
         y = y.transpose(1, 2).contiguous().view(bsz, seqlen, self.dim)
 
@@ -385,7 +616,8 @@ def precompute_freqs_cis(
 
 def apply_rotary_emb(x: Tensor, freqs_cis: Tensor) -> Tensor:
     xshaped = x.float().reshape(*x.shape[:-1], -1, 2)
-    freqs_cis = freqs_cis.view(1, xshaped.size(1), 1, xshaped.size(3), 2)
+    # freqs_cis: [S, D // 2, 2], or [B, S, D // 2, 2] for per-sequence positions
+    freqs_cis = freqs_cis.view(-1, xshaped.size(1), 1, xshaped.size(3), 2)
     x_out2 = torch.stack(
         [
             xshaped[..., 0] * freqs_cis[..., 0] - xshaped[..., 1] * freqs_cis[..., 1],
@@ -119,12 +119,13 @@ from torch.nn.attention import SDPBackend
 from torchao._models.llama.model import Transformer
 from torchao._models.llama.tokenizer import get_tokenizer
 from torchao.profiler import (
+    CPUDeviceSpec,
     CUDADeviceSpec,
     TransformerPerformanceCounter,
     total_model_params,
 )
 
-DEVICE_SPEC: CUDADeviceSpec
+DEVICE_SPEC: Union[CUDADeviceSpec, CPUDeviceSpec]
 PERF_COUNTER: TransformerPerformanceCounter
 PERF_COUNTER_PREFIX = "TransformerPerfCounter"
 GPT_FAST_PREFIX = "GPTFast"
@@ -327,7 +328,10 @@ def main(
     global DEVICE_SPEC
     global PERF_COUNTER
 
-    DEVICE_SPEC = CUDADeviceSpec(dtype=precision)
+    if "cuda" in device:
+        DEVICE_SPEC = CUDADeviceSpec(dtype=precision)
+    else:
+        DEVICE_SPEC = CPUDeviceSpec(dtype=precision)
     PERF_COUNTER = TransformerPerformanceCounter(depth=3, device_spec=DEVICE_SPEC)
     print(DELIMITER)
     print(f"{PERF_COUNTER_PREFIX}")
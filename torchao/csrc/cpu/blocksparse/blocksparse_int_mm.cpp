@@ -0,0 +1,117 @@
+#include <ATen/ATen.h>
+#include <ATen/Parallel.h>
+#include <ATen/core/Tensor.h>
+#include <torch/extension.h>
+
+#include <algorithm>
+
+namespace torchao {
+
+namespace {
+
+// out[rows] = W[rows] @ A for the block rows [row_start, row_end), one dense int8 gemm
+// per block row: the row's blocks side by side against the matching block rows of A
+void blocksparse_int_mm_rows(
+    const int64_t* crow,
+    const int64_t* col,
+    const at::Tensor& col_indices,
+    const at::Tensor& W,
+    const at::Tensor& A_blocks,
+    at::Tensor& out,
+    int64_t bs_m,
+    int64_t bs_k,
+    int64_t row_start,
+    int64_t row_end) {
+  const int64_t N = out.size(1);
+  int64_t max_row_nnz = 0;
+  for (int64_t row = row_start; row < row_end; ++row) {
+    max_row_nnz = std::max(max_row_nnz, crow[row + 1] - crow[row]);
+  }
+  // gather buffer for the activation block rows, reused by every block row of this range
+  at::Tensor A_row = at::empty({max_row_nnz, bs_k * N}, A_blocks.options());
+  for (int64_t row = row_start; row < row_end; ++row) {
+    const int64_t start = crow[row];
+    const int64_t end = crow[row + 1];
+    if (start == end) {
+      continue;
+    }
+    at::Tensor A_gathered;
+    if (col[end - 1] - col[start] == end - start - 1) {
+      // consecutive blocks (column indices are sorted) only need a view
+      A_gathered = A_blocks.narrow(0, col[start], end - start);
+    } else {
+      A_gathered = A_row.narrow(0, 0, end - start);
+      at::index_select_out(A_gathered, A_blocks, 0, col_indices.narrow(0, start, end - start));
+    }
+    at::Tensor out_row = out.narrow(0, row * bs_m, bs_m);
+    at::_int_mm_out(
+        out_row,
+        W.narrow(1, start * bs_k, (end - start) * bs_k),
+        A_gathered.view({(end - start) * bs_k, N}));
+  }
+}
+
+} // namespace
+
+at::Tensor _blocksparse_int_mm(
+    const at::Tensor& crow_indices,
+    const at::Tensor& col_indices,
+    const at::Tensor& values,
+    const at::Tensor& A,
+    int64_t M) {
+  TORCH_CHECK(values.dtype() == at::kChar && A.dtype() == at::kChar, "blocksparse_int_mm expects int8 values and A");
+  TORCH_CHECK(values.dim() == 3, "values should be a 3d (nnz, bs_m, bs_k) tensor, got ", values.dim(), "D");
+  TORCH_CHECK(A.dim() == 2, "A should be a 2d tensor, got ", A.dim(), "D");
+  const int64_t nnz = values.size(0);
+  const int64_t bs_m = values.size(1);
+  const int64_t bs_k = values.size(2);
+  const int64_t K = A.size(0);
+  const int64_t N = A.size(1);
+  at::Tensor out = at::zeros({M, N}, A.options().dtype(at::kInt));
+  if (nnz == 0) {
+    return out;
+  }
+
+  // all blocks side by side, (bs_m, nnz * bs_k), so each block row is a column slice,
+  // this is a view for values laid out with side_by_side_block_values
+  at::Tensor W = values.transpose(0, 1).reshape({bs_m, nnz * bs_k});
+  // row-major copy so the block rows of A are contiguous; this also normalizes
+  // the strides of size 1 dims (e.g. single token decode), which _int_mm mishandles
+  at::Tensor A_blocks = A.clone(at::MemoryFormat::Contiguous).view({K / bs_k, bs_k * N});
+  at::Tensor crow_long = crow_indices.to(at::kLong).contiguous();
+  at::Tensor col_long = col_indices.to(at::kLong).contiguous();
+  const int64_t* crow = crow_long.data_ptr<int64_t>();
+  const int64_t* col = col_long.data_ptr<int64_t>();
+  const int64_t num_block_rows = crow_long.numel() - 1;
+
+  // contiguous block row ranges with roughly equal numbers of nonzero blocks, one per thread.
+  // Inside at::parallel_for the gemms run single threaded, so there are at most
+  // get_num_threads() busy threads
+  const int64_t num_chunks = std::min<int64_t>(at::get_num_threads(), num_block_rows);
+  auto chunk_bound = [&](int64_t chunk) {
+    if (chunk == num_chunks) {
+      return num_block_rows;
+    }
+    const int64_t target = (nnz * chunk + num_chunks - 1) / num_chunks;
+    return static_cast<int64_t>(std::lower_bound(crow, crow + num_block_rows, target) - crow);
+  };
+  auto run_chunks = [&](int64_t chunk_begin, int64_t chunk_end) {
+    for (int64_t chunk = chunk_begin; chunk < chunk_end; ++chunk) {
+      blocksparse_int_mm_rows(
+          crow, col, col_long, W, A_blocks, out, bs_m, bs_k, chunk_bound(chunk), chunk_bound(chunk + 1));
+    }
+  };
+  if (num_chunks <= 1) {
+    // a single range keeps the intra-op parallelism of the gemms
+    run_chunks(0, num_chunks);
+  } else {
+    at::parallel_for(0, num_chunks, 1, run_chunks);
+  }
+  return out;
+}
+
+TORCH_LIBRARY_IMPL(torchao, CPU, m) {
+  m.impl("torchao::blocksparse_int_mm", &_blocksparse_int_mm);
+}
+
+} // namespace torchao
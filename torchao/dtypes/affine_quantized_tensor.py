@@ -118,6 +118,29 @@ def deregister_aqt_quantized_linear_dispatch(dispatch_condition):
     else:
         logger.warn(f"Attempting to remove non-existant dispatch condition {dispatch_condition}")
 
+def _get_hqq_problem(
+    input_float: torch.Tensor,
+    mapping_type: MappingType,
+    block_size: Tuple[int, ...],
+    quant_min: Optional[int],
+    quant_max: Optional[int],
+    zero_point_dtype: Optional[torch.dtype],
+    zero_point_domain: Optional[ZeroPointDomain],
+    layout_type: LayoutType,
+) -> Tuple[torch.Tensor, dict]:
+    """Returns the tensor and the keyword arguments that `AffineQuantizedTensor.from_hp_to_intx(..., use_hqq=True)`
+    passes to `choose_qparams_and_quantize_affine_hqq`
+    """
+    assert zero_point_domain == ZeroPointDomain.FLOAT and mapping_type == MappingType.ASYMMETRIC and quant_min==0, "Invalid input parameters for HQQ quantization."
+    input_float = layout_type.pre_process(input_float)
+    nbits = int(math.log2(quant_max + 1))
+    axis  = 1 if (block_size[0]==1) else 0
+    group_size = max(block_size)
+    compute_dtype = zero_point_dtype if (zero_point_dtype is not None) else input_float.dtype
+    device = input_float.device
+    return input_float, dict(nbits=nbits, group_size=group_size, axis=axis, compute_dtype=compute_dtype, device=device, verbose=False, raw_output=False)
+
+
 class AffineQuantizedTensor(TorchAOBaseTensor):
     """
     Affine quantized tensor subclass. Affine quantization means we quantize the floating point tensor with an affine transformation:
@@ -267,20 +290,21 @@ class AffineQuantizedTensor(TorchAOBaseTensor):
         zero_point_domain: Optional[ZeroPointDomain] = ZeroPointDomain.INT,
         layout_type: LayoutType = PlainLayoutType(),
         use_hqq: bool = False,
+        hqq_qparams: Optional[Tuple] = None,
     ):
+        """`hqq_qparams`: the `(W_q, scale, zero, shape)` HQQ result for `input_float` when it was already solved,
+        e.g. together with other weights by `choose_qparams_and_quantize_affine_hqq_batched`, used with `use_hqq`
+        """
         original_shape = input_float.shape
-        input_float = layout_type.pre_process(input_float)
-
         if use_hqq:
-            assert zero_point_domain == ZeroPointDomain.FLOAT and mapping_type == MappingType.ASYMMETRIC and quant_min==0, "Invalid input parameters for HQQ quantization."
-            nbits = int(math.log2(quant_max + 1))
-            axis  = 1 if (block_size[0]==1) else 0
-            group_size = max(block_size)
-            compute_dtype = zero_point_dtype if (zero_point_dtype is not None) else input_float.dtype
-            device = input_float.device
-            data, scale, zero_point, _ = choose_qparams_and_quantize_affine_hqq(input_float, nbits=nbits, group_size=group_size, axis=axis, compute_dtype=compute_dtype, device=device, verbose=False, raw_output=False)
+            input_float, hqq_kwargs = _get_hqq_problem(input_float, mapping_type, block_size, quant_min, quant_max, zero_point_dtype, zero_point_domain, layout_type)
+            if hqq_qparams is None:
+                hqq_qparams = choose_qparams_and_quantize_affine_hqq(input_float, **hqq_kwargs)
+            data, scale, zero_point, shape = hqq_qparams
+            assert shape == input_float.shape, f"hqq_qparams are for shape {shape}, expected {input_float.shape}"
             data = data.to(target_dtype)
         else:
+            input_float = layout_type.pre_process(input_float)
             scale, zero_point = choose_qparams_affine(input_float, mapping_type, block_size, target_dtype, quant_min, quant_max, eps, scale_dtype, zero_point_dtype, preserve_zero, zero_point_domain)
             # choose_qparams_affine is a custom op that does support returning optional Tensors. We thus set the zero_point to None if its domain is None
             if zero_point_domain is None:
@@ -658,6 +682,10 @@ class PlainAQTLayout(AQTLayout):
     def get_plain(self) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         return self.int_data, self.scale, self.zero_point
 
+    def get_plain_rows(self, indices: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        """Same as get_plain but only for the rows at (1d) indices, requires row wise (or finer) quantization"""
+        return self.int_data[indices], self.scale[indices], self.zero_point[indices]
+
     def get_layout_type(self) -> LayoutType:
         return self.layout_type
 
@@ -795,11 +823,18 @@ class BlockSparseAQTLayout(PlainAQTLayout):
     @classmethod
     def from_plain(cls, int_data, scale, zero_point, layout_type):
         bsr_tensor = int_data.to_sparse_bsr(layout_type.blocksize)
+        bsr_values = bsr_tensor.values()
+        if bsr_values.device.type == "cpu":
+            from torchao.sparsity.prototype.superblock.blocksparse import side_by_side_block_values
+
+            # store the blocks side by side, the layout the cpu int_addmm kernel multiplies with,
+            # so it isn't copied on every call
+            bsr_values = side_by_side_block_values(bsr_values)
         return cls(
             shape=int_data.shape,
             bsr_crow_indices=bsr_tensor.crow_indices(),
             bsr_col_indices=bsr_tensor.col_indices(),
-            bsr_values=bsr_tensor.values(),
+            bsr_values=bsr_values,
             scale=scale,
             zero_point=zero_point,
             layout_type = layout_type,
@@ -1419,7 +1454,7 @@ def _linear_int8_act_int8_weight_block_sparse_check(input_tensor, weight_tensor,
         isinstance(input_tensor, AffineQuantizedTensor) and
         _aqt_is_int8_reduced_range(input_tensor) and
         isinstance(weight_tensor, AffineQuantizedTensor) and
-        weight_tensor.is_cuda and
+        (weight_tensor.is_cuda or weight_tensor.device.type == "cpu") and
         input_tensor.dtype == weight_tensor.dtype and
         isinstance(input_tensor.layout_type, PlainLayoutType) and
         isinstance(weight_tensor.layout_type, BlockSparseLayoutType)
@@ -1814,6 +1849,35 @@ def _(func, types, args, kwargs):
             weight_tensor = weight_tensor.dequantize()
         return func(input_tensor, weight_tensor)
 
+@implements([torch.nn.functional.embedding, aten.embedding.default])
+def _(func, types, args, kwargs):
+    if func is torch.nn.functional.embedding:
+        input_tensor, weight_tensor = args[0], args[1]
+        max_norm = args[3] if len(args) > 3 else kwargs.get("max_norm", None)
+        if max_norm is not None:
+            raise NotImplementedError(f"{func} with max_norm is not implemented for AffineQuantizedTensor weight")
+    else:
+        weight_tensor, input_tensor = args[0], args[1]
+
+    from torchao.dtypes.uintx.uintx import UintxLayoutType
+    if weight_tensor.block_size[0] != 1 or not isinstance(weight_tensor.layout_type, (PlainLayoutType, UintxLayoutType)):
+        return torch.nn.functional.embedding(input_tensor, weight_tensor.dequantize())
+
+    # gather the requested rows of the (packed) quantized table and only dequantize those
+    data, scale, zero_point = weight_tensor.layout_tensor.get_plain_rows(input_tensor.reshape(-1))
+    dq = dequantize_affine(
+        data,
+        weight_tensor.block_size,
+        scale,
+        zero_point,
+        data.dtype,
+        weight_tensor.quant_min,
+        weight_tensor.quant_max,
+        weight_tensor.zero_point_domain,
+        output_dtype=weight_tensor.dtype,
+    )
+    return dq.view(*input_tensor.shape, weight_tensor.shape[1])
+
 @implements(aten.detach.default)
 def _(func, types, args, kwargs):
     return return_and_correct_aliasing(
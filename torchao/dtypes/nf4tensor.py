@@ -10,6 +10,8 @@ import torch.nn.functional as F
 from torch._prims_common import make_contiguous_strides_for
 from torch.distributed.device_mesh import DeviceMesh
 
+from torchao.utils import TORCH_VERSION_AT_LEAST_2_5
+
 aten = torch.ops.aten
 
 c10d_functional = torch.ops.c10d_functional
@@ -706,7 +708,7 @@ class NF4Tensor(torch.Tensor):
         for chunk_num in range(math.ceil(numel / CHUNK_SIZE)):
             start = chunk_num * CHUNK_SIZE
             end = min(start + CHUNK_SIZE, numel)
-            quantized_blocks[start:end] = NF4Tensor.quantize_tensor_nearest(
+            quantized_blocks[start:end] = NF4Tensor.quantize_tensor_nearest_bucketize(
                 flattened[start:end], nf4
             ).to(torch.uint8)
 
@@ -720,31 +722,20 @@ class NF4Tensor(torch.Tensor):
 
     def get_original_weight(self) -> torch.Tensor:
         """Get the original weight from the normalized float weight format"""
-        # Since we are using uint8 we will decode 2 entries per byte
-        # Shift elements down 4 and select out the bottom 4 bits
-        first_elements = (self.quantized_data >> 4).to(torch.long)
-        second_elements = (self.quantized_data & 0b1111).to(torch.long)
-
-        # Dequantize every element
-        dequantized_first = self.dequantize(first_elements, self.nf4)
-        dequantized_second = self.dequantize(second_elements, self.nf4)
-
-        # Build up matrix of scalers repeated for each element in the block
-        # Since first and second elements make up a full block
-        # we expand out to half the size of the full block
+        # Each uint8 holds 2 consecutive entries, looking the byte up in a table of all 256 pairs of nf4
+        # values decodes both of them already interleaved: pairs[byte] = (nf4[byte >> 4], nf4[byte & 0b1111])
+        pairs = torch.stack(
+            [self.nf4.repeat_interleave(16), self.nf4.repeat(16)], dim=-1
+        )
+        dequantized = pairs[self.quantized_data.to(torch.long)].view(
+            self.n_blocks, self.block_size
+        )
+
+        # Scale each block by its dequantized scaler
         scalers = self.dequantize_scalers(
             self.quantized_scalers, self.quantization_factor, self.scaler_block_size
         )
-        repeated = scalers.unsqueeze(-1).expand(scalers.size(0), self.block_size // 2)
-
-        scaled_first = dequantized_first * repeated.flatten()
-        scaled_second = dequantized_second * repeated.flatten()
-
-        # Flip them to be vertical and them stack them together horizontally
-        # Upon flattening this will interleave the elements
-        scaled_first = scaled_first.unsqueeze(-1).transpose(0, 1)
-        scaled_second = scaled_second.unsqueeze(-1).transpose(0, 1)
-        return torch.stack([scaled_first, scaled_second], dim=-1).reshape(self.shape)
+        return (dequantized * scalers.unsqueeze(-1)).reshape(self.shape)
 
     @staticmethod
     def quantize_tensor_nearest(value: torch.Tensor, nf4: torch.Tensor) -> torch.Tensor:
@@ -755,6 +746,22 @@ class NF4Tensor(torch.Tensor):
         closest_nf4 = diff.min(dim=-1).indices
         return closest_nf4
 
+    @staticmethod
+    def quantize_tensor_nearest_bucketize(
+        value: torch.Tensor, nf4: torch.Tensor
+    ) -> torch.Tensor:
+        """Same result as quantize_tensor_nearest without the (numel, 16) distance tensor
+
+        nf4 is sorted, so bucketize finds the two nf4 values around each value and the nearest of the two
+        is picked with the same distance computation as quantize_tensor_nearest (ties go to the lower index,
+        like min), which keeps the result bit-exact.
+        """
+        # index of the first nf4 value >= value, clamped so that both neighbours exist
+        upper = torch.bucketize(value, nf4).clamp_(1, nf4.numel() - 1)
+        lower = upper - 1
+        pick_lower = (value - nf4[lower]).abs() <= (value - nf4[upper]).abs()
+        return torch.where(pick_lower, lower, upper)
+
     @staticmethod
     def dequantize(value: torch.Tensor, nf4: torch.Tensor) -> torch.Tensor:
         """Dequantize a nf4 value to bfloat16 format"""
@@ -1023,3 +1030,8 @@ def nf4_constructor(
         quantized_data,
         nf4,
     )
+
+
+if TORCH_VERSION_AT_LEAST_2_5:
+    # Allow a model with NF4Tensor weights to be loaded with `weights_only=True`
+    torch.serialization.add_safe_globals([NF4Tensor])
@@ -2,14 +2,20 @@ from typing import Tuple, List
 from dataclasses import dataclass
 import torch
 
-from torch.utils._python_dispatch import return_and_correct_aliasing
-from .bitpacking import pack, unpack
+from torch.utils._python_dispatch import return_and_correct_aliasing, is_traceable_wrapper_subclass
+from .bitpacking import pack, unpack, numbits, shifts
 from torchao.dtypes.utils import (
     LayoutType,
 )
 from torchao.utils import TorchAOBaseTensor
-from torchao.dtypes.affine_quantized_tensor import PlainAQTLayout, register_layout_cls
-from torchao.utils import TORCH_VERSION_AT_LEAST_2_3
+from torchao.dtypes.affine_quantized_tensor import (
+    AffineQuantizedTensor,
+    PlainAQTLayout,
+    register_aqt_quantized_linear_dispatch,
+    register_layout_cls,
+)
+from torchao.quantization.quant_primitives import ZeroPointDomain
+from torchao.utils import TORCH_VERSION_AT_LEAST_2_3, TORCH_VERSION_AT_LEAST_2_5
 
 aten = torch.ops.aten
 
@@ -194,12 +200,30 @@ class UintxLayoutType(LayoutType):
     def post_process(self, input: torch.Tensor) -> torch.Tensor:
         return to_uintx(input, self.dtype, self.pack_dim)
 
+    # torch.uint1 - torch.uint7 are not allowed globals for `weights_only=True` loading,
+    # so the layout is pickled with the bit width instead of the dtype
+    def __getstate__(self):
+        return {"bit_width": _DTYPE_TO_BIT_WIDTH[self.dtype], "pack_dim": self.pack_dim}
+
+    def __setstate__(self, state):
+        object.__setattr__(self, "dtype", _BIT_WIDTH_TO_DTYPE[state["bit_width"]])
+        object.__setattr__(self, "pack_dim", state["pack_dim"])
+
 @register_layout_cls(UintxLayoutType)
 class UintxAQTLayout(PlainAQTLayout):
 
     def get_plain(self) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         return self.int_data.get_plain(), self.scale, self.zero_point
 
+    def get_plain_rows(self, indices: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
+        # rows are packed independently when packing along the last dim, so only the requested rows are unpacked
+        if self.int_data.pack_dim not in (-1, self.int_data.ndim - 1):
+            int_data = self.int_data.get_plain()[indices]
+        else:
+            shards = [shard[indices] for shard in self.int_data.get_shards()]
+            int_data = unpack(shards, self.int_data.bit_width, dim=-1)
+        return int_data, self.scale[indices], self.zero_point[indices]
+
     @classmethod
     def from_plain(
         cls,
@@ -210,3 +234,83 @@ class UintxAQTLayout(PlainAQTLayout):
     ):
         assert isinstance(layout_type, UintxLayoutType)
         return cls(int_data, scale, zero_point, layout_type)
+
+
+def _uintx_linear_tile_size(in_features: int, group_size: int):
+    # `pack` splits the packed dim into 8 // nbits slices per shard, so a tile of in_features // 8 columns is
+    # always within a single slice of every shard. Tiles also have to line up with the quantization groups, and
+    # cover all the columns
+    if in_features % 8 != 0:
+        return None
+    tile_size = in_features // 8
+    if tile_size % group_size == 0 or group_size % tile_size == 0:
+        return tile_size
+    return None
+
+def _unpack_uintx_tile(shards: List[torch.Tensor], bit_width: int, tile: int, tile_size: int) -> torch.Tensor:
+    # unpacks the columns [tile * tile_size, (tile + 1) * tile_size) of data packed with `pack` along the last dim
+    int_data = None
+    for shard, nbits, shift in zip(shards, numbits[bit_width], shifts[bit_width]):
+        # the shard packs the slice `slot` of nbits * tile_size columns at bit offset nbits * slot
+        slot, offset = divmod(tile, nbits)
+        data = shard[:, offset * tile_size:(offset + 1) * tile_size]
+        data = ((data >> (nbits * slot)) & ((1 << nbits) - 1)) << shift
+        int_data = data if int_data is None else int_data | data
+    return int_data
+
+def _linear_fp_act_uintx_weight_check(input_tensor, weight_tensor, bias):
+    return (
+        # input is native float tensor on cpu
+        not is_traceable_wrapper_subclass(input_tensor) and
+        input_tensor.is_floating_point() and
+        input_tensor.device.type == "cpu" and
+        # weight is groupwise quantized affine quantized tensor packed along the input features
+        isinstance(weight_tensor, AffineQuantizedTensor) and
+        isinstance(weight_tensor.layout_type, UintxLayoutType) and
+        len(weight_tensor.shape) == 2 and
+        len(weight_tensor.block_size) == 2 and
+        weight_tensor.block_size[0] == 1 and
+        weight_tensor.zero_point_domain == ZeroPointDomain.INT and
+        weight_tensor.layout_tensor.int_data.pack_dim in (-1, 1) and
+        _uintx_linear_tile_size(weight_tensor.shape[1], weight_tensor.block_size[1]) is not None
+    )
+
+def _linear_fp_act_uintx_weight_impl(input_tensor, weight_tensor, bias):
+    # unpacks and dequantizes the weight one tile of input features at a time and accumulates the partial
+    # products, so only in_features // 8 columns of the weight are in float at any time instead of all of them
+    layout_tensor = weight_tensor.layout_tensor
+    int_data = layout_tensor.int_data
+    out_features, in_features = weight_tensor.shape
+    group_size = weight_tensor.block_size[1]
+    tile_size = _uintx_linear_tile_size(in_features, group_size)
+    shards = int_data.get_shards()
+    scale = layout_tensor.scale.reshape(out_features, -1)
+    zero_point = layout_tensor.zero_point
+    if zero_point is not None:
+        zero_point = zero_point.reshape(out_features, -1)
+
+    # float32 accumulation, cpu matmuls in float16 / bfloat16 are slower and don't round the partial sums
+    x = input_tensor.reshape(-1, in_features).float()
+    y = torch.zeros(x.shape[0], out_features, dtype=torch.float32, device=x.device)
+    tile_group_size = min(group_size, tile_size)
+    for tile in range(8):
+        start = tile * tile_size
+        groups = slice(start // group_size, start // group_size + max(tile_size // group_size, 1))
+        # same as `dequantize_affine` for the integer zero point domain, in place on the tile
+        w = _unpack_uintx_tile(shards, int_data.bit_width, tile, tile_size).view(out_features, -1, tile_group_size).float()
+        if zero_point is not None:
+            w.sub_(zero_point[:, groups, None])
+        w = w.mul_(scale[:, groups, None]).view(out_features, tile_size)
+        y.addmm_(x[:, start:start + tile_size], w.t())
+
+    y = y.reshape(*input_tensor.shape[:-1], out_features).to(input_tensor.dtype)
+    if bias is not None:
+        y += bias
+    return y
+
+register_aqt_quantized_linear_dispatch(_linear_fp_act_uintx_weight_check, _linear_fp_act_uintx_weight_impl)
+
+
+if TORCH_VERSION_AT_LEAST_2_5:
+    # Allow a model with UintxAQTLayout weights to be loaded with `weights_only=True`
+    torch.serialization.add_safe_globals([UintxTensor, UintxLayoutType])
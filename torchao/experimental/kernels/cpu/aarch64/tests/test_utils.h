@@ -6,16 +6,32 @@
 
 #pragma once
 
-#if defined(__aarch64__) || defined(__ARM_NEON)
+#if defined(__aarch64__) || defined(__ARM_NEON) || \
+    (defined(__x86_64__) && defined(__AVX2__))
 
+#if defined(__aarch64__) || defined(__ARM_NEON)
 #include <torchao/experimental/kernels/cpu/aarch64/quantization/quantize.h>
 #include <torchao/experimental/kernels/cpu/aarch64/reduction/reduction.h>
+#else
+#include <torchao/experimental/kernels/cpu/x86/quantization/quantize.h>
+#include <torchao/experimental/kernels/cpu/x86/reduction/reduction.h>
+#endif
+#include <algorithm>
 #include <cassert>
 #include <functional>
 #include <random>
 #include <vector>
 
 namespace torchao {
+
+// Test cases are quantized with the same routines the kernels use for dynamic
+// activation quantization on the target architecture
+#if defined(__aarch64__) || defined(__ARM_NEON)
+namespace arch_kernels = torchao::kernels::cpu::aarch64;
+#else
+namespace arch_kernels = torchao::kernels::cpu::x86;
+#endif
+
 inline std::vector<float>
 get_random_vector(int size, float min = -1.0, float max = 1.0) {
   assert(min < max);
@@ -111,16 +127,16 @@ struct channelwise_8bit_activation_groupwise_lowbit_weight_test_case {
         weight_zeros(weight_zeros_),
         bias(bias_) {
     assert(k % weight_group_size == 0);
-    assert(expected_output.size() == m * n);
-    assert(activations.size() == m * k);
-    assert(activation_qvals.size() == m * k);
-    assert(activation_scales.size() == m);
-    assert(activation_zeros.size() == m);
-    assert(weights.size() == n * k);
-    assert(weight_qvals.size() == n * k);
-    assert((weight_group_size * weight_scales.size()) == (n * k));
-    assert((weight_group_size * weight_zeros.size()) == (n * k));
-    assert(bias.size() == m);
+    assert(expected_output.size() == (size_t) m * n);
+    assert(activations.size() == (size_t) m * k);
+    assert(activation_qvals.size() == (size_t) m * k);
+    assert(activation_scales.size() == (size_t) m);
+    assert(activation_zeros.size() == (size_t) m);
+    assert(weights.size() == (size_t) n * k);
+    assert(weight_qvals.size() == (size_t) n * k);
+    assert((weight_group_size * weight_scales.size()) == (size_t)(n * k));
+    assert((weight_group_size * weight_zeros.size()) == (size_t)(n * k));
+    assert(bias.size() == (size_t) m);
 
     if (has_clamp) {
       assert(clamp_min < clamp_max);
@@ -146,20 +162,20 @@ struct channelwise_8bit_activation_groupwise_lowbit_weight_test_case {
     auto activation_zeros = std::vector<int8_t>(m, 0);
 
     // Quantize activations with 8-bit asymmetric
-    // TODO: replace with generic function that does not use aarch64
+    // TODO: replace with generic function that does not use arch-specific
     // quantize method after we combine with torchao
     int qmin, qmax, zero;
     float vmin, vmax, scale;
     torchao::quantization::get_qvals_range(
         qmin, qmax, /*nbit=*/8, /*is_symmetric=*/false);
     for (int m_idx = 0; m_idx < m; m_idx++) {
-      torchao::kernels::cpu::aarch64::reduction::find_min_and_max(
+      arch_kernels::reduction::find_min_and_max(
           vmin, vmax, /*vals=*/activations.data() + m_idx * k, /*size=*/k);
       torchao::quantization::get_scale_and_zero(
           scale, zero, vmin, vmax, qmin, qmax);
       activation_scales[m_idx] = scale;
       activation_zeros[m_idx] = zero;
-      torchao::kernels::cpu::aarch64::quantization::quantize(
+      arch_kernels::quantization::quantize(
           /*qvals=*/activation_qvals.data() + m_idx * k,
           /*vals=*/activations.data() + m_idx * k,
           /*size=*/k,
@@ -178,14 +194,14 @@ struct channelwise_8bit_activation_groupwise_lowbit_weight_test_case {
     auto weight_zeros = std::vector<int8_t>(n_weight_groups, 0);
 
     // Quantize weights with weight_nbit
-    // TODO: replace with generic function that does not use aarch64
+    // TODO: replace with generic function that does not use arch-specific
     // quantize method after we combine with torchao
     torchao::quantization::get_qvals_range(
         qmin, qmax, /*nbit=*/weight_nbit, /*is_symmetric=*/false);
 
     int n_groups = (n * k) / weight_group_size;
     for (int group_idx = 0; group_idx < n_groups; group_idx += 1) {
-      torchao::kernels::cpu::aarch64::reduction::find_min_and_max(
+      arch_kernels::reduction::find_min_and_max(
           vmin,
           vmax,
           /*vals=*/weights.data() + group_idx * weight_group_size,
@@ -201,7 +217,7 @@ struct channelwise_8bit_activation_groupwise_lowbit_weight_test_case {
       weight_scales[group_idx] = scale;
       weight_zeros[group_idx] = zero;
 
-      torchao::kernels::cpu::aarch64::quantization::quantize(
+      arch_kernels::quantization::quantize(
           /*qvals=*/weight_qvals.data() + group_idx * weight_group_size,
           /*vals=*/weights.data() + group_idx * weight_group_size,
           /*size=*/weight_group_size,
@@ -276,4 +292,4 @@ struct channelwise_8bit_activation_groupwise_lowbit_weight_test_case {
 
 } // namespace torchao
 
-#endif // defined(__aarch64__) || defined(__ARM_NEON)
+#endif // defined(__aarch64__) || defined(__ARM_NEON) || defined(__AVX2__)
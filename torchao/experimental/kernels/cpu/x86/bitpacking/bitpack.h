@@ -0,0 +1,277 @@
+// Copyright (c) Meta Platforms, Inc. and affiliates.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#pragma once
+
+#if defined(__x86_64__) && defined(__AVX2__)
+
+#include <immintrin.h>
+#include <stdint.h>
+
+#ifndef TORCHAO_ALWAYS_INLINE
+#define TORCHAO_ALWAYS_INLINE __attribute__((always_inline))
+#endif
+
+// Bitpacking for AVX2.
+//
+// 128 lowbit values are held in four 256-bit registers.  Rather than packing
+// consecutive values into consecutive bits (which needs lane-crossing shuffles
+// to undo on x86), a value of weight_nbit bits is split into 4-bit, 2-bit and
+// 1-bit pieces, and each piece is packed "vertically": piece i of byte b of
+// every register is stored in the same packed byte b.  Unpacking is then only
+// byte-wise shifts, masks, and ors, with no shuffles.
+//
+//   nbit | pieces (low bits first)  | packed bytes
+//   -----+--------------------------+-------------
+//     1  | 1                        | 16
+//     2  | 2                        | 32
+//     3  | 2, 1                     | 48
+//     4  | 4                        | 64
+//     5  | 4, 1                     | 80
+//     6  | 4, 2                     | 96
+//
+// Like aarch64/bitpacking/bitpack.h, values are passed to vec_pack as signed
+// int8 in [-2^(nbit-1), 2^(nbit-1)) and shifted to the nonnegative range
+// before packing.  Unlike aarch64, vec_unpack returns the shifted,
+// nonnegative values in [0, 2^nbit), which is what the unsigned operand of
+// _mm256_maddubs_epi16 / _mm256_dpbusd_epi32 expects.  Callers account for the
+// shift of 2^(nbit-1) themselves.
+namespace torchao {
+namespace bitpacking {
+
+namespace internal {
+
+// x is a byte in [0, 256); bits [offset, offset + piece_nbit) are extracted.
+// _mm256_srli_epi16 shifts bits of the neighboring byte into the top of each
+// byte, but they are cleared by the mask as long as offset + piece_nbit <= 8.
+template <int offset, int piece_nbit>
+TORCHAO_ALWAYS_INLINE inline __m256i vec_extract_bits(const __m256i& x) {
+  static_assert(offset + piece_nbit <= 8);
+  const __m256i mask = _mm256_set1_epi8((1 << piece_nbit) - 1);
+  return _mm256_and_si256(_mm256_srli_epi16(x, offset), mask);
+}
+
+// x is a byte in [0, 2^piece_nbit); it is shifted to bits
+// [offset, offset + piece_nbit).  No bits cross into the neighboring byte
+// as long as offset + piece_nbit <= 8.
+template <int offset, int piece_nbit>
+TORCHAO_ALWAYS_INLINE inline __m256i vec_insert_bits(const __m256i& x) {
+  static_assert(offset + piece_nbit <= 8);
+  return _mm256_slli_epi16(x, offset);
+}
+
+template <int offset>
+TORCHAO_ALWAYS_INLINE inline void vec_pack_128_uint4_pieces(
+    uint8_t* packed,
+    const __m256i& unpacked0,
+    const __m256i& unpacked1,
+    const __m256i& unpacked2,
+    const __m256i& unpacked3) {
+  __m256i packed0 = _mm256_or_si256(
+      vec_extract_bits<offset, 4>(unpacked0),
+      vec_insert_bits<4, 4>(vec_extract_bits<offset, 4>(unpacked1)));
+  __m256i packed1 = _mm256_or_si256(
+      vec_extract_bits<offset, 4>(unpacked2),
+      vec_insert_bits<4, 4>(vec_extract_bits<offset, 4>(unpacked3)));
+  _mm256_storeu_si256((__m256i*)packed, packed0);
+  _mm256_storeu_si256((__m256i*)(packed + 32), packed1);
+}
+
+template <int offset>
+TORCHAO_ALWAYS_INLINE inline void vec_unpack_128_uint4_pieces(
+    __m256i& unpacked0,
+    __m256i& unpacked1,
+    __m256i& unpacked2,
+    __m256i& unpacked3,
+    const uint8_t* packed) {
+  __m256i packed0 = _mm256_loadu_si256((const __m256i*)packed);
+  __m256i packed1 = _mm256_loadu_si256((const __m256i*)(packed + 32));
+  unpacked0 = _mm256_or_si256(
+      unpacked0, vec_insert_bits<offset, 4>(vec_extract_bits<0, 4>(packed0)));
+  unpacked1 = _mm256_or_si256(
+      unpacked1, vec_insert_bits<offset, 4>(vec_extract_bits<4, 4>(packed0)));
+  unpacked2 = _mm256_or_si256(
+      unpacked2, vec_insert_bits<offset, 4>(vec_extract_bits<0, 4>(packed1)));
+  unpacked3 = _mm256_or_si256(
+      unpacked3, vec_insert_bits<offset, 4>(vec_extract_bits<4, 4>(packed1)));
+}
+
+template <int offset>
+TORCHAO_ALWAYS_INLINE inline void vec_pack_128_uint2_pieces(
+    uint8_t* packed,
+    const __m256i& unpacked0,
+    const __m256i& unpacked1,
+    const __m256i& unpacked2,
+    const __m256i& unpacked3) {
+  __m256i packed0 = _mm256_or_si256(
+      _mm256_or_si256(
+          vec_extract_bits<offset, 2>(unpacked0),
+          vec_insert_bits<2, 2>(vec_extract_bits<offset, 2>(unpacked1))),
+      _mm256_or_si256(
+          vec_insert_bits<4, 2>(vec_extract_bits<offset, 2>(unpacked2)),
+          vec_insert_bits<6, 2>(vec_extract_bits<offset, 2>(unpacked3))));
+  _mm256_storeu_si256((__m256i*)packed, packed0);
+}
+
+template <int offset>
+TORCHAO_ALWAYS_INLINE inline void vec_unpack_128_uint2_pieces(
+    __m256i& unpacked0,
+    __m256i& unpacked1,
+    __m256i& unpacked2,
+    __m256i& unpacked3,
+    const uint8_t* packed) {
+  __m256i packed0 = _mm256_loadu_si256((const __m256i*)packed);
+  unpacked0 = _mm256_or_si256(
+      unpacked0, vec_insert_bits<offset, 2>(vec_extract_bits<0, 2>(packed0)));
+  unpacked1 = _mm256_or_si256(
+      unpacked1, vec_insert_bits<offset, 2>(vec_extract_bits<2, 2>(packed0)));
+  unpacked2 = _mm256_or_si256(
+      unpacked2, vec_insert_bits<offset, 2>(vec_extract_bits<4, 2>(packed0)));
+  unpacked3 = _mm256_or_si256(
+      unpacked3, vec_insert_bits<offset, 2>(vec_extract_bits<6, 2>(packed0)));
+}
+
+// 1-bit pieces of the four registers only fill the low nibble of 32 bytes, so
+// the high 128-bit lane is folded into the high nibble of the low lane.
+template <int offset>
+TORCHAO_ALWAYS_INLINE inline void vec_pack_128_uint1_pieces(
+    uint8_t* packed,
+    const __m256i& unpacked0,
+    const __m256i& unpacked1,
+    const __m256i& unpacked2,
+    const __m256i& unpacked3) {
+  __m256i packed0 = _mm256_or_si256(
+      _mm256_or_si256(
+          vec_extract_bits<offset, 1>(unpacked0),
+          vec_insert_bits<1, 1>(vec_extract_bits<offset, 1>(unpacked1))),
+      _mm256_or_si256(
+          vec_insert_bits<2, 1>(vec_extract_bits<offset, 1>(unpacked2)),
+          vec_insert_bits<3, 1>(vec_extract_bits<offset, 1>(unpacked3))));
+  __m128i folded = _mm_or_si128(
+      _mm256_castsi256_si128(packed0),
+      _mm_slli_epi16(_mm256_extracti128_si256(packed0, 1), 4));
+  _mm_storeu_si128((__m128i*)packed, folded);
+}
+
+template <int offset>
+TORCHAO_ALWAYS_INLINE inline void vec_unpack_128_uint1_pieces(
+    __m256i& unpacked0,
+    __m256i& unpacked1,
+    __m256i& unpacked2,
+    __m256i& unpacked3,
+    const uint8_t* packed) {
+  __m128i folded = _mm_loadu_si128((const __m128i*)packed);
+  __m256i packed0 = _mm256_set_m128i(
+      _mm_and_si128(_mm_srli_epi16(folded, 4), _mm_set1_epi8(0x0F)),
+      _mm_and_si128(folded, _mm_set1_epi8(0x0F)));
+  unpacked0 = _mm256_or_si256(
+      unpacked0, vec_insert_bits<offset, 1>(vec_extract_bits<0, 1>(packed0)));
+  unpacked1 = _mm256_or_si256(
+      unpacked1, vec_insert_bits<offset, 1>(vec_extract_bits<1, 1>(packed0)));
+  unpacked2 = _mm256_or_si256(
+      unpacked2, vec_insert_bits<offset, 1>(vec_extract_bits<2, 1>(packed0)));
+  unpacked3 = _mm256_or_si256(
+      unpacked3, vec_insert_bits<offset, 1>(vec_extract_bits<3, 1>(packed0)));
+}
+
+// Packs bits [offset, nbit) of the unpacked values, largest pieces first
+template <int nbit, int offset>
+TORCHAO_ALWAYS_INLINE inline void vec_pack_128_uint_pieces(
+    uint8_t* packed,
+    const __m256i& unpacked0,
+    const __m256i& unpacked1,
+    const __m256i& unpacked2,
+    const __m256i& unpacked3) {
+  constexpr int remaining = nbit - offset;
+  if constexpr (remaining >= 4) {
+    vec_pack_128_uint4_pieces<offset>(
+        packed, unpacked0, unpacked1, unpacked2, unpacked3);
+    vec_pack_128_uint_pieces<nbit, offset + 4>(
+        packed + 64, unpacked0, unpacked1, unpacked2, unpacked3);
+  } else if constexpr (remaining >= 2) {
+    vec_pack_128_uint2_pieces<offset>(
+        packed, unpacked0, unpacked1, unpacked2, unpacked3);
+    vec_pack_128_uint_pieces<nbit, offset + 2>(
+        packed + 32, unpacked0, unpacked1, unpacked2, unpacked3);
+  } else if constexpr (remaining == 1) {
+    vec_pack_128_uint1_pieces<offset>(
+        packed, unpacked0, unpacked1, unpacked2, unpacked3);
+  }
+}
+
+template <int nbit, int offset>
+TORCHAO_ALWAYS_INLINE inline void vec_unpack_128_uint_pieces(
+    __m256i& unpacked0,
+    __m256i& unpacked1,
+    __m256i& unpacked2,
+    __m256i& unpacked3,
+    const uint8_t* packed) {
+  constexpr int remaining = nbit - offset;
+  if constexpr (remaining >= 4) {
+    vec_unpack_128_uint4_pieces<offset>(
+        unpacked0, unpacked1, unpacked2, unpacked3, packed);
+    vec_unpack_128_uint_pieces<nbit, offset + 4>(
+        unpacked0, unpacked1, unpacked2, unpacked3, packed + 64);
+  } else if constexpr (remaining >= 2) {
+    vec_unpack_128_uint2_pieces<offset>(
+        unpacked0, unpacked1, unpacked2, unpacked3, packed);
+    vec_unpack_128_uint_pieces<nbit, offset + 2>(
+        unpacked0, unpacked1, unpacked2, unpacked3, packed + 32);
+  } else if constexpr (remaining == 1) {
+    vec_unpack_128_uint1_pieces<offset>(
+        unpacked0, unpacked1, unpacked2, unpacked3, packed);
+  }
+}
+
+} // namespace internal
+
+// Packs 128 signed nbit values into 16 * nbit bytes
+template <int nbit>
+TORCHAO_ALWAYS_INLINE inline void vec_pack_128_lowbit_values(
+    uint8_t* packed,
+    const __m256i& unpacked0,
+    const __m256i& unpacked1,
+    const __m256i& unpacked2,
+    const __m256i& unpacked3) {
+  // Currently supported values
+  static_assert(nbit >= 1);
+  static_assert(nbit <= 6);
+
+  // Shift unpacked values to nonnegative range
+  const __m256i shift = _mm256_set1_epi8(1 << (nbit - 1));
+  internal::vec_pack_128_uint_pieces<nbit, 0>(
+      packed,
+      _mm256_add_epi8(unpacked0, shift),
+      _mm256_add_epi8(unpacked1, shift),
+      _mm256_add_epi8(unpacked2, shift),
+      _mm256_add_epi8(unpacked3, shift));
+}
+
+// Unpacks 16 * nbit bytes into 128 values in [0, 2^nbit).
+// The values are NOT shifted back to the signed range; see comment at top.
+template <int nbit>
+TORCHAO_ALWAYS_INLINE inline void vec_unpack_128_lowbit_values(
+    __m256i& unpacked0,
+    __m256i& unpacked1,
+    __m256i& unpacked2,
+    __m256i& unpacked3,
+    const uint8_t* packed) {
+  // Currently supported values
+  static_assert(nbit >= 1);
+  static_assert(nbit <= 6);
+
+  unpacked0 = _mm256_setzero_si256();
+  unpacked1 = _mm256_setzero_si256();
+  unpacked2 = _mm256_setzero_si256();
+  unpacked3 = _mm256_setzero_si256();
+  internal::vec_unpack_128_uint_pieces<nbit, 0>(
+      unpacked0, unpacked1, unpacked2, unpacked3, packed);
+}
+
+} // namespace bitpacking
+} // namespace torchao
+
+#endif // defined(__x86_64__) && defined(__AVX2__)
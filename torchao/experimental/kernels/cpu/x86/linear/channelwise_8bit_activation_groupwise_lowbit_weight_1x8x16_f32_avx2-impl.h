@@ -0,0 +1,558 @@
+// Copyright (c) Meta Platforms, Inc. and affiliates.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#pragma once
+
+#if defined(__x86_64__) && defined(__AVX2__)
+
+#include <immintrin.h>
+#include <torchao/experimental/kernels/cpu/x86/bitpacking/bitpack.h>
+#include <torchao/experimental/kernels/cpu/x86/quantization/quantize.h>
+#include <torchao/experimental/kernels/cpu/x86/reduction/reduction.h>
+#include <cassert>
+#include <cstring>
+
+namespace torchao::kernels::cpu::x86::linear {
+namespace channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+    internal {
+
+inline __m256 vec_clamp(__m256 x, __m256 vec_min, __m256 vec_max) {
+  __m256 tmp = _mm256_max_ps(x, vec_min);
+  return _mm256_min_ps(tmp, vec_max);
+}
+
+// Accumulates the dot products of 4 consecutive unsigned weight bytes with 4
+// consecutive signed activation bytes into each int32 lane of acc.
+// With AVX-512 VNNI (or AVX-VNNI) this is a single instruction; otherwise it
+// is emulated with maddubs + madd.  The emulation cannot saturate the
+// intermediate int16 pair sums because weights are at most 6-bit:
+// 2 * 63 * 128 < 2^15.
+inline __m256i vec_dot_accumulate(__m256i acc, __m256i weight_q, __m256i act_q) {
+#if defined(__AVX512VNNI__) && defined(__AVX512VL__)
+  return _mm256_dpbusd_epi32(acc, weight_q, act_q);
+#elif defined(__AVXVNNI__)
+  return _mm256_dpbusd_avx_epi32(acc, weight_q, act_q);
+#else
+  __m256i pair_sums = _mm256_maddubs_epi16(weight_q, act_q);
+  return _mm256_add_epi32(
+      acc, _mm256_madd_epi16(pair_sums, _mm256_set1_epi16(1)));
+#endif
+}
+
+// Implements variants of
+// channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2
+// to compute
+//    output = F(activations * weights + bias)
+// with the same conventions as the aarch64
+// channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_neondot
+// kernel: activations are mxk and channelwise 8-bit quantized, weights are
+// nxk (stored row-major) and groupwise lowbit quantized, bias is mx1, F is
+// clamp or linear, and output is mxn.
+//
+// The suffix 1x8x16_f32_avx2 indicates the tile sizes (1x8 = 1x16 @ 16x8),
+// floating point type for output (f32), and main ISA (avx2).
+// There are 128 = 8*16 weight values unpacked in each inner loop iteration.
+//
+// x86 has no signed x signed int8 dot product, so weight values are kept in
+// the nonnegative range qval + 2^(weight_nbit-1) (see bitpacking/bitpack.h),
+// and the shift is folded into the weight zero point.  Consequently the
+// activation qvals_sum is always needed, and is always stored in the
+// prepared activation data (unlike aarch64, where it is only stored if
+// has_weight_zeros = true).
+//
+// Activations and weights are stored in a prepared format specific to
+// this kernel.  See prepare_weight_data_impl and prepare_activation_data_impl
+// functions for details.
+
+// Prepares activation data for kernel_impl.
+//   Per m_idx (row), activations are stored as follows:
+//     scale (float), zero (int8_t),
+//     group0_qvals (int8_t[group_size]), group0_qvals_sum (int32_t)
+//     group1_qvals (int8_t[group_size]), group1_qvals_sum (int32_t)
+//     ...
+
+// Returns number of bytes required for activation_data
+int inline activation_data_size_impl(int m, int k, int group_size) {
+  assert(k % group_size == 0);
+  int groups_per_row = k / group_size;
+  int row_size = 0;
+
+  // scale
+  row_size += sizeof(float);
+
+  // zero
+  row_size += sizeof(int8_t);
+
+  // qvals
+  row_size += sizeof(int8_t) * k;
+
+  // qvals_sum
+  row_size += sizeof(int32_t) * groups_per_row;
+
+  return row_size * m;
+}
+
+void inline prepare_activation_data_impl(
+    // Output
+    void* activation_data,
+    // Inputs
+    int m,
+    int k,
+    int group_size,
+    const float* activations) {
+  auto activation_data_byte_ptr = (char*)activation_data;
+
+  float vmin, vmax, scale;
+  int qmin, qmax, zero, qvals_sum;
+  torchao::quantization::get_qvals_range(
+      qmin, qmax, /*nbit=*/8, /*is_symmetric=*/false);
+
+  for (int m_idx = 0; m_idx < m; m_idx++) {
+    torchao::kernels::cpu::x86::reduction::find_min_and_max(
+        vmin, vmax, activations, k);
+    torchao::quantization::get_scale_and_zero(
+        scale, zero, vmin, vmax, qmin, qmax);
+
+    // Save scale and zero
+    std::memcpy(activation_data_byte_ptr, &scale, sizeof(float));
+    activation_data_byte_ptr += sizeof(float);
+
+    *(int8_t*)activation_data_byte_ptr = (int8_t)zero;
+    activation_data_byte_ptr += sizeof(int8_t);
+
+    for (int k_idx = 0; k_idx < k; k_idx += group_size) {
+      torchao::kernels::cpu::x86::quantization::quantize(
+          /*qvals=*/(int8_t*)activation_data_byte_ptr,
+          /*vals=*/activations,
+          /*size=*/group_size,
+          /*scale=*/scale,
+          /*zero=*/zero,
+          /*qmin=*/qmin,
+          /*qmax=*/qmax);
+
+      qvals_sum = torchao::kernels::cpu::x86::reduction::compute_sum(
+          /*vals=*/(int8_t*)activation_data_byte_ptr,
+          /*size=*/group_size);
+
+      activation_data_byte_ptr += group_size;
+
+      std::memcpy(activation_data_byte_ptr, &qvals_sum, sizeof(int32_t));
+      activation_data_byte_ptr += sizeof(int32_t);
+
+      activations += group_size;
+    }
+  }
+}
+
+template <int weight_nbit, bool has_weight_zeros, bool has_bias, bool has_clamp>
+void kernel_impl(
+    // Outputs
+    float* output,
+    // Inputs
+    int output_m_stride,
+    int m,
+    int n,
+    int k,
+    int group_size,
+    const void* weight_data,
+    const void* activation_data,
+    // Ignored if has_bias is false
+    const float* bias,
+    // Ignored if has_clamp is false
+    float clamp_min,
+    float clamp_max) {
+  assert(k % group_size == 0);
+  assert(group_size % 16 == 0);
+
+  constexpr int bytes_per_128_weight_values = 16 * weight_nbit;
+
+  auto activation_data_byte_ptr = (const char*)(activation_data);
+  const char* activation_ptr = activation_data_byte_ptr;
+
+  for (int m_idx = 0; m_idx < m; m_idx++) {
+    // Read activation scale and zero
+    float activation_scale;
+    std::memcpy(&activation_scale, activation_data_byte_ptr, sizeof(float));
+    activation_data_byte_ptr += sizeof(float);
+
+    int activation_zero = (int)(*((const int8_t*)activation_data_byte_ptr));
+    activation_data_byte_ptr += sizeof(int8_t);
+
+    __m256 activation_scales = _mm256_set1_ps(activation_scale);
+    __m256i activation_zeros = _mm256_set1_epi32(activation_zero);
+
+    // Set weight_data_byte_ptr to start of weight_data
+    auto weight_data_byte_ptr = (const char*)(weight_data);
+
+    // Loop over 8 cols at a time
+    // Weights and activations are padded when prepared, so the
+    // reads are legal, even if on a partial tile
+    for (int n_idx = 0; n_idx < n; n_idx += 8) {
+      // Set activation_ptr to start of activation qvals for row m_idx
+      activation_ptr = activation_data_byte_ptr;
+      __m256 res = _mm256_setzero_ps();
+
+      // Loop k_idx by group
+      for (int k_idx = 0; k_idx < k; k_idx += group_size) {
+        // Iterating over k in chunks of 16, we compute the dot product
+        // between 16 values of activation data with 16 values in each of 8
+        // cols of weight data.  The 16 activation values are broadcast to
+        // both 128-bit lanes, and each weight register holds 16 values of one
+        // col in its low lane and 16 values of another col in its high lane:
+        //
+        // weight register     low lane     high lane    accumulator
+        // ---------------------------------------------------------
+        // weight_q_cols04     col0         col4         acc_cols04
+        // weight_q_cols15     col1         col5         acc_cols15
+        // weight_q_cols26     col2         col6         acc_cols26
+        // weight_q_cols37     col3         col7         acc_cols37
+        //
+        // Each accumulator holds 4 partial sums per col.  This pairing is
+        // what lets three hadds at the end of the group produce the 8 dot
+        // products in column order, and it informs the weight packing.
+        __m256i acc_cols04 = _mm256_setzero_si256();
+        __m256i acc_cols15 = _mm256_setzero_si256();
+        __m256i acc_cols26 = _mm256_setzero_si256();
+        __m256i acc_cols37 = _mm256_setzero_si256();
+
+        __m256i weight_q_cols04;
+        __m256i weight_q_cols15;
+        __m256i weight_q_cols26;
+        __m256i weight_q_cols37;
+
+        for (int i = 0; i < group_size; i += 16) {
+          torchao::bitpacking::vec_unpack_128_lowbit_values<weight_nbit>(
+              weight_q_cols04,
+              weight_q_cols15,
+              weight_q_cols26,
+              weight_q_cols37,
+              (const uint8_t*)weight_data_byte_ptr);
+          weight_data_byte_ptr += bytes_per_128_weight_values;
+
+          // Load 16 activation values, duplicated in both lanes
+          __m256i act_q = _mm256_broadcastsi128_si256(
+              _mm_loadu_si128((const __m128i*)activation_ptr));
+          activation_ptr += 16;
+
+          acc_cols04 = vec_dot_accumulate(acc_cols04, weight_q_cols04, act_q);
+          acc_cols15 = vec_dot_accumulate(acc_cols15, weight_q_cols15, act_q);
+          acc_cols26 = vec_dot_accumulate(acc_cols26, weight_q_cols26, act_q);
+          acc_cols37 = vec_dot_accumulate(acc_cols37, weight_q_cols37, act_q);
+        }
+
+        // Reduce accumulators, so we have one dot product value per col
+        //   hadd(acc_cols04, acc_cols15) = [c0 c0 c1 c1 | c4 c4 c5 c5]
+        //   hadd(acc_cols26, acc_cols37) = [c2 c2 c3 c3 | c6 c6 c7 c7]
+        //   hadd of the above            = [c0 c1 c2 c3 | c4 c5 c6 c7]
+        __m256i qval_dot = _mm256_hadd_epi32(
+            _mm256_hadd_epi32(acc_cols04, acc_cols15),
+            _mm256_hadd_epi32(acc_cols26, acc_cols37));
+
+        int32_t activation_qvals_sum;
+        std::memcpy(&activation_qvals_sum, activation_ptr, sizeof(int32_t));
+        activation_ptr += sizeof(int32_t);
+
+        // Result is updated with:
+        // res += scale_factor * (qval_dot - term1 - term2 + term3), where
+        // * scale_factor = (weight_scale * activation_scale)
+        // * term1 = (activation_zero * weight_qvals_sum)
+        // * term2 = (weight_zero * activation_qvals_sum)
+        // * term3 = (group_size * weight_zero * activation_zero)
+        // and weight_zero includes the 2^(weight_nbit-1) shift of the weight
+        // qvals (and is only that shift if has_weight_zeros = false).
+        // Terms 2 and 3 are combined as
+        // weight_zero * (activation_qvals_sum - group_size * activation_zero).
+
+        // Compute scale_factor
+        __m256 weight_scales =
+            _mm256_loadu_ps((const float*)weight_data_byte_ptr);
+        weight_data_byte_ptr += 32;
+        __m256 scale_factor = _mm256_mul_ps(weight_scales, activation_scales);
+
+        // Compute term1
+        __m256i weight_qvals_sum =
+            _mm256_loadu_si256((const __m256i*)weight_data_byte_ptr);
+        weight_data_byte_ptr += 32;
+        __m256i term1 = _mm256_mullo_epi32(weight_qvals_sum, activation_zeros);
+
+        // Compute term2 - term3
+        __m256i activation_qvals_sum_minus_zeros = _mm256_set1_epi32(
+            activation_qvals_sum - group_size * activation_zero);
+        __m256i term23;
+        if constexpr (has_weight_zeros) {
+          __m256i weight_zeros =
+              _mm256_loadu_si256((const __m256i*)weight_data_byte_ptr);
+          weight_data_byte_ptr += 32;
+          term23 = _mm256_mullo_epi32(
+              weight_zeros, activation_qvals_sum_minus_zeros);
+        } else {
+          term23 = _mm256_slli_epi32(
+              activation_qvals_sum_minus_zeros, weight_nbit - 1);
+        }
+
+        // Do updates
+        __m256i tmp = _mm256_sub_epi32(qval_dot, term1);
+        tmp = _mm256_sub_epi32(tmp, term23);
+        res = _mm256_add_ps(
+            res, _mm256_mul_ps(scale_factor, _mm256_cvtepi32_ps(tmp)));
+      } // k_idx
+      if constexpr (has_bias) {
+        res = _mm256_add_ps(res, _mm256_set1_ps(bias[m_idx]));
+      }
+      if constexpr (has_clamp) {
+        res = vec_clamp(
+            res, _mm256_set1_ps(clamp_min), _mm256_set1_ps(clamp_max));
+      }
+
+      // Store result
+      int remaining = n - n_idx;
+      float* store_loc = output + m_idx * output_m_stride + n_idx;
+      if (remaining >= 8) {
+        _mm256_storeu_ps(store_loc, res);
+      } else {
+        __m256i store_mask = _mm256_cmpgt_epi32(
+            _mm256_set1_epi32(remaining),
+            _mm256_setr_epi32(0, 1, 2, 3, 4, 5, 6, 7));
+        _mm256_maskstore_ps(store_loc, store_mask, res);
+      }
+    } // n_idx
+    activation_data_byte_ptr += (activation_ptr - activation_data_byte_ptr);
+  } // m_idx
+}
+
+// Prepares weight data for kernel_impl.
+//   Per group of each 8-col tile, weights are stored as follows:
+//     qvals (group_size / 16 chunks of 16 * weight_nbit bitpacked bytes),
+//     scales (float[8]), qvals_sum (int32_t[8]), [zeros (int32_t[8])]?
+//   The zeros are only present if has_weight_zeros = true.  qvals_sum and
+//   zeros are in the shifted range used by the kernel.
+
+// Returns number of bytes required for weight_data
+int inline weight_data_size_impl(
+    int n,
+    int k,
+    int group_size,
+    int weight_nbit,
+    bool has_weight_zeros) {
+  assert(k % group_size == 0);
+  int groups_per_col = k / group_size;
+  int col_size = 0;
+
+  // qvals
+  col_size += (k / 8) * weight_nbit;
+
+  // scales
+  col_size += sizeof(float) * groups_per_col;
+
+  // qvals_sum
+  col_size += sizeof(int32_t) * groups_per_col;
+
+  // zeros
+  if (has_weight_zeros) {
+    col_size += sizeof(int32_t) * groups_per_col;
+  }
+
+  // Replace n with next multiple of 8 >= n
+  n = ((n + 7) / 8) * 8;
+
+  return col_size * n;
+}
+
+template <int weight_nbit, bool has_weight_zeros>
+void prepare_weight_data_impl(
+    // Output
+    void* weight_data,
+    // Inputs
+    int n,
+    int k,
+    int group_size,
+    const int8_t* weight_qvals,
+    const float* weight_scales,
+    // Ignored if has_weight_zeros = false
+    const int8_t* weight_zeros) {
+  assert(k % group_size == 0);
+  assert(group_size % 16 == 0);
+  int groups_per_k = k / group_size;
+  constexpr int bytes_per_128_weight_values = 16 * weight_nbit;
+  constexpr int weight_shift = 1 << (weight_nbit - 1);
+
+  auto weight_data_byte_ptr = (char*)weight_data;
+  const int8_t* qvals_ptr = weight_qvals;
+  const float* scales_ptr = weight_scales;
+  const int8_t* zeros_ptr = weight_zeros;
+
+  // Col j of the tile goes to the low lane of register j % 4 if j < 4, and to
+  // the high lane otherwise (see kernel_impl)
+  int8_t buffer[128];
+
+  for (int n_idx = 0; n_idx < n; n_idx += 8) {
+    for (int k_idx = 0; k_idx < k; k_idx += group_size) {
+      // Loop over group in chunks of 16, processing 8 columns at at time
+      int qvals_sum[8] = {0, 0, 0, 0, 0, 0, 0, 0};
+      for (int i = 0; i < group_size; i += 16) {
+        // Padded columns are filled with -weight_shift, which packs to 0
+        std::memset(buffer, -weight_shift, 128);
+        for (int j = 0; j < 8; j++) {
+          if (n_idx + j < n) {
+            int8_t* dest = buffer + 32 * (j % 4) + 16 * (j / 4);
+            std::memcpy(dest, qvals_ptr + k * j, 16);
+            for (int l = 0; l < 16; l++) {
+              qvals_sum[j] += dest[l] + weight_shift;
+            }
+          }
+        }
+        torchao::bitpacking::vec_pack_128_lowbit_values<weight_nbit>(
+            (uint8_t*)weight_data_byte_ptr,
+            _mm256_loadu_si256((const __m256i*)buffer),
+            _mm256_loadu_si256((const __m256i*)(buffer + 32)),
+            _mm256_loadu_si256((const __m256i*)(buffer + 64)),
+            _mm256_loadu_si256((const __m256i*)(buffer + 96)));
+        qvals_ptr += 16;
+        weight_data_byte_ptr += bytes_per_128_weight_values;
+      } // loop over group
+
+      // Store weight scales
+      for (int j = 0; j < 8; j++) {
+        float scale = 0.0;
+        if (n_idx + j < n) {
+          scale = *(scales_ptr + j * groups_per_k);
+        }
+        std::memcpy(weight_data_byte_ptr, &scale, sizeof(float));
+        weight_data_byte_ptr += sizeof(float);
+      }
+      scales_ptr += 1;
+
+      // Store weight qvals_sum
+      std::memcpy(weight_data_byte_ptr, qvals_sum, 8 * sizeof(int32_t));
+      weight_data_byte_ptr += 8 * sizeof(int32_t);
+
+      // Store weight zeros
+      if constexpr (has_weight_zeros) {
+        for (int j = 0; j < 8; j++) {
+          int32_t zero = weight_shift;
+          if (n_idx + j < n) {
+            zero += (int)(*(zeros_ptr + j * groups_per_k));
+          }
+          std::memcpy(weight_data_byte_ptr, &zero, sizeof(int32_t));
+          weight_data_byte_ptr += sizeof(int32_t);
+        }
+        zeros_ptr += 1;
+      }
+    } // k_idx
+
+    // In the previous loop over k, we processed 8 columns at a time,
+    // but only advanced our pointers over the first column.
+    // So we advance over the other 7 columns here.
+    qvals_ptr += 7 * k;
+    scales_ptr += 7 * groups_per_k;
+    if constexpr (has_weight_zeros) {
+      zeros_ptr += 7 * groups_per_k;
+    }
+  } // n_idx
+}
+
+} // namespace
+  // channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::internal
+} // namespace torchao::kernels::cpu::x86::linear
+
+// Activation functions
+template <bool has_weight_zeros>
+int torchao::kernels::cpu::x86::linear::
+    channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+        activation_data_size(int m, int k, int group_size) {
+  return torchao::kernels::cpu::x86::linear::
+      channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+          internal::activation_data_size_impl(m, k, group_size);
+}
+
+template <bool has_weight_zeros>
+void torchao::kernels::cpu::x86::linear::
+    channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+        prepare_activation_data(
+            void* activation_data,
+            // Inputs
+            int m,
+            int k,
+            int group_size,
+            const float* activations) {
+  torchao::kernels::cpu::x86::linear::
+      channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+          internal::prepare_activation_data_impl(
+              activation_data, m, k, group_size, activations);
+}
+
+// Weight functions
+template <int weight_nbit, bool has_weight_zeros>
+int torchao::kernels::cpu::x86::linear::
+    channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+        weight_data_size(int n, int k, int group_size) {
+  return torchao::kernels::cpu::x86::linear::
+      channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+          internal::weight_data_size_impl(
+              n, k, group_size, weight_nbit, has_weight_zeros);
+}
+
+template <int weight_nbit, bool has_weight_zeros>
+void torchao::kernels::cpu::x86::linear::
+    channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+        prepare_weight_data(
+            void* weight_data,
+            // Inputs
+            int n,
+            int k,
+            int group_size,
+            const int8_t* weight_qvals,
+            const float* weight_scales,
+            const int8_t* weight_zeros) {
+  torchao::kernels::cpu::x86::linear::
+      channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+          internal::prepare_weight_data_impl<weight_nbit, has_weight_zeros>(
+              weight_data,
+              n,
+              k,
+              group_size,
+              weight_qvals,
+              weight_scales,
+              weight_zeros);
+}
+
+template <int weight_nbit, bool has_weight_zeros, bool has_bias, bool has_clamp>
+void torchao::kernels::cpu::x86::linear::
+    channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+        kernel(
+            // Outputs
+            float* output,
+            // Inputs
+            int output_m_stride,
+            int m,
+            int n,
+            int k,
+            int group_size,
+            const void* weight_data,
+            const void* activation_data,
+            // Not applied if nullptr
+            const float* bias,
+            // Ignored if has_clamp = false
+            float clamp_min,
+            float clamp_max) {
+  torchao::kernels::cpu::x86::linear::
+      channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2::
+          internal::
+              kernel_impl<weight_nbit, has_weight_zeros, has_bias, has_clamp>(
+                  output,
+                  output_m_stride,
+                  m,
+                  n,
+                  k,
+                  group_size,
+                  weight_data,
+                  activation_data,
+                  bias,
+                  clamp_min,
+                  clamp_max);
+}
+
+#endif // defined(__x86_64__) && defined(__AVX2__)
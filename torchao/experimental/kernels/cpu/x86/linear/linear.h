@@ -0,0 +1,69 @@
+// Copyright (c) Meta Platforms, Inc. and affiliates.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#pragma once
+
+#if defined(__x86_64__) && defined(__AVX2__)
+
+#include <immintrin.h>
+#include <stdint.h>
+
+namespace torchao::kernels::cpu::x86::linear {
+
+namespace channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2 {
+
+template <bool has_weight_zeros>
+int activation_data_size(int m, int k, int group_size);
+
+template <bool has_weight_zeros>
+void prepare_activation_data(
+    void* activation_data,
+    // Inputs
+    int m,
+    int k,
+    int group_size,
+    const float* activations);
+
+template <int weight_nbit, bool has_weight_zeros>
+int weight_data_size(int n, int k, int group_size);
+
+template <int weight_nbit, bool has_weight_zeros>
+void prepare_weight_data(
+    void* weight_data,
+    // Inputs
+    int n,
+    int k,
+    int group_size,
+    const int8_t* weight_qvals,
+    const float* weight_scales,
+    const int8_t* weight_zeros);
+
+template <int weight_nbit, bool has_weight_zeros, bool has_bias, bool has_clamp>
+void kernel(
+    // Outputs
+    float* output,
+    // Inputs
+    int output_m_stride,
+    int m,
+    int n,
+    int k,
+    int group_size,
+    const void* weight_data,
+    const void* activation_data,
+    // Not applied if nullptr
+    const float* bias,
+    // Ignored if has_clamp = false
+    float clamp_min,
+    float clamp_max);
+
+} // namespace
+  // channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2
+
+} // namespace torchao::kernels::cpu::x86::linear
+
+#include <torchao/experimental/kernels/cpu/x86/linear/channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2-impl.h>
+
+#endif // defined(__x86_64__) && defined(__AVX2__)
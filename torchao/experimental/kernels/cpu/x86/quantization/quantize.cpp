@@ -0,0 +1,94 @@
+// Copyright (c) Meta Platforms, Inc. and affiliates.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#if defined(__x86_64__) && defined(__AVX2__)
+
+#include <torchao/experimental/kernels/cpu/x86/quantization/quantize.h>
+#include <algorithm>
+#include <cassert>
+#include <cmath>
+
+void torchao::quantization::get_qvals_range(
+    int& qmin,
+    int& qmax,
+    int nbit,
+    bool is_symmetric) {
+  if (is_symmetric) {
+    qmin = -(1 << (nbit - 1)) + 1;
+    qmax = -qmin;
+  } else {
+    qmin = -(1 << (nbit - 1));
+    qmax = (1 << (nbit - 1)) - 1;
+  }
+}
+
+float torchao::quantization::get_scale(
+    float vmin,
+    float vmax,
+    int qmin,
+    int qmax) {
+  assert(qmin < qmax);
+  assert(vmin < vmax);
+  return (vmax - vmin) / (qmax - qmin);
+}
+
+void torchao::quantization::get_scale_and_zero(
+    float& scale,
+    int& zero,
+    float vmin,
+    float vmax,
+    int qmin,
+    int qmax) {
+  scale = torchao::quantization::get_scale(vmin, vmax, qmin, qmax);
+  zero = qmin - std::round(vmin / scale);
+}
+
+void torchao::kernels::cpu::x86::quantization::quantize(
+    // Output
+    int8_t* qvals,
+    // Inputs
+    const float* vals,
+    int size,
+    float scale,
+    int8_t zero,
+    int8_t qmin,
+    int8_t qmax) {
+  assert(size % 8 == 0);
+
+  float invScale = 1.0 / (scale + 1e-16);
+  __m256 vec_zero = _mm256_set1_ps(zero);
+  __m256 vec_invScale = _mm256_set1_ps(invScale);
+  __m256i vec_qmin = _mm256_set1_epi32(qmin);
+  __m256i vec_qmax = _mm256_set1_epi32(qmax);
+
+  // After packing 8 int32 values down to int8, the first 4 bytes of each
+  // 128-bit lane hold the quantized values.  This gathers them into the
+  // low 8 bytes.
+  __m256i vec_gather_idx = _mm256_setr_epi32(0, 4, 0, 0, 0, 0, 0, 0);
+
+  for (int i = 0; i < size; i += 8) {
+    __m256 vec_val = _mm256_loadu_ps(vals + i);
+
+    // Quantize and round (to nearest, ties to even)
+    __m256 vec_qval_f32 =
+        _mm256_add_ps(_mm256_mul_ps(vec_val, vec_invScale), vec_zero);
+    __m256i vec_qval_s32 = _mm256_cvtps_epi32(_mm256_round_ps(
+        vec_qval_f32, _MM_FROUND_TO_NEAREST_INT | _MM_FROUND_NO_EXC));
+
+    vec_qval_s32 = _mm256_max_epi32(vec_qval_s32, vec_qmin);
+    vec_qval_s32 = _mm256_min_epi32(vec_qval_s32, vec_qmax);
+
+    // Narrow to int8 and store 8 quantized elements
+    __m256i vec_qval_s16 = _mm256_packs_epi32(vec_qval_s32, vec_qval_s32);
+    __m256i vec_qval_s8 = _mm256_packs_epi16(vec_qval_s16, vec_qval_s16);
+    vec_qval_s8 = _mm256_permutevar8x32_epi32(vec_qval_s8, vec_gather_idx);
+    _mm_storel_epi64(
+        reinterpret_cast<__m128i*>(qvals + i),
+        _mm256_castsi256_si128(vec_qval_s8));
+  }
+}
+
+#endif // defined(__x86_64__) && defined(__AVX2__)
@@ -0,0 +1,40 @@
+// Copyright (c) Meta Platforms, Inc. and affiliates.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#if defined(__x86_64__) && defined(__AVX2__)
+
+#include <torchao/experimental/kernels/cpu/x86/reduction/reduction.h>
+#include <cassert>
+
+int32_t torchao::kernels::cpu::x86::reduction::compute_sum(
+    const int8_t* vals,
+    int size) {
+  assert(size >= 1);
+
+  int32_t res = 0;
+  int i = 0;
+
+  if (i + 15 < size) {
+    __m256i ones = _mm256_set1_epi16(1);
+    __m256i sums = _mm256_setzero_si256();
+    for (; i + 15 < size; i += 16) {
+      __m256i vec_vals = _mm256_cvtepi8_epi16(
+          _mm_loadu_si128(reinterpret_cast<const __m128i*>(vals + i)));
+      sums = _mm256_add_epi32(sums, _mm256_madd_epi16(vec_vals, ones));
+    }
+    __m128i sums_128 = _mm_add_epi32(
+        _mm256_castsi256_si128(sums), _mm256_extracti128_si256(sums, 1));
+    sums_128 = _mm_hadd_epi32(sums_128, sums_128);
+    sums_128 = _mm_hadd_epi32(sums_128, sums_128);
+    res = _mm_cvtsi128_si32(sums_128);
+  }
+  for (; i < size; i += 1) {
+    res += vals[i];
+  }
+  return res;
+}
+
+#endif // defined(__x86_64__) && defined(__AVX2__)
@@ -0,0 +1,61 @@
+// Copyright (c) Meta Platforms, Inc. and affiliates.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#if defined(__x86_64__) && defined(__AVX2__)
+
+#include <torchao/experimental/kernels/cpu/x86/reduction/reduction.h>
+#include <algorithm>
+#include <cassert>
+
+void torchao::kernels::cpu::x86::reduction::find_min_and_max(
+    float& min,
+    float& max,
+    const float* vals,
+    int size) {
+  assert(size > 0);
+
+  // Needed in case size < 8 so we don't compare to
+  // uninitialized min/max values
+  min = vals[0];
+  max = min;
+
+  int i = 0;
+  if (i + 7 < size) {
+    __m256 mins = _mm256_loadu_ps(vals + i);
+    __m256 maxes = mins;
+    i += 8;
+    for (; i + 7 < size; i += 8) {
+      __m256 v = _mm256_loadu_ps(vals + i);
+      mins = _mm256_min_ps(mins, v);
+      maxes = _mm256_max_ps(maxes, v);
+    }
+
+    // Reduce 8 lanes to 1
+    __m128 mins_128 =
+        _mm_min_ps(_mm256_castps256_ps128(mins), _mm256_extractf128_ps(mins, 1));
+    __m128 maxes_128 = _mm_max_ps(
+        _mm256_castps256_ps128(maxes), _mm256_extractf128_ps(maxes, 1));
+    mins_128 = _mm_min_ps(mins_128, _mm_movehl_ps(mins_128, mins_128));
+    maxes_128 = _mm_max_ps(maxes_128, _mm_movehl_ps(maxes_128, maxes_128));
+    mins_128 = _mm_min_ss(mins_128, _mm_shuffle_ps(mins_128, mins_128, 1));
+    maxes_128 = _mm_max_ss(maxes_128, _mm_shuffle_ps(maxes_128, maxes_128, 1));
+    min = _mm_cvtss_f32(mins_128);
+    max = _mm_cvtss_f32(maxes_128);
+  }
+
+  // Remainder
+  while (i < size) {
+    if (vals[i] < min) {
+      min = vals[i];
+    }
+    if (vals[i] > max) {
+      max = vals[i];
+    }
+    i += 1;
+  }
+}
+
+#endif // defined(__x86_64__) && defined(__AVX2__)
@@ -0,0 +1,28 @@
+// Copyright (c) Meta Platforms, Inc. and affiliates.
+// All rights reserved.
+//
+// This source code is licensed under the license found in the
+// LICENSE file in the root directory of this source tree.
+
+#pragma once
+
+#if defined(__x86_64__) && defined(__AVX2__)
+#include <immintrin.h>
+#include <stdint.h>
+
+namespace torchao {
+namespace kernels {
+namespace cpu {
+namespace x86 {
+namespace reduction {
+void find_min_and_max(float& min, float& max, const float* vals, int size);
+
+int32_t compute_sum(const int8_t* vals, int size);
+
+} // namespace reduction
+} // namespace x86
+} // namespace cpu
+} // namespace kernels
+} // namespace torchao
+
+#endif // defined(__x86_64__) && defined(__AVX2__)
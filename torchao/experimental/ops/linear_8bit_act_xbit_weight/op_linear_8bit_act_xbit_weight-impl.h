@@ -8,7 +8,9 @@
 
 #if defined(__aarch64__) || defined(__ARM_NEON)
 #include <torchao/experimental/kernels/cpu/aarch64/linear/linear.h>
-#endif // defined(__aarch64__) || defined(__ARM_NEON)
+#elif defined(__x86_64__) && defined(__AVX2__)
+#include <torchao/experimental/kernels/cpu/x86/linear/linear.h>
+#endif
 
 #include <torchao/experimental/ops/linear_8bit_act_xbit_weight/linear_8bit_act_xbit_weight.h>
 #include <optional>
@@ -57,7 +59,24 @@ get_ukernel_config() {
       &ukernel::prepare_weight_data<weight_nbit, has_weight_zeros>;
   config.kernel_fn =
       &ukernel::kernel<weight_nbit, has_weight_zeros, has_bias, has_clamp>;
-#endif // defined(__aarch64__) || defined(__ARM_NEON)
+#elif defined(__x86_64__) && defined(__AVX2__)
+  namespace ukernel = torchao::kernels::cpu::x86::linear::
+      channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2;
+  config.mr = 1;
+  config.nr = 8;
+  config.activation_data_size_fn =
+      &ukernel::activation_data_size<has_weight_zeros>;
+  config.activation_data_alignment = 32; // size of avx2 register
+  config.prepare_activation_data_fn =
+      &ukernel::prepare_activation_data<has_weight_zeros>;
+  config.weight_data_size_fn =
+      &ukernel::weight_data_size<weight_nbit, has_weight_zeros>;
+  config.weight_data_alignment = 32; // size of avx2 register
+  config.prepare_weight_data_fn =
+      &ukernel::prepare_weight_data<weight_nbit, has_weight_zeros>;
+  config.kernel_fn =
+      &ukernel::kernel<weight_nbit, has_weight_zeros, has_bias, has_clamp>;
+#endif
 
   return config;
 }
@@ -6,8 +6,12 @@
 
 #include <gtest/gtest.h>
 // TODO: move test_utils.h out of aarch64
-#include <torchao/experimental/kernels/cpu/aarch64/linear/linear.h>
 #include <torchao/experimental/kernels/cpu/aarch64/tests/test_utils.h>
+#if defined(__aarch64__) || defined(__ARM_NEON)
+#include <torchao/experimental/kernels/cpu/aarch64/linear/linear.h>
+#elif defined(__x86_64__) && defined(__AVX2__)
+#include <torchao/experimental/kernels/cpu/x86/linear/linear.h>
+#endif
 #include <torchao/experimental/ops/linear_8bit_act_xbit_weight/linear_8bit_act_xbit_weight.h>
 #include <torchao/experimental/ops/memory.h>
 #include <torchao/experimental/ops/parallel.h>
@@ -20,18 +24,25 @@ template <int weight_nbit, bool has_weight_zeros, bool has_bias, bool has_clamp>
 UKernelConfig get_ukernel_config() {
   UKernelConfig config;
 
+#if defined(__aarch64__) || defined(__ARM_NEON)
   namespace ukernel = torchao::kernels::cpu::aarch64::linear::
       channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_neondot;
+  constexpr int register_size = 16; // size of neon register
+#else
+  namespace ukernel = torchao::kernels::cpu::x86::linear::
+      channelwise_8bit_activation_groupwise_lowbit_weight_1x8x16_f32_avx2;
+  constexpr int register_size = 32; // size of avx2 register
+#endif
   config.mr = 1;
   config.nr = 8;
   config.activation_data_size_fn =
       &ukernel::activation_data_size<has_weight_zeros>;
-  config.activation_data_alignment = 16; // size of neon register
+  config.activation_data_alignment = register_size;
   config.prepare_activation_data_fn =
       &ukernel::prepare_activation_data<has_weight_zeros>;
   config.weight_data_size_fn =
       &ukernel::weight_data_size<weight_nbit, has_weight_zeros>;
-  config.weight_data_alignment = 16; // size of neon register
+  config.weight_data_alignment = register_size;
   config.prepare_weight_data_fn =
       &ukernel::prepare_weight_data<weight_nbit, has_weight_zeros>;
   config.kernel_fn =
@@ -13,6 +13,7 @@ from torchao.float8.config import (
 )
 from torchao.float8.float8_linear import Float8Linear
 from torchao.float8.float8_linear_utils import (
+    clear_float8_weight_cache,
     convert_to_float8_training,
     linear_requires_sync,
     sync_float8_amax_and_scale_history,
@@ -43,6 +44,7 @@ __all__ = [
     "CastConfig",
     # top level UX
     "convert_to_float8_training",
+    "clear_float8_weight_cache",
     "linear_requires_sync",
     "sync_float8_amax_and_scale_history",
     "precompute_float8_dynamic_scale_for_fsdp",
@@ -200,6 +200,20 @@ class Float8LinearConfig:
 
     force_recompute_fp8_weight_in_bwd: bool = False
 
+    # If True, the float8 cast of the weight and its scale are cached after the
+    # first forward and reused until the weight changes, e.g. across gradient
+    # accumulation micro-batches. The cache is cleared after every optimizer step
+    # that updates the weight and after `load_state_dict`, other weight updates under
+    # torch.compile need `clear_float8_weight_cache`. This works under torch.compile,
+    # which compiles separate graphs for refreshing and reusing the cache. In eager
+    # mode, in-place changes to the weight or its static scale are also detected
+    # through their version counters.
+    # Delayed weight scaling is not supported, its scale changes with every sync.
+    # The cache is bypassed for axiswise scaling and when the weight is already
+    # float8 (FSDP float8 all-gather). The cached weight stays allocated between
+    # forwards, so this is not recommended with FSDP `reshard_after_forward=True`.
+    cache_fp8_weight: bool = False
+
     def __post_init__(self):
         # Populate the additional cast overrides, if the user did not specify them
         # Note: this hacks around the frozen-ness of this dataclass
@@ -219,6 +233,10 @@ class Float8LinearConfig:
             assert not self.enable_fsdp_float8_all_gather, \
                 f"enable_fsdp_float8_all_gather only supports tensorwise scaling granularity, got {self.cast_config_weight.scaling_granularity}"
 
+        if self.cache_fp8_weight:
+            assert self.cast_config_weight.scaling_type is not ScalingType.DELAYED, \
+                "cache_fp8_weight does not support delayed weight scaling"
+
         # save some characters in the compatibility checks below
         cc_i = self.cast_config_input
         cc_w = self.cast_config_weight
@@ -9,12 +9,14 @@ A simple module swap UX for a float8 version of `torch.nn.Linear`.
 
 import dataclasses
 import enum
+import weakref
 
-from typing import Optional
+from typing import Optional, Tuple
 
 import torch
 
 import torch.utils.checkpoint as checkpoint
+from torch.optim.optimizer import register_optimizer_step_post_hook
 
 from torchao.float8.config import Float8LinearConfig, ScalingType, ScalingGranularity
 
@@ -112,6 +114,62 @@ class manual_float8_matmul_with_args_in_float8(torch.autograd.Function):
 
         return grad_input, grad_weight.t()
 
+class _CachedFloat8WeightFunc(torch.autograd.Function):
+    """
+    Reuses a cached float8 cast of the weight.
+    * forward: wrap the cached float8 data and scale in a Float8Tensor, the weight is only used for autograd
+    * backward: pass the gradient to the weight without changes, like the cast
+    """
+
+    @staticmethod
+    def forward(
+        ctx,
+        weight: torch.Tensor,
+        data: torch.Tensor,
+        scale: torch.Tensor,
+        linear_mm_config: LinearMMConfig,
+    ):
+        return Float8Tensor(
+            data,
+            scale,
+            weight.dtype,
+            linear_mm_config=linear_mm_config,
+            gemm_input_role=GemmInputRole.WEIGHT,
+        )
+
+    @staticmethod
+    def backward(ctx, g):
+        return g, None, None, None
+
+
+# Float8Linear layers with `cache_fp8_weight`, their caches are marked stale after every
+# optimizer step that updates their weight, since torch.compile can't see weight updates
+_fp8_weight_cache_layers = weakref.WeakSet()
+_fp8_weight_cache_optimizer_hook = None
+
+
+def _clear_fp8_weight_caches_after_optimizer_step(optimizer, args, kwargs):
+    if len(_fp8_weight_cache_layers) == 0:
+        return
+    param_ids = {id(p) for group in optimizer.param_groups for p in group["params"]}
+    for layer in list(_fp8_weight_cache_layers):
+        if id(layer.weight) in param_ids:
+            layer.clear_fp8_weight_cache()
+
+
+def _clear_fp8_weight_cache_after_load_state_dict(module, incompatible_keys):
+    module.clear_fp8_weight_cache()
+
+
+def _register_fp8_weight_cache(layer: "Float8Linear"):
+    global _fp8_weight_cache_optimizer_hook
+    _fp8_weight_cache_layers.add(layer)
+    if _fp8_weight_cache_optimizer_hook is None:
+        _fp8_weight_cache_optimizer_hook = register_optimizer_step_post_hook(
+            _clear_fp8_weight_caches_after_optimizer_step
+        )
+
+
 @torch._dynamo.allow_in_graph
 class manual_float8_matmul_with_args_in_hp(torch.autograd.Function):
     """
@@ -336,6 +394,12 @@ class Float8Linear(torch.nn.Linear):
         # update function for torch.float16
         self.last_seen_input_dtype = None
 
+        # Float8 weight cast cache, see `Float8LinearConfig.cache_fp8_weight`
+        self.clear_fp8_weight_cache(free=True)
+        if self.config.cache_fp8_weight:
+            _register_fp8_weight_cache(self)
+            self.register_load_state_dict_post_hook(_clear_fp8_weight_cache_after_load_state_dict)
+
         # pre_forward and post_forward are currently broken with FSDP
         # and torch.compile, this option can disable them
         # Note that when using `self.config.enable_pre_and_post_forward = False`,
@@ -413,6 +477,8 @@ class Float8Linear(torch.nn.Linear):
     def _apply(self, fn, recurse=True):
         ret = super()._apply(fn, recurse)
         self.convert_amax_buffer_to_float32()
+        # `.to()` and friends may swap `weight.data` without bumping its version
+        self.clear_fp8_weight_cache(free=True)
         return ret
 
     def convert_amax_buffer_to_float32(self):
@@ -506,6 +572,74 @@ class Float8Linear(torch.nn.Linear):
         )
         return weight_fp8.t()
 
+    def __setstate__(self, state):
+        # copies (e.g. copy.deepcopy) don't go through __init__
+        super().__setstate__(state)
+        if self.config.cache_fp8_weight:
+            _register_fp8_weight_cache(self)
+
+    def clear_fp8_weight_cache(self, free: bool = False):
+        """
+        Marks the cached float8 weight as stale, see `Float8LinearConfig.cache_fp8_weight`.
+        The cache tensors are kept and refilled in place on the next forward, so compiled
+        graphs are reused, unless `free` is set.
+        """
+        # Note: this is a python attribute so that torch.compile guards on it, with one
+        # graph which refreshes the cache and one graph which reuses it
+        self._fp8_weight_cache_valid = False
+        self._fp8_weight_cache_key: Optional[Tuple[int, ...]] = None
+        if free:
+            self._fp8_weight_cache_data: Optional[torch.Tensor] = None
+            self._fp8_weight_cache_scale: Optional[torch.Tensor] = None
+
+    def _fp8_weight_cache_key_for(self, weight: torch.Tensor) -> Tuple[int, ...]:
+        if self.scaling_type_weight is ScalingType.STATIC:
+            return (id(weight), weight._version, self.fp8_static_scale_weight._version)
+        return (id(weight), weight._version)
+
+    def cast_weight_to_float8_t_cached(self, weight: torch.Tensor) -> torch.Tensor:
+        """
+        Same as `cast_weight_to_float8_t(weight, ..., self.get_weight_scale(weight))`,
+        but reuses the previous cast until the cache is cleared, which happens after
+        every optimizer step that updates the weight and after `load_state_dict`. In
+        eager mode, the cache is also refreshed when the weight (or its static scale)
+        is modified in place some other way. torch.compile can't guard on version
+        counters, so compiled callers that modify the weight outside of an optimizer
+        step have to call `clear_fp8_weight_cache` themselves.
+        """
+        is_compiling = torch.compiler.is_compiling()
+        is_valid = self._fp8_weight_cache_valid and (
+            is_compiling
+            or self._fp8_weight_cache_key == self._fp8_weight_cache_key_for(weight)
+        )
+        if not is_valid:
+            with torch.no_grad():
+                weight_fp8 = hp_tensor_and_scale_to_float8(
+                    weight,
+                    self.get_weight_scale(weight),
+                    e4m3_dtype,
+                    self.linear_mm_config,
+                    gemm_input_role=GemmInputRole.WEIGHT,
+                )
+                if (
+                    self._fp8_weight_cache_data is None
+                    or self._fp8_weight_cache_data.shape != weight_fp8._data.shape
+                ):
+                    self._fp8_weight_cache_data = weight_fp8._data
+                    self._fp8_weight_cache_scale = weight_fp8._scale
+                else:
+                    self._fp8_weight_cache_data.copy_(weight_fp8._data)
+                    self._fp8_weight_cache_scale.copy_(weight_fp8._scale)
+            self._fp8_weight_cache_valid = True
+            if not is_compiling:
+                self._fp8_weight_cache_key = self._fp8_weight_cache_key_for(weight)
+        return _CachedFloat8WeightFunc.apply(
+            weight,
+            self._fp8_weight_cache_data,
+            self._fp8_weight_cache_scale,
+            self.linear_mm_config,
+        ).t()
+
     def cast_output_to_float8_in_bw(self, output: torch.Tensor) -> torch.Tensor:
         if self.scaling_type_grad_output is ScalingType.DELAYED:
             scale_fn_name = self.config.delayed_scaling_config.scale_fn_name
@@ -565,11 +699,13 @@ class Float8Linear(torch.nn.Linear):
 
         if not has_any_axiswise_scaling:
             input_fp8 = self.cast_input_to_float8(input, self.is_amax_initialized)
-            # If force_recompute_fp8_weight_in_bwd, we only recompute the fp8 weight,
-            # weight_scale should be saved.
-            weight_scale = self.get_weight_scale(self.weight)
 
-            if self.config.force_recompute_fp8_weight_in_bwd:
+            if self.config.cache_fp8_weight and not isinstance(self.weight, Float8Tensor):
+                weight_fp8_t = self.cast_weight_to_float8_t_cached(self.weight)
+            elif self.config.force_recompute_fp8_weight_in_bwd:
+                # If force_recompute_fp8_weight_in_bwd, we only recompute the fp8 weight,
+                # weight_scale should be saved.
+                weight_scale = self.get_weight_scale(self.weight)
                 weight_fp8_t = checkpoint.checkpoint(
                     self.cast_weight_to_float8_t,
                     self.weight,
@@ -577,6 +713,7 @@ class Float8Linear(torch.nn.Linear):
                     weight_scale,
                 )
             else:
+                weight_scale = self.get_weight_scale(self.weight)
                 weight_fp8_t = self.cast_weight_to_float8_t(
                     self.weight, self.is_amax_initialized, weight_scale
                 )
@@ -169,6 +169,24 @@ def get_float8_layers(model: torch.nn.Module):
     return fp8_layers
 
 
+def clear_float8_weight_cache(model: torch.nn.Module) -> None:
+    """
+    Drops the cached float8 weight casts of all Float8Linear layers in `model`,
+    see `Float8LinearConfig.cache_fp8_weight`.
+
+    The caches are already cleared after every optimizer step that updates the
+    weights and after `load_state_dict`. This is needed for other weight updates
+    under torch.compile, which can't detect them (eager mode also checks the
+    weights' version counters).
+
+    Args:
+        model (torch.nn.Module): The model to clear the float8 weight caches of
+    """
+    for child in model.modules():
+        if isinstance(child, Float8Linear):
+            child.clear_fp8_weight_cache()
+
+
 @torch.no_grad()
 def sync_float8_amax_and_scale_history(model: torch.nn.Module, fp8_layers=None) -> None:
     """
@@ -4,8 +4,12 @@
 # This source code is licensed under the BSD 3-Clause license found in the
 # LICENSE file in the root directory of this source tree.
 
+from typing import Optional
+
 import torch
 
+from torchao.profiler.device_spec import DeviceSpec
+
 BYTES_PER_EL_FLOAT8 = 1
 BYTES_PER_EL_BF16 = 2
 
@@ -112,8 +116,14 @@ def get_tensor_memory_traffic_bytes(
         return kernel_1_r + kernel_1_w + tc_adjustment
 
 
-def get_gemm_time_sympy(M, K, N, dtype):
+def get_gemm_time_sympy(M, K, N, dtype, device_spec: Optional[DeviceSpec] = None):
     gemm_ops = 2 * M * K * N + 2 * M * N * K + 2 * K * M * N
+    if device_spec is not None:
+        # measured specs (e.g. CPUDeviceSpec) are already achievable numbers
+        assert (
+            dtype in device_spec.flops_by_dtype
+        ), f"no FLOPs data for {dtype} in {device_spec.name}"
+        return gemm_ops / device_spec.flops_by_dtype[dtype]
     if dtype is torch.bfloat16:
         peak_tops = H100_BF16_PEAK_TOPS
     elif dtype in (torch.float8_e4m3fn, torch.float8_e5m2):
@@ -130,6 +140,7 @@ def get_float8_mem_sympy(
     scaling_type_input: str = "dynamic",
     scaling_type_weight: str = "dynamic",
     scaling_type_grad_output: str = "dynamic",
+    device_spec: Optional[DeviceSpec] = None,
 ):
 
     assert scaling_type_input in ("dynamic", "delayed"), "unsupported"
@@ -181,9 +192,12 @@ def get_float8_mem_sympy(
         gi_fp8_grad_output_mem + gi_fp8_weight_mem + \
         gw_fp8_input_t_mem + gw_fp8_grad_output_mem
     fp8_total_mem = fwd_fp8_total_mem + bwd_fp8_total_mem
-    fp8_mem_time_s = (
-        fp8_total_mem / H100_PEAK_MEM_BW_BYTES_SEC / H100_PCT_ACHIEVABLE_MEM_BW
-    )
+    if device_spec is not None:
+        fp8_mem_time_s = fp8_total_mem / device_spec.bandwidth
+    else:
+        fp8_mem_time_s = (
+            fp8_total_mem / H100_PEAK_MEM_BW_BYTES_SEC / H100_PCT_ACHIEVABLE_MEM_BW
+        )
 
     # Adjust final estimate for small kernel launches
     # note that we do this adjustment here because we are assuming a minimal
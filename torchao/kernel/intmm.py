@@ -2,7 +2,7 @@ import itertools
 import os
 import torch
 
-from torchao.utils import TORCH_VERSION_AT_LEAST_2_2
+from torchao.utils import TORCH_VERSION_AT_LEAST_2_2, TORCH_VERSION_AT_LEAST_2_4
 
 try:
     # Only works for torch2.2 or newer.
@@ -23,7 +23,7 @@ if TORCH_VERSION_AT_LEAST_2_2:
     def safe_int_mm(input: torch.Tensor, mat2: torch.Tensor) -> torch.Tensor:
         """
         Performs a safe integer matrix multiplication, considering different paths for
-        torch.compile, cublas, and fallback cases.
+        torch.compile, cublas, cpu (oneDNN) and fallback cases.
 
         Args:
             input (torch.Tensor): The input tensor of shape [i, j].
@@ -44,6 +44,17 @@ if TORCH_VERSION_AT_LEAST_2_2:
             mat2.device == input.device
         ), f"need both tensors to be on the same device but got {mat2.device} and {input.device}"
         device_cpu = "cpu" in [mat2.device.type, input.device.type]
+
+        # cpu path, torch._int_mm dispatches to a oneDNN int8 gemm (VNNI/AMX where available)
+        # with int32 accumulation and has no shape constraints on cpu
+        if (
+            device_cpu
+            and TORCH_VERSION_AT_LEAST_2_4
+            and input.dtype == torch.int8
+            and mat2.dtype == torch.int8
+        ):
+            return torch._int_mm(input, mat2)
+
         # with input.shape = [i,j] and mat2.shape = [j,k]
         i_is_strictly_greater_than_16 = input.shape[0] > 16
         j_is_nonzero_multiple_of_8 = (input.shape[1] % 8 == 0) and (input.shape[1] > 0)
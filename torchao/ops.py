@@ -9,6 +9,7 @@ lib.define("quant_llm_linear(int EXPONENT, int MANTISSA, Tensor _in_feats, Tenso
 lib.define("unpack_tensor_core_tiled_layout(Tensor packed_w, int inner_k_tiles) -> Tensor")
 lib.define("dequantize_tensor_core_tiled_layout(Tensor packed_w, Tensor scales_and_zeros, int group_size, int inner_k_tiles) -> Tensor")
 lib.define("marlin_24_gemm(Tensor x, Tensor weight_marlin, Tensor meta, Tensor s, Tensor workspace, int bits, int size_m, int size_n, int size_k) -> Tensor")
+lib.define("blocksparse_int_mm(Tensor crow_indices, Tensor col_indices, Tensor values, Tensor A, int M) -> Tensor")
 
 
 def register_custom_op(name):
@@ -275,3 +276,31 @@ def _(
     torch._check(workspace.numel() >= min_workspace_size, lambda: f"workspace.numel = {workspace.numel()} is below min_workspace_size = {min_workspace_size}")
 
     return torch.empty((x.size(0), s.size(1)), dtype=x.dtype, device=x.device)
+
+
+def blocksparse_int_mm(crow_indices: Tensor, col_indices: Tensor, values: Tensor, A: Tensor, M: int) -> Tensor:
+    """
+    Int8 block sparse (BSR) weight times dense int8 activation, accumulated in int32, on CPU.
+    Block rows are split across threads with `at::parallel_for`.
+
+    Args:
+        crow_indices: BSR compressed row indices of the weight
+        col_indices: BSR column indices of the weight
+        values: int8 tensor of shape `nnz x bs_m x bs_k`, fastest when laid out with
+            `torchao.sparsity.prototype.superblock.blocksparse.side_by_side_block_values`
+        A: int8 tensor of shape `K x N`
+        M: number of rows of the weight
+
+    Returns:
+        torch.tensor of shape `M x N`, dtype is torch.int32
+    """
+    return torch.ops.torchao.blocksparse_int_mm.default(crow_indices, col_indices, values, A, M)
+
+
+@register_custom_op("torchao::blocksparse_int_mm")
+def _(crow_indices: Tensor, col_indices: Tensor, values: Tensor, A: Tensor, M: int) -> Tensor:
+    torch._check(values.dim() == 3, lambda: f"values should be a 3d tensor, got {values.dim()}D")
+    torch._check(values.dtype is torch.int8, lambda: f"values must be INT8, got {values.dtype}")
+    torch._check(A.dim() == 2, lambda: f"A should be a 2d tensor, got {A.dim()}D")
+    torch._check(A.dtype is torch.int8, lambda: f"A must be INT8, got {A.dtype}")
+    return torch.empty((M, A.size(1)), dtype=torch.int32, device=A.device)
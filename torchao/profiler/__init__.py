@@ -1,12 +1,13 @@
 
 # Re-exports
-from .device_spec import CUDADeviceSpec, DeviceSpec
+from .device_spec import CPUDeviceSpec, CUDADeviceSpec, DeviceSpec, calibrate_device
 from .performance_counter import (
     CUDAPerformanceTimer,
     PerformanceCounterMode,
     PerformanceStats,
     PerformanceTimer,
     TransformerPerformanceCounter,
+    register_flop_formula,
 )
 from .utils import total_model_params
 
@@ -16,7 +17,10 @@ __all__ = [
     "PerformanceStats",
     "PerformanceTimer",
     "TransformerPerformanceCounter",
+    "register_flop_formula",
+    "CPUDeviceSpec",
     "CUDADeviceSpec",
+    "calibrate_device",
     "DeviceSpec",
     "total_model_params",
 ]
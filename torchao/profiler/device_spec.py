@@ -1,13 +1,20 @@
+import json
+import os
+import platform
+import socket
 from dataclasses import dataclass, field, fields
-from typing import Dict, Optional, Union
+from typing import Dict, Optional, Sequence, Union
 
 import torch
+import torch.utils.benchmark as benchmark
 
 """This module contains the device specs for theoretical peak performance calculations.
 
 - Contains a list of available chips and their corresponding theoretical peak FLOPs performance for various torch.dtypes.
 - Exposes a DeviceSpec interface and a concrete CUDADeviceSpec implementation for CUDA gpus.  Extendable to other device types.
 - Where possible, the CUDADeviceSpec auto-populates its fields by utilizing `torch.cuda` API and `triton.runtime.driver`.
+- For devices without a spec table (e.g. CPUs), `calibrate_device` measures achievable bandwidth and per-dtype GEMM
+  throughput with microbenchmarks and caches the results on disk; `CPUDeviceSpec` is populated from it.
 
 """
 # Copied from https://github.com/Lightning-AI/pytorch-lightning/blob/master/src/lightning/fabric/utilities/throughput.py
@@ -280,6 +287,152 @@ def get_flops_by_dtype(chip_name: str) -> dict[torch.dtype, float]:
     return _AVAILABLE_GPU_SPECS.get(chip_name, None)
 
 
+# ------------------------- Calibration ------------------------- #
+_DEFAULT_CALIBRATION_DTYPES = (torch.float32, torch.bfloat16, torch.int8)
+_CALIBRATION_CACHE_ENV = "TORCHAO_DEVICE_SPEC_CACHE"
+
+
+def _time_stmt(stmt: str, globals: dict, num_threads: int, min_run_time: float) -> float:
+    # benchmark.Timer handles cuda synchronization and pins the thread count
+    timer = benchmark.Timer(stmt=stmt, globals=globals, num_threads=num_threads)
+    return timer.blocked_autorange(min_run_time=min_run_time).median
+
+
+def measure_bandwidth(
+    device: str = "cpu",
+    num_threads: Optional[int] = None,
+    numel: int = 2**24,
+    min_run_time: float = 0.2,
+) -> Dict[str, float]:
+    """
+    STREAM-style memory bandwidth measurement in bytes / s.
+
+    `numel` should be chosen so that each fp32 array is well beyond the last level cache.
+    Returns a dict with the "copy" (a = b) and "triad" (a = b + s * c) bandwidths.
+    """
+    num_threads = num_threads or torch.get_num_threads()
+    a = torch.empty(numel, dtype=torch.float32, device=device)
+    b = torch.rand(numel, dtype=torch.float32, device=device)
+    c = torch.rand(numel, dtype=torch.float32, device=device)
+    nbytes = a.element_size() * numel
+    env = {"torch": torch, "a": a, "b": b, "c": c}
+
+    copy_s = _time_stmt("a.copy_(b)", env, num_threads, min_run_time)
+    triad_s = _time_stmt("torch.add(b, c, alpha=3.0, out=a)", env, num_threads, min_run_time)
+    return {"copy": 2 * nbytes / copy_s, "triad": 3 * nbytes / triad_s}
+
+
+def measure_gemm_flops(
+    dtype: torch.dtype,
+    device: str = "cpu",
+    num_threads: Optional[int] = None,
+    size: int = 1024,
+    min_run_time: float = 0.2,
+) -> Optional[float]:
+    """
+    Achievable GEMM throughput in FLOP / s for a square `size` x `size` matmul in `dtype`.
+
+    int8 is measured with `torch._int_mm`. Returns None if the device has no kernel for `dtype`.
+    """
+    num_threads = num_threads or torch.get_num_threads()
+    if dtype == torch.int8:
+        a = torch.randint(-128, 127, (size, size), dtype=torch.int8, device=device)
+        b = torch.randint(-128, 127, (size, size), dtype=torch.int8, device=device)
+        stmt = "torch._int_mm(a, b)"
+    else:
+        a = torch.randn(size, size, device=device).to(dtype)
+        b = torch.randn(size, size, device=device).to(dtype)
+        stmt = "torch.mm(a, b)"
+    env = {"torch": torch, "a": a, "b": b}
+    try:
+        eval(stmt, env)
+    except (RuntimeError, NotImplementedError):
+        return None
+    return 2 * size**3 / _time_stmt(stmt, env, num_threads, min_run_time)
+
+
+def _calibration_cache_path(device: str, num_threads: int, cache_dir: Optional[str]) -> str:
+    if cache_dir is None:
+        cache_dir = os.environ.get(
+            _CALIBRATION_CACHE_ENV,
+            os.path.join(os.path.expanduser("~"), ".cache", "torchao", "device_specs"),
+        )
+    key = f"{socket.gethostname()}-{device.replace(':', '')}-{num_threads}threads"
+    return os.path.join(cache_dir, f"{key}.json")
+
+
+def calibrate_device(
+    device: str = "cpu",
+    num_threads: Optional[int] = None,
+    dtypes: Sequence[torch.dtype] = _DEFAULT_CALIBRATION_DTYPES,
+    cache_dir: Optional[str] = None,
+    force: bool = False,
+    bandwidth_numel: int = 2**24,
+    gemm_size: int = 1024,
+    min_run_time: float = 0.2,
+) -> Dict[str, Union[float, Dict[torch.dtype, float]]]:
+    """
+    Measure achievable memory bandwidth and per-dtype GEMM throughput for `device` using `num_threads` threads.
+
+    Results are cached as json keyed by hostname, device and thread count (default location
+    `~/.cache/torchao/device_specs`, overridable with `cache_dir` or the TORCHAO_DEVICE_SPEC_CACHE env var).
+    Cached dtypes are reused and only missing ones are measured unless `force=True`.
+
+    Returns a dict with:
+        - bandwidth (bytes / s): max of the STREAM copy and triad bandwidths
+        - bandwidth_copy, bandwidth_triad (bytes / s)
+        - flops_by_dtype (dict[torch.dtype, float]): FLOP / s, dtypes without a kernel are omitted
+    """
+    num_threads = num_threads or torch.get_num_threads()
+    path = _calibration_cache_path(device, num_threads, cache_dir)
+
+    cached = {}
+    if not force and os.path.exists(path):
+        with open(path) as f:
+            cached = json.load(f)
+
+    if "bandwidth_copy" not in cached:
+        bw = measure_bandwidth(device, num_threads, bandwidth_numel, min_run_time)
+        cached["bandwidth_copy"] = bw["copy"]
+        cached["bandwidth_triad"] = bw["triad"]
+    flops = cached.setdefault("flops_by_dtype", {})
+    for dtype in dtypes:
+        key = str(dtype).replace("torch.", "")
+        if key not in flops:
+            flops[key] = measure_gemm_flops(dtype, device, num_threads, gemm_size, min_run_time)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(cached, f, indent=2)
+
+    return {
+        "bandwidth": max(cached["bandwidth_copy"], cached["bandwidth_triad"]),
+        "bandwidth_copy": cached["bandwidth_copy"],
+        "bandwidth_triad": cached["bandwidth_triad"],
+        "flops_by_dtype": {
+            getattr(torch, k): v for k, v in flops.items() if v is not None
+        },
+    }
+
+
+def get_cpu_name() -> str:
+    name = platform.processor() or platform.machine()
+    if os.path.exists("/proc/cpuinfo"):
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    name = line.split(":", 1)[1].strip()
+                    break
+    return name
+
+
+def get_system_memory() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
 @dataclass
 class DeviceSpec:
     """
@@ -419,3 +572,59 @@ class CUDADeviceSpec(DeviceSpec):
 
         # Issue post check warnings
         self._post_init_check()
+
+
+@dataclass
+class CPUDeviceSpec(DeviceSpec):
+    """
+    CPU specs for achievable peak performance, conformant with DeviceSpec interface.
+
+    There is no spec table for CPUs, so missing bandwidth / FLOPs fields are measured with
+    `calibrate_device` for the given thread count and cached on disk keyed by host.
+
+    Fields and expected units:
+        - name (str): cpu model name
+        - bandwidth (bytes /s): measured STREAM bandwidth in bytes / s
+        - flops_per_s (FLOP / s): measured GEMM FLOPs per second for `dtype`
+        - vram (bytes): system memory in bytes
+        - dtype (torch.dtype): dtype used for peak performance, defaults to torch.float32
+        - flops_by_dtype (dict[Union[torch.dtype, str], float]): mapping from dtype to FLOP / s
+        - num_threads (int): number of threads to calibrate for, defaults to torch.get_num_threads()
+        - calibrate (bool): whether to run microbenchmarks for missing fields
+        - cache_dir (str): calibration cache directory, see `calibrate_device`
+    """
+
+    device_type: str = "cpu"
+    num_threads: Optional[int] = None
+    calibrate: bool = True
+    cache_dir: Optional[str] = None
+
+    def __post_init__(self):
+        if self.name is None:
+            self.name = get_cpu_name()
+        if self.dtype is None:
+            self.dtype = torch.float32
+        if self.num_threads is None:
+            self.num_threads = torch.get_num_threads()
+
+        if self.calibrate and (self.bandwidth is None or self.flops_per_s is None):
+            dtypes = set(_DEFAULT_CALIBRATION_DTYPES) | {self.dtype}
+            calibration = calibrate_device(
+                "cpu", self.num_threads, sorted(dtypes, key=str), self.cache_dir
+            )
+            if self.bandwidth is None:
+                self.bandwidth = calibration["bandwidth"]
+            for dtype, flops in calibration["flops_by_dtype"].items():
+                self.flops_by_dtype.setdefault(dtype, flops)
+            if self.flops_per_s is None:
+                if self.dtype in self.flops_by_dtype:
+                    self.flops_per_s = self.flops_by_dtype[self.dtype]
+                else:
+                    print(
+                        f"Could not measure FLOPs for dtype {self.dtype} on device {self.name}"
+                    )
+
+        if self.vram is None:
+            self.vram = get_system_memory()
+
+        self._post_init_check()
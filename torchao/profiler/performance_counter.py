@@ -13,13 +13,150 @@ from pathlib import Path
 from typing import Any, Dict, Optional, Union
 
 import torch
-from torch.utils._pytree import tree_map
+from torch.overrides import TorchFunctionMode
+from torch.utils._python_dispatch import is_traceable_wrapper_subclass
+from torch.utils._pytree import tree_flatten, tree_map
 from torch.utils.flop_counter import FlopCounterMode
 
 from .device_spec import DeviceSpec
 
 aten = torch.ops.aten
 
+# FLOP formulas for the kernels used by torchao that are not in the upstream `flop_registry`,
+# keyed by qualified op name ("namespace::op") so that ops from optional extensions can be
+# registered before (or without) being loaded.
+# Formulas are called as `formula(*args, **kwargs, out_val=out)` with the raw op arguments.
+_TORCHAO_FLOP_REGISTRY: Dict[str, Any] = {}
+
+
+def register_flop_formula(*op_names):
+    """Registers a FLOP formula for ops that ``PerformanceCounterMode`` should count, e.g.
+
+    >>> @register_flop_formula("mylib::my_mm")
+    >>> def my_mm_flop(a, b, out_val=None):
+    >>>     return 2 * a.shape[0] * a.shape[1] * b.shape[1]
+
+    Returning 0 still counts the IO of the op.
+    """
+
+    def decorator(formula):
+        for op_name in op_names:
+            _TORCHAO_FLOP_REGISTRY[op_name] = formula
+        return formula
+
+    return decorator
+
+
+def _matmul_flop(k, out):
+    # every output element is a length-k dot product
+    return 2 * out.numel() * k
+
+
+@register_flop_formula(
+    "aten::_int_mm",
+    "aten::_scaled_mm",
+    "aten::_weight_int4pack_mm",
+    "aten::_weight_int8pack_mm",
+    "torchao::scaled_int8_mm",
+)
+def _mm_like_flop(a, *args, out_val=None, **kwargs):
+    return _matmul_flop(a.shape[-1], out_val)
+
+
+@register_flop_formula("torchao::quant_llm_linear")
+def _quant_llm_linear_flop(exponent, mantissa, in_feats, *args, out_val=None, **kwargs):
+    return _matmul_flop(in_feats.shape[-1], out_val)
+
+
+@register_flop_formula("torchao::marlin_24_gemm")
+def _marlin_24_gemm_flop(x, weight_marlin, meta, s, workspace, bits, size_m, size_n, size_k, out_val=None):
+    # 2:4 sparse weight, half of the multiply-adds of the dense matmul are executed
+    return size_m * size_n * size_k
+
+
+@register_flop_formula("blocksparse::int_addmm")
+def _blocksparse_int_addmm_flop(crow_indices, col_indices, values, A, *args, out_val=None, **kwargs):
+    # only the stored blocks of the (M, K) weight are multiplied with the (K, N) input
+    return 2 * values.numel() * (A.numel() // A.shape[-2])
+
+
+@register_flop_formula("blocksparse::linear")
+def _blocksparse_linear_flop(A, crow_indices, col_indices, values, M, K, bias, out_val=None):
+    return 2 * values.numel() * (A.numel() // K)
+
+
+for _nbit in range(1, 8):
+    register_flop_formula(
+        f"torchao::_linear_8bit_act_{_nbit}bit_weight",
+        f"torchao::_linear_8bit_act_{_nbit}bit0zp_weight",
+    )(_mm_like_flop)
+
+
+@register_flop_formula(
+    "blocksparse::bsr_to_dense",
+    "torchao::dequantize_tensor_core_tiled_layout",
+    "torchao::unpack_tensor_core_tiled_layout",
+)
+def _no_flop(*args, out_val=None, **kwargs):
+    return 0
+
+
+def _get_stored_nbytes(x: torch.Tensor) -> int:
+    """
+    Bytes actually stored for ``x``. Tensor subclasses such as ``AffineQuantizedTensor``, ``UintxTensor`` or
+    ``NF4Tensor`` are flattened down to the plain tensors of their layout, so packed data is billed at its
+    packed size rather than at the logical dtype of the subclass.
+    """
+    if is_traceable_wrapper_subclass(x):
+        inner_names, _ = x.__tensor_flatten__()
+        return sum(
+            _get_stored_nbytes(getattr(x, name))
+            for name in inner_names
+            if getattr(x, name) is not None
+        )
+    return x.numel() * x.element_size()
+
+
+# torch functions whose subclass implementations are counted as a single matmul, see `_SubclassMatmulMode`
+_SUBCLASS_MATMUL_FUNCS = {
+    torch.nn.functional.linear: lambda args: args[0].shape[-1],
+    torch.matmul: lambda args: args[0].shape[-1],
+    torch.mm: lambda args: args[0].shape[-1],
+    torch.bmm: lambda args: args[0].shape[-1],
+    torch.addmm: lambda args: args[1].shape[-1],
+    torch.Tensor.matmul: lambda args: args[0].shape[-1],
+    torch.Tensor.__matmul__: lambda args: args[0].shape[-1],
+}
+
+
+class _SubclassMatmulMode(TorchFunctionMode):
+    """
+    Counts matmuls with a tensor subclass operand (e.g. a linear with an ``AffineQuantizedTensor`` weight) at the
+    torch function level: ``2 * M * N * K`` FLOPs and the stored bytes of the operands and output. The ops that
+    the subclass dispatches to (dequantize + mm, or a packed kernel) are not counted again, since how a layout
+    implements the matmul should not change the FLOPs and bytes it is billed for.
+    """
+
+    def __init__(self, counter):
+        super().__init__()
+        self.counter = counter
+
+    def __torch_function__(self, func, types, args=(), kwargs=None):
+        kwargs = kwargs if kwargs else {}
+        if func not in _SUBCLASS_MATMUL_FUNCS or not any(
+            is_traceable_wrapper_subclass(a) for a in tree_flatten((args, kwargs))[0]
+        ):
+            return func(*args, **kwargs)
+
+        self.counter._subclass_matmul_depth += 1
+        try:
+            out = func(*args, **kwargs)
+        finally:
+            self.counter._subclass_matmul_depth -= 1
+        flop_count = _matmul_flop(_SUBCLASS_MATMUL_FUNCS[func](args), out)
+        self.counter._record(func, flop_count, *self.counter._count_io(func, out, args, kwargs))
+        return out
+
 
 class DeviceInfoMissing(UserWarning):
     pass
@@ -42,13 +179,29 @@ class PerformanceCounterMode(FlopCounterMode):
     - ``get_total_io``: returns the total number of IO operations across all modules
     - ``get_summary_io_counts``: returns a summary of the IO counts for each module (totals by operator)
     - ``get_summary_flop_counts``: returns a summary of the flop counts for each module (totals by operator)
+
+    Quantized models are supported: the kernels used by torchao are counted with the formulas in
+    ``_TORCHAO_FLOP_REGISTRY`` (see ``register_flop_formula``), IO is counted with the stored size of
+    tensor subclasses (see ``_get_stored_nbytes``), and matmuls with a tensor subclass operand are
+    counted once at the torch function level (see ``_SubclassMatmulMode``).
     """
 
     def __init__(self, display=False, depth=10, debug=False):
         self.debug = debug
         self.io_counts = defaultdict(lambda: defaultdict(int))
+        self._subclass_matmul_depth = 0
+        self._subclass_matmul_mode = _SubclassMatmulMode(self)
         super().__init__(display=display, depth=depth)
 
+    def __enter__(self):
+        super().__enter__()
+        self._subclass_matmul_mode.__enter__()
+        return self
+
+    def __exit__(self, *args):
+        self._subclass_matmul_mode.__exit__(*args)
+        super().__exit__(*args)
+
     def get_io_counts(self):
         return {k: dict(v) for k, v in self.io_counts.items()}
 
@@ -57,9 +210,7 @@ class PerformanceCounterMode(FlopCounterMode):
 
     def _get_io_sizes(self, args):
         sizes = tree_map(
-            lambda x: x.numel() * x.element_size()
-            if isinstance(x, torch.Tensor)
-            else 0,
+            lambda x: _get_stored_nbytes(x) if isinstance(x, torch.Tensor) else 0,
             args,
         )
         if not hasattr(sizes, "__len__"):
@@ -129,25 +280,35 @@ class PerformanceCounterMode(FlopCounterMode):
         return arg_size, kwargs_size, out_size
 
     def _count_flops(self, func_packet, out, args, kwargs):
+        if self._subclass_matmul_depth > 0:
+            # already counted by `_SubclassMatmulMode`
+            return out
+
         if func_packet in self.flop_registry:
             flop_count_func = self.flop_registry[func_packet]
-            flop_count = flop_count_func(*args, **kwargs, out_val=out)  # type: ignore[operator]
-            arg_size, kwarg_size, out_size = self._count_io(
-                func_packet, out, args, kwargs
-            )
-            total_size = arg_size + kwarg_size + out_size
-
-            for par in set(self.mod_tracker.parents):
-                if self.debug:
-                    print(f"Counting flops for {par}, {func_packet}: {flop_count}")
-                    print(
-                        f"Counting io for {par}, {func_packet}: {sum([arg_size, kwarg_size, out_size])} = {arg_size} + {kwarg_size} + {out_size}"
-                    )
-                self.flop_counts[par][func_packet] += flop_count
-                self.io_counts[par][func_packet] += total_size
+        elif func_packet._qualified_op_name in _TORCHAO_FLOP_REGISTRY:
+            flop_count_func = _TORCHAO_FLOP_REGISTRY[func_packet._qualified_op_name]
+        else:
+            return out
 
+        flop_count = flop_count_func(*args, **kwargs, out_val=out)  # type: ignore[operator]
+        self._record(
+            func_packet, flop_count, *self._count_io(func_packet, out, args, kwargs)
+        )
         return out
 
+    def _record(self, func_packet, flop_count, arg_size, kwarg_size, out_size):
+        total_size = arg_size + kwarg_size + out_size
+
+        for par in set(self.mod_tracker.parents):
+            if self.debug:
+                print(f"Counting flops for {par}, {func_packet}: {flop_count}")
+                print(
+                    f"Counting io for {par}, {func_packet}: {sum([arg_size, kwarg_size, out_size])} = {arg_size} + {kwarg_size} + {out_size}"
+                )
+            self.flop_counts[par][func_packet] += flop_count
+            self.io_counts[par][func_packet] += total_size
+
 
 class PerformanceTimer:
     """
@@ -22,7 +22,7 @@ from .core import(
 
 assert len(_DTYPE_TO_BIT_WIDTH) > 0, "Error importing low bit torch.uint dtypes. Please upgrade to torch 2.3+"
 
-def insert_awq_observer_(model: torch.nn.Module, n_validation_examples: int, validation_sequence_len: int,  quant_dtype: torch.dtype = torch.uint4,   scale_search_space_size: int = 20, group_size: int = 128):
+def insert_awq_observer_(model: torch.nn.Module, n_validation_examples: int, validation_sequence_len: int,  quant_dtype: torch.dtype = torch.uint4,   scale_search_space_size: int = 20, group_size: int = 128, use_gram: bool = False):
     """
     Inserts AWQObserver into Linear layers of a given model.
 
@@ -33,6 +33,7 @@ def insert_awq_observer_(model: torch.nn.Module, n_validation_examples: int, val
         quant_dtype: The data type of the quantized weights. Currently only torch.uint4 is intended to be used but can be used with torch.uint1 -> torch.uint8
         scale search space size: how many different scale options to try. Original AWQ implementation uses 20. A larger size can lead to better results but takes longer to calibrate
         group_size: Quantization granularity. Use -1 for channel wise quantization
+        use_gram: Score the scale options from the input Gram matrix X^T X of all calibration tokens in one batched pass instead of replaying the stored validation examples. n_validation_examples and validation_sequence_len are then unused
     """
     _is_linear = lambda m, fqn: isinstance(m, torch.nn.Linear)
     assert quant_dtype in _DTYPE_TO_BIT_WIDTH or quant_dtype == torch.uint8, "Invalid quant_dtype. Please use torch.uint1 .. torch.uint8"
@@ -63,7 +64,8 @@ def insert_awq_observer_(model: torch.nn.Module, n_validation_examples: int, val
             zero_point_dtype = zero_point_dtype,
             quant_min=quant_min,
             quant_max = quant_max,
-            eps = eps)
+            eps = eps,
+            use_gram = use_gram)
         return AWQObservedLinear.from_float(layer, observer)
     _replace_with_custom_fn_if_matches_filter(model, replace_with_observer, _is_linear)
 
@@ -10,6 +10,8 @@ from torchao.dtypes import to_affine_quantized_intx
 from torchao.quantization.quant_primitives import (
     MappingType,
     ZeroPointDomain,
+    choose_qparams_affine,
+    fake_quantize_affine,
 )
 from torchao.quantization.observer import (
     AffineQuantizedObserverBase, GranularityType
@@ -33,6 +35,7 @@ class AWQObserver(AffineQuantizedObserverBase):
         zero_point_dtype: Optional[torch.dtype] = None,
         preserve_zero: Optional[bool] = True,
         zero_point_domain = ZeroPointDomain.INT,
+        use_gram: bool = False,
     ):
         """
         A custom observer for Activation aware Weight Quantization (AWQ)
@@ -55,6 +58,9 @@ class AWQObserver(AffineQuantizedObserverBase):
             preserve_zero: A flag to indicate whether we need zero to be exactly
                 representable or not.
             zero_point_domain: The domain of the zero point.
+            use_gram: Instead of storing validation examples, accumulate the input Gram matrix X^T X of every
+                calibration token and score all scale options from it in one batched pass. Uses in_features^2
+                floats per layer, which is less than the stored examples once the validation tokens exceed in_features
         """
         super().__init__(
             mapping_type,
@@ -79,6 +85,9 @@ class AWQObserver(AffineQuantizedObserverBase):
         self.scale_options = scale_search_space_size
         self.device = self.weight.device
         self.average =  torch.zeros((1,weight.shape[1]), device= self.device)
+        self.use_gram = use_gram
+        if self.use_gram:
+            self.gram = torch.zeros((weight.shape[1], weight.shape[1]), device=self.device)
         if self.bias is not None:
             self.bias.to(self.device)
     @torch.no_grad()
@@ -86,7 +95,10 @@ class AWQObserver(AffineQuantizedObserverBase):
         # import pdb
         # pdb.set_trace()
         # print(input.shape, input.abs().sum(1).shape, self.average.shape)
-        if len(self.inputs) < self.n_validation_examples:
+        if self.use_gram:
+            x = input.reshape(-1, input.shape[-1]).float()
+            self.gram.addmm_(x.t(), x)
+        elif len(self.inputs) < self.n_validation_examples:
             self.inputs.append(input.to("cpu"))
             self.outputs.append(output.to("cpu"))
         self.calibration_token_count += input.shape[-2]
@@ -97,6 +109,8 @@ class AWQObserver(AffineQuantizedObserverBase):
     def calculate_qparams(self):
         # import pdb
         # pdb.set_trace()
+        if self.use_gram:
+            return self._calculate_qparams_from_gram()
         assert self.outputs != None, "calibrate observer first by running model on exemplar data"
         self.average /= (self.calibration_token_count)
         for i in range(self.n_validation_examples):
@@ -138,6 +152,51 @@ class AWQObserver(AffineQuantizedObserverBase):
                 self.outputs[i].to("cpu")
         return best_scales.detach()
 
+    @torch.no_grad()
+    def _calculate_qparams_from_gram(self):
+        # the output error of a scale option over all calibration tokens X is
+        # ||X (W - Q(W * s) / s)^T||^2 = sum over rows d of d X^T X d^T, so every option can be scored from the
+        # Gram matrix without replaying activations
+        assert self.calibration_token_count > 0, "calibrate observer first by running model on exemplar data"
+        average = self.average / self.calibration_token_count
+        ratios = torch.arange(self.scale_options, device=self.device) / self.scale_options
+        scales = average.pow(ratios[:, None])
+        scales = (scales / (scales.amax(-1, keepdim=True) * scales.amin(-1, keepdim=True)).sqrt()).to(self.weight.dtype)
+        # same quantization as `to_affine_quantized_intx` in `calculate_qparams`, with a leading dim for the options
+        block_size = (1, 1, self.quantization_granularity.group_size)
+        loss = torch.zeros(self.scale_options, device=self.device)
+        # all options are scored together, on chunks of rows so the (options, rows, in_features) candidates stay
+        # about the size of the weight
+        rows = max(1, self.weight.shape[0] // self.scale_options)
+        for weight in self.weight.detach().split(rows):
+            scaled_weight = weight * scales[:, None]
+            scale, zero_point = choose_qparams_affine(
+                scaled_weight,
+                self.mapping_type,
+                block_size,
+                torch.uint8,
+                quant_min = self.quant_min,
+                quant_max = self.quant_max,
+                eps = self.eps,
+                scale_dtype = self.scale_dtype,
+                zero_point_dtype = self.zero_point_dtype,
+                preserve_zero = self.preserve_zero,
+                zero_point_domain = self.zero_point_domain,
+            )
+            w = fake_quantize_affine(
+                scaled_weight,
+                block_size,
+                scale,
+                zero_point,
+                torch.uint8,
+                self.quant_min,
+                self.quant_max,
+                self.zero_point_domain,
+            )
+            diff = weight.float() - w.float() / scales[:, None].float()
+            loss += ((diff @ self.gram) * diff).sum((-2, -1))
+        return scales[loss.argmin()][None].detach()
+
 class AWQObservedLinear(torch.nn.Linear):
     def __init__(self, in_features: int, out_features: int, act_obs: torch.nn.Module, bias: bool = True, device=None, dtype=None):
         super().__init__(in_features, out_features, bias, device, dtype)
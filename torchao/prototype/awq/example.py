@@ -168,7 +168,8 @@ def wikitext2_ppl(
         print(f"running {quant_dtype} calibration")
         t0 = time.time()
         # insert observers to find average magnitude and calculate scales
-        insert_awq_observer_(model,validation_size, sequence_length, quant_dtype=quant_dtype, group_size=group_size)
+        use_gram = "gram" in quant
+        insert_awq_observer_(model,validation_size, sequence_length, quant_dtype=quant_dtype, group_size=group_size, use_gram=use_gram)
         calibration_data = get_calib_dataset(tokenizer=tokenizer, n_samples=calibration_size, block_size=sequence_length)
         for batch in calibration_data:
             model(batch.to(device))
@@ -200,7 +201,7 @@ if __name__ == "__main__":
 
     # Optional arguments with default values
     parser.add_argument("repo", type=str, help="Repository ID of the model.")
-    parser.add_argument("quant", type=str, help="Quantization method. Options are either awq-uint<x>-<group_size> for x =[1..8], int4wo-<group_size>, or int4wo-<group_size>-hqq.")
+    parser.add_argument("quant", type=str, help="Quantization method. Options are either awq-uint<x>-<group_size> for x =[1..8] (append -gram to search scales from Gram statistics), int4wo-<group_size>, or int4wo-<group_size>-hqq.")
     parser.add_argument("--tasks", type=list[str], help="Task to benchmark model on. Either PPL or QA", default=["PPL"])
     parser.add_argument("--calibration_samples", type=int, default=10, help="Number of samples to use for calibration. Default is 10.")
     parser.add_argument("--validation_size", type=int, default=1, help="Validation size. Default is 1.")
@@ -3,6 +3,7 @@ import logging
 import bitsandbytes as bnb
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 from bitsandbytes.nn import Linear4bit
 from hqq.core.quantize import BaseQuantizeConfig, HQQBackend, HQQLinear
 
@@ -65,6 +66,12 @@ class DoRALinear(nn.Module):
     returns the base weight.
 
     For `bnb` and `hqq`, the respective `dequantize` method can be substituted.
+
+    When no gradient is needed for the DoRA parameters (`torch.no_grad()`, `torch.inference_mode()` or frozen
+    `lora_A`, `lora_B` and `magnitude_vec`), `magnitude_scale` is computed once and cached. After `merge()`,
+    `magnitude_scale * (base_weight + lora_B @ lora_A)` is also folded into a single (optionally requantized)
+    weight, so that the forward pass is a single linear. The cached values are recomputed automatically when
+    `lora_A`, `lora_B` or `magnitude_vec` are updated.
     """
 
     def __init__(self, base_layer, lora_rank, *args, **kwargs):
@@ -78,7 +85,7 @@ class DoRALinear(nn.Module):
         self.base_layer = base_layer
 
         # Initialize magnitude vec - TODO: this is clunky, better way to init?
-        base_weight = self.dequantize().clone().cuda()
+        base_weight = self.dequantize().clone().to(device)
         self.magnitude_vec = nn.Parameter(base_weight.norm(p=2, dim=1))
 
         del base_weight
@@ -95,12 +102,101 @@ class DoRALinear(nn.Module):
             **kwargs,
         )
 
+        # Inference caches, plain tensor attributes so that they are not part of the state dict
+        self.merged = False
+        self._merge_apply_tensor_subclass = None
+        self._cache_key = None
+        self._cached_magnitude_scale = None
+        self._merged_weight = None
+
     def dequantize(self):
         return self.base_layer.weight
 
+    def _dora_params(self):
+        return (
+            self.magnitude_vec,
+            self.dora_layer.lora_A.weight,
+            self.dora_layer.lora_B.weight,
+        )
+
+    def _use_inference_cache(self):
+        # Cached values carry no autograd history
+        return not (
+            torch.is_grad_enabled() and any(p.requires_grad for p in self._dora_params())
+        )
+
+    def _current_cache_key(self):
+        # In-place updates (optimizer steps, `copy_`, `load_state_dict`) bump `_version`,
+        # `.data` reassignment and `.to()` change `data_ptr`
+        return tuple((p._version, p.data_ptr()) for p in self._dora_params())
+
+    def _update_inference_cache(self):
+        key = self._current_cache_key()
+        if key == self._cache_key:
+            return
+
+        # Build the cache as normal tensors even under `torch.inference_mode()`: inference tensors can't be
+        # saved for backward, and the cache is also used by grad enabled calls with frozen DoRA params
+        with torch.no_grad(), torch.inference_mode(False):
+            self._build_inference_cache()
+        self._cache_key = key
+
+    def _build_inference_cache(self):
+        dq_base_weight = self.dequantize()
+        lora_A_weight = self.dora_layer.lora_A.weight
+        lora_B_weight = self.dora_layer.lora_B.weight
+        dora_weight = dq_base_weight + lora_B_weight @ lora_A_weight
+        self._cached_magnitude_scale = self.magnitude_vec / dora_weight.norm(p=2, dim=1)
+
+        self._merged_weight = None
+        if self.merged:
+            merged_weight = dora_weight * self._cached_magnitude_scale[:, None]
+            if self._merge_apply_tensor_subclass is not None:
+                from torchao.quantization.quant_api import quantize_
+
+                out_features, in_features = merged_weight.shape
+                linear = nn.Linear(
+                    in_features,
+                    out_features,
+                    bias=False,
+                    device=merged_weight.device,
+                    dtype=merged_weight.dtype,
+                )
+                linear.weight = nn.Parameter(merged_weight, requires_grad=False)
+                quantize_(linear, self._merge_apply_tensor_subclass)
+                merged_weight = linear.weight
+            self._merged_weight = merged_weight
+
+    def merge(self, apply_tensor_subclass=None):
+        """Fold `magnitude_scale * (base_weight + lora_B @ lora_A)` into a single weight used by the forward
+        pass whenever no gradient is needed for the DoRA parameters.
+
+        Args:
+            apply_tensor_subclass: optional quantization config for `torchao.quantization.quant_api.quantize_`,
+                e.g. `int8_weight_only()`, used to requantize the merged weight. The merged weight is kept in the
+                dequantized dtype if `None`.
+        """
+        self.merged = True
+        self._merge_apply_tensor_subclass = apply_tensor_subclass
+        self._cache_key = None
+        return self
+
+    def unmerge(self):
+        self.merged = False
+        self._merge_apply_tensor_subclass = None
+        self._merged_weight = None
+        self._cache_key = None
+        return self
+
     def forward(self, x, *args, **kwargs):
         # Out shape is either bs, seqlen, out_features or bs * seqlen, out_features
         assert x.ndim == 2 or x.ndim == 3, "Expected 2D or 3D input"
+        use_cache = self._use_inference_cache()
+        if use_cache:
+            self._update_inference_cache()
+            if self.merged:
+                return F.linear(x, self._merged_weight)
+
         dq_base_weight = self.dequantize()
         out_shape = [*x.shape[:-1], dq_base_weight.shape[0]]
         # Reshape to (bs * seqlen, out_features)
@@ -112,8 +208,13 @@ class DoRALinear(nn.Module):
         lora_out = (x @ lora_A_weight.T) @ lora_B_weight.T
 
         # DoRA magnitude scale
-        column_norm = (dq_base_weight + lora_B_weight @ lora_A_weight).norm(p=2, dim=1)
-        magnitude_scale = self.magnitude_vec / column_norm
+        if use_cache:
+            magnitude_scale = self._cached_magnitude_scale
+        else:
+            column_norm = (dq_base_weight + lora_B_weight @ lora_A_weight).norm(
+                p=2, dim=1
+            )
+            magnitude_scale = self.magnitude_vec / column_norm
 
         # DoRA update
         dora_out = (x @ dq_base_weight.T + lora_out) * magnitude_scale[None, :]
@@ -127,6 +228,11 @@ class DoRALinear(nn.Module):
         See README.md for description of fused kernels.
         """
         assert x.ndim == 2 or x.ndim == 3, "Expected 2D or 3D input"
+        use_cache = self._use_inference_cache()
+        if use_cache:
+            self._update_inference_cache()
+            if self.merged:
+                return F.linear(x, self._merged_weight)
 
         dq_base_weight = self.dequantize()
         # Out shape is either bs, seqlen, out_features or bs * seqlen, out_features
@@ -141,14 +247,17 @@ class DoRALinear(nn.Module):
 
         # DoRA magnitude
         # Fused kernel #1: `magnitude_scale = (base_weight + lora_B @ lora_A).norm(p=2, dim=1) * magnitude_vector`
-        magnitude_scale = triton_mm_small_k(
-            lora_B_weight,
-            lora_A_weight,
-            epilogue_norm=True,
-            source=dq_base_weight,
-            magnitude=self.magnitude_vec,
-            store_acc=False,
-        )
+        if use_cache:
+            magnitude_scale = self._cached_magnitude_scale
+        else:
+            magnitude_scale = triton_mm_small_k(
+                lora_B_weight,
+                lora_A_weight,
+                epilogue_norm=True,
+                source=dq_base_weight,
+                magnitude=self.magnitude_vec,
+                store_acc=False,
+            )
         # DoRA update
         # Fused kernel #2:  `out = (x @ base_weight + lora_out) * magnitude_scale`
         dora_out = triton_mm(
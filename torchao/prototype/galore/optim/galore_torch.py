@@ -13,60 +13,98 @@ from torch.optim import Optimizer
 
 from bitsandbytes.optim.optimizer import Optimizer2State
 
+from torchao.prototype.galore.utils import get_orthogonal_matrix_randomized
+
 
 class GaLoreProjector:
+    """
+    Args:
+        svd_type (`str`, defaults to `"exact"`):
+            `"exact"` recomputes the projection with a full `torch.linalg.svd` at every refresh.
+            `"randomized"` uses a randomized range finder, warm-started from the previous projection
+            after the first refresh, which only costs a few (m x n) @ (n x rank) matmuls.
+        power_iters (`int`, defaults to 1):
+            Subspace iterations per refresh for `svd_type="randomized"`.
+        oversample (`int`, defaults to 8):
+            Extra sketch columns beyond `rank` for `svd_type="randomized"`.
+        refresh_offset (`int`, defaults to 0):
+            The projection is refreshed when `(iter + refresh_offset) % update_proj_gap == 0`. Giving
+            parameters different offsets spreads the refresh cost over several steps.
+    """
+
     def __init__(
-        self, rank, verbose=False, update_proj_gap=200, scale=1.0, proj_type="std"
+        self,
+        rank,
+        verbose=False,
+        update_proj_gap=200,
+        scale=1.0,
+        proj_type="std",
+        svd_type="exact",
+        power_iters=1,
+        oversample=8,
+        refresh_offset=0,
     ):
+        if svd_type not in ("exact", "randomized"):
+            raise ValueError(f"svd_type should be exact or randomized, got {svd_type}")
         self.rank = rank
         self.verbose = verbose
         self.update_proj_gap = update_proj_gap
         self.scale = scale
         self.ortho_matrix = None
         self.proj_type = proj_type
+        self.svd_type = svd_type
+        self.power_iters = power_iters
+        self.oversample = oversample
+        self.refresh_offset = refresh_offset
+
+    def _should_refresh(self, iter):
+        return (
+            self.ortho_matrix is None
+            or (iter + self.refresh_offset) % self.update_proj_gap == 0
+        )
 
     def project(self, full_rank_grad, iter):
 
         if self.proj_type == "std":
             if full_rank_grad.shape[0] >= full_rank_grad.shape[1]:
-                if self.ortho_matrix is None or iter % self.update_proj_gap == 0:
+                if self._should_refresh(iter):
                     self.ortho_matrix = self.get_orthogonal_matrix(
                         full_rank_grad, self.rank, type="right"
                     )
                 low_rank_grad = torch.matmul(full_rank_grad, self.ortho_matrix.t())
             else:
-                if self.ortho_matrix is None or iter % self.update_proj_gap == 0:
+                if self._should_refresh(iter):
                     self.ortho_matrix = self.get_orthogonal_matrix(
                         full_rank_grad, self.rank, type="left"
                     )
                 low_rank_grad = torch.matmul(self.ortho_matrix.t(), full_rank_grad)
         elif self.proj_type == "reverse_std":
             if full_rank_grad.shape[0] >= full_rank_grad.shape[1]:
-                if self.ortho_matrix is None or iter % self.update_proj_gap == 0:
+                if self._should_refresh(iter):
                     self.ortho_matrix = self.get_orthogonal_matrix(
                         full_rank_grad, self.rank, type="left"
                     )
                 low_rank_grad = torch.matmul(self.ortho_matrix.t(), full_rank_grad)
             else:
-                if self.ortho_matrix is None or iter % self.update_proj_gap == 0:
+                if self._should_refresh(iter):
                     self.ortho_matrix = self.get_orthogonal_matrix(
                         full_rank_grad, self.rank, type="right"
                     )
                 low_rank_grad = torch.matmul(full_rank_grad, self.ortho_matrix.t())
         elif self.proj_type == "right":
-            if self.ortho_matrix is None or iter % self.update_proj_gap == 0:
+            if self._should_refresh(iter):
                 self.ortho_matrix = self.get_orthogonal_matrix(
                     full_rank_grad, self.rank, type="right"
                 )
             low_rank_grad = torch.matmul(full_rank_grad, self.ortho_matrix.t())
         elif self.proj_type == "left":
-            if self.ortho_matrix is None or iter % self.update_proj_gap == 0:
+            if self._should_refresh(iter):
                 self.ortho_matrix = self.get_orthogonal_matrix(
                     full_rank_grad, self.rank, type="left"
                 )
             low_rank_grad = torch.matmul(self.ortho_matrix.t(), full_rank_grad)
         elif self.proj_type == "full":
-            if self.ortho_matrix is None or iter % self.update_proj_gap == 0:
+            if self._should_refresh(iter):
                 self.ortho_matrix = self.get_orthogonal_matrix(
                     full_rank_grad, self.rank, type="full"
                 )
@@ -104,6 +142,16 @@ class GaLoreProjector:
 
     # svd decomposition
     def get_orthogonal_matrix(self, weights, rank, type):
+        if self.svd_type == "randomized":
+            return get_orthogonal_matrix_randomized(
+                weights,
+                rank,
+                type,
+                init=self.ortho_matrix,
+                power_iters=self.power_iters,
+                oversample=self.oversample,
+            )
+
         module_params = weights
 
         if module_params.data.dtype != torch.float:
@@ -142,6 +190,25 @@ class GaLoreProjector:
             raise ValueError("type should be left, right or full")
 
 
+def _make_projector(group, pindex):
+    # with `stagger_proj_refresh`, the parameters of a group refresh their projections at
+    # evenly spaced steps instead of all on the same step
+    update_proj_gap = group["update_proj_gap"]
+    refresh_offset = 0
+    if group.get("stagger_proj_refresh", False):
+        refresh_offset = pindex * update_proj_gap // len(group["params"])
+    return GaLoreProjector(
+        group["rank"],
+        update_proj_gap=update_proj_gap,
+        scale=group["scale"],
+        proj_type=group["proj_type"],
+        svd_type=group.get("svd_type", "exact"),
+        power_iters=group.get("power_iters", 1),
+        oversample=group.get("oversample", 8),
+        refresh_offset=refresh_offset,
+    )
+
+
 class AdamW(Optimizer):
     """
     Implements Adam algorithm with weight decay fix as introduced in [Decoupled Weight Decay
@@ -215,7 +282,7 @@ class AdamW(Optimizer):
             loss = closure()
 
         for group in self.param_groups:
-            for p in group["params"]:
+            for pindex, p in enumerate(group["params"]):
                 if p.grad is None:
                     continue
                 grad = p.grad
@@ -232,12 +299,7 @@ class AdamW(Optimizer):
                 # GaLore Projection
                 if "rank" in group:
                     if "projector" not in state:
-                        state["projector"] = GaLoreProjector(
-                            group["rank"],
-                            update_proj_gap=group["update_proj_gap"],
-                            scale=group["scale"],
-                            proj_type=group["proj_type"],
-                        )
+                        state["projector"] = _make_projector(group, pindex)
 
                     grad = state["projector"].project(grad, state["step"])
 
@@ -354,12 +416,7 @@ class AdamW8bit(Optimizer2State):
                 # GaLore Projection
                 if "rank" in group:
                     if "projector" not in state:
-                        state["projector"] = GaLoreProjector(
-                            group["rank"],
-                            update_proj_gap=group["update_proj_gap"],
-                            scale=group["scale"],
-                            proj_type=group["proj_type"],
-                        )
+                        state["projector"] = _make_projector(group, pindex)
 
                     if "weight_decay" in group and group["weight_decay"] > 0:
                         # ensure that the weight decay is not applied to the norm grad
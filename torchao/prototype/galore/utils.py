@@ -40,6 +40,79 @@ def get_orthogonal_matrix(weights, rank, type):
         raise ValueError("type should be left, right or full")
 
 
+def _randomized_svd(matrix, rank, init=None, power_iters=1, oversample=8):
+    """Leading `rank` singular vectors of `matrix` (m x n) from a randomized range finder
+    (Halko et al., 2011), returned as `(U, Vh)` with shapes (m, rank) and (rank, n).
+
+    `init` is an (m, rank) estimate of the left singular subspace, e.g. the basis from the previous
+    GaLore refresh. It replaces the leading columns of the random sketch, so the power iterations
+    refine the old subspace instead of starting from scratch.
+    """
+    m, n = matrix.shape
+    k = min(rank + oversample, m, n)
+    if init is not None and init.shape[0] == m:
+        init = init[:, :k]
+        sketch = matrix @ torch.randn(n, k - init.shape[1], device=matrix.device, dtype=matrix.dtype)
+        sketch = torch.cat([init, sketch], dim=1)
+    else:
+        sketch = matrix @ torch.randn(n, k, device=matrix.device, dtype=matrix.dtype)
+
+    for _ in range(power_iters):
+        Q = torch.linalg.qr(sketch).Q
+        sketch = matrix @ (matrix.t() @ Q)
+    Q = torch.linalg.qr(sketch).Q
+
+    # exact SVD of the small (k x n) projection
+    Ub, _, Vh = torch.linalg.svd(Q.t() @ matrix, full_matrices=False)
+    return Q @ Ub[:, :rank], Vh[:rank, :]
+
+
+def get_orthogonal_matrix_randomized(
+    weights, rank, type, init=None, power_iters=1, oversample=8
+):
+    """Drop-in replacement for `get_orthogonal_matrix` that approximates the truncated SVD with
+    `_randomized_svd`. `init` is the value previously returned for the same `weights` shape and
+    `type`; passing it warm-starts the subspace iteration.
+    """
+    module_params = weights
+
+    if module_params.data.dtype != torch.float:
+        float_data = False
+        original_type = module_params.data.dtype
+        original_device = module_params.data.device
+        matrix = module_params.data.float()
+    else:
+        float_data = True
+        matrix = module_params.data
+
+    if type == "right":
+        # right singular vectors of the matrix are the left singular vectors of its transpose
+        if init is not None:
+            init = init.float().t()
+        V, _ = _randomized_svd(matrix.t(), rank, init, power_iters, oversample)
+        B = V.t()
+        if not float_data:
+            B = B.to(original_device).type(original_type)
+        return B
+    elif type == "left":
+        if init is not None:
+            init = init.float()
+        A, _ = _randomized_svd(matrix, rank, init, power_iters, oversample)
+        if not float_data:
+            A = A.to(original_device).type(original_type)
+        return A
+    elif type == "full":
+        if init is not None:
+            init = init[0].float()
+        A, B = _randomized_svd(matrix, rank, init, power_iters, oversample)
+        if not float_data:
+            A = A.to(original_device).type(original_type)
+            B = B.to(original_device).type(original_type)
+        return [A, B]
+    else:
+        raise ValueError("type should be left, right or full")
+
+
 class TestGaLoreProjector:
     def __init__(
         self,
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 import torch
 from torch import Tensor
@@ -11,7 +11,11 @@ from .subclass_fp8 import OptimStateFp8
 
 
 class _AdamBase(Optimizer):
-    def __init__(self, params, lr, betas, eps, weight_decay, amsgrad, *, block_size, is_adamw) -> None:
+    # max number of params updated by a single compiled multi-tensor call. bounds compile time
+    # and the size of the generated graph.
+    multi_tensor_chunk_size = 64
+
+    def __init__(self, params, lr, betas, eps, weight_decay, amsgrad, *, block_size, is_adamw, foreach=False) -> None:
         if not 0.0 <= lr:
             raise ValueError("Invalid learning rate: {}".format(lr))
         if not 0.0 <= eps:
@@ -24,6 +28,7 @@ class _AdamBase(Optimizer):
         super().__init__(params, defaults)
         self.block_size = block_size
         self.is_adamw = is_adamw
+        self.foreach = foreach
 
     def __setstate__(self, state):
         super().__setstate__(state)
@@ -59,10 +64,20 @@ class _AdamBase(Optimizer):
             with torch.enable_grad():
                 loss = closure()
 
-        # for a given model, the number of different argument combinations to single_param_adam() is fixed.
-        # thus, it is safe to disable cache limit without the risk of always re-compiling.
+        # for a given model, the number of different argument combinations to single_param_adam() and
+        # multi_param_adam() is fixed. thus, it is safe to disable cache limit without the risk of always re-compiling.
         with torch._dynamo.utils.disable_cache_limit():
             for group in self.param_groups:
+                buckets = dict()
+                group_args = (
+                    group["lr"],
+                    group["betas"][0],
+                    group["betas"][1],
+                    group["weight_decay"],
+                    group["eps"],
+                    self.is_adamw,
+                )
+
                 for p in group["params"]:
                     if p.grad is None:
                         continue
@@ -89,23 +104,43 @@ class _AdamBase(Optimizer):
                             "optim.param_groups[0]['lr'].fill_(new_lr)"
                         )
 
-                    torch.compile(single_param_adam, fullgraph=True, dynamic=False)(
+                    param_args = (
                         p,
                         grad,
                         state["step"],
                         state["exp_avg"],
                         state["exp_avg_sq"],
                         state.get("max_exp_avg_sq", None),
-                        group["lr"],
-                        group["betas"][0],
-                        group["betas"][1],
-                        group["weight_decay"],
-                        group["eps"],
-                        self.is_adamw,
                     )
+                    if self.foreach:
+                        buckets.setdefault(self._bucket_key(p, state), []).append(param_args)
+                    else:
+                        torch.compile(single_param_adam, fullgraph=True, dynamic=False)(*param_args, *group_args)
+
+                # each bucket holds params whose optim states are the same subclass with the same block size,
+                # so the whole chunk is dequantized, updated and requantized by one compiled graph.
+                for bucket in buckets.values():
+                    for i in range(0, len(bucket), self.multi_tensor_chunk_size):
+                        chunk = bucket[i : i + self.multi_tensor_chunk_size]
+                        torch.compile(multi_param_adam, fullgraph=True, dynamic=False)(
+                            *[list(x) for x in zip(*chunk)], *group_args
+                        )
 
         return loss
 
+    @staticmethod
+    def _bucket_key(p: Tensor, state):
+        exp_avg = state["exp_avg"]
+        if isinstance(exp_avg, DTensor):
+            exp_avg = exp_avg.to_local()
+        return (
+            type(p),
+            p.dtype,
+            p.device,
+            type(exp_avg),
+            getattr(exp_avg, "block_size", None),
+        )
+
 
 # this will work with any optim state tensor subclass that implements aten.lerp.Scalar and aten.copy_.default
 # and param tensor subclass that implements aten.add_.Tensor, and aten.addcdiv_.default
@@ -154,6 +189,30 @@ def single_param_adam(
         p.addcdiv_(new_exp_avg, denom, value=-step_size)
 
 
+# multi-tensor version of single_param_adam(). all arguments except the hyperparameters are lists with one entry
+# per param. when compiled, the updates of all params are traced into a single graph.
+def multi_param_adam(
+    params: List[Tensor],
+    grads: List[Tensor],
+    steps: List[Tensor],
+    exp_avgs: List[Tensor],
+    exp_avg_sqs: List[Tensor],
+    max_exp_avg_sqs: List[Optional[Tensor]],
+    lr: Tensor,
+    beta1: float,
+    beta2: float,
+    weight_decay: float,
+    eps: float,
+    is_adamw: bool,
+):
+    for p, grad, step, exp_avg, exp_avg_sq, max_exp_avg_sq in zip(
+        params, grads, steps, exp_avgs, exp_avg_sqs, max_exp_avg_sqs
+    ):
+        single_param_adam(
+            p, grad, step, exp_avg, exp_avg_sq, max_exp_avg_sq, lr, beta1, beta2, weight_decay, eps, is_adamw
+        )
+
+
 class Adam8bit(_AdamBase):
     def __init__(
         self,
@@ -165,8 +224,9 @@ class Adam8bit(_AdamBase):
         amsgrad=False,
         *,
         block_size=256,
+        foreach=False,
     ) -> None:
-        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=False)
+        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=False, foreach=foreach)
 
     @staticmethod
     def _subclass_zeros(p: Tensor, signed: bool, block_size: int):
@@ -184,8 +244,9 @@ class Adam4bit(_AdamBase):
         amsgrad=False,
         *,
         block_size=128,
+        foreach=False,
     ) -> None:
-        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=False)
+        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=False, foreach=foreach)
 
     @staticmethod
     def _subclass_zeros(p: Tensor, signed: bool, block_size: int):
@@ -203,8 +264,9 @@ class AdamFp8(_AdamBase):
         amsgrad=False,
         *,
         block_size=256,
+        foreach=False,
     ) -> None:
-        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=False)
+        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=False, foreach=foreach)
 
     @staticmethod
     def _subclass_zeros(p: Tensor, signed: bool, block_size: int):
@@ -222,8 +284,9 @@ class AdamW8bit(_AdamBase):
         amsgrad=False,
         *,
         block_size=256,
+        foreach=False,
     ) -> None:
-        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=True)
+        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=True, foreach=foreach)
 
     @staticmethod
     def _subclass_zeros(p: Tensor, signed: bool, block_size: int):
@@ -241,8 +304,9 @@ class AdamW4bit(_AdamBase):
         amsgrad=False,
         *,
         block_size=128,
+        foreach=False,
     ) -> None:
-        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=True)
+        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=True, foreach=foreach)
 
     @staticmethod
     def _subclass_zeros(p: Tensor, signed: bool, block_size: int):
@@ -260,8 +324,9 @@ class AdamWFp8(_AdamBase):
         amsgrad=False,
         *,
         block_size=256,
+        foreach=False,
     ) -> None:
-        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=True)
+        super().__init__(params, lr, betas, eps, weight_decay, amsgrad, block_size=block_size, is_adamw=True, foreach=foreach)
 
     @staticmethod
     def _subclass_zeros(p: Tensor, signed: bool, block_size: int):
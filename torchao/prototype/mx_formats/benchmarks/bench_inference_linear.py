@@ -0,0 +1,103 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+
+# This source code is licensed under the license found in the
+# LICENSE file in the root directory of this source tree.
+
+"""
+Benchmarking MXInferenceLinear latency and peak memory of the full weight
+upcast path against the tile-streamed path
+"""
+
+from typing import Optional
+
+import fire
+import tabulate
+import torch
+
+from torch.profiler import profile, ProfilerActivity
+from torchao.prototype.mx_formats.constants import (  # noqa: E501
+    DTYPE_FP6_E2M3,
+    DTYPE_FP6_E3M2,
+    SUPPORTED_ELEM_DTYPES,
+)
+
+from torchao.prototype.mx_formats.mx_linear import MXInferenceLinear
+from torchao.utils import benchmark_torch_function_in_microseconds
+
+
+def _peak_extra_memory_bytes(f, *args):
+    """Peak memory allocated by `f(*args)` on top of what is already allocated"""
+    if args[0].is_cuda:
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+        start = torch.cuda.memory_allocated()
+        f(*args)
+        torch.cuda.synchronize()
+        return torch.cuda.max_memory_allocated() - start
+
+    # on cpu, replay the allocations and frees recorded by the profiler, which
+    # are attributed to the innermost op or to `[memory]` events outside of ops
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        f(*args)
+    events = sorted(prof.events(), key=lambda e: e.time_range.start)
+    cur, peak = 0, 0
+    for e in events:
+        cur += e.self_cpu_memory_usage
+        peak = max(peak, cur)
+    return peak
+
+
+def run(
+    M: int = 16,
+    K: int = 4096,
+    N: int = 11008,
+    block_size: int = 32,
+    tile_size: int = 32,
+    device: Optional[str] = None,
+):
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    headers = [
+        "elem_dtype",
+        "pack_fp6",
+        "tile_size",
+        "weight_bytes",
+        "time_us",
+        "peak_extra_mem_bytes",
+    ]
+    results = []
+
+    linear = torch.nn.Linear(K, N, bias=False, dtype=torch.bfloat16, device=device)
+    x = torch.randn(M, K, dtype=torch.bfloat16, device=device)
+
+    for elem_dtype in SUPPORTED_ELEM_DTYPES:
+        is_fp6 = elem_dtype in (DTYPE_FP6_E2M3, DTYPE_FP6_E3M2)
+        for pack_fp6 in (False, True) if is_fp6 else (False,):
+            for cur_tile_size in (None, tile_size):
+                m = MXInferenceLinear.from_float(
+                    linear, elem_dtype, block_size, pack_fp6, cur_tile_size
+                )
+                weight_bytes = (
+                    m.weight_mx._data.numel() * m.weight_mx._data.element_size()
+                    + m.weight_mx._scale_e8m0.numel()
+                )
+                time_us = benchmark_torch_function_in_microseconds(m, x)
+                peak_bytes = _peak_extra_memory_bytes(m, x)
+                results.append(
+                    [
+                        elem_dtype,
+                        pack_fp6,
+                        cur_tile_size,
+                        weight_bytes,
+                        time_us,
+                        peak_bytes,
+                    ]
+                )
+
+    print(f"M={M}, K={K}, N={N}, block_size={block_size}, device={device}")
+    print(tabulate.tabulate(results, headers=headers))
+
+
+if __name__ == "__main__":
+    fire.Fire(run)
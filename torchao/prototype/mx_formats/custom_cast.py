@@ -486,3 +486,41 @@ def pack_uint4(uint8_data) -> torch.Tensor:
     assert shape[-1] % 2 == 0
     uint8_data = uint8_data.contiguous().view(-1)
     return (uint8_data[::2] << 4 | uint8_data[1::2]).view(down_size(shape))
+
+
+def unpack_uint6(uint8_data) -> torch.Tensor:
+    """Inverse of `pack_uint6`, returns one fp6 value per byte in bits 0-5"""
+    assert uint8_data.is_contiguous()
+
+    shape = uint8_data.shape
+    assert shape[-1] % 3 == 0, f"{shape} last dim not divisible by three"
+    uint8_data = uint8_data.view(-1, 3)
+    byte0, byte1, byte2 = uint8_data[:, 0], uint8_data[:, 1], uint8_data[:, 2]
+    unpacked = torch.stack(
+        [
+            byte0 >> 2,
+            ((byte0 & 0b11) << 4) | (byte1 >> 4),
+            ((byte1 & 0b1111) << 2) | (byte2 >> 6),
+            byte2 & 0b111111,
+        ],
+        dim=-1,
+    )
+    return unpacked.view(*shape[:-1], shape[-1] // 3 * 4)
+
+
+def pack_uint6(uint8_data) -> torch.Tensor:
+    """Packs fp6 values stored one per byte in bits 0-5 into 3 bytes per 4 values,
+    along the last dimension"""
+    shape = uint8_data.shape
+    assert shape[-1] % 4 == 0, f"{shape} last dim not divisible by four"
+    uint8_data = uint8_data.contiguous().view(-1, 4)
+    a, b, c, d = (uint8_data[:, i] for i in range(4))
+    packed = torch.stack(
+        [
+            (a << 2) | (b >> 4),
+            ((b & 0b1111) << 4) | (c >> 2),
+            ((c & 0b11) << 6) | d,
+        ],
+        dim=-1,
+    )
+    return packed.view(*shape[:-1], shape[-1] // 4 * 3)
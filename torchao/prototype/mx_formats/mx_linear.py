@@ -16,7 +16,7 @@ inference, and to a tensor subclass weight wrapper + module hooks for training.
 import torch
 import torch.nn.functional as F
 
-from torchao.prototype.mx_formats.mx_tensor import MXTensor, to_mx
+from torchao.prototype.mx_formats.mx_tensor import MXTensor, to_dtype, to_mx
 
 
 @torch._dynamo.allow_in_graph
@@ -66,14 +66,54 @@ class MXLinear(torch.nn.Linear):
         return y
 
 
+def _mx_linear_tiled(x, weight_mx, bias, tile_size):
+    """
+    Computes `F.linear(x, weight_mx.to_dtype(x.dtype), bias)` while only
+    dequantizing `tile_size` input features of the weight at a time, so that
+    the extra memory is one `(tile_size, out_features)` tile of the weight
+    instead of the whole high precision weight. Accumulates in float32.
+    """
+    # `weight_mx` is the transpose of a row-major (in_features, out_features)
+    # MX tensor with blocks along out_features, so a tile of input features is
+    # a slice of rows of both `_data` and `_scale_e8m0`
+    data = weight_mx._data.t()
+    assert data.is_contiguous()
+    out_features, in_features = weight_mx.shape
+    scale = weight_mx._scale_e8m0.view(in_features, -1)
+
+    x_2d = x.reshape(-1, in_features)
+    y = torch.zeros(x_2d.shape[0], out_features, dtype=torch.float, device=x.device)
+    for start in range(0, in_features, tile_size):
+        end = min(start + tile_size, in_features)
+        w_tile = to_dtype(
+            data[start:end],
+            scale[start:end].reshape(-1),
+            weight_mx._elem_dtype,
+            weight_mx._block_size,
+            torch.float,
+            weight_mx._pack_fp6,
+        )
+        y.addmm_(x_2d[:, start:end].float(), w_tile)
+    if bias is not None:
+        y += bias
+    return y.to(x.dtype).reshape(*x.shape[:-1], out_features)
+
+
 class MXInferenceLinear(torch.nn.Linear):
     """
     Inference version of MXLinear, with the weight pre-quantized to MX.
+
+    By default the whole weight is dequantized to high precision in every
+    forward. With `tile_size` set, the matmul is instead accumulated over
+    tiles of `tile_size` input features, dequantizing one tile at a time.
+    Tiling needs `out_features` to be a multiple of `block_size`, other
+    shapes use the default forward. `pack_fp6` stores fp6 weights packed
+    four to three bytes.
     """
 
     @classmethod
     @torch.no_grad()
-    def from_float(cls, mod, elem_dtype, block_size):
+    def from_float(cls, mod, elem_dtype, block_size, pack_fp6=False, tile_size=None):
         with torch.device("meta"):
             super_kwargs = {
                 "in_features": mod.in_features,
@@ -84,14 +124,24 @@ class MXInferenceLinear(torch.nn.Linear):
         # TODO(future PR): set to new_mod.weight directly, will need to work
         # through some errors
         new_mod.weight_mx = MXTensor.to_mx(
-            mod.weight.t().contiguous(), elem_dtype, block_size=block_size
+            mod.weight.t().contiguous(),
+            elem_dtype,
+            block_size=block_size,
+            pack_fp6=pack_fp6,
         ).t()
         new_mod.bias = mod.bias
         new_mod.elem_dtype = elem_dtype
+        # a tile of input features is a slice of whole MX blocks of the weight
+        # only when the blocks along out_features don't straddle rows
+        if mod.out_features % block_size != 0:
+            tile_size = None
+        new_mod.tile_size = tile_size
         return new_mod
 
     @torch.no_grad()
     def forward(self, x):
+        if self.tile_size is not None:
+            return _mx_linear_tiled(x, self.weight_mx, self.bias, self.tile_size)
         w_hp = self.weight_mx.to_dtype(x.dtype)
         y = F.linear(x, w_hp, self.bias)
         return y
@@ -144,6 +194,8 @@ def swap_linear_with_mx_inference_linear(
     elem_dtype,
     block_size,
     filter_fn=None,
+    pack_fp6=False,
+    tile_size=None,
 ):
     if filter_fn is None:
         combined_filter_fn = _is_linear
@@ -155,6 +207,8 @@ def swap_linear_with_mx_inference_linear(
         combined_filter_fn = __fn
     replace_with_custom_fn_if_matches_filter(
         model,
-        lambda mod: MXInferenceLinear.from_float(mod, elem_dtype, block_size),
+        lambda mod: MXInferenceLinear.from_float(
+            mod, elem_dtype, block_size, pack_fp6, tile_size
+        ),
         combined_filter_fn,
     )
@@ -26,6 +26,7 @@ from torchao.prototype.mx_formats.constants import DTYPE_FP4
 from torchao.prototype.mx_formats.mx_tensor import (  # noqa: E501
     MXTensor,
     tensor_size_hp_to_fp4x2,
+    tensor_size_hp_to_fp6x4,
 )
 
 aten = torch.ops.aten
@@ -54,6 +55,7 @@ def mx_desugar_op(aten_op, args, kwargs=None):
         old._elem_dtype,
         old._block_size,
         old._orig_dtype,
+        old._pack_fp6,
     )
     return new
 
@@ -91,6 +93,7 @@ def mx_t(aten_op, args, kwargs=None):
         old._elem_dtype,
         old._block_size,
         old._orig_dtype,
+        old._pack_fp6,
     )
     return new
 
@@ -122,6 +125,8 @@ def mx_view_op(aten_op, args, kwargs=None):
     if args[0]._elem_dtype == DTYPE_FP4:
         # special case fp4 as we pack two elements per byte
         new_size = tensor_size_hp_to_fp4x2(new_size, data.is_contiguous())
+    elif args[0]._pack_fp6:
+        new_size = tensor_size_hp_to_fp6x4(new_size, data.is_contiguous())
     new_data = aten_op(data, new_size, *args[2:], **kwargs)
     return MXTensor(
         args[0]._scale_e8m0,
@@ -129,6 +134,7 @@ def mx_view_op(aten_op, args, kwargs=None):
         args[0]._elem_dtype,
         args[0]._block_size,
         args[0]._orig_dtype,
+        args[0]._pack_fp6,
     )
 
 
@@ -153,6 +159,7 @@ def autocast_to_copy(aten_op, args, kwargs=None):
         args[0]._elem_dtype,
         args[0]._block_size,
         kwargs["dtype"],
+        args[0]._pack_fp6,
     )
     # print('after', res, res.dtype, res._orig_dtype)
     return res
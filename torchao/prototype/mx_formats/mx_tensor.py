@@ -50,8 +50,10 @@ from torchao.prototype.mx_formats.custom_cast import (
     f6_e2m3_unpacked_to_f32,
     f6_e3m2_unpacked_to_f32,
     pack_uint4,
+    pack_uint6,
     triton_f4_to_scaled_bf16,
     unpack_uint4,
+    unpack_uint6,
 )
 
 
@@ -59,10 +61,14 @@ def to_mx(
     data_hp: torch.Tensor,
     elem_dtype: Union[torch.dtype, str],
     block_size: int,
+    pack_fp6: bool = False,
 ):
     """
     Takes a high precision tensor and converts to MX scale and raw data, in
     naive layout (scale and raw data are separate tensors).
+
+    If `pack_fp6` is True, fp6 elements are packed four to three bytes along
+    the last dimension instead of being stored one per byte.
     """
 
     assert data_hp.dtype in (
@@ -73,6 +79,10 @@ def to_mx(
     assert data_hp.numel() % block_size == 0, "unsupported"
     assert data_hp.is_contiguous(), "unsupported"
     assert elem_dtype in SUPPORTED_ELEM_DTYPES, "unsupported"
+    assert not pack_fp6 or elem_dtype in (
+        DTYPE_FP6_E2M3,
+        DTYPE_FP6_E3M2,
+    ), "pack_fp6 requires an fp6 elem_dtype"
 
     # calculate the scale in e8m0 format
 
@@ -165,8 +175,12 @@ def to_mx(
         data_lp = data_lp.to(elem_dtype)
     elif elem_dtype == DTYPE_FP6_E2M3:
         data_lp = f32_to_f6_e2m3_unpacked(data_lp)
+        if pack_fp6:
+            data_lp = pack_uint6(data_lp)
     elif elem_dtype == DTYPE_FP6_E3M2:
         data_lp = f32_to_f6_e3m2_unpacked(data_lp)
+        if pack_fp6:
+            data_lp = pack_uint6(data_lp)
     elif elem_dtype == DTYPE_FP4:
         data_lp = f32_to_f4_unpacked(data_lp)
         data_lp = pack_uint4(data_lp)
@@ -192,7 +206,9 @@ def get_fp_scale(scale_e8m0):
     return s_fp
 
 
-def to_dtype(data_lp, scale_e8m0, elem_dtype, block_size, target_dtype):
+def to_dtype(
+    data_lp, scale_e8m0, elem_dtype, block_size, target_dtype, pack_fp6=False
+):
     orig_shape = data_lp.shape
     is_transposed = not data_lp.is_contiguous()
     # if the underlying data is transposed, convert to row major before
@@ -205,9 +221,15 @@ def to_dtype(data_lp, scale_e8m0, elem_dtype, block_size, target_dtype):
     if elem_dtype in (torch.float8_e4m3fn, torch.float8_e5m2):
         data_hp = data_lp.to(target_dtype)
     elif elem_dtype == DTYPE_FP6_E2M3:
+        if pack_fp6:
+            data_lp = unpack_uint6(data_lp)
+            orig_shape = (*orig_shape[:-1], orig_shape[-1] // 3 * 4)
         data_hp = f6_e2m3_unpacked_to_f32(data_lp)
         data_hp = data_hp.to(target_dtype)
     elif elem_dtype == DTYPE_FP6_E3M2:
+        if pack_fp6:
+            data_lp = unpack_uint6(data_lp)
+            orig_shape = (*orig_shape[:-1], orig_shape[-1] // 3 * 4)
         data_hp = f6_e3m2_unpacked_to_f32(data_lp)
         data_hp = data_hp.to(target_dtype)
     elif elem_dtype == DTYPE_FP4:
@@ -264,6 +286,24 @@ def tensor_size_fp4x2_to_hp(orig_size, is_contiguous):
     return new_size
 
 
+def tensor_size_hp_to_fp6x4(orig_size, is_contiguous):
+    new_size = orig_size
+    if is_contiguous:
+        new_size = [*list(new_size[:-1]), new_size[-1] // 4 * 3]
+    else:
+        new_size = [new_size[0] // 4 * 3, *list(new_size[1:])]
+    return new_size
+
+
+def tensor_size_fp6x4_to_hp(orig_size, is_contiguous):
+    new_size = orig_size
+    if is_contiguous:
+        new_size = [*list(new_size[:-1]), new_size[-1] // 3 * 4]
+    else:
+        new_size = [new_size[0] // 3 * 4, *list(new_size[1:])]
+    return new_size
+
+
 @torch._dynamo.allow_in_graph
 class ToMXConstrFunc(torch.autograd.Function):
     """
@@ -271,15 +311,22 @@ class ToMXConstrFunc(torch.autograd.Function):
     """
 
     @staticmethod
-    def forward(ctx, data_hp, elem_dtype, block_size):
-        scale_e8m0_biased, data_lp = to_mx(data_hp, elem_dtype, block_size)
+    def forward(ctx, data_hp, elem_dtype, block_size, pack_fp6=False):
+        scale_e8m0_biased, data_lp = to_mx(
+            data_hp, elem_dtype, block_size, pack_fp6
+        )
         return MXTensor(
-            scale_e8m0_biased, data_lp, elem_dtype, block_size, data_hp.dtype
+            scale_e8m0_biased,
+            data_lp,
+            elem_dtype,
+            block_size,
+            data_hp.dtype,
+            pack_fp6,
         )
 
     @staticmethod
     def backward(ctx, g):
-        return g, None, None
+        return g, None, None, None
 
 
 @torch._dynamo.allow_in_graph
@@ -296,6 +343,7 @@ class FromMXConstrFunc(torch.autograd.Function):
             tensor_lp._elem_dtype,
             tensor_lp._block_size,
             target_dtype,
+            tensor_lp._pack_fp6,
         )
 
     @staticmethod
@@ -311,6 +359,7 @@ class MXTensor(torch.Tensor):
         elem_dtype,
         block_size,
         orig_dtype,
+        pack_fp6=False,
     ):
         new_size = data_bits.size()
         if elem_dtype == DTYPE_FP4:
@@ -319,6 +368,12 @@ class MXTensor(torch.Tensor):
                 new_size,
                 data_bits.is_contiguous(),
             )
+        elif pack_fp6:
+            # set the tensor size to what it would be without 4x6 packing
+            new_size = tensor_size_fp6x4_to_hp(
+                new_size,
+                data_bits.is_contiguous(),
+            )
         self = torch.Tensor._make_wrapper_subclass(
             cls,
             new_size,
@@ -332,7 +387,10 @@ class MXTensor(torch.Tensor):
             torch.float8_e5m2,
             torch.uint8,
         ), "unsupported"
-        if elem_dtype in (
+        if pack_fp6:
+            assert elem_dtype in (DTYPE_FP6_E2M3, DTYPE_FP6_E3M2), "unsupported"
+            target_numel = scale_e8m0_bits.numel() * block_size * 3 / 4
+        elif elem_dtype in (
             torch.float8_e4m3fn,
             torch.float8_e5m2,
             DTYPE_FP6_E2M3,
@@ -361,6 +419,7 @@ class MXTensor(torch.Tensor):
         self._elem_dtype = elem_dtype
         self._block_size = block_size
         self._orig_dtype = orig_dtype
+        self._pack_fp6 = pack_fp6
         return self
 
     def __repr__(self):
@@ -386,14 +445,16 @@ class MXTensor(torch.Tensor):
         data_hp: torch.Tensor,
         elem_dtype: Union[torch.dtype, str],
         block_size: int = BLOCK_SIZE_DEFAULT,
+        pack_fp6: bool = False,
     ):
-        return ToMXConstrFunc.apply(data_hp, elem_dtype, block_size)
+        return ToMXConstrFunc.apply(data_hp, elem_dtype, block_size, pack_fp6)
 
     def __tensor_flatten__(self):
         ctx = {
             "_elem_dtype": self._elem_dtype,
             "_block_size": self._block_size,
             "_orig_dtype": self._orig_dtype,
+            "_pack_fp6": self._pack_fp6,
         }
         return ["_scale_e8m0", "_data"], ctx
 
@@ -410,6 +471,7 @@ class MXTensor(torch.Tensor):
             metadata["_elem_dtype"],
             metadata["_block_size"],
             metadata["_orig_dtype"],
+            metadata.get("_pack_fp6", False),
         )
 
     # Do not force the MXTensor type on the returned tensor
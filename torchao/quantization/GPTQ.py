@@ -17,7 +17,7 @@ import torch.fx as fx
 import torch.nn as nn
 import torch.nn.functional as F
 
-from torch.utils._pytree import tree_flatten, tree_unflatten
+from torch.utils._pytree import tree_flatten, tree_map, tree_unflatten
 
 from .utils import (
     _lm_eval_available,
@@ -385,7 +385,8 @@ class GenericGPTQRunner(fx.Interpreter):
 
             W[:, i2:] -= Err1.to(Hinv.dtype).matmul(Hinv[i1:i2, i2:])
 
-        torch.cuda.synchronize()
+        if W.is_cuda:
+            torch.cuda.synchronize()
 
         if all_qparams == []:
 
@@ -400,6 +401,222 @@ class GenericGPTQRunner(fx.Interpreter):
         return Q, DQ.to(orig_dtype), all_qparams
 
 
+class _StopForward(Exception):
+    pass
+
+
+class BlockSequentialGPTQRunner:
+    """
+    A GPTQ runner with bounded memory: instead of tracing the whole model and keeping the calibration
+    inputs of every linear like GenericGPTQRunner, it runs one block (e.g. transformer layer) at a time.
+
+    The inputs of the first block are recorded for every calibration sample. Then, for each block,
+    its linears are quantized in the order they run: the calibration samples are run through the block while
+    a forward pre-hook accumulates H = 2 X^T X / n of the next linear in a float32 buffer (linears that get the
+    same input, e.g. q/k/v, share one H and are quantized together by concatenating their weights, since GPTQ
+    treats the rows independently), the linear's weight is replaced with its dequantized value and the next
+    linear sees its quantized output. Finally the block is run again to get the inputs of the next block. Linears outside the blocks (e.g. the output projection) are
+    quantized last, from a pass of the model where the blocks replay their recorded outputs.
+    Peak memory is about one block, one H and the hidden states of the calibration samples, with `device` set
+    only the block being quantized is moved to `device`.
+
+    Note: the weights of the quantized linears in `model` are overwritten with their dequantized values.
+
+    intended to be used in concert with a GPTQQuantizer class to define the quantization mode.
+    """
+
+    configure_quantization_mode = GenericGPTQRunner.configure_quantization_mode
+    faster_quant = GenericGPTQRunner.faster_quant
+
+    def __init__(
+        self,
+        model,
+        inputs: List[_MultiInput],
+        blocksize=128,
+        percdamp=0.01,
+        groupsize=128,
+        blocks: Optional[nn.ModuleList] = None,
+        device: Optional[torch.device] = None,
+    ):
+        self.model = model
+        self.blocks = blocks if blocks is not None else self._find_blocks(model)
+        self.device = device
+        self.inputs = inputs
+        self.blocksize = blocksize
+        self.percdamp = percdamp
+        self.groupsize = groupsize
+        self.id_to_name = {
+            id(module): name for name, module in model.named_modules()
+        }
+        self.new_state_dict = model.state_dict()
+        self.gptq_done = False
+
+    @staticmethod
+    def _find_blocks(model):
+        # the ModuleList holding most of the parameters, e.g. the transformer layers
+        module_lists = [module for module in model.modules() if isinstance(module, nn.ModuleList) and len(module) > 0]
+        assert module_lists, "couldn't find the blocks of the model, pass them with `blocks`"
+        return max(module_lists, key=lambda module: sum(p.numel() for p in module.parameters()))
+
+    def _to_device(self, x):
+        if self.device is None:
+            return x
+        return tree_map(lambda t: t.to(self.device) if isinstance(t, torch.Tensor) else t, x)
+
+    def _calibration_samples(self):
+        num_samples = max(len(x.values) if isinstance(x, _MultiInput) else 1 for x in self.inputs)
+        for i in range(num_samples):
+            yield [x.values[i] if isinstance(x, _MultiInput) else x for x in self.inputs]
+
+    def _record_first_block_inputs(self):
+        block_inputs = []
+        def record(module, args, kwargs):
+            block_inputs.append((args, kwargs))
+            raise _StopForward
+
+        handle = self.blocks[0].register_forward_pre_hook(record, with_kwargs=True)
+        try:
+            for sample in self._calibration_samples():
+                try:
+                    self.model(*sample)
+                except _StopForward:
+                    pass
+        finally:
+            handle.remove()
+        return block_inputs
+
+    def _next_group_hessian(self, run, linears):
+        # H of the first of `linears` to run, shared with the linears that get the same input tensor
+        # (e.g. q/k/v), the forward is stopped as soon as another linear runs
+        group = []
+        H = None
+        num_batches = 0
+        leader_input = None
+
+        def accumulate(module, args):
+            nonlocal H, num_batches, leader_input
+            x = args[0]
+            if not group:
+                group.append(module)
+            if module is group[0]:
+                leader_input = x
+            elif x is leader_input:
+                if module not in group:
+                    group.append(module)
+                return
+            else:
+                raise _StopForward
+            x = self._to_device(self.act_fake_quant_func(x.float()))
+            n = 1 if x.dim() == 2 else x.shape[0]
+            x = x.reshape(-1, x.shape[-1])
+            if H is None:
+                H = torch.zeros(x.shape[-1], x.shape[-1], dtype=torch.float32, device=x.device)
+            H *= num_batches / (num_batches + n)
+            num_batches += n
+            H.addmm_(x.t(), x, alpha=2 / num_batches)
+
+        handles = [linear.register_forward_pre_hook(accumulate) for linear in linears]
+        try:
+            for forward in run():
+                leader_input = None
+                try:
+                    forward()
+                except _StopForward:
+                    pass
+        finally:
+            for handle in handles:
+                handle.remove()
+        return H, group
+
+    def _quantize_linears(self, run, linears):
+        remaining = [
+            linear for linear in linears
+            if linear not in self.quantized_linears
+            and not (self.skip_layer_func is not None and self.skip_layer_func(linear.weight))
+        ]
+        while remaining:
+            H, group = self._next_group_hessian(run, remaining)
+            if not group:
+                # the remaining linears are not used by the model
+                break
+            W = torch.cat([self._to_device(linear.weight.detach()) for linear in group])
+            Q, DQ, qparams = self.faster_quant(H, W)
+            del H
+            rows = [linear.weight.shape[0] for linear in group]
+            qparams_per_linear = self._split_qparams(qparams, rows)
+            for linear, linear_Q, linear_DQ, linear_qparams in zip(group, Q.split(rows), DQ.split(rows), qparams_per_linear):
+                mod_fqn = self.id_to_name[id(linear)]
+                print(mod_fqn)
+                names_and_values_dict = self.make_names_and_values_dict_func(linear_Q, linear_qparams)
+                self.new_state_dict.pop(mod_fqn + ".weight", None)
+                for name, value in names_and_values_dict.items():
+                    self.new_state_dict[mod_fqn + "." + name] = value
+                # the linears after it see the output of the quantized linear
+                linear.weight.data.copy_(linear_DQ)
+                self.quantized_linears.add(linear)
+                self.handles.append(
+                    linear.register_forward_pre_hook(lambda module, args: (self.act_fake_quant_func(args[0]), *args[1:]))
+                )
+                remaining.remove(linear)
+
+    @staticmethod
+    def _split_qparams(qparams, rows):
+        # qparams of the concatenated weight have the (output) rows on dim 0, e.g. [scales, zeros]
+        flat, spec = tree_flatten(qparams)
+        split = [
+            x.split(rows) if isinstance(x, torch.Tensor) and x.dim() > 0 and x.shape[0] == sum(rows) else [x] * len(rows)
+            for x in flat
+        ]
+        return [tree_unflatten(list(values), spec) for values in zip(*split)]
+
+    def run(self):
+        assert (
+            self.get_qparams_func is not None
+        ), "need to configure quantization mode before running"
+        self.quantized_linears = set()
+        self.handles = []
+        try:
+            block_inputs = self._record_first_block_inputs()
+            for block in self.blocks:
+                if self.device is not None:
+                    original_device = next(block.parameters()).device
+                    block.to(self.device)
+
+                def run_block():
+                    for args, kwargs in block_inputs:
+                        yield lambda: block(*self._to_device(args), **self._to_device(kwargs))
+
+                self._quantize_linears(run_block, [module for module in block.modules() if isinstance(module, nn.Linear)])
+                block_outputs = [forward() for forward in run_block()]
+                block_outputs = [out[0] if isinstance(out, tuple) else out for out in block_outputs]
+                block_inputs = [
+                    ((out.to(args[0].device), *args[1:]), kwargs) for out, (args, kwargs) in zip(block_outputs, block_inputs)
+                ]
+                if self.device is not None:
+                    block.to(original_device)
+
+            # linears outside of the blocks, the blocks replay the outputs of the last block
+            def run_model():
+                sample_idx = 0
+                for block in self.blocks[:-1]:
+                    block.forward = lambda x, *args, **kwargs: x
+                self.blocks[-1].forward = lambda *args, **kwargs: block_inputs[sample_idx][0][0]
+                try:
+                    for sample_idx, sample in enumerate(self._calibration_samples()):
+                        yield lambda: self.model(*sample)
+                finally:
+                    for block in self.blocks:
+                        del block.forward
+
+            self._quantize_linears(run_model, [module for module in self.model.modules() if isinstance(module, nn.Linear)])
+        finally:
+            for handle in self.handles:
+                handle.remove()
+        self.gptq_done = True
+
+    get_quantized_state_dict = GenericGPTQRunner.get_quantized_state_dict
+
+
 class GPTQQuantizer(Quantizer):
     """
     This class implements a GPTQ Quantizer that can be used to apply GPTQ to a model in concert with the GenericGPTQRunner class.
@@ -493,14 +710,26 @@ class GPTQQuantizer(Quantizer):
         groupsize,
         #  `typing.Dict[<key type>, <value type>]` to avoid runtime subscripting errors.
     ) -> Dict:
-        print("Tracing model for GPTQ")
-        GPTQ_runner = GenericGPTQRunner(
-            model,
-            inputs,
-            blocksize,
-            percdamp,
-            groupsize,
-        ).configure_quantization_mode(
+        if getattr(self, "block_sequential", False):
+            print("Running GPTQ one block at a time")
+            GPTQ_runner = BlockSequentialGPTQRunner(
+                model,
+                inputs,
+                blocksize,
+                percdamp,
+                groupsize,
+                device=getattr(self, "device", None),
+            )
+        else:
+            print("Tracing model for GPTQ")
+            GPTQ_runner = GenericGPTQRunner(
+                model,
+                inputs,
+                blocksize,
+                percdamp,
+                groupsize,
+            )
+        GPTQ_runner.configure_quantization_mode(
             self.get_qparams_func,  # pyre-ignore[16]
             self.quantize_func,  # pyre-ignore[16]
             self.dequantize_func,  # pyre-ignore[16]
@@ -758,6 +987,7 @@ class Int4WeightOnlyGPTQQuantizer(GPTQQuantizer):
             inner_k_tiles=8,
             padding_allowed=True,
             device: torch.device = torch.device("cuda"),
+            block_sequential=False,
         ):
             self.blocksize = blocksize
             self.percdamp = percdamp
@@ -765,6 +995,7 @@ class Int4WeightOnlyGPTQQuantizer(GPTQQuantizer):
             self.inner_k_tiles = inner_k_tiles
             self.padding_allowed = padding_allowed
             self.device = device
+            self.block_sequential = block_sequential
             self.act_fake_quant_func = None
             n_bit = 4
             self.get_qparams_func = lambda w: get_groupwise_affine_qparams(
@@ -1111,6 +1342,7 @@ class Int8DynActInt4WeightGPTQQuantizer(GPTQQuantizer):
         inner_k_tiles=8,
         padding_allowed=True,
         precision=torch.float32,
+        block_sequential=False,
     ):
         self.blocksize = blocksize
         self.percdamp = percdamp
@@ -1118,6 +1350,7 @@ class Int8DynActInt4WeightGPTQQuantizer(GPTQQuantizer):
         self.inner_k_tiles = inner_k_tiles
         self.padding_allowed = padding_allowed
         self.precision = precision
+        self.block_sequential = block_sequential
 
         self.act_fake_quant_func = per_token_dynamic_quant
         n_bit = 4
@@ -40,6 +40,9 @@ __all__ = [
     "dequantize_affine",
     "choose_qprams_affine",
     "quantize_",
+    "quantize_from_checkpoint_",
+    "save_quantized_checkpoint",
+    "load_quantized_checkpoint",
     "int8_dynamic_activation_int4_weight",
     "int8_dynamic_activation_int8_weight",
     "int8_dynamic_activation_int8_semi_sparse_weight",
@@ -1,3 +1,8 @@
+import json
+import os
+import platform
+from contextlib import contextmanager
+
 import torch
 import torchao
 from torchao.quantization.quant_primitives import (
@@ -28,6 +33,8 @@ __all__ = [
     "DEFAULT_AUTOQUANT_CLASS_LIST",
     "DEFAULT_INT4_AUTOQUANT_CLASS_LIST",
     "OTHER_AUTOQUANT_CLASS_LIST",
+    "load_autoquant_cache",
+    "save_autoquant_cache",
 ]
 
 
@@ -41,6 +48,237 @@ def check_cache(cls, shapes_and_dtype):
 def update_cache(cls, shapes_and_dtype, res):
     AUTOQUANT_CACHE[(cls,)+shapes_and_dtype] = res
 
+# on-disk cache format version, bump when the layout of the cache file or the
+# meaning of the stored timings changes
+AUTOQUANT_CACHE_VERSION = 3
+AUTOQUANT_CACHE_ENV_VAR = "TORCHAO_AUTOQUANT_CACHE"
+
+# inductor settings that change which kernels get generated, and therefore the timings
+_AUTOQUANT_CACHE_INDUCTOR_KEYS = [
+    "coordinate_descent_tuning",
+    "coordinate_descent_check_all_directions",
+    "force_fuse_int_mm_with_mul",
+    "use_mixed_mm",
+    "epilogue_fusion",
+    "max_autotune",
+    "max_autotune_gemm",
+]
+
+def _get_autoquant_cache_path(cache_path=None):
+    if cache_path is None:
+        cache_path = os.environ.get(AUTOQUANT_CACHE_ENV_VAR, None)
+    return cache_path
+
+def _cpu_model_name():
+    # platform.processor() is empty on most linux systems
+    if os.path.exists("/proc/cpuinfo"):
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    return platform.processor() or platform.machine()
+
+def _autoquant_cache_device_name(device=None):
+    """
+    name of the hardware the timings for `device` (defaults to cuda if available, else cpu) were measured on
+    """
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    device = torch.device(device)
+    if device.type == "cuda":
+        return torch.cuda.get_device_name(device)
+    if device.type == "cpu":
+        # cpu timings depend on the cpu model, the instruction set the kernels were
+        # dispatched to (e.g. AVX512 vs AMX) and how many threads the benchmarks ran with
+        return (
+            f"cpu-{_cpu_model_name()}-{torch.backends.cpu.get_cpu_capability()}-"
+            f"{torch.get_num_threads()}threads"
+        )
+    return device.type
+
+def _get_autoquant_device(model):
+    """
+    device of the first weight of the model, which is the device autoquant benchmarks on
+    """
+    for mod in model.modules():
+        weight = getattr(mod, "weight", None)
+        if isinstance(weight, torch.Tensor):
+            return weight.device
+    return None
+
+def _autoquant_cache_metadata():
+    """
+    Everything the stored timings depend on besides the (cls, shapes, dtype) key and the device, entries
+    from a cache file are only reused if all of these match the current process. The cache file keeps the
+    entries of each configuration in a separate group
+    """
+    inductor_config = {
+        k: getattr(torch._inductor.config, k, None) for k in _AUTOQUANT_CACHE_INDUCTOR_KEYS
+    }
+    inductor_config["float32_matmul_precision"] = torch.get_float32_matmul_precision()
+    return {
+        "torch_version": torch.__version__,
+        "torchao_version": torchao.__version__,
+        "inductor_config": inductor_config,
+    }
+
+def _cls_to_name(cls):
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+def _name_to_cls(name):
+    import importlib
+    module_name, _, qualname = name.rpartition(".")
+    try:
+        return getattr(importlib.import_module(module_name), qualname)
+    except (ImportError, AttributeError):
+        return None
+
+def _shape_to_list(shape):
+    return None if shape is None else list(shape)
+
+def _list_to_shape(shape):
+    return None if shape is None else torch.Size(shape)
+
+def _read_autoquant_cache_groups(cache_path):
+    """
+    returns the groups of the cache file at `cache_path`, each one a dict with the `metadata` the entries were
+    written under and the `entries` themselves. Files that are missing, unreadable or have a different cache
+    version give no groups
+    """
+    if not os.path.exists(cache_path):
+        return []
+    try:
+        with open(cache_path, "r") as f:
+            contents = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"warning: failed to read autoquant cache {cache_path} due to {e}")
+        return []
+    if not isinstance(contents, dict) or contents.get("version", None) != AUTOQUANT_CACHE_VERSION:
+        return []
+    return contents.get("groups", [])
+
+def _read_autoquant_cache_file(cache_path):
+    """
+    returns the {(device_name, key): time} entries of the cache file at `cache_path` that are valid for the
+    current process
+    """
+    metadata = _autoquant_cache_metadata()
+    entries = {}
+    for group in _read_autoquant_cache_groups(cache_path):
+        if group.get("metadata", None) != metadata:
+            continue
+        for entry in group.get("entries", []):
+            q_cls = _name_to_cls(entry["cls"])
+            if q_cls is None:
+                continue
+            key = (
+                q_cls,
+                _list_to_shape(entry["act_shape"]),
+                _list_to_shape(entry["w_shape"]),
+                _list_to_shape(entry["bias_shape"]),
+                getattr(torch, entry["dtype"].replace("torch.", "")),
+            )
+            entries[(entry["device"], key)] = entry["time"]
+    return entries
+
+def _autoquant_cache_entry_id(entry):
+    # everything but the timing, an entry replaces the stored one with the same id
+    return json.dumps({k: v for k, v in entry.items() if k != "time"}, sort_keys=True)
+
+@contextmanager
+def _autoquant_cache_lock(cache_path):
+    """
+    holds an exclusive lock on `cache_path` + ".lock" so that processes sharing a cache file don't lose each
+    other's entries when they update it at the same time
+    """
+    try:
+        import fcntl
+    except ImportError:
+        # no advisory file locks (e.g. windows), concurrent saves can drop entries but the atomic
+        # replace still keeps the file valid
+        yield
+        return
+    with open(f"{cache_path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def load_autoquant_cache(cache_path=None, device=None):
+    """
+    Merges the benchmark results stored at `cache_path` (defaults to the path in the
+    TORCHAO_AUTOQUANT_CACHE environment variable) into the in-memory autoquant cache so those
+    shapes are not benchmarked again. Entries written for a different device, torch/torchao version,
+    inductor config or cache version are ignored. Results already in memory take precedence.
+
+    Args:
+        cache_path (str, optional): path of the cache file.
+        device (torch.device, optional): device the model is benchmarked on, only timings measured on
+            the same hardware are loaded. Defaults to cuda if available, else cpu.
+
+    Returns:
+        int: the number of entries that were added to the in-memory cache.
+    """
+    cache_path = _get_autoquant_cache_path(cache_path)
+    if cache_path is None:
+        return 0
+    device_name = _autoquant_cache_device_name(device)
+    num_loaded = 0
+    for (entry_device_name, key), res in _read_autoquant_cache_file(cache_path).items():
+        if entry_device_name != device_name:
+            continue
+        if AUTOQUANT_CACHE.get(key, None) is None:
+            AUTOQUANT_CACHE[key] = res
+            num_loaded += 1
+    return num_loaded
+
+def save_autoquant_cache(cache_path=None, device=None):
+    """
+    Writes the benchmark results of the in-memory autoquant cache to `cache_path` (defaults to the path in the
+    TORCHAO_AUTOQUANT_CACHE environment variable), merged with the entries already stored there so that
+    several processes can share and grow one cache file. Entries of other devices and of other torch/torchao
+    versions or inductor configs are kept. The update holds a file lock and replaces the file atomically.
+
+    Args:
+        cache_path (str, optional): path of the cache file.
+        device (torch.device, optional): device the in-memory results were measured on.
+            Defaults to cuda if available, else cpu.
+    """
+    cache_path = _get_autoquant_cache_path(cache_path)
+    if cache_path is None:
+        return
+    device_name = _autoquant_cache_device_name(device)
+    metadata = _autoquant_cache_metadata()
+    new_entries = [
+        {
+            "device": device_name,
+            "cls": _cls_to_name(q_cls),
+            "act_shape": _shape_to_list(act_shape),
+            "w_shape": _shape_to_list(w_shape),
+            "bias_shape": _shape_to_list(bias_shape),
+            "dtype": str(dtype),
+            "time": float(res),
+        }
+        for (q_cls, act_shape, w_shape, bias_shape, dtype), res in AUTOQUANT_CACHE.items()
+        if res is not None
+    ]
+    cache_dir = os.path.dirname(os.path.abspath(cache_path))
+    os.makedirs(cache_dir, exist_ok=True)
+    with _autoquant_cache_lock(cache_path):
+        groups = _read_autoquant_cache_groups(cache_path)
+        group = next((group for group in groups if group.get("metadata", None) == metadata), None)
+        if group is None:
+            group = {"metadata": metadata, "entries": []}
+            groups.append(group)
+        entries = {_autoquant_cache_entry_id(entry): entry for entry in group["entries"]}
+        entries.update((_autoquant_cache_entry_id(entry), entry) for entry in new_entries)
+        group["entries"] = list(entries.values())
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": AUTOQUANT_CACHE_VERSION, "groups": groups}, f, indent=1)
+        os.replace(tmp_path, cache_path)
+
 # TODO: Document the methods
 class AutoQuantizableLinearWeight(torch.Tensor):
     """
@@ -93,17 +331,9 @@ class AutoQuantizableLinearWeight(torch.Tensor):
                 update_cache(q_cls, shapes_and_dtype, None)
 
     def tune_autoquant(self, q_cls, shapes_and_dtype, best_time):
-        act_shape, w_shape, bias_shape, act_dtype = shapes_and_dtype
         if check_cache(q_cls, shapes_and_dtype) is None:
-            with torch.no_grad():
-                act_mat = torch.randn(act_shape, dtype=act_dtype, device=self.device)
-                bias = None if bias_shape is None else torch.randn(bias_shape, dtype=act_dtype, device=self.device)
-                try:
-                    res = q_cls._autoquant_test(act_mat, self.weight, bias, best_time, self.mode)
-                except Exception as e:
-                    print(f"warning: failed to autoquant {q_cls.__name__} for shape: {shapes_and_dtype} due to {e}")
-                    res = torch.inf
-                update_cache(q_cls, shapes_and_dtype, res)
+            res = _benchmark_autoquant_cls(q_cls, self.weight, shapes_and_dtype, best_time, self.mode)
+            update_cache(q_cls, shapes_and_dtype, res)
 
     @torch.no_grad()
     def to_quantized(self, error_on_unseen, **kwargs):
@@ -209,12 +439,26 @@ class AutoQuantizableLinearWeight(torch.Tensor):
             return return_and_correct_aliasing(func, args, kwargs, args[0]._apply_fn_to_data(torch.detach))
 
 @torch.no_grad()
-def do_autoquant_bench(op, *args, **kwargs):
+def _benchmark_autoquant_cls(q_cls, weight, shapes_and_dtype, best_time, mode):
     """
-    runs benchmark op(*args, **kwargs) avoiding torch.compile overhead
+    benchmarks q_cls for a weight and the given activation/bias shapes and dtype on random inputs,
+    returns torch.inf if q_cls fails for them
+    """
+    act_shape, w_shape, bias_shape, act_dtype = shapes_and_dtype
+    act_mat = torch.randn(act_shape, dtype=act_dtype, device=weight.device)
+    bias = None if bias_shape is None else torch.randn(bias_shape, dtype=act_dtype, device=weight.device)
+    try:
+        res = q_cls._autoquant_test(act_mat, weight, bias, best_time, mode)
+    except Exception as e:
+        print(f"warning: failed to autoquant {q_cls.__name__} for shape: {shapes_and_dtype} due to {e}")
+        res = torch.inf
+    return res
+
+@torch.no_grad()
+def _do_autoquant_bench_cuda(op, *args, warmup=25, rep=100, **kwargs):
+    """
+    times op(*args, **kwargs) by replaying it as a cuda graph
     """
-    rep = kwargs.pop("rep", 100)
-    warmup = kwargs.pop("warmup", 25)
     with torch.no_grad():
         torch.cuda.synchronize()
         stream = torch.cuda.Stream()
@@ -240,6 +484,73 @@ def do_autoquant_bench(op, *args, **kwargs):
             res = do_bench(lambda: graph.replay(), warmup=warmup, rep=rep, return_mode="median")
     return res
 
+# size of the buffer written between cpu timing runs, chosen to be larger than the
+# last level cache of common server cpus so every run starts from a cold cache
+AUTOQUANT_CPU_CACHE_FLUSH_BYTES = 256 * 1024 * 1024
+
+@torch.no_grad()
+def _do_autoquant_bench_cpu(op, *args, warmup=25, rep=100, num_threads=None, **kwargs):
+    """
+    times op(*args, **kwargs) with wall-clock timing, returning the median over the runs.
+    Like the cuda benchmark, `warmup` and `rep` are time budgets in ms, the number of runs is derived
+    from an initial estimate of the runtime. The cache is flushed before every timed run and the benchmark
+    runs with `num_threads` intra-op threads (defaults to the current setting).
+    """
+    import statistics
+    import time
+
+    hold_num_threads = torch.get_num_threads()
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+    try:
+        flush_buffer = torch.empty(AUTOQUANT_CPU_CACHE_FLUSH_BYTES // 4, dtype=torch.int32)
+
+        # first call triggers compilation, don't count it towards the estimate
+        op(*args, **kwargs)
+        start = time.perf_counter()
+        for _ in range(5):
+            op(*args, **kwargs)
+        estimate_ms = max((time.perf_counter() - start) * 1000 / 5, 1e-6)
+        n_warmup = max(1, int(warmup / estimate_ms))
+        n_repeat = max(1, int(rep / estimate_ms))
+
+        for _ in range(n_warmup):
+            op(*args, **kwargs)
+        times = []
+        for _ in range(n_repeat):
+            flush_buffer.zero_()
+            start = time.perf_counter()
+            op(*args, **kwargs)
+            times.append((time.perf_counter() - start) * 1000)
+    finally:
+        torch.set_num_threads(hold_num_threads)
+    return statistics.median(times)
+
+# device type -> function timing op(*args, **kwargs) in ms on that device
+AUTOQUANT_BENCH_BACKENDS = {
+    "cuda": _do_autoquant_bench_cuda,
+    "cpu": _do_autoquant_bench_cpu,
+}
+
+def _get_bench_device_type(args):
+    for arg in args:
+        if isinstance(arg, torch.Tensor):
+            return arg.device.type
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+@torch.no_grad()
+def do_autoquant_bench(op, *args, **kwargs):
+    """
+    runs benchmark op(*args, **kwargs) avoiding torch.compile overhead, using the benchmarking
+    backend in AUTOQUANT_BENCH_BACKENDS for the device of the tensor arguments
+    """
+    rep = kwargs.pop("rep", 100)
+    warmup = kwargs.pop("warmup", 25)
+    device_type = _get_bench_device_type(args)
+    if device_type not in AUTOQUANT_BENCH_BACKENDS:
+        raise NotImplementedError(f"autoquant has no benchmarking backend for device {device_type}")
+    return AUTOQUANT_BENCH_BACKENDS[device_type](op, *args, warmup=warmup, rep=rep, **kwargs)
+
 def _is_interpolate_mode(mode):
     if isinstance(mode, list) and mode[0]=="interpolate" and len(mode)==2 and isinstance(mode[1], float):
         return True
@@ -577,7 +888,119 @@ def _change_linears_to_autoquantizable(model, **kwargs):
         filter_fn if filter_fn is not None else _is_linear,
     )
 
-def _change_autoquantizable_to_quantized(model, supress_autoquant_errors=True, **kwargs):
+def _tune_autoquant_shape(weight, qtensor_class_list, shapes_and_dtype, mode, cached_times):
+    """
+    benchmarks every class in qtensor_class_list that doesn't have a time in cached_times for one
+    shapes_and_dtype, returns {q_cls: time}
+    """
+    times = {}
+    best_time = torch.inf
+    for q_cls in qtensor_class_list:
+        res = cached_times.get(q_cls, None)
+        if res is None:
+            res = _benchmark_autoquant_cls(q_cls, weight, shapes_and_dtype, best_time, mode)
+            torch._dynamo.reset()
+        times[q_cls] = res
+        best_time = min(best_time, res)
+    return times
+
+def _autoquant_tuning_worker_init(core_sets, inductor_config, float32_matmul_precision):
+    # each worker takes its own set of cores so concurrent benchmarks don't compete for them
+    cores = core_sets.get()
+    if cores:
+        os.sched_setaffinity(0, cores)
+        torch.set_num_threads(len(cores))
+    torch._inductor.config.load_config(inductor_config)
+    torch.set_float32_matmul_precision(float32_matmul_precision)
+    torch._dynamo.config.automatic_dynamic_shapes = False
+    torch._dynamo.config.suppress_errors = True
+
+def _get_autoquant_worker_core_sets(num_workers):
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+    if len(cores) < num_workers:
+        return [None] * num_workers
+    cores_per_worker = len(cores) // num_workers
+    return [cores[i * cores_per_worker:(i + 1) * cores_per_worker] for i in range(num_workers)]
+
+def _print_autoquant_timing_table(timings, layer_counts):
+    for key, times in timings.items():
+        act_shape, w_shape, bias_shape, dtype = key[1]
+        bias_shape = None if bias_shape is None else tuple(bias_shape)
+        print(
+            f"activation_shape: {tuple(act_shape)}, weight_shape: {tuple(w_shape)}, bias_shape: {bias_shape}, "
+            f"dtype: {dtype}, layers: {layer_counts[key]}"
+        )
+        best_cls = min(times, key=times.get)
+        for q_cls, res in times.items():
+            marker = " <- best" if q_cls is best_cls else ""
+            print(f"    {q_cls.__name__:<55} {res:0.4f}ms{marker}")
+
+def _tune_autoquant_shapes(model, filter_fn, num_workers=0):
+    """
+    Benchmarks every (class, shapes_and_dtype) combination logged by the AutoQuantizableLinearWeights of the model
+    that isn't in the autoquant cache yet, once per unique combination instead of once per layer, so that
+    AutoQuantizableLinearWeight.to_quantized finds everything it needs in the cache. With num_workers > 0 and
+    weights on cpu, unique shapes are benchmarked concurrently in a pool of processes pinned to disjoint
+    sets of cores. Prints a timing table for each benchmarked shape and returns the timings.
+    """
+    # (qtensor_class_list, shapes_and_dtype) -> (weight, mode)
+    pending = {}
+    layer_counts = {}
+    seen_weights = set()
+    for fqn, mod in model.named_modules():
+        if not filter_fn(mod, fqn) or not isinstance(getattr(mod, "weight", None), AutoQuantizableLinearWeight):
+            continue
+        if id(mod.weight) in seen_weights:
+            continue
+        seen_weights.add(id(mod.weight))
+        w_autoquant = mod.weight
+        for shapes_and_dtype in w_autoquant.logged_data:
+            key = (tuple(w_autoquant.qtensor_class_list), shapes_and_dtype)
+            layer_counts[key] = layer_counts.get(key, 0) + 1
+            if key not in pending and any(check_cache(q_cls, shapes_and_dtype) is None for q_cls in key[0]):
+                pending[key] = (w_autoquant.weight, w_autoquant.mode)
+
+    if len(pending) == 0:
+        return {}
+
+    def get_cached_times(key):
+        return {q_cls: check_cache(q_cls, key[1]) for q_cls in key[0]}
+
+    timings = {}
+    use_workers = num_workers > 0 and all(weight.device.type == "cpu" for weight, _ in pending.values())
+    if num_workers > 0 and not use_workers:
+        print("warning: parallel autoquant tuning is only supported for cpu weights, tuning serially")
+    if use_workers:
+        import concurrent.futures
+        import multiprocessing
+        num_workers = min(num_workers, len(pending))
+        ctx = multiprocessing.get_context("spawn")
+        core_sets = ctx.Queue()
+        for cores in _get_autoquant_worker_core_sets(num_workers):
+            core_sets.put(cores)
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=ctx,
+            initializer=_autoquant_tuning_worker_init,
+            initargs=(core_sets, torch._inductor.config.save_config(), torch.get_float32_matmul_precision()),
+        ) as executor:
+            futures = {
+                key: executor.submit(_tune_autoquant_shape, weight, key[0], key[1], mode, get_cached_times(key))
+                for key, (weight, mode) in pending.items()
+            }
+            for key, future in futures.items():
+                timings[key] = future.result()
+    else:
+        for key, (weight, mode) in pending.items():
+            timings[key] = _tune_autoquant_shape(weight, key[0], key[1], mode, get_cached_times(key))
+
+    for key, times in timings.items():
+        for q_cls, res in times.items():
+            update_cache(q_cls, key[1], res)
+    _print_autoquant_timing_table(timings, layer_counts)
+    return timings
+
+def _change_autoquantizable_to_quantized(model, supress_autoquant_errors=True, num_workers=0, **kwargs):
     """
     Converts AutoQuantizableLinearWeight tensor subclasses
     to various quantized/non-quantized tensor subclasses depending
@@ -598,6 +1021,8 @@ def _change_autoquantizable_to_quantized(model, supress_autoquant_errors=True, *
             hasattr(mod, "weight") and isinstance(mod.weight, AutoQuantizableLinearWeight)
     )
     error_on_unseen=kwargs.pop("error_on_unseen", True)
+    # benchmark each unique shape once up front, to_quantized then only reads the cache
+    _tune_autoquant_shapes(model, filter_fn, num_workers)
     from torchao.quantization.quant_api import _replace_with_custom_fn_if_matches_filter
     from torchao.quantization.quant_api import _get_subclass_inserter
     _replace_with_custom_fn_if_matches_filter(
@@ -629,6 +1054,8 @@ def autoquant(
     manual=False, 
     set_inductor_config=True,
     supress_autoquant_errors=True,
+    cache_path=None,
+    num_workers=0,
     **aq_kwargs
 ):
     """
@@ -663,6 +1090,12 @@ def autoquant(
                                 the user to call model.finalize_autoquant (True) so inputs with several shapes/dtypes can be logged.
         set_inductor_config (bool, optional): Whether to automatically use recommended inductor config settings (defaults to True)
         supress_autoquant_errors (bool, optional): Whether to suppress errors during autoquantization. (defaults to True)
+        cache_path (str, optional): Path of an on-disk benchmark cache. Results stored there (for the same device, torch/torchao
+                                    version and inductor config) are reused instead of re-benchmarked, and new results are merged
+                                    back into it when autoquant is finalized, so many processes can share one tuning run.
+                                    Defaults to the TORCHAO_AUTOQUANT_CACHE environment variable, no on-disk cache if neither is set.
+        num_workers (int, optional): Number of processes used to benchmark the unique shapes concurrently when autoquant is finalized,
+                                     each pinned to its own set of cores. Only used for models on cpu. Defaults to 0 (benchmark in process).
         **aq_kwargs: Additional keyword arguments for the autoquantization process.
 
     Returns:
@@ -678,10 +1111,17 @@ def autoquant(
         model(*example_input1)
         model(*example_input2)
         model.finalize_autoquant()
+
+        # share benchmark results between runs/processes
+        torchao.autoquant(torch.compile(model), cache_path="/tmp/autoquant_cache.json")
+        model(*example_input)
     """
     if set_inductor_config:
         torchao.quantization.utils.recommended_inductor_config_setter()
 
+    # the cache is keyed on the inductor config, so only read it once the config is final
+    load_autoquant_cache(cache_path, _get_autoquant_device(model))
+
     if qtensor_class_list is OTHER_AUTOQUANT_CLASS_LIST:
         assert torch.cuda.is_available() and torch.cuda.get_device_capability() >= (8, 9), "float8 requires CUDA arch >= 8.9"
 
@@ -728,11 +1168,16 @@ def autoquant(
     # note the torch.compile wrapper (eval_frame) moves the assignment of any assigned
     # attributes to the inner model that didn't exist before, so we have to call delattr on the inner model
     def finalize_autoquant():
+        # pick up results other processes may have written since autoquant was called
+        device = _get_autoquant_device(real_model)
+        load_autoquant_cache(cache_path, device)
         _change_autoquantizable_to_quantized(
             real_model,
             supress_autoquant_errors,
+            num_workers,
             **aq_kwargs,
         )
+        save_autoquant_cache(cache_path, device)
         if hasattr(real_model, "old_forward"):
             model.forward = real_model.old_forward
             delattr(real_model, "old_forward")
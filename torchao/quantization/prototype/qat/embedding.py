@@ -246,17 +246,32 @@ class Int4WeightOnlyEmbedding(torch.nn.Module):
     def forward(self, x):
         from torchao._executorch_ops import _quantized_decomposed_dequantize_per_channel_group_wrapper
         qmin, qmax = _get_qmin_qmax(self.bit_width)
-        w_dq = _quantized_decomposed_dequantize_per_channel_group_wrapper(
-            self.weight,
-            self.scale,
-            self.zero_point,
+        if self.max_norm is not None:
+            w_dq = _quantized_decomposed_dequantize_per_channel_group_wrapper(
+                self.weight,
+                self.scale,
+                self.zero_point,
+                qmin,
+                qmax,
+                torch.int8,
+                self.group_size,
+                x.dtype,
+            )
+            return F.embedding(
+                x, w_dq, self.padding_idx, self.max_norm,
+                self.norm_type, self.scale_grad_by_freq, self.sparse,
+            )
+
+        # only dequantize the rows that are looked up instead of the whole table
+        indices = x.reshape(-1)
+        rows_dq = _quantized_decomposed_dequantize_per_channel_group_wrapper(
+            self.weight[indices],
+            self.scale[indices],
+            self.zero_point[indices],
             qmin,
             qmax,
             torch.int8,
             self.group_size,
             x.dtype,
         )
-        return F.embedding(
-            x, w_dq, self.padding_idx, self.max_norm,
-            self.norm_type, self.scale_grad_by_freq, self.sparse,
-        )
+        return rows_dq.view(*x.shape, self.embedding_dim)
@@ -20,8 +20,13 @@ import torch
 import torchao
 import torch.nn as nn
 import torch.nn.functional as F
-from typing import Any, Callable, Union, Dict, Optional, Literal, Tuple
+from torch.utils.weak import WeakIdKeyDictionary
+from typing import Any, Callable, Union, Dict, Iterable, Mapping, Optional, Literal, Tuple
+import collections
+import concurrent.futures
+import os
 import types
+import weakref
 
 from torchao.dtypes.uintx.uintx import UintxLayoutType
 from torchao.dtypes import (
@@ -35,6 +40,7 @@ from torchao.dtypes import (
     Float8LayoutType,
     MarlinSparseLayoutType,
 )
+from torchao.dtypes.affine_quantized_tensor import _get_hqq_problem
 from torchao.utils import (
     TORCH_VERSION_AT_LEAST_2_4,
     TORCH_VERSION_AT_LEAST_2_5,
@@ -55,6 +61,7 @@ from torchao.quantization.weight_tensor_linear_activation_quantization import (
 from .quant_primitives import (
     MappingType,
     ZeroPointDomain,
+    choose_qparams_and_quantize_affine_hqq_batched,
 )
 from .weight_only import WeightOnlyInt8QuantLinear
 from .unified import Quantizer, TwoStepQuantizer
@@ -84,6 +91,9 @@ __all__ = [
     "autoquant",
     "_get_subclass_inserter",
     "quantize_",
+    "quantize_from_checkpoint_",
+    "save_quantized_checkpoint",
+    "load_quantized_checkpoint",
     "int8_dynamic_activation_int4_weight",
     "int8_dynamic_activation_int8_weight",
     "int8_dynamic_activation_int8_semi_sparse_weight",
@@ -233,6 +243,14 @@ def _is_linear(mod, *args):
         and not isinstance(mod.weight, AffineFakeQuantizedTensor)
     )
 
+def _is_embedding(mod, *args):
+    # filter_fn for quantize_ to quantize the weight of embedding modules (row wise or per group along
+    # the embedding dim), e.g. `quantize_(model, uintx_weight_only(torch.uint4), _is_embedding)`
+    return (
+        isinstance(mod, torch.nn.Embedding)
+        and not isinstance(mod.weight, AffineQuantizedTensor)
+    )
+
 import torch.nn.utils.parametrize as parametrize
 
 def _get_subclass_inserter(cls, enable_parametrization=False, **kwargs):
@@ -389,24 +407,72 @@ def _quantization_type(weight: torch.Tensor):
 def _linear_extra_repr(self):
     return f"in_features={self.weight.shape[1]}, out_features={self.weight.shape[0]}, weight={_quantization_type(self.weight)}"
 
+def _embedding_extra_repr(self):
+    return f"num_embeddings={self.weight.shape[0]}, embedding_dim={self.weight.shape[1]}, weight={_quantization_type(self.weight)}"
+
 def _get_linear_subclass_inserter(constructor, *, allow_requires_grad=False, **kwargs):
     """Helper function to apply the constructor that quantizes the weight Tensor (with additional kwargs)
-    to the weight of linear module
+    to the weight of linear module (or embedding module, when selected with e.g. `_is_embedding`)
     """
-    def insert_subclass(lin):
-        requires_grad = allow_requires_grad and lin.weight.requires_grad
-        lin.weight = torch.nn.Parameter(constructor(lin.weight, **kwargs), requires_grad=requires_grad)
-        lin.extra_repr = types.MethodType(_linear_extra_repr, lin)
+    # a weight shared by several modules, e.g. an input embedding tied to the output projection, is
+    # quantized once and stays shared when those modules are quantized in the same quantize_ call.
+    # Entries are dropped once the original weight is freed
+    quantized_weights = WeakIdKeyDictionary()
+    def insert_subclass(lin, **constructor_kwargs):
+        weight = lin.weight
+        quantized_weight = quantized_weights[weight]() if weight in quantized_weights else None
+        if quantized_weight is None:
+            requires_grad = allow_requires_grad and weight.requires_grad
+            quantized_weight = torch.nn.Parameter(constructor(weight, **kwargs, **constructor_kwargs), requires_grad=requires_grad)
+            quantized_weights[weight] = weakref.ref(quantized_weight)
+        lin.weight = quantized_weight
+        if isinstance(lin, torch.nn.Embedding):
+            lin.extra_repr = types.MethodType(_embedding_extra_repr, lin)
+        else:
+            lin.extra_repr = types.MethodType(_linear_extra_repr, lin)
         return lin
 
     return insert_subclass
 
+def _get_hqq_linear_subclass_inserter(quant_kwargs, **kwargs):
+    """`_get_linear_subclass_inserter` for weights quantized with `to_affine_quantized_intx(weight, **quant_kwargs(weight, **kwargs))`,
+    `quant_kwargs` returns None for weights that are left as is. The inserter exposes the HQQ problem of a weight as
+    `insert_subclass.hqq_problem(weight)` and takes its solution as `insert_subclass(lin, hqq_qparams=...)`, which is how
+    `quantize_(..., hqq_batch_size=n)` solves the weights of several modules together
+    """
+    def apply_quant(weight, hqq_qparams=None, **kwargs):
+        weight_quant_kwargs = quant_kwargs(weight, **kwargs)
+        if weight_quant_kwargs is None:
+            return weight
+        return to_affine_quantized_intx(weight, **weight_quant_kwargs, hqq_qparams=hqq_qparams)
+
+    def hqq_problem(weight):
+        weight_quant_kwargs = quant_kwargs(weight, **kwargs)
+        if weight_quant_kwargs is None or not weight_quant_kwargs.get("use_hqq", False):
+            return None
+        return _get_hqq_problem(
+            weight,
+            weight_quant_kwargs["mapping_type"],
+            weight_quant_kwargs["block_size"],
+            weight_quant_kwargs["quant_min"],
+            weight_quant_kwargs["quant_max"],
+            weight_quant_kwargs["zero_point_dtype"],
+            weight_quant_kwargs["zero_point_domain"],
+            weight_quant_kwargs["layout_type"],
+        )
+
+    insert_subclass = _get_linear_subclass_inserter(apply_quant, **kwargs)
+    insert_subclass.hqq_problem = hqq_problem
+    return insert_subclass
+
 def quantize_(
     model: torch.nn.Module,
     apply_tensor_subclass: Callable[[torch.nn.Module], torch.nn.Module],
     filter_fn: Optional[Callable[[torch.nn.Module, str], bool]] = None,
     set_inductor_config: bool = True,
     device: Optional[torch.types.Device] = None,
+    hqq_batch_size: int = 0,
+    hqq_compile: bool = False,
 ):
     """Convert the weight of linear modules in the model with `apply_tensor_subclass`, model is modified inplace
 
@@ -418,6 +484,12 @@ def quantize_(
         set_inductor_config (bool, optional): Whether to automatically use recommended inductor config settings (defaults to True)
         device (device, optional): Device to move module to before applying `filter_fn`. This can be set to `"cuda"` to speed up quantization. The final model will be on the specified `device`.
             Defaults to None (do not change device).
+        hqq_batch_size (int, optional): Number of modules whose HQQ problems are solved together, with
+            `choose_qparams_and_quantize_affine_hqq_batched`. Needs an `apply_tensor_subclass` that uses HQQ, i.e.
+            `int4_weight_only(use_hqq=True)` or `uintx_weight_only(use_hqq=True)`, and a float32 copy of the weights
+            of those modules. Defaults to 0 (solve the weights one at a time).
+        hqq_compile (bool, optional): Run the batched HQQ iterations with `torch.compile`, used with `hqq_batch_size`.
+            Defaults to False.
 
     Example::
 
@@ -465,6 +537,17 @@ def quantize_(
     if set_inductor_config:
         torchao.quantization.utils.recommended_inductor_config_setter()
 
+    if hqq_batch_size > 0:
+        _quantize_with_batched_hqq(
+            model,
+            apply_tensor_subclass,
+            _is_linear if filter_fn is None else filter_fn,
+            device,
+            hqq_batch_size,
+            hqq_compile,
+        )
+        return
+
     _replace_with_custom_fn_if_matches_filter(
         model,
         apply_tensor_subclass,
@@ -472,6 +555,301 @@ def quantize_(
         device=device,
     )
 
+def _quantize_with_batched_hqq(model, apply_tensor_subclass, filter_fn, device, hqq_batch_size, hqq_compile):
+    hqq_problem = getattr(apply_tensor_subclass, "hqq_problem", None)
+    if hqq_problem is None:
+        raise ValueError(
+            "hqq_batch_size needs an apply_tensor_subclass that uses HQQ, e.g. int4_weight_only(use_hqq=True), "
+            f"got {apply_tensor_subclass}"
+        )
+    modules = []
+    _replace_with_custom_fn_if_matches_filter(model, lambda module: modules.append(module) or module, filter_fn, device=device)
+    solved = set()
+    for start in range(0, len(modules), hqq_batch_size):
+        batch = {id(module) for module in modules[start:start + hqq_batch_size]}
+        # gather the HQQ problems of the batch, a weight shared by several modules is solved once
+        problems = collections.defaultdict(dict)
+        for module in modules[start:start + hqq_batch_size]:
+            if id(module.weight) in solved:
+                continue
+            problem = hqq_problem(module.weight)
+            if problem is not None:
+                tensor, hqq_kwargs = problem
+                problems[tuple(hqq_kwargs.items())][id(module.weight)] = tensor
+        hqq_qparams = {}
+        for hqq_kwargs, tensors in problems.items():
+            results = choose_qparams_and_quantize_affine_hqq_batched(list(tensors.values()), **dict(hqq_kwargs), compile=hqq_compile)
+            hqq_qparams.update(zip(tensors.keys(), results))
+            solved.update(tensors.keys())
+        del problems
+        _replace_with_custom_fn_if_matches_filter(
+            model,
+            lambda module: apply_tensor_subclass(module, hqq_qparams=hqq_qparams.pop(id(module.weight), None)),
+            lambda module, fqn: id(module) in batch,
+        )
+
+def _checkpoint_shards(checkpoint):
+    # a checkpoint file, a state dict, or an iterable of them (e.g. the shards of a sharded checkpoint)
+    if isinstance(checkpoint, (str, os.PathLike, Mapping)):
+        checkpoint = [checkpoint]
+    for shard in checkpoint:
+        if isinstance(shard, (str, os.PathLike)):
+            shard = torch.load(str(shard), mmap=True, weights_only=True)
+        yield shard
+
+def quantize_from_checkpoint_(
+    model: torch.nn.Module,
+    checkpoint: Union[str, os.PathLike, Mapping[str, torch.Tensor], Iterable[Union[str, os.PathLike, Mapping[str, torch.Tensor]]]],
+    apply_tensor_subclass: Callable[[torch.nn.Module], torch.nn.Module],
+    filter_fn: Optional[Callable[[torch.nn.Module, str], bool]] = None,
+    set_inductor_config: bool = True,
+    device: Optional[torch.types.Device] = None,
+    dtype: Optional[torch.dtype] = None,
+    num_workers: int = 0,
+):
+    """Load the weights of `model` from `checkpoint` and quantize them with `apply_tensor_subclass`, one module
+    at a time, so that the float model is never materialized as a whole
+
+    `model` is a skeleton of the float model, typically constructed on the meta device. The modules
+    `quantize_` would convert are selected by calling `filter_fn` on the skeleton, so `filter_fn` should
+    only depend on the module types and shapes (as `_is_linear` does). Checkpoint shards are read one at a
+    time, and as soon as all the weights of a selected module have been read they are materialized (moved
+    to `device` and cast to `dtype`), `apply_tensor_subclass` is applied and the float weights are released.
+    Peak memory is about one module's float weights per worker plus the quantized model. All the other
+    parameters and persistent buffers are loaded as is, non persistent buffers are left untouched.
+
+    Args:
+        model (torch.nn.Module): model skeleton, modified inplace
+        checkpoint: path to a checkpoint file (loaded with `torch.load(mmap=True, weights_only=True)`), a state dict,
+            or an iterable of paths or state dicts for sharded checkpoints (e.g. a generator loading one shard at a time)
+        apply_tensor_subclass (Callable[[torch.nn.Module], torch.nn.Module]): same as in `quantize_`
+        filter_fn (Optional[Callable[[torch.nn.Module, str], bool]]): same as in `quantize_`, called on the skeleton
+        set_inductor_config (bool, optional): Whether to automatically use recommended inductor config settings (defaults to True)
+        device (device, optional): Device to load the weights to, e.g. `"cuda"` to quantize on gpu. Defaults to None
+            (weights stay where the checkpoint puts them, i.e. mmapped on cpu for checkpoint files).
+        dtype (torch.dtype, optional): dtype to cast floating point weights to before quantizing them. Defaults to None.
+        num_workers (int): number of threads quantizing independent modules concurrently, defaults to 0
+            (quantize in the calling thread). Mostly useful on cpu, where a single module doesn't keep all cores busy.
+
+    Example::
+
+        with torch.device("meta"):
+            model = Transformer.from_name("Llama-3.1-70B")
+
+        shards = sorted(checkpoint_dir.glob("*.pth"))
+        quantize_from_checkpoint_(model, shards, int4_weight_only(), device="cuda", dtype=torch.bfloat16)
+    """
+    if set_inductor_config:
+        torchao.quantization.utils.recommended_inductor_config_setter()
+    if filter_fn is None:
+        filter_fn = _is_linear
+
+    # the modules quantize_ would pass to apply_tensor_subclass
+    selected = {}
+    def select(module, fqn):
+        if filter_fn(module, fqn):
+            selected[fqn] = module
+        else:
+            for name, child in module.named_children():
+                select(child, f"{fqn}.{name}" if fqn else name)
+    select(model, "")
+
+    # every tensor of the state dict, the modules holding it (several for tied weights) and the selected
+    # modules it belongs to, a tensor that doesn't belong to a selected module is owned by None
+    tensors = {}
+    canonical_keys = {}
+    keys_by_id = {}
+    for module_fqn, module in model.named_modules(remove_duplicate=False):
+        owner = max((fqn for fqn in selected if fqn == "" or module_fqn == fqn or module_fqn.startswith(fqn + ".")), key=len, default=None)
+        entries = [(name, tensor, True) for name, tensor in module._parameters.items()]
+        entries += [(name, tensor, False) for name, tensor in module._buffers.items() if name not in module._non_persistent_buffers_set]
+        for name, tensor, is_param in entries:
+            if tensor is None:
+                continue
+            key = f"{module_fqn}.{name}" if module_fqn else name
+            canonical_key = keys_by_id.setdefault(id(tensor), key)
+            canonical_keys[key] = canonical_key
+            if canonical_key == key:
+                tensors[key] = {"tensor": tensor, "is_param": is_param, "holders": [], "owners": set()}
+            tensors[canonical_key]["holders"].append((module, name))
+            tensors[canonical_key]["owners"].add(owner)
+
+    keys_by_module = {fqn: [] for fqn in selected}
+    # modules sharing a tensor are quantized in the calling thread, so the tensor is quantized once and stays shared
+    shared = set()
+    for key, info in tensors.items():
+        owners = info["owners"] - {None}
+        for owner in owners:
+            keys_by_module[owner].append(key)
+        if len(info["owners"]) > 1:
+            shared.update(owners)
+    remaining = {fqn: set(keys) for fqn, keys in keys_by_module.items()}
+
+    def materialize(key, value):
+        info = tensors[key]
+        if value.shape != info["tensor"].shape:
+            raise RuntimeError(
+                f"size mismatch for {key}: copying a param with shape {value.shape} from checkpoint, "
+                f"the shape in current model is {info['tensor'].shape}."
+            )
+        if dtype is not None and value.is_floating_point():
+            value = value.to(dtype)
+        if device is not None:
+            value = value.to(device)
+        if info["is_param"]:
+            value = torch.nn.Parameter(value, requires_grad=info["tensor"].requires_grad)
+        for module, name in info["holders"]:
+            if info["is_param"]:
+                module._parameters[name] = value
+            else:
+                module._buffers[name] = value
+
+    loaded = {}
+    def quantize_module(fqn):
+        for key in keys_by_module[fqn]:
+            # tensors shared with a module quantized earlier are already materialized
+            if key in loaded:
+                materialize(key, loaded.pop(key))
+        return apply_tensor_subclass(selected[fqn])
+
+    def replace_module(fqn, new_module):
+        # drops the last reference to the float weights
+        if new_module is not selected[fqn] and fqn != "":
+            parent_fqn, _, name = fqn.rpartition(".")
+            setattr(model.get_submodule(parent_fqn), name, new_module)
+
+    pool = concurrent.futures.ThreadPoolExecutor(num_workers) if num_workers > 0 else None
+    in_flight = collections.deque()
+    unexpected_keys = []
+    seen = set()
+    try:
+        for shard in _checkpoint_shards(checkpoint):
+            for key, value in shard.items():
+                if key not in canonical_keys:
+                    unexpected_keys.append(key)
+                    continue
+                key = canonical_keys[key]
+                if key in seen:
+                    continue
+                seen.add(key)
+                owners = tensors[key]["owners"]
+                if owners == {None}:
+                    materialize(key, value)
+                    continue
+                loaded[key] = value
+                for fqn in owners:
+                    if fqn is None:
+                        continue
+                    remaining[fqn].discard(key)
+                    if remaining[fqn]:
+                        continue
+                    if pool is None or fqn in shared:
+                        replace_module(fqn, quantize_module(fqn))
+                        continue
+                    if len(in_flight) >= num_workers:
+                        done_fqn, future = in_flight.popleft()
+                        replace_module(done_fqn, future.result())
+                    in_flight.append((fqn, pool.submit(quantize_module, fqn)))
+            del shard
+        while in_flight:
+            done_fqn, future = in_flight.popleft()
+            replace_module(done_fqn, future.result())
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    missing_keys = [key for key, canonical_key in canonical_keys.items() if canonical_key not in seen]
+    if missing_keys or unexpected_keys:
+        raise RuntimeError(
+            f"Error(s) in loading state_dict for {model.__class__.__name__}: missing keys: {missing_keys}, "
+            f"unexpected keys: {unexpected_keys}"
+        )
+
+_QUANTIZED_CHECKPOINT_VERSION = 1
+
+def save_quantized_checkpoint(model: torch.nn.Module, path: Union[str, os.PathLike]):
+    """Save a model quantized with `quantize_` so that it can be loaded without quantizing it again
+
+    The checkpoint stores the already packed inner tensors of the tensor subclass weights
+    (`AffineQuantizedTensor` with any layout, `LinearActivationQuantizedTensor`, `NF4Tensor`) together
+    with their layout metadata, and a `quantization` entry describing the quantization type of each weight.
+    Weights shared by several modules are stored once.
+
+    Args:
+        model (torch.nn.Module): quantized model
+        path (str or os.PathLike): file to save the checkpoint to
+    """
+    state_dict = model.state_dict(keep_vars=True)
+    quantization = {
+        fqn: _quantization_type(tensor) for fqn, tensor in state_dict.items() if type(tensor) not in (torch.Tensor, torch.nn.Parameter)
+    }
+    torch.save({"version": _QUANTIZED_CHECKPOINT_VERSION, "quantization": quantization, "state_dict": state_dict}, path)
+
+def load_quantized_checkpoint(
+    model_fn: Callable[[], torch.nn.Module],
+    path: Union[str, os.PathLike],
+    device: Optional[torch.types.Device] = None,
+) -> torch.nn.Module:
+    """Load a checkpoint written by `save_quantized_checkpoint`
+
+    The module tree is built by calling `model_fn` on the meta device, and the checkpoint is loaded
+    with `torch.load(mmap=True, weights_only=True)` and assigned to it, so the packed weights are used
+    directly from the memory mapped file, without copying, quantizing or repacking them and without
+    materializing the high precision weights. Buffers that are not part of the state dict (e.g. caches
+    the model builds itself) are left on the meta device.
+
+    Args:
+        model_fn (Callable[[], torch.nn.Module]): function that constructs the (unquantized) model
+        path (str or os.PathLike): checkpoint file
+        device (device, optional): device to move the loaded model to, defaults to None (keep the
+            weights memory mapped on cpu)
+
+    Example::
+
+        quantize_(model, int8_weight_only())
+        save_quantized_checkpoint(model, "model_int8wo.pt")
+
+        model = load_quantized_checkpoint(lambda: Transformer.from_name(name), "model_int8wo.pt")
+    """
+    checkpoint = torch.load(str(path), mmap=True, weights_only=True)
+    if not isinstance(checkpoint, dict) or "version" not in checkpoint:
+        raise ValueError(f"{path} is not a checkpoint saved with save_quantized_checkpoint")
+    if checkpoint["version"] > _QUANTIZED_CHECKPOINT_VERSION:
+        raise ValueError(
+            f"{path} has quantized checkpoint version {checkpoint['version']}, "
+            f"only versions up to {_QUANTIZED_CHECKPOINT_VERSION} are supported"
+        )
+
+    with torch.device("meta"):
+        model = model_fn()
+    state_dict = checkpoint["state_dict"]
+    requires_grad = {fqn: tensor.requires_grad for fqn, tensor in state_dict.items()}
+    model.load_state_dict(state_dict, assign=True)
+
+    # `load_state_dict` takes requires_grad from the freshly constructed model and wraps each entry in
+    # its own Parameter, restore requires_grad and tie the weights that were shared when saving
+    loaded = {}
+    for fqn, tensor in state_dict.items():
+        module_fqn, _, name = fqn.rpartition(".")
+        module = model.get_submodule(module_fqn)
+        if name not in module._parameters:
+            continue
+        if id(tensor) in loaded:
+            setattr(module, name, loaded[id(tensor)])
+        else:
+            loaded[id(tensor)] = module._parameters[name].requires_grad_(requires_grad[fqn])
+
+    for module in model.modules():
+        if isinstance(module, (torch.nn.Linear, torch.nn.Embedding)) and type(module.weight) not in (torch.Tensor, torch.nn.Parameter):
+            if isinstance(module, torch.nn.Embedding):
+                module.extra_repr = types.MethodType(_embedding_extra_repr, module)
+            else:
+                module.extra_repr = types.MethodType(_linear_extra_repr, module)
+
+    if device is not None:
+        model.to(device)
+    return model
+
 def _int8_asymm_per_token_quant(x: torch.Tensor) -> torch.Tensor:
     """This is defined here instead of local function to support serialization
     """
@@ -530,12 +908,12 @@ def int4_weight_only(group_size=128, layout_type=TensorCoreTiledLayoutType(inner
         `layout_type`: layout type for quantized tensor, default is `TensorCoreTiledLayoutType(inner_k_tiles=8)`
         `use_hqq`: whether to use hqq or default quantization mode, default is False
     """
-    def apply_int4_weight_only_quant(weight):
+    def int4_weight_only_quant_kwargs(weight):
         if weight.shape[-1] % group_size != 0:
             logger.info(
                 f"Skipping quantizing weight with int4 weight only quantization because the shape of weight {weight.shape} is not compatible with group_size {group_size}"
             )
-            return weight
+            return None
 
         mapping_type = MappingType.ASYMMETRIC
         block_size = (1, group_size)
@@ -555,9 +933,9 @@ def int4_weight_only(group_size=128, layout_type=TensorCoreTiledLayoutType(inner
             preserve_zero = True
             zero_point_domain = ZeroPointDomain.INT
 
-        return to_affine_quantized_intx(weight, mapping_type, block_size, target_dtype, quant_min, quant_max, eps, zero_point_dtype=zero_point_dtype, preserve_zero=preserve_zero, zero_point_domain=zero_point_domain, layout_type=layout_type, use_hqq=use_hqq)
+        return dict(mapping_type=mapping_type, block_size=block_size, target_dtype=target_dtype, quant_min=quant_min, quant_max=quant_max, eps=eps, zero_point_dtype=zero_point_dtype, preserve_zero=preserve_zero, zero_point_domain=zero_point_domain, layout_type=layout_type, use_hqq=use_hqq)
 
-    return _get_linear_subclass_inserter(apply_int4_weight_only_quant)
+    return _get_hqq_linear_subclass_inserter(int4_weight_only_quant_kwargs)
 
 
 def int8_weight_only():
@@ -847,7 +1225,7 @@ def uintx_weight_only(dtype, group_size=64, pack_dim=-1, use_hqq=False):
     SUPPORTED_DTYPES = {torch.uint1, torch.uint2, torch.uint3, torch.uint4, torch.uint5, torch.uint6, torch.uint7, torch.uint8}
     assert dtype in SUPPORTED_DTYPES, f"Unsupported dtype for hqq: {dtype}"
 
-    def apply_uintx_weight_only_quant(weight, dtype):
+    def uintx_weight_only_quant_kwargs(weight, dtype):
         mapping_type = MappingType.ASYMMETRIC
         block_size = (1, group_size)
 
@@ -869,8 +1247,8 @@ def uintx_weight_only(dtype, group_size=64, pack_dim=-1, use_hqq=False):
             preserve_zero = True
             layout_type = UintxLayoutType(dtype=dtype, pack_dim=pack_dim)
 
-        return to_affine_quantized_intx(
-            weight, mapping_type, block_size, dtype,
+        return dict(
+            mapping_type=mapping_type, block_size=block_size, target_dtype=dtype,
             quant_min=quant_min, quant_max=quant_max,
             eps=eps, zero_point_dtype=zero_point_dtype,
             zero_point_domain=zero_point_domain,
@@ -879,7 +1257,7 @@ def uintx_weight_only(dtype, group_size=64, pack_dim=-1, use_hqq=False):
             use_hqq=use_hqq,
         )
 
-    return _get_linear_subclass_inserter(apply_uintx_weight_only_quant, dtype=dtype)
+    return _get_hqq_linear_subclass_inserter(uintx_weight_only_quant_kwargs, dtype=dtype)
 
 def fpx_weight_only(ebits: int, mbits: int):
     """Sub-byte floating point dtypes defined by `ebits`: exponent bits and `mbits`: mantissa bits
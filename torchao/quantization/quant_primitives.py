@@ -31,6 +31,7 @@ __all__ = [
     "fake_quantize_affine",
     "fake_quantize_affine_cachemask",
     "choose_qparams_and_quantize_affine_hqq",
+    "choose_qparams_and_quantize_affine_hqq_batched",
 ]
 
 class MappingType(Enum):
@@ -844,7 +845,108 @@ def optimize_weights_proximal_legacy(
     scale = scale.to(tensor.device)
     zero = zero.to(tensor.device)
     del W_f, W_q, W_r, W_e
-    torch.cuda.empty_cache()
+    if device.type == "cuda":
+        torch.cuda.empty_cache()
+
+    W_q = torch.round(tensor * scale + zero).clamp(min_max[0], min_max[1])
+    return W_q, scale, zero
+
+def _optimize_weights_proximal_step(
+    W_f: torch.Tensor,
+    scale: torch.Tensor,
+    zero: torch.Tensor,
+    beta: torch.Tensor,
+    min_max: list,
+    lp_norm: float,
+    axis: int,
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    W_q = torch.round(W_f * scale + zero).clamp(min_max[0], min_max[1])
+    W_r = (W_q - zero) / scale
+    W_e = _shrink_lp_op(W_f - W_r, beta, lp_norm)
+    zero = torch.mean(W_q - (W_f - W_e) * scale, axis=axis, keepdim=True)
+    error = torch.abs(W_f - W_r).mean(axis=axis, keepdim=True)
+    return zero, error
+
+# Same solver as `optimize_weights_proximal_legacy`, but with early stopping per group: each group stops at
+# its own best iteration instead of all groups stopping when the mean error of the tensor does, so the
+# groups of different weights can be concatenated and optimized together
+@torch.inference_mode()
+def optimize_weights_proximal_batched(
+    tensor: torch.Tensor,
+    scale: torch.Tensor,
+    zero: torch.Tensor,
+    min_max: list,
+    axis: int = 0,
+    dtype: Union[torch.dtype, None] = None,
+    device: Union[str, None] = None,
+    verbose: bool = False,
+    opt_params: dict = {
+        "lp_norm": 0.7,
+        "beta": 1e1,
+        "kappa": 1.01,
+        "iters": 20,
+        "early_stop": True,
+    },
+    compile: bool = False,
+) -> tuple:
+    lp_norm, beta, kappa, iters, early_stop = (
+        opt_params["lp_norm"],
+        opt_params["beta"],
+        opt_params["kappa"],
+        opt_params["iters"],
+        opt_params["early_stop"],
+    )
+
+    device = tensor.device if (device is None) else torch.device(device)
+
+    if dtype is None:
+        dtype = torch.float16 if (device.type == "cuda") else torch.float32
+
+    W_f = tensor.to(dtype=dtype, device=device)
+    scale = scale.to(dtype=dtype, device=device)
+    zero = zero.to(dtype=dtype, device=device)
+    # a tensor so the compiled step is not recompiled for every value of beta
+    beta = torch.tensor(beta, dtype=dtype, device=device)
+    step = torch.compile(_optimize_weights_proximal_step) if compile else _optimize_weights_proximal_step
+
+    # groups that stop improving are dropped, so later iterations only run on the groups still improving
+    group_dim = 1 - axis
+    index = torch.arange(W_f.shape[group_dim], device=device)
+    best_zero = zero.clone()
+    best_error = torch.full_like(zero, 1e4)
+    W_a, scale_a, zero_a, best_zero_a = W_f, scale, zero, zero
+    for i in range(iters):
+        new_zero, current_error = step(W_a, scale_a, zero_a, beta, min_max, lp_norm, axis)
+        beta = beta * kappa
+
+        if verbose:
+            print("Iter " + str(i + 1), " | Groups: " + str(index.numel()), " | Error: " + str(float(current_error.mean())))
+        if early_stop:
+            # current_error is the error of `zero_a`, each group keeps the zero point with its lowest error
+            improved = current_error < best_error
+            best_error = torch.where(improved, current_error, best_error)
+            best_zero_a = torch.where(improved, zero_a, best_zero_a)
+            if not improved.all():
+                improved = improved.flatten()
+                done = (~improved).nonzero().squeeze(1)
+                best_zero.index_copy_(group_dim, index[done], best_zero_a.index_select(group_dim, done))
+                keep = improved.nonzero().squeeze(1)
+                index = index[keep]
+                W_a, scale_a, new_zero, best_error, best_zero_a = (
+                    t.index_select(group_dim, keep) for t in (W_a, scale_a, new_zero, best_error, best_zero_a)
+                )
+                if index.numel() == 0:
+                    break
+        zero_a = new_zero
+    if early_stop:
+        best_zero.index_copy_(group_dim, index, best_zero_a)
+        zero = best_zero
+    else:
+        zero = zero_a
+
+    scale = scale.to(tensor.device)
+    zero = zero.to(tensor.device)
+    del W_f
 
     W_q = torch.round(tensor * scale + zero).clamp(min_max[0], min_max[1])
     return W_q, scale, zero
@@ -863,6 +965,43 @@ def _convert_to_affinequantized_format(W_q: torch.Tensor, scale: torch.Tensor, z
     W_q_ao = W_q.view(shape)
     return W_q_ao, scale_ao, zero_ao
 
+def _group_hqq(tensor: torch.Tensor, group_size: Optional[int], axis: int) -> torch.Tensor:
+    if group_size is None:
+        return tensor
+    return tensor.reshape([-1, group_size]) if (axis == 1) else tensor.reshape([group_size, -1])
+
+def _init_hqq_qparams(W: torch.Tensor, nbits: float, axis: int) -> Tuple[torch.Tensor, torch.Tensor, list]:
+    # Get min/max values
+    _min = W.min(axis=axis, keepdim=True)[0]
+    _max = W.max(axis=axis, keepdim=True)[0]
+
+    max_v = round(2**nbits - 1)
+    min_v = 0
+    min_max = [min_v, max_v]
+
+    # Clamp to avoid fp16 issues
+    scale = (max_v / (_max - _min)).clamp(max=2e4)
+    zero = -_min * scale
+
+    # Round zero as in: https://github.com/casper-hansen/AutoAWQ/blob/main/awq/quantize/quantizer.py#L42C9-L42C14
+    if nbits in [4]:
+        zero = torch.round(zero)
+    return scale, zero, min_max
+
+def _finalize_hqq_qparams(W_q: torch.Tensor, scale: torch.Tensor, zero: torch.Tensor, nbits: float, shape: torch.Size, compute_dtype: torch.dtype, device: torch.device, raw_output: bool) -> Tuple:
+    # Store meta-data (we invert the scale for dequantization)
+    scale = 1.0 / scale
+
+    # Convert to affienquantized format
+    if raw_output is False:
+        W_q, scale, zero = _convert_to_affinequantized_format(W_q, scale, zero, nbits, shape)
+
+    # Make sure all the weights are in the right compute_dtype/device
+    W_q = W_q.to(dtype=torch.uint8, device=device)
+    scale = scale.to(dtype=compute_dtype, device=device)
+    zero = zero.to(dtype=compute_dtype, device=device)
+    return W_q, scale, zero, shape
+
 # Main hqq quantizer function
 def choose_qparams_and_quantize_affine_hqq(
     tensor: torch.Tensor,
@@ -871,7 +1010,7 @@ def choose_qparams_and_quantize_affine_hqq(
     optimize: bool = True,
     axis: int = 1,
     compute_dtype: torch.dtype = torch.float16,
-    device: str = "cuda",
+    device: Optional[str] = None,
     verbose: bool = False,  # to check the optimizer error
     raw_output: bool = False,  # If True, it will return the quant params in hqq lib format
     optimize_weights: Callable = optimize_weights_proximal_legacy #weights proximal optimizer function
@@ -885,33 +1024,15 @@ def choose_qparams_and_quantize_affine_hqq(
             + str(group_size)
         )
 
+    device = tensor.device if (device is None) else torch.device(device)
     #It's better to work with float32 here
     W = tensor.to(device=device, dtype=torch.float32)
     shape = W.shape
 
     # Reshape for grouping
-    if group_size is not None:
-        W = (
-            W.reshape([-1, group_size])
-            if (axis == 1)
-            else W.reshape([group_size, -1])
-        )
+    W = _group_hqq(W, group_size, axis)
 
-    # Get min/max values
-    _min = W.min(axis=axis, keepdim=True)[0]
-    _max = W.max(axis=axis, keepdim=True)[0]
-
-    max_v = round(2**nbits - 1)
-    min_v = 0
-    min_max = [min_v, max_v]
-
-    # Clamp to avoid fp16 issues
-    scale = (max_v / (_max - _min)).clamp(max=2e4)
-    zero = -_min * scale
-
-    # Round zero as in: https://github.com/casper-hansen/AutoAWQ/blob/main/awq/quantize/quantizer.py#L42C9-L42C14
-    if nbits in [4]:
-        zero = torch.round(zero)
+    scale, zero, min_max = _init_hqq_qparams(W, nbits, axis)
 
     # Fine-tune weights
     if optimize:
@@ -927,24 +1048,80 @@ def choose_qparams_and_quantize_affine_hqq(
     else:
         W_q = torch.round(W * scale + zero).clamp(min_max[0], min_max[1])
 
-    # Store meta-data (we invert the scale for dequantization)
-    scale = 1.0 / scale
-
-    # Convert to affienquantized format
-    if raw_output is False:
-        W_q, scale, zero = _convert_to_affinequantized_format(W_q, scale, zero, nbits, shape)
-
-    # Make sure all the weights are in the right compute_dtype/device
-    W_q = W_q.to(dtype=torch.uint8, device=device)
-    scale = scale.to(dtype=compute_dtype, device=device)
-    zero = zero.to(dtype=compute_dtype, device=device)
+    W_q, scale, zero, shape = _finalize_hqq_qparams(W_q, scale, zero, nbits, shape, compute_dtype, device, raw_output)
 
     # cleanup
-    del W, _min, _max
-    torch.cuda.empty_cache()
+    del W
+    if device.type == "cuda":
+        torch.cuda.empty_cache()
 
     return W_q, scale, zero, shape
 
+def choose_qparams_and_quantize_affine_hqq_batched(
+    tensors: List[torch.Tensor],
+    nbits: float = 4,
+    group_size: int = 64,
+    optimize: bool = True,
+    axis: int = 1,
+    compute_dtype: torch.dtype = torch.float16,
+    device: Optional[str] = None,
+    verbose: bool = False,
+    raw_output: bool = False,
+    compile: bool = False,
+) -> List[tuple]:
+    """`choose_qparams_and_quantize_affine_hqq` for several tensors at once: the quantization groups of all
+    the tensors are concatenated and optimized together by `optimize_weights_proximal_batched`, where each
+    group stops iterating when its own error stops improving. Tensors can have different shapes, only the
+    group size is shared. `compile` runs the proximal iterations with `torch.compile`.
+
+    Returns a list with the `(W_q, scale, zero, shape)` of each tensor
+    """
+    assert axis in [0, 1], "axis should be either 0 or 1"
+    assert group_size is not None, "batching needs a group_size"
+    for tensor in tensors:
+        assert _is_divisible(tensor.numel(), group_size), (
+            "group_size should be divisble by the total tensor dimensions. shape: "
+            + str(tensor.shape)
+            + ", group_size: "
+            + str(group_size)
+        )
+    if len(tensors) == 0:
+        return []
+
+    device = tensors[0].device if (device is None) else torch.device(device)
+    group_dim = 0 if (axis == 1) else 1
+    groups = [_group_hqq(tensor.to(device=device, dtype=torch.float32), group_size, axis) for tensor in tensors]
+    num_groups = [W.shape[group_dim] for W in groups]
+    W = torch.cat(groups, dim=group_dim)
+    del groups
+
+    scale, zero, min_max = _init_hqq_qparams(W, nbits, axis)
+
+    if optimize:
+        W_q, scale, zero = optimize_weights_proximal_batched(
+            tensor=W,
+            scale=scale,
+            zero=zero,
+            min_max=min_max,
+            axis=axis,
+            device=device,
+            verbose=verbose,
+            compile=compile,
+        )
+    else:
+        W_q = torch.round(W * scale + zero).clamp(min_max[0], min_max[1])
+    del W
+
+    results = [
+        _finalize_hqq_qparams(W_q_i.contiguous(), scale_i, zero_i, nbits, tensor.shape, compute_dtype, device, raw_output)
+        for tensor, W_q_i, scale_i, zero_i in zip(
+            tensors, W_q.split(num_groups, group_dim), scale.split(num_groups, group_dim), zero.split(num_groups, group_dim)
+        )
+    ]
+    if device.type == "cuda":
+        torch.cuda.empty_cache()
+    return results
+
 
 def choose_qparams_affine_floatx(tensor: torch.Tensor, ebits: int, mbits: int) -> torch.Tensor:
     # _n_ones() is not compatible with torch.compile() due to << operator
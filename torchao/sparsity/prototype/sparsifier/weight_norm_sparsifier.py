@@ -4,6 +4,7 @@ from typing import Callable, Optional, Tuple, Union
 import torch
 import torch.nn.functional as F
 
+from torchao.sparsity.utils import prune_lowest_
 from .base_sparsifier import BaseSparsifier
 import operator
 
@@ -75,16 +76,6 @@ class WeightNormSparsifier(BaseSparsifier):
             raise NotImplementedError(f"L-{norm} is not yet implemented.")
         super().__init__(defaults=defaults)
 
-    def _scatter_fold_block_mask(self, output_shape, dim, indices, block_shape,
-                                 mask=None, input_shape=None, device=None):
-        r"""Creates patches of size `block_shape` after scattering the indices."""
-        if mask is None:
-            assert input_shape is not None
-            mask = torch.ones(input_shape, device=device)
-        mask.scatter_(dim=dim, index=indices, value=0)
-        mask.data = F.fold(mask, output_size=output_shape, kernel_size=block_shape, stride=block_shape)
-        return mask
-
     def _make_tensor_mask(self, data, input_shape, sparsity_level, sparse_block_shape, mask=None):
         r"""Creates a tensor-level mask.
 
@@ -118,19 +109,17 @@ class WeightNormSparsifier(BaseSparsifier):
         data = data.flatten()
         num_blocks = len(data)
 
-        data = data.repeat(1, values_per_block, 1)
-
         threshold_idx = int(round(sparsity_level * num_blocks))
         threshold_idx = max(0, min(num_blocks - 1, threshold_idx))  # Sanity check
-        _, sorted_idx = torch.topk(data, k=threshold_idx, dim=2, largest=False)
 
-        # Temp reshape for mask
-        mask_reshape = mask.reshape(data.shape)  # data might be reshaped
-        self._scatter_fold_block_mask(
-            dim=2, output_shape=(h + dh, w + dw),
-            indices=sorted_idx, block_shape=sparse_block_shape, mask=mask_reshape
+        # Select the lowest-norm blocks by threshold, then expand them into patches
+        block_mask = torch.ones(num_blocks, dtype=mask.dtype, device=mask.device)
+        prune_lowest_(block_mask.view(1, -1), data.view(1, -1), threshold_idx)
+        num_block_rows, num_block_cols = (h + dh) // block_h, (w + dw) // block_w
+        mask.view(num_block_rows, block_h, num_block_cols, block_w).mul_(
+            block_mask.view(num_block_rows, 1, num_block_cols, 1)
         )
-        mask.data = mask_reshape.squeeze().reshape(mask.shape)[:h, :w].contiguous()
+        mask.data = mask[:h, :w].contiguous()
         return mask
 
     def _make_block_mask(self, data, sparse_block_shape, zeros_per_block, mask=None):
@@ -164,10 +153,10 @@ class WeightNormSparsifier(BaseSparsifier):
 
         # Temp reshape for mask
         mask_reshape = mask.reshape(unfolded_data.shape)
-        _, sorted_idx = torch.topk(unfolded_data, k=zeros_per_block, dim=1, largest=False)
-
-        self._scatter_fold_block_mask(
-            dim=1, indices=sorted_idx, output_shape=padded_data.shape, block_shape=sparse_block_shape, mask=mask_reshape
+        # One row per block; padding is NaN, so it is never selected by topk
+        prune_lowest_(mask_reshape[0].t(), unfolded_data[0].t(), zeros_per_block)
+        mask_reshape.data = F.fold(
+            mask_reshape, output_size=padded_data.shape, kernel_size=sparse_block_shape, stride=sparse_block_shape
         )
 
         mask.data = mask_reshape.squeeze().reshape(mask.shape).contiguous()
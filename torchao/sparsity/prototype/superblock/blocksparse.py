@@ -65,6 +65,88 @@ def blocksparse_int_addmm(
     ).t()
 
 
+def _blocksparse_int_mm_rows(crow_indices, col, col_indices, W, A_blocks, out, bs_m, bs_k):
+    # python version of torchao::blocksparse_int_mm, for builds without the cpp extension
+    N = out.shape[1]
+    num_block_rows = len(crow_indices) - 1
+    # gather buffer for the activation block rows, reused by every block row
+    max_row_nnz = max(crow_indices[row + 1] - crow_indices[row] for row in range(num_block_rows))
+    A_row = A_blocks.new_empty(max_row_nnz, bs_k * N)
+    for row in range(num_block_rows):
+        start, end = crow_indices[row], crow_indices[row + 1]
+        if start == end:
+            continue
+        if col[end - 1] - col[start] == end - start - 1:
+            # consecutive blocks (column indices are sorted) only need a view
+            A_gathered = A_blocks[col[start] : col[end - 1] + 1]
+        else:
+            A_gathered = A_row[: end - start]
+            torch.index_select(A_blocks, 0, col_indices[start:end], out=A_gathered)
+        # one dense int8 gemm per block row: the row's blocks side by side against
+        # the matching block rows of A, accumulated in int32
+        torch._int_mm(
+            W[:, start * bs_k : end * bs_k],
+            A_gathered.view((end - start) * bs_k, N),
+            out=out[row * bs_m : (row + 1) * bs_m],
+        )
+
+
+def side_by_side_block_values(values: torch.Tensor) -> torch.Tensor:
+    """
+    Returns the (nnz, bs_m, bs_k) bsr values stored with all blocks side by side,
+    i.e. as a transposed view of a contiguous (bs_m, nnz * bs_k) matrix, which is
+    the layout the cpu int_addmm kernel multiplies with. Lay out the values once
+    when the weight is created, other layouts are copied on every call.
+    """
+    return values.transpose(0, 1).contiguous().transpose(0, 1)
+
+
+def _has_cpp_blocksparse_int_mm() -> bool:
+    # torchao::blocksparse_int_mm is defined in torchao.ops and implemented in the cpp extension
+    return hasattr(torch.ops.torchao, "blocksparse_int_mm") and torch._C._dispatch_has_kernel_for_dispatch_key(
+        "torchao::blocksparse_int_mm", "CPU"
+    )
+
+
+@blocksparse_int_addmm.register_kernel("cpu")
+def _(
+    crow_indices: torch.Tensor,
+    col_indices: torch.Tensor,
+    values: torch.Tensor,
+    A: torch.Tensor,
+    left_alpha: torch.Tensor,
+    right_alpha: torch.Tensor,
+) -> torch.Tensor:
+    assert values.dtype == torch.int8 and A.dtype == torch.int8
+    assert A.dim() == 2, "batched inputs are not supported on cpu"
+    M = left_alpha.shape[-1]
+    K, N = A.shape
+    nnz, bs_m, bs_k = values.shape
+    if nnz == 0:
+        # all-zero weight
+        return A.new_zeros(M, N, dtype=torch.bfloat16).t()
+
+    if _has_cpp_blocksparse_int_mm():
+        # splits the block rows across threads with at::parallel_for
+        out = torch.ops.torchao.blocksparse_int_mm(crow_indices, col_indices, values, A, M)
+    else:
+        crow = crow_indices.tolist()
+        col = col_indices.tolist()
+        # all blocks side by side, (bs_m, nnz * bs_k), so each block row is a column slice,
+        # this is a view for values laid out with side_by_side_block_values
+        W = values.transpose(0, 1).reshape(bs_m, nnz * bs_k)
+        # row-major copy so the block rows of A are contiguous; this also normalizes
+        # the strides of size 1 dims (e.g. single token decode), which _int_mm mishandles
+        A_blocks = A.clone(memory_format=torch.contiguous_format).view(K // bs_k, bs_k * N)
+        out = torch.zeros(M, N, dtype=torch.int32)
+        _blocksparse_int_mm_rows(crow, col, col_indices, W, A_blocks, out, bs_m, bs_k)
+
+    # epilogue: scale rows by the weight scales and columns by the activation scales
+    y = out.to(torch.float32) * left_alpha.reshape(-1, 1).to(torch.float32)
+    y = y * right_alpha.reshape(1, -1).to(torch.float32)
+    return y.to(torch.bfloat16).t()
+
+
 @torch.library.register_fake("blocksparse::int_addmm")
 def blocksparse_int_addmm_abstract(
     crow_indices: torch.Tensor,
@@ -7,16 +7,17 @@ __all__ = [
     "create_semi_structured_tensor",
     "PerChannelNormObserver",
     "mask_creator",
+    "prune_lowest_",
 ]
 
-def create_block_sparse_tensor(M, N, blocksize, sparsity, dtype):
+def create_block_sparse_tensor(M, N, blocksize, sparsity, dtype, device="cuda"):
     assert sparsity <= 1.0 and sparsity >= 0.0, \
         "sparsity should be a value between 0 and 1"
     A = torch.bernoulli(torch.full((M//blocksize, N//blocksize),
                         1 - sparsity, dtype=dtype))
     A = torch.repeat_interleave(A, blocksize, dim=0)
     A = torch.repeat_interleave(A, blocksize, dim=1)
-    return A.to(dtype).contiguous().cuda()
+    return A.to(dtype).contiguous().to(device)
 
 def create_semi_structured_tensor(
     r, c, dtype
@@ -114,9 +115,59 @@ def mask_creator(
 
     # N:M sparsity for linear layers
     tensor_temp = tensor.detach().abs().reshape(num_groups, M)
-    index = torch.argsort(tensor_temp, dim=1)[:, :int(M - N)]
 
     w_b = torch.ones(tensor_temp.shape, device=tensor_temp.device)
-    mask = w_b.scatter_(dim=1, index=index, value=0).reshape(tensor.shape)
+    mask = prune_lowest_(w_b, tensor_temp, int(M - N)).reshape(tensor.shape)
 
     return mask
+
+
+def prune_lowest_(
+        mask: torch.Tensor,
+        metric: torch.Tensor,
+        num_specified: int,
+        chunk_size: int = 2**22,
+    ) -> torch.Tensor:
+    """
+    Zeroes out, in place, the `num_specified` entries of every row of `mask`
+    with the lowest `metric`.
+    A single row selects across the whole tensor: its threshold comes from
+    `kthvalue` (O(n)) instead of a full sort, and ties at the threshold are
+    pruned in order so exactly `num_specified` entries are zeroed. Multiple
+    rows (e.g. N:M groups) use a batched `topk`. Either way rows are processed
+    `chunk_size` elements at a time to bound temporary memory.
+    :param mask: A (num_groups, group_size) view of the mask to update
+    :param metric: A (num_groups, group_size) pruning metric, lower is pruned first
+    :param num_specified: The number of entries to prune per row
+    :param chunk_size: The number of elements processed at once
+    :return: `mask`
+    """
+    num_groups, group_size = metric.shape
+    if num_specified <= 0:
+        return mask
+
+    if num_groups > 1:
+        rows_per_chunk = max(1, chunk_size // group_size)
+        for start in range(0, num_groups, rows_per_chunk):
+            end = start + rows_per_chunk
+            index = torch.topk(metric[start:end], num_specified, dim=1, largest=False).indices
+            mask[start:end].scatter_(1, index, 0)
+        return mask
+
+    flat_metric, flat_mask = metric[0], mask[0]
+    threshold = torch.kthvalue(flat_metric, num_specified).values
+    num_below = sum(
+        int((flat_metric[start:start + chunk_size] < threshold).sum())
+        for start in range(0, group_size, chunk_size)
+    )
+    num_ties = num_specified - num_below
+    for start in range(0, group_size, chunk_size):
+        metric_chunk = flat_metric[start:start + chunk_size]
+        prune = metric_chunk < threshold
+        if num_ties > 0:
+            ties = metric_chunk == threshold
+            ties &= ties.cumsum(0) <= num_ties
+            num_ties -= int(ties.sum())
+            prune |= ties
+        flat_mask[start:start + chunk_size].masked_fill_(prune, 0)
+    return mask
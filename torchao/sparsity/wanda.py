@@ -8,7 +8,7 @@ from torch.ao.pruning import BaseSparsifier
 from torch.ao.quantization import default_placeholder_observer, QConfig
 from torch.ao.quantization.quantize import _remove_qconfig
 
-from .utils import PerChannelNormObserver
+from .utils import PerChannelNormObserver, prune_lowest_
 
 __all__ = ["WandaSparsifier"]
 
@@ -82,13 +82,11 @@ class WandaSparsifier(BaseSparsifier):
             block_size = kwargs["semi_structured_block_size"]
             num_specified = block_size // 2
 
-        # get indicies to prune
-        pruning_inds = pruning_metric.view(-1, block_size).argsort(dim=1)[
-            :, :num_specified
-        ]
-        # update mask
-        mask.data.view(-1, block_size).scatter_(
-            1, pruning_inds, torch.zeros_like(pruning_inds, dtype=mask.dtype)
+        # update mask, selecting by threshold rather than sorting the whole layer
+        prune_lowest_(
+            mask.data.view(-1, block_size),
+            pruning_metric.view(-1, block_size),
+            num_specified,
         )
 
     def squash_mask(